@@ -759,7 +759,8 @@ Focus on factual, verifiable information with specific dates, locations, and sou
                             self.db,
                             query_embedding=embedding,
                             limit=5,
-                            similarity_threshold=0.8
+                            similarity_threshold=0.8,
+                            model_name=model_name
                         )
                     else:
                         matches = []
@@ -1573,9 +1574,11 @@ Generate a structured professional report with these sections:
 
         # Get the primary embedding (prefer wildlife_tools)
         primary_embedding = None
+        primary_model = None
         for model_name in ["wildlife_tools", "tiger_reid", "cvwc2019", "rapid"]:
             if model_name in embeddings and embeddings[model_name] is not None:
                 primary_embedding = embeddings[model_name]
+                primary_model = model_name
                 break
 
         if primary_embedding is None:
@@ -1642,7 +1645,7 @@ Generate a structured professional report with these sections:
 
         # Store embedding in vector search for future matching
         try:
-            store_embedding(self.db, image_id, primary_embedding)
+            store_embedding(self.db, image_id, primary_embedding, model_name=primary_model)
             logger.info(f"[STORE TIGER] Stored embedding for image {image_id[:8]}")
         except Exception as e:
             logger.warning(f"[STORE TIGER] Failed to store embedding: {e}")
@@ -66,6 +66,60 @@ async def lifespan(app: FastAPI):
         init_db()
         logger.info("Database schema initialized")
 
+        # Load per-model gallery matrices (memory-mapped snapshots)
+        try:
+            from backend.database import get_db_session
+            from backend.database.gallery_index import load_gallery_indexes
+            with get_db_session() as db:
+                load_gallery_indexes(db)
+        except Exception as e:
+            logger.warning(f"Gallery index load failed, vector search will rebuild lazily: {e}")
+
+        # Load HNSW graphs when the deployment uses approximate search (stale
+        # graphs rebuild in the background; search stays exact until then)
+        from backend.database.vector_search import VECTOR_SEARCH_ENGINE
+        if VECTOR_SEARCH_ENGINE == "hnsw":
+            try:
+                from backend.database import get_db_session
+                from backend.database.hnsw_index import load_hnsw_indexes
+                with get_db_session() as db:
+                    load_hnsw_indexes(db)
+            except Exception as e:
+                logger.warning(f"HNSW index load failed, vector search will use exact search: {e}")
+
+        # Load gallery k-NN graphs used by identification re-ranking
+        try:
+            from backend.database import get_db_session
+            from backend.database.knn_graph import load_knn_graphs
+            with get_db_session() as db:
+                load_knn_graphs(db)
+        except Exception as e:
+            logger.warning(f"Gallery k-NN graph load failed, identification will skip re-ranking: {e}")
+
+        # Build per-tiger prototypes when two-stage search is enabled
+        from backend.database.prototype_index import DEFAULT_TOP_TIGERS
+        if DEFAULT_TOP_TIGERS > 0:
+            try:
+                from backend.database import get_db_session
+                from backend.database.prototype_index import load_prototype_indexes
+                with get_db_session() as db:
+                    load_prototype_indexes(db)
+            except Exception as e:
+                logger.warning(f"Prototype index build failed, it will be built lazily: {e}")
+
+        # Fill verification features of gallery images ingested before the
+        # feature store existed (non-blocking; new images are filled at ingest)
+        import threading
+        def backfill_verification_features():
+            try:
+                from backend.database import get_db_session
+                from backend.database.verification_features import backfill_gallery_features
+                with get_db_session() as db:
+                    backfill_gallery_features(db)
+            except Exception as e:
+                logger.warning(f"Verification feature backfill failed, features will be computed on first use: {e}")
+        threading.Thread(target=backfill_verification_features, daemon=True).start()
+
         # Check if database needs data loading
         from backend.database import get_db_session
         from backend.database.models import Facility, Tiger
@@ -166,6 +220,25 @@ async def lifespan(app: FastAPI):
         discovery_scheduler.stop()
         logger.info("Discovery scheduler stopped")
 
+    # Persist gallery index changes made since startup
+    try:
+        from backend.database.gallery_index import save_gallery_indexes
+        save_gallery_indexes()
+    except Exception as e:
+        logger.warning(f"Failed to save gallery indexes: {e}")
+
+    try:
+        from backend.database.hnsw_index import save_hnsw_indexes
+        save_hnsw_indexes()
+    except Exception as e:
+        logger.warning(f"Failed to save HNSW indexes: {e}")
+
+    try:
+        from backend.database.knn_graph import save_knn_graphs
+        save_knn_graphs()
+    except Exception as e:
+        logger.warning(f"Failed to save gallery k-NN graphs: {e}")
+
 
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
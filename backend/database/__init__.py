@@ -35,6 +35,7 @@ from backend.database.models import (
     EvidenceLink,
     ModelVersion,
     ModelInference,
+    VecTableGeneration,
     BackgroundJob,
     DataExport,
     SystemMetric,
@@ -58,6 +59,9 @@ from backend.database.models import (
 # Import audit models so they're registered with Base
 from backend.database.audit_models import AuditLog
 
+# Keep gallery verification features in step with tiger_images
+from backend.database import verification_features  # noqa: F401
+
 
 def _get_database_url():
     """Get SQLite database URL from environment or default."""
@@ -136,24 +140,31 @@ def get_db_session():
 
 
 def init_db():
-    """Initialize database schema and sqlite-vec virtual table."""
+    """Initialize database schema and per-model sqlite-vec virtual tables."""
+    from backend.database.vector_search import create_vec_tables, LEGACY_VEC_TABLE
+
     # Create all tables
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created")
 
-    # Create sqlite-vec virtual table for embeddings
+    # Create one sqlite-vec virtual table per ReID model
     with engine.connect() as conn:
+        tables = create_vec_tables(conn)
+        conn.commit()
+        logger.info(f"Vector tables ready: {tables}")
+
+        # Warn if embeddings are still sitting in the pre-migration table
         try:
-            conn.execute(text("""
-                CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings USING vec0(
-                    image_id TEXT PRIMARY KEY,
-                    embedding FLOAT[2048]
+            legacy_count = conn.execute(
+                text(f"SELECT COUNT(*) FROM {LEGACY_VEC_TABLE}")
+            ).scalar()
+            if legacy_count:
+                logger.warning(
+                    f"{legacy_count} embeddings remain in legacy {LEGACY_VEC_TABLE} table. "
+                    f"Run backend/database/migrations/008_per_model_vec_tables.py to move them."
                 )
-            """))
-            conn.commit()
-            logger.info("vec_embeddings virtual table created")
-        except Exception as e:
-            logger.warning(f"Failed to create vec_embeddings table: {e}")
+        except Exception:
+            pass
 
     return True
 
@@ -180,6 +191,7 @@ __all__ = [
     'EvidenceLink',
     'ModelVersion',
     'ModelInference',
+    'VecTableGeneration',
     'BackgroundJob',
     'DataExport',
     'SystemMetric',
@@ -0,0 +1,289 @@
+"""Persistent content-addressed cache of model embeddings
+
+Every ReID embedding is a pure function of the crop bytes and the model
+that produced it, yet re-identifying a known photo, re-running an
+investigation or a calibration script used to send every crop back to the
+GPU. ``ModalClient`` looks each crop up here before calling a model and
+stores what it computes:
+
+    cache = get_embedding_cache()
+    key = (sha256_hex(crop_bytes), "wildlife_tools", "1/modal")
+    found = cache.get_many([key])
+    cache.put_many({key: embedding})
+
+Entries are keyed on the SHA-256 of the encoded crop, the model name and a
+model version (``ModelRegistry.get_embedding_version``), so new weights or
+a different backend never serve stale vectors. Embeddings are stored as raw
+float32 bytes and evicted least recently used first once the stored bytes
+exceed ``EMBEDDING_CACHE_MAX_MB``.
+
+The cache is a SQLite file next to the database (``EMBEDDING_CACHE_PATH``
+overrides it) so entries survive restarts and are shared by the API, the
+task runner, the discovery scheduler and scripts. It is disabled for
+in-memory databases.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+DEFAULT_MAX_BYTES = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+# (crop sha256 hex, model name, model version)
+EmbeddingKey = Tuple[str, str, str]
+
+# Keys per lookup query (three bound parameters each)
+_LOOKUP_CHUNK = 300
+
+
+def get_default_cache_path() -> Optional[Path]:
+    """
+    Cache file location (next to the SQLite file).
+
+    Returns:
+        Cache path, or None for in-memory databases
+    """
+    override = os.getenv("EMBEDDING_CACHE_PATH")
+    if override:
+        return Path(override)
+
+    url = os.getenv("DATABASE_URL", "sqlite:///data/tiger_id.db")
+    if not url.startswith("sqlite:///") or ":memory:" in url:
+        return None
+    return Path(url.replace("sqlite:///", "")).parent / "embedding_cache.db"
+
+
+def sha256_hex(data: bytes) -> str:
+    """Content address of an encoded crop."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed cache of embeddings by (crop hash, model, version)."""
+
+    def __init__(self, path: Union[str, Path], max_bytes: Optional[int] = None):
+        """
+        Open (or create) a cache file.
+
+        Args:
+            path: SQLite file, or ":memory:"
+            max_bytes: Embedding bytes kept before the least recently used
+                entries are evicted (defaults to EMBEDDING_CACHE_MAX_MB)
+        """
+        self.path = str(path)
+        self.max_bytes = max_bytes or DEFAULT_MAX_BYTES
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                image_sha256 TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                PRIMARY KEY (image_sha256, model_name, model_version)
+            );
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_used
+                ON embeddings(last_used_at);
+        """)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        """Embedding bytes currently stored."""
+        with self._lock:
+            return self._size_bytes()
+
+    def _size_bytes(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(embedding)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, keys: Iterable[EmbeddingKey]) -> Dict[EmbeddingKey, np.ndarray]:
+        """
+        Look up several embeddings at once.
+
+        Args:
+            keys: (crop sha256, model name, model version) tuples
+
+        Returns:
+            float32 embeddings by key (missing keys are omitted)
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        rows = []
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                conditions = " OR ".join(
+                    "(image_sha256 = ? AND model_name = ? AND model_version = ?)" for _ in chunk
+                )
+                params = [part for key in chunk for part in key]
+                found_rows = self._conn.execute(
+                    f"""
+                    SELECT image_sha256, model_name, model_version, embedding
+                    FROM embeddings WHERE {conditions}
+                    """,
+                    params
+                ).fetchall()
+                if found_rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used_at = ? WHERE {conditions}",
+                        [time.time()] + params
+                    )
+                rows.extend(found_rows)
+
+        found = {
+            (row[0], row[1], row[2]): np.frombuffer(row[3], dtype="<f4").copy()
+            for row in rows
+        }
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, image_sha256: str, model_name: str, model_version: str) -> Optional[np.ndarray]:
+        """
+        Look up one embedding.
+
+        Returns:
+            The cached float32 embedding, or None on a miss
+        """
+        key = (image_sha256, model_name, model_version)
+        return self.get_many([key]).get(key)
+
+    def put_many(self, embeddings: Dict[EmbeddingKey, Any]) -> int:
+        """
+        Store several embeddings in one transaction, then evict down to size.
+
+        Args:
+            embeddings: Embedding (array or list of floats) by key
+
+        Returns:
+            Number of entries stored
+        """
+        rows = []
+        now = time.time()
+        for (image_sha256, model_name, model_version), embedding in embeddings.items():
+            if embedding is None:
+                continue
+            array = np.ascontiguousarray(embedding, dtype="<f4").reshape(-1)
+            rows.append(
+                (image_sha256, model_name, model_version, len(array), array.tobytes(), now, now)
+            )
+        if not rows:
+            return 0
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO embeddings
+                        (image_sha256, model_name, model_version, dim, embedding,
+                         created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows
+                )
+                evicted = self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if evicted:
+            self.evictions += evicted
+            logger.debug(f"Evicted {evicted} embeddings over {self.max_bytes} bytes")
+        return len(rows)
+
+    def put(self, image_sha256: str, model_name: str, model_version: str, embedding: Any) -> None:
+        """Store one embedding."""
+        self.put_many({(image_sha256, model_name, model_version): embedding})
+
+    def _evict(self) -> int:
+        """Drop least recently used entries until the stored bytes fit."""
+        if self._size_bytes() <= self.max_bytes:
+            return 0
+        return self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, SUM(LENGTH(embedding)) OVER (
+                        ORDER BY last_used_at DESC, rowid DESC
+                    ) AS kept_bytes
+                    FROM embeddings
+                ) WHERE kept_bytes > ?
+            )
+            """,
+            (self.max_bytes,)
+        ).rowcount
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes, hit rate and evictions."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the process-wide embedding cache (None when disabled)."""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        with _cache_lock:
+            if not _cache_loaded:
+                path = get_default_cache_path() if DEFAULT_ENABLED else None
+                if path is not None:
+                    try:
+                        _cache = EmbeddingCache(path)
+                    except Exception as e:
+                        logger.warning(f"Embedding cache disabled ({path}): {e}")
+                _cache_loaded = True
+    return _cache
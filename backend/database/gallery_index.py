@@ -0,0 +1,843 @@
+"""In-memory gallery index for exact cosine top-k search
+
+Keeps one contiguous, L2-normalized float32 matrix per ReID model together
+with parallel arrays of image_id and tiger_id. A query is a single
+matrix-vector product followed by ``np.argpartition``, so exact search over
+100k+ gallery images stays in the millisecond range without sqlite-vec.
+
+Each index is persisted as a ``.npy`` snapshot (loaded memory-mapped) plus a
+small JSON sidecar with the id arrays, in a ``gallery_index`` directory next
+to the SQLite database file. Snapshots are loaded at startup and reconciled
+against the per-model vec0 tables; ``store_embedding``/``delete_embedding``
+keep the in-memory copy current. Every embedding write bumps the table's
+generation (``vec_table_generations``) in the same transaction and each
+snapshot records the generation it reflects, so a rewrite that keeps the
+row count (a re-embed from another process, a crash before the save) is
+still rebuilt.
+
+Optionally the scan matrix can be quantized (``float16`` or per-row scalar
+``int8``), cutting resident memory 2-4x. The first-stage scan then runs over
+the quantized codes and the top ``k * rescore_factor`` candidates are
+re-scored exactly against float32 vectors, which stay in the memory-mapped
+snapshot (plus rows added since it was written). NumPy has no int8/float16
+GEMM, so codes are widened in cache-sized blocks: int8 scans run at roughly
+float32 speed, float16 scans are slower and only worth it for memory.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Rows allocated on first insert; capacity doubles afterwards
+_INITIAL_CAPACITY = 1024
+
+# Scan representation: "none" (float32), "float16" or "int8"
+QUANTIZATION_MODES = ("none", "float16", "int8")
+DEFAULT_QUANTIZATION = os.getenv("GALLERY_INDEX_QUANTIZATION", "none")
+
+# Candidates re-scored exactly per result when the scan is quantized
+DEFAULT_RESCORE_FACTOR = int(os.getenv("GALLERY_INDEX_RESCORE_FACTOR", "4"))
+
+# Rows dequantized per block during a quantized scan (kept cache-sized)
+_SCAN_BLOCK_ROWS = 256
+
+# Rows encoded/written per block when loading or saving snapshots
+_IO_BLOCK_ROWS = 16384
+
+# Mutations after which a dirty index is written back to disk (0 = only on
+# shutdown/explicit save; startup reconciliation rebuilds stale snapshots)
+DEFAULT_AUTOSAVE_EVERY = int(os.getenv("GALLERY_INDEX_AUTOSAVE_EVERY", "0"))
+
+
+def get_default_index_dir() -> Optional[Path]:
+    """
+    Directory for gallery index snapshots (next to the SQLite file).
+
+    Returns:
+        Snapshot directory, or None for in-memory databases
+    """
+    override = os.getenv("GALLERY_INDEX_DIR")
+    if override:
+        return Path(override)
+
+    url = os.getenv("DATABASE_URL", "sqlite:///data/tiger_id.db")
+    if not url.startswith("sqlite:///") or ":memory:" in url:
+        return None
+    db_path = Path(url.replace("sqlite:///", ""))
+    return db_path.parent / "gallery_index"
+
+
+# ----------------------------------------------------------------------
+# Table generations
+# ----------------------------------------------------------------------
+
+def get_table_generation(session: Session, table: str) -> Optional[int]:
+    """
+    Read a vec0 table's write generation (``vec_table_generations``).
+
+    Snapshots record the generation they reflect; a snapshot is current
+    only if it matches, whatever the row counts say.
+
+    Returns:
+        Generation (0 before the first write), or None if it cannot be read
+    """
+    try:
+        row = session.execute(
+            text("SELECT generation FROM vec_table_generations WHERE table_name = :table"),
+            {"table": table}
+        ).fetchone()
+    except Exception as e:
+        logger.debug(f"Cannot read generation of {table}: {e}")
+        return None
+    return row[0] if row else 0
+
+
+def bump_table_generation(connection, table: str) -> int:
+    """
+    Advance a vec0 table's write generation in the caller's transaction.
+
+    Args:
+        connection: SQLAlchemy connection or session writing to the table
+        table: vec0 table name
+
+    Returns:
+        The generation the write produces once committed
+    """
+    connection.execute(
+        text("""
+            INSERT INTO vec_table_generations(table_name, generation) VALUES (:table, 1)
+            ON CONFLICT(table_name) DO UPDATE SET generation = generation + 1
+        """),
+        {"table": table}
+    )
+    return connection.execute(
+        text("SELECT generation FROM vec_table_generations WHERE table_name = :table"),
+        {"table": table}
+    ).scalar()
+
+
+def follow_table_generation(index, generation: Optional[int]) -> None:
+    """
+    Move a loaded index to the generation of a committed write it applied.
+
+    The index only reflects the table if it also saw every earlier write;
+    after a gap (another process wrote in between) it has no generation,
+    so its snapshot is rebuilt at the next startup.
+    """
+    current = index.generation
+    index.generation = (
+        generation if current is not None and generation == current + 1 else None
+    )
+
+
+class GalleryIndex:
+    """Cosine-similarity index over one model's gallery embeddings."""
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        directory: Optional[Path] = None,
+        quantization: Optional[str] = None,
+        rescore_factor: Optional[int] = None
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            model_name: Canonical ReID model name
+            dim: Embedding dimension for the model
+            directory: Snapshot directory (no persistence if None)
+            quantization: Scan representation ("none", "float16", "int8")
+            rescore_factor: Candidates per result re-scored in float32
+                when the scan is quantized
+        """
+        quantization = quantization or DEFAULT_QUANTIZATION
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}"
+            )
+
+        self.model_name = model_name
+        self.dim = dim
+        self.directory = Path(directory) if directory else None
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor or DEFAULT_RESCORE_FACTOR)
+
+        self._lock = threading.RLock()
+        self._dirty_count = 0
+        self._autosave_paused = False
+        self.loaded = False
+        # Table generation the rows reflect (None once out of step)
+        self.generation: Optional[int] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty all storage."""
+        self._matrix = np.zeros((0, self.dim), dtype=self._scan_dtype)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._image_ids = np.empty(0, dtype=object)
+        self._tiger_ids = np.empty(0, dtype=object)
+        self._positions: Dict[str, int] = {}
+        self._size = 0
+        self._writable = True
+
+        # Exact float32 vectors for re-scoring a quantized scan
+        self._exact_snapshot: Optional[np.ndarray] = None
+        self._exact_snapshot_rows: Dict[str, int] = {}
+        self._exact_recent: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, image_id: str) -> bool:
+        return str(image_id) in self._positions
+
+    @property
+    def quantized(self) -> bool:
+        return self.quantization != "none"
+
+    @property
+    def _scan_dtype(self):
+        return {"none": np.float32, "float16": np.float16, "int8": np.int8}[self.quantization]
+
+    @property
+    def matrix_path(self) -> Optional[Path]:
+        return self.directory / f"{self.model_name}.npy" if self.directory else None
+
+    @property
+    def ids_path(self) -> Optional[Path]:
+        return self.directory / f"{self.model_name}.ids.json" if self.directory else None
+
+    def scan_bytes(self) -> int:
+        """Bytes scanned per query (codes plus int8 scales)."""
+        scan = self._matrix[:self._size].nbytes
+        if self.quantization == "int8":
+            scan += self._scales[:self._size].nbytes
+        return scan
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        return embeddings / (norms + 1e-10)
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode normalized float32 rows into the scan representation."""
+        if self.quantization == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.round(vectors / scales[:, None]).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        return vectors.astype(self._scan_dtype), np.ones(len(vectors), dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _ensure_capacity(self, needed: int) -> None:
+        """Grow (or detach from the read-only memory map) to hold `needed` rows."""
+        capacity = self._matrix.shape[0]
+        if self._writable and needed <= capacity:
+            return
+
+        if needed > capacity:
+            new_capacity = max(needed, _INITIAL_CAPACITY, capacity * 2)
+        else:
+            new_capacity = capacity
+        matrix = np.zeros((new_capacity, self.dim), dtype=self._scan_dtype)
+        matrix[:self._size] = self._matrix[:self._size]
+        scales = np.ones(new_capacity, dtype=np.float32)
+        scales[:self._size] = self._scales[:self._size]
+        image_ids = np.empty(new_capacity, dtype=object)
+        image_ids[:self._size] = self._image_ids[:self._size]
+        tiger_ids = np.empty(new_capacity, dtype=object)
+        tiger_ids[:self._size] = self._tiger_ids[:self._size]
+
+        self._matrix = matrix
+        self._scales = scales
+        self._image_ids = image_ids
+        self._tiger_ids = tiger_ids
+        self._writable = True
+
+    def add(self, image_id: str, embedding: np.ndarray, tiger_id: Optional[str] = None) -> None:
+        """
+        Add or replace one image's embedding.
+
+        Args:
+            image_id: Image UUID
+            embedding: Embedding vector (normalized here)
+            tiger_id: Owning tiger UUID, used for exclusion filters
+        """
+        self.add_many([image_id], np.asarray(embedding).reshape(1, -1), [tiger_id])
+
+    def add_many(
+        self,
+        image_ids: List[str],
+        embeddings: np.ndarray,
+        tiger_ids: Optional[List[Optional[str]]] = None
+    ) -> None:
+        """
+        Add or replace several embeddings at once.
+
+        Args:
+            image_ids: Image UUIDs
+            embeddings: Matrix of shape (len(image_ids), dim)
+            tiger_ids: Owning tiger UUIDs (parallel to image_ids)
+        """
+        embeddings = self._normalize(embeddings)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected embeddings of shape (n, {self.dim}) for {self.model_name}, "
+                f"got {embeddings.shape}"
+            )
+        if tiger_ids is None:
+            tiger_ids = [None] * len(image_ids)
+        codes, scales = self._encode(embeddings)
+
+        with self._lock:
+            self._ensure_capacity(self._size + len(image_ids))
+            for i, (image_id, tiger_id) in enumerate(zip(image_ids, tiger_ids)):
+                image_id = str(image_id)
+                row = self._positions.get(image_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._positions[image_id] = row
+                    self._image_ids[row] = image_id
+                self._matrix[row] = codes[i]
+                self._scales[row] = scales[i]
+                self._tiger_ids[row] = str(tiger_id) if tiger_id else None
+                if self.quantized:
+                    self._exact_recent[image_id] = embeddings[i].copy()
+            self._mark_dirty(len(image_ids))
+
+    def remove(self, image_id: str) -> bool:
+        """
+        Remove an image's embedding (swaps the last row into its slot).
+
+        Returns:
+            True if the image was present
+        """
+        image_id = str(image_id)
+        with self._lock:
+            row = self._positions.pop(image_id, None)
+            if row is None:
+                return False
+
+            self._ensure_capacity(self._size)
+            last = self._size - 1
+            if row != last:
+                moved_id = self._image_ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._scales[row] = self._scales[last]
+                self._image_ids[row] = moved_id
+                self._tiger_ids[row] = self._tiger_ids[last]
+                self._positions[moved_id] = row
+            self._image_ids[last] = None
+            self._tiger_ids[last] = None
+            self._exact_recent.pop(image_id, None)
+            self._size = last
+            self._mark_dirty(1)
+            return True
+
+    def clear(self) -> None:
+        """Drop all rows."""
+        with self._lock:
+            self._reset()
+            self._mark_dirty(1)
+
+    def _mark_dirty(self, count: int) -> None:
+        self._dirty_count += count
+        if (
+            self.directory
+            and DEFAULT_AUTOSAVE_EVERY
+            and not self._autosave_paused
+            and self._dirty_count >= DEFAULT_AUTOSAVE_EVERY
+        ):
+            self.save()
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _exact_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Fetch exact float32 vectors for scan rows."""
+        if not self.quantized:
+            return np.asarray(self._matrix[rows], dtype=np.float32)
+
+        vectors = np.empty((len(rows), self.dim), dtype=np.float32)
+        for i, row in enumerate(rows):
+            image_id = self._image_ids[row]
+            recent = self._exact_recent.get(image_id)
+            if recent is not None:
+                vectors[i] = recent
+            else:
+                vectors[i] = self._exact_snapshot[self._exact_snapshot_rows[image_id]]
+        return vectors
+
+    def _scan(self, queries: np.ndarray, size: int) -> np.ndarray:
+        """First-stage (q, n) similarities over the scan matrix."""
+        if not self.quantized:
+            return queries @ self._matrix[:size].T
+
+        similarities = np.empty((len(queries), size), dtype=np.float32)
+        buffer = np.empty((_SCAN_BLOCK_ROWS, self.dim), dtype=np.float32)
+        for start in range(0, size, _SCAN_BLOCK_ROWS):
+            stop = min(start + _SCAN_BLOCK_ROWS, size)
+            block = buffer[:stop - start]
+            np.copyto(block, self._matrix[start:stop], casting="unsafe")
+            block_scores = queries @ block.T
+            if self.quantization == "int8":
+                block_scores *= self._scales[start:stop]
+            similarities[:, start:stop] = block_scores
+        return similarities
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        exclude_tiger_id: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        eligible_ids: Optional[Set[str]] = None
+    ) -> List[Tuple[str, Optional[str], float]]:
+        """
+        Top-k cosine search.
+
+        Args:
+            query_embedding: Query vector at the model's dimension
+            k: Number of results
+            exclude_tiger_id: Skip images belonging to this tiger
+            similarity_threshold: Drop results below this similarity
+            eligible_ids: Only rank these images (pre-filtered candidates)
+
+        Returns:
+            List of (image_id, tiger_id, similarity), best first
+        """
+        query = np.asarray(query_embedding).reshape(1, -1)
+        return self.search_batch(query, k, exclude_tiger_id, similarity_threshold, eligible_ids)[0]
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        exclude_tiger_id: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        eligible_ids: Optional[Set[str]] = None
+    ) -> List[List[Tuple[str, Optional[str], float]]]:
+        """
+        Top-k cosine search for several queries with one matrix product.
+
+        Results are exact for float32 indexes. Quantized indexes scan the
+        codes, then re-score the best ``k * rescore_factor`` candidates per
+        query in float32, so returned similarities are always exact.
+
+        Args:
+            query_embeddings: Query matrix of shape (q, dim)
+            k: Number of results per query
+            exclude_tiger_id: Skip images belonging to this tiger
+            similarity_threshold: Drop results below this similarity
+            eligible_ids: Only rank these images (pre-filtered candidates)
+
+        Returns:
+            One list of (image_id, tiger_id, similarity) per query, best first
+        """
+        queries = self._normalize(np.asarray(query_embeddings))
+        if queries.ndim != 2 or queries.shape[1] != self.dim:
+            raise ValueError(
+                f"Query shape {queries.shape} does not match "
+                f"{self.model_name} index (q, {self.dim})"
+            )
+
+        num_queries = queries.shape[0]
+        with self._lock:
+            size = self._size
+            if size == 0 or k <= 0:
+                return [[] for _ in range(num_queries)]
+
+            # (q, n) similarities in a single GEMM (blocked when quantized)
+            similarities = self._scan(queries, size)
+            if exclude_tiger_id is not None:
+                excluded = self._tiger_ids[:size] == str(exclude_tiger_id)
+                similarities[:, excluded] = -np.inf
+            if eligible_ids is not None:
+                eligible = np.zeros(size, dtype=bool)
+                rows = [self._positions[i] for i in eligible_ids if i in self._positions]
+                eligible[rows] = True
+                similarities[:, ~eligible] = -np.inf
+
+            k = min(k, size)
+            candidates = min(size, k * self.rescore_factor) if self.quantized else k
+            if candidates < size:
+                top = np.argpartition(-similarities, candidates - 1, axis=1)[:, :candidates]
+            else:
+                top = np.broadcast_to(np.arange(size), (num_queries, size))
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+
+            if self.quantized:
+                top_scores = self._rescore(queries, top, top_scores)
+
+            order = np.argsort(-top_scores, axis=1, kind="stable")[:, :k]
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            results = []
+            for rows, scores in zip(top, top_scores):
+                hits = []
+                for row, similarity in zip(rows, scores):
+                    similarity = float(similarity)
+                    if similarity == -np.inf:
+                        break
+                    if similarity_threshold is not None and similarity < similarity_threshold:
+                        break
+                    hits.append((self._image_ids[row], self._tiger_ids[row], similarity))
+                results.append(hits)
+        return results
+
+    def _rescore(self, queries: np.ndarray, top: np.ndarray, top_scores: np.ndarray) -> np.ndarray:
+        """Replace approximate candidate scores with exact float32 similarities."""
+        unique_rows, inverse = np.unique(top, return_inverse=True)
+        exact = self._exact_vectors(unique_rows)
+        inverse = inverse.reshape(top.shape)
+
+        rescored = np.empty_like(top_scores)
+        for i, query in enumerate(queries):
+            rescored[i] = exact[inverse[i]] @ query
+        # Keep exclusions excluded
+        rescored[top_scores == -np.inf] = -np.inf
+        return rescored
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> bool:
+        """
+        Write the float32 index snapshot atomically.
+
+        Returns:
+            True if a snapshot was written
+        """
+        if not self.directory:
+            return False
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            matrix_tmp = self.matrix_path.with_name(self.matrix_path.name + ".tmp")
+            ids_tmp = self.ids_path.with_name(self.ids_path.name + ".tmp")
+
+            if self.quantized:
+                # Stream exact rows so the full float32 matrix is never resident
+                out = np.lib.format.open_memmap(
+                    matrix_tmp, mode="w+", dtype=np.float32, shape=(self._size, self.dim)
+                )
+                for start in range(0, self._size, _IO_BLOCK_ROWS):
+                    stop = min(start + _IO_BLOCK_ROWS, self._size)
+                    out[start:stop] = self._exact_vectors(np.arange(start, stop))
+                out.flush()
+                del out
+            else:
+                with open(matrix_tmp, "wb") as f:
+                    np.save(f, np.ascontiguousarray(self._matrix[:self._size]))
+
+            image_ids = list(self._image_ids[:self._size])
+            with open(ids_tmp, "w") as f:
+                json.dump({
+                    "model_name": self.model_name,
+                    "dim": self.dim,
+                    "count": self._size,
+                    "generation": self.generation,
+                    "image_ids": image_ids,
+                    "tiger_ids": list(self._tiger_ids[:self._size]),
+                }, f)
+
+            # Detach from any memory map before replacing the file under it
+            self._ensure_capacity(self._size)
+            self._exact_snapshot = None
+            os.replace(matrix_tmp, self.matrix_path)
+            os.replace(ids_tmp, self.ids_path)
+            self._dirty_count = 0
+
+            if self.quantized:
+                # Exact rows now live in the new snapshot
+                self._exact_snapshot = np.load(self.matrix_path, mmap_mode="r")
+                self._exact_snapshot_rows = {image_id: row for row, image_id in enumerate(image_ids)}
+                self._exact_recent = {}
+
+        logger.debug(f"Saved {self.model_name} gallery index ({self._size} rows)")
+        return True
+
+    def load(self) -> bool:
+        """
+        Load the snapshot memory-mapped.
+
+        Float32 indexes scan the memory map directly (read-only until the
+        first mutation). Quantized indexes encode it block by block and keep
+        the memory map only for exact re-scoring.
+
+        Returns:
+            True if a valid snapshot was loaded
+        """
+        if not self.matrix_path or not self.matrix_path.exists() or not self.ids_path.exists():
+            return False
+
+        try:
+            with open(self.ids_path) as f:
+                meta = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode="r")
+        except Exception as e:
+            logger.warning(f"Failed to read {self.model_name} gallery index snapshot: {e}")
+            return False
+
+        count = meta.get("count", 0)
+        if meta.get("dim") != self.dim or matrix.shape != (count, self.dim):
+            logger.warning(f"Ignoring {self.model_name} gallery index snapshot with mismatched shape")
+            return False
+
+        with self._lock:
+            self._reset()
+            self._image_ids = np.array(meta["image_ids"], dtype=object).reshape(-1)
+            self._tiger_ids = np.array(meta["tiger_ids"], dtype=object).reshape(-1)
+            self._positions = {image_id: row for row, image_id in enumerate(meta["image_ids"])}
+            self._size = count
+
+            if self.quantized:
+                self._matrix = np.empty((count, self.dim), dtype=self._scan_dtype)
+                self._scales = np.ones(count, dtype=np.float32)
+                for start in range(0, count, _IO_BLOCK_ROWS):
+                    stop = min(start + _IO_BLOCK_ROWS, count)
+                    codes, scales = self._encode(np.asarray(matrix[start:stop], dtype=np.float32))
+                    self._matrix[start:stop] = codes
+                    self._scales[start:stop] = scales
+                self._exact_snapshot = matrix
+                self._exact_snapshot_rows = dict(self._positions)
+            else:
+                self._matrix = matrix
+                self._scales = np.ones(count, dtype=np.float32)
+                self._writable = False
+
+            self.generation = meta.get("generation")
+            self._dirty_count = 0
+            self.loaded = True
+        return True
+
+    def rebuild_from_table(self, session: Session, table: str, batch_size: int = 5000) -> int:
+        """
+        Rebuild the index from a per-model vec0 table.
+
+        Args:
+            session: Database session (sqlite-vec must be loaded)
+            table: vec0 table name for this model
+            batch_size: Rows fetched per round trip
+
+        Returns:
+            Number of rows indexed
+        """
+        with self._lock:
+            self.clear()
+            self._autosave_paused = True
+            try:
+                # Read before the rows so concurrent writes make it stale, not current
+                generation = get_table_generation(session, table)
+                self._rebuild_batches(session, table, batch_size)
+            finally:
+                self._autosave_paused = False
+
+            self.generation = generation
+            self.loaded = True
+            self.save()
+        return self._size
+
+    def _rebuild_batches(self, session: Session, table: str, batch_size: int) -> None:
+        """Keyset-walk a vec0 table and add its rows in batches."""
+        last_id = ""
+        while True:
+            rows = session.execute(
+                text(f"""
+                    SELECT ve.image_id, ve.embedding, ti.tiger_id
+                    FROM {table} ve
+                    LEFT JOIN tiger_images ti ON ve.image_id = ti.image_id
+                    WHERE ve.image_id > :last_id
+                    ORDER BY ve.image_id
+                    LIMIT :batch_size
+                """),
+                {"last_id": last_id, "batch_size": batch_size}
+            ).fetchall()
+            if not rows:
+                break
+
+            matrix = np.stack([np.frombuffer(row.embedding, dtype=np.float32) for row in rows])
+            self.add_many(
+                [str(row.image_id) for row in rows],
+                matrix,
+                [str(row.tiger_id) if row.tiger_id else None for row in rows]
+            )
+            last_id = str(rows[-1].image_id)
+
+
+def measure_quantization_recall(
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    quantization: str = "int8",
+    rescore_factor: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Compare quantized top-k against exact float32 top-k on a gallery.
+
+    Args:
+        embeddings: Gallery matrix of shape (n, dim)
+        queries: Query matrix of shape (q, dim)
+        k: Results compared per query
+        quantization: Quantization mode to evaluate
+        rescore_factor: Candidates per result re-scored in float32
+
+    Returns:
+        Dict with recall@k, timings (ms per query) and scan memory (bytes)
+    """
+    import time
+
+    dim = embeddings.shape[1]
+    image_ids = [str(i) for i in range(len(embeddings))]
+    exact = GalleryIndex("recall_check", dim, quantization="none")
+    exact.add_many(image_ids, embeddings)
+    approx = GalleryIndex("recall_check", dim, quantization=quantization, rescore_factor=rescore_factor)
+    approx.add_many(image_ids, embeddings)
+
+    start = time.perf_counter()
+    exact_hits = exact.search_batch(queries, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+    start = time.perf_counter()
+    approx_hits = approx.search_batch(queries, k)
+    approx_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+    found = sum(
+        len({hit[0] for hit in a} & {hit[0] for hit in e})
+        for a, e in zip(approx_hits, exact_hits)
+    )
+    expected = sum(len(e) for e in exact_hits)
+
+    return {
+        "recall_at_k": found / expected if expected else 1.0,
+        "k": k,
+        "queries": len(queries),
+        "exact_ms_per_query": exact_ms,
+        "quantized_ms_per_query": approx_ms,
+        "exact_scan_bytes": exact.scan_bytes(),
+        "quantized_scan_bytes": approx.scan_bytes(),
+    }
+
+
+# ----------------------------------------------------------------------
+# Process-wide registry
+# ----------------------------------------------------------------------
+
+_indexes: Dict[str, GalleryIndex] = {}
+_indexes_lock = threading.Lock()
+_index_dir: Optional[Path] = None
+
+
+def get_gallery_index(model_name: str) -> GalleryIndex:
+    """
+    Get (or create an empty) gallery index for a model.
+
+    Args:
+        model_name: Model name (aliases allowed)
+
+    Returns:
+        GalleryIndex for the model
+    """
+    from backend.database.vector_search import resolve_model_name, get_model_embedding_dim
+
+    canonical = resolve_model_name(model_name)
+    index = _indexes.get(canonical)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(canonical)
+            if index is None:
+                index = GalleryIndex(canonical, get_model_embedding_dim(canonical), _index_dir)
+                _indexes[canonical] = index
+    return index
+
+
+def get_loaded_gallery_index(model_name: str) -> Optional[GalleryIndex]:
+    """Get a model's gallery index only if it has been loaded or built."""
+    index = get_gallery_index(model_name)
+    return index if index.loaded else None
+
+
+def load_gallery_indexes(session: Session, directory: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Load (or rebuild) gallery indexes for every ReID model.
+
+    Snapshots are reconciled against the vec0 tables: one whose row count
+    or table generation differs is rebuilt from the table. A stale snapshot
+    is dropped if the table cannot be read, and an index is left unloaded
+    rather than served empty.
+
+    Args:
+        session: Database session
+        directory: Snapshot directory (defaults to next to the SQLite file)
+
+    Returns:
+        Dict of model name to indexed row count
+    """
+    from backend.database.vector_search import get_model_registry, get_vec_table_name
+
+    global _index_dir
+    _index_dir = Path(directory) if directory else get_default_index_dir()
+
+    counts = {}
+    for model_name in get_model_registry().list_reid_models():
+        index = get_gallery_index(model_name)
+        index.directory = _index_dir
+        table = get_vec_table_name(model_name)
+
+        snapshot_loaded = index.load()
+        generation = get_table_generation(session, table)
+        current = snapshot_loaded and generation is not None and index.generation == generation
+        try:
+            table_count = session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() or 0
+        except Exception as e:
+            logger.debug(f"Cannot read {table} for gallery index reconciliation: {e}")
+            table_count = None
+
+        if table_count is not None and (not current or table_count != len(index)):
+            try:
+                index.rebuild_from_table(session, table)
+            except Exception as e:
+                logger.warning(f"Failed to rebuild {model_name} gallery index: {e}")
+        elif snapshot_loaded and not current:
+            logger.warning(f"Dropping stale {model_name} gallery index snapshot ({table} unreadable)")
+            with index._lock:
+                index._reset()
+                index.loaded = False
+
+        counts[model_name] = len(index)
+
+    logger.info(f"Gallery indexes loaded: {counts}")
+    return counts
+
+
+def save_gallery_indexes() -> None:
+    """Write snapshots for every index with unsaved changes."""
+    for index in list(_indexes.values()):
+        if index._dirty_count:
+            try:
+                index.save()
+            except Exception as e:
+                logger.warning(f"Failed to save {index.model_name} gallery index: {e}")
@@ -0,0 +1,858 @@
+"""HNSW approximate nearest-neighbour index for gallery embeddings
+
+sqlite-vec's vec0 tables and the in-memory ``GalleryIndex`` both scan every
+vector, so query cost grows linearly with the gallery. ``HNSWIndex`` keeps a
+hierarchical navigable small-world graph per ReID model so a query only
+visits a few hundred nodes.
+
+The graph is backed by ``hnswlib`` when it is installed and by a NumPy
+implementation otherwise. Both support incremental ``add``/``remove`` (driven
+by ``store_embedding``/``delete_embedding``), on-disk save/load and a tunable
+``ef_search``.
+
+Enable it per deployment with ``VECTOR_SEARCH_ENGINE=hnsw``; sqlite-vec stays
+the exact fallback, and serves searches while a stale graph is rebuilt in
+the background at startup.
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+# Graph parameters (per deployment)
+DEFAULT_M = int(os.getenv("HNSW_M", "16"))
+DEFAULT_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+DEFAULT_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+
+# Compact (rebuild without tombstones) on save once this share is deleted
+_COMPACT_DELETED_RATIO = 0.25
+
+_INITIAL_CAPACITY = 1024
+
+# Filters this selective are answered by an exact scan of the eligible nodes;
+# graph search would otherwise walk most of the graph to find k of them
+_EXACT_SCAN_MAX_ELIGIBLE = 2048
+
+# Background rebuilds retried when writes land before the graph goes live
+_REBUILD_ATTEMPTS = 3
+
+
+class _NumpyGraph:
+    """Pure NumPy/heapq HNSW graph over normalized vectors (cosine distance)."""
+
+    def __init__(self, dim: int, M: int, ef_construction: int, seed: int = 100):
+        self.dim = dim
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self._ml = 1.0 / math.log(max(M, 2))
+        self._rng = np.random.default_rng(seed)
+
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._count = 0
+        self._levels: List[int] = []
+        self._links: List[List[List[int]]] = []
+        self._entry = -1
+        self._max_level = -1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        vectors = np.zeros((max(needed, _INITIAL_CAPACITY, capacity * 2), self.dim), dtype=np.float32)
+        vectors[:self._count] = self._vectors[:self._count]
+        self._vectors = vectors
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: List[int],
+        ef: int,
+        level: int,
+        eligible: Optional[np.ndarray] = None
+    ) -> List[Tuple[float, int]]:
+        """Greedy beam search on one layer; returns (distance, node) ascending."""
+        visited = set(entry_points)
+        distances = 1.0 - self._vectors[entry_points] @ query
+
+        candidates = [(float(d), n) for d, n in zip(distances, entry_points)]
+        heapq.heapify(candidates)
+        results = [(-d, n) for d, n in candidates if eligible is None or eligible[n]]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            distance, node = heapq.heappop(candidates)
+            if len(results) >= ef and distance > -results[0][0]:
+                break
+
+            neighbours = [n for n in self._links[node][level] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+
+            neighbour_distances = 1.0 - self._vectors[neighbours] @ query
+            for n, d in zip(neighbours, neighbour_distances):
+                d = float(d)
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, n))
+                    if eligible is None or eligible[n]:
+                        heapq.heappush(results, (-d, n))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+
+        return sorted((-d, n) for d, n in results)
+
+    def _select_neighbours(self, candidates: List[Tuple[float, int]], m: int) -> List[int]:
+        """HNSW neighbour heuristic, topped up with the closest pruned nodes."""
+        if len(candidates) <= m:
+            return [node for _, node in candidates]
+
+        nodes = [node for _, node in candidates]
+        vectors = self._vectors[nodes]
+        pairwise = 1.0 - vectors @ vectors.T
+        closest_selected = np.full(len(nodes), np.inf, dtype=np.float32)
+
+        selected: List[int] = []
+        pruned: List[int] = []
+        for i, (distance, node) in enumerate(candidates):
+            if len(selected) >= m:
+                break
+            # Keep a candidate only if it is closer to the base than to any kept neighbour
+            if distance < closest_selected[i]:
+                selected.append(node)
+                np.minimum(closest_selected, pairwise[i], out=closest_selected)
+            else:
+                pruned.append(node)
+
+        selected.extend(pruned[:m - len(selected)])
+        return selected
+
+    def add(self, vector: np.ndarray) -> int:
+        """Insert a normalized vector; returns its node id."""
+        node = self._count
+        self._grow(node + 1)
+        self._vectors[node] = vector
+        self._count += 1
+
+        level = int(-math.log(max(self._rng.random(), 1e-12)) * self._ml)
+        self._levels.append(level)
+        self._links.append([[] for _ in range(level + 1)])
+
+        if self._entry == -1:
+            self._entry = node
+            self._max_level = level
+            return node
+
+        entry_points = [self._entry]
+        for layer in range(self._max_level, level, -1):
+            entry_points = [self._search_layer(vector, entry_points, 1, layer)[0][1]]
+
+        for layer in range(min(level, self._max_level), -1, -1):
+            candidates = self._search_layer(vector, entry_points, self.ef_construction, layer)
+            max_links = self.M0 if layer == 0 else self.M
+            neighbours = self._select_neighbours(candidates, self.M)
+            self._links[node][layer] = neighbours
+
+            for neighbour in neighbours:
+                links = self._links[neighbour][layer]
+                links.append(node)
+                if len(links) > max_links:
+                    link_distances = 1.0 - self._vectors[links] @ self._vectors[neighbour]
+                    ranked = sorted(zip(link_distances.tolist(), links))
+                    self._links[neighbour][layer] = self._select_neighbours(ranked, max_links)
+
+            entry_points = [n for _, n in candidates]
+
+        if level > self._max_level:
+            self._entry = node
+            self._max_level = level
+        return node
+
+    def knn(
+        self,
+        query: np.ndarray,
+        k: int,
+        ef: int,
+        eligible: np.ndarray
+    ) -> List[Tuple[float, int]]:
+        """Approximate k nearest eligible nodes as (distance, node)."""
+        if self._entry == -1:
+            return []
+
+        entry_points = [self._entry]
+        for layer in range(self._max_level, 0, -1):
+            entry_points = [self._search_layer(query, entry_points, 1, layer)[0][1]]
+        return self._search_layer(query, entry_points, max(ef, k), 0, eligible)[:k]
+
+    def vectors(self, nodes: List[int]) -> np.ndarray:
+        return self._vectors[nodes]
+
+    def save(self, path: Path) -> None:
+        link_counts = []
+        link_data = []
+        for node_links in self._links:
+            for layer_links in node_links:
+                link_counts.append(len(layer_links))
+                link_data.extend(layer_links)
+
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                vectors=self._vectors[:self._count],
+                levels=np.asarray(self._levels, dtype=np.int32),
+                link_counts=np.asarray(link_counts, dtype=np.int32),
+                link_data=np.asarray(link_data, dtype=np.int64),
+                header=np.asarray([self._entry, self._max_level], dtype=np.int64),
+            )
+
+    def load(self, path: Path) -> None:
+        with np.load(path) as data:
+            self._vectors = np.array(data["vectors"], dtype=np.float32)
+            self._count = len(self._vectors)
+            self._levels = data["levels"].tolist()
+            link_counts = data["link_counts"]
+            link_data = data["link_data"].tolist()
+            self._entry, self._max_level = (int(x) for x in data["header"])
+
+        self._links = []
+        position = 0
+        pair = 0
+        for level in self._levels:
+            node_links = []
+            for _ in range(level + 1):
+                count = int(link_counts[pair])
+                node_links.append(link_data[position:position + count])
+                position += count
+                pair += 1
+            self._links.append(node_links)
+
+
+class _HnswlibGraph:
+    """hnswlib-backed HNSW graph (inner-product space on normalized vectors)."""
+
+    def __init__(self, dim: int, M: int, ef_construction: int):
+        self.dim = dim
+        self.M = M
+        self.ef_construction = ef_construction
+        self._count = 0
+        self._index = hnswlib.Index(space="ip", dim=dim)
+        self._index.init_index(max_elements=_INITIAL_CAPACITY, ef_construction=ef_construction, M=M)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add_many(self, vectors: np.ndarray) -> List[int]:
+        labels = np.arange(self._count, self._count + len(vectors))
+        capacity = self._index.get_max_elements()
+        if self._count + len(vectors) > capacity:
+            self._index.resize_index(max(self._count + len(vectors), capacity * 2))
+        self._index.add_items(vectors, labels)
+        self._count += len(vectors)
+        return labels.tolist()
+
+    def mark_deleted(self, node: int) -> None:
+        self._index.mark_deleted(node)
+
+    def vectors(self, nodes: List[int]) -> np.ndarray:
+        if not nodes:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.asarray(self._index.get_items(nodes), dtype=np.float32)
+
+    def knn(
+        self,
+        query: np.ndarray,
+        k: int,
+        ef: int,
+        eligible: np.ndarray
+    ) -> List[Tuple[float, int]]:
+        available = int(eligible[:self._count].sum())
+        k = min(k, available)
+        if k <= 0:
+            return []
+
+        self._index.set_ef(max(ef, k))
+        while k > 0:
+            try:
+                labels, distances = self._index.knn_query(
+                    query.reshape(1, -1), k=k, filter=lambda label: bool(eligible[label])
+                )
+                return list(zip(distances[0].tolist(), labels[0].tolist()))
+            except RuntimeError:
+                # Fewer than k reachable eligible nodes for this ef
+                k //= 2
+        return []
+
+    def save(self, path: Path) -> None:
+        self._index.save_index(str(path))
+
+    def load(self, path: Path, count: int) -> None:
+        self._index = hnswlib.Index(space="ip", dim=self.dim)
+        self._index.load_index(str(path), max_elements=max(count, _INITIAL_CAPACITY))
+        self._count = count
+
+
+class HNSWIndex:
+    """Approximate cosine-similarity index over one model's gallery embeddings."""
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        directory: Optional[Path] = None,
+        M: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        backend: Optional[str] = None
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            model_name: Canonical ReID model name
+            dim: Embedding dimension for the model
+            directory: Snapshot directory (no persistence if None)
+            M: Graph out-degree (2*M on the base layer)
+            ef_construction: Beam width while inserting
+            ef_search: Beam width while querying (recall/latency trade-off)
+            backend: "hnswlib" or "numpy" (hnswlib when installed by default)
+        """
+        backend = backend or ("hnswlib" if HNSWLIB_AVAILABLE else "numpy")
+        if backend == "hnswlib" and not HNSWLIB_AVAILABLE:
+            raise ValueError("hnswlib backend requested but hnswlib is not installed")
+        if backend not in ("hnswlib", "numpy"):
+            raise ValueError(f"Unknown HNSW backend '{backend}'")
+
+        self.model_name = model_name
+        self.dim = dim
+        self.directory = Path(directory) if directory else None
+        self.M = M or DEFAULT_M
+        self.ef_construction = ef_construction or DEFAULT_EF_CONSTRUCTION
+        self.ef_search = ef_search or DEFAULT_EF_SEARCH
+        self.backend = backend
+
+        self._lock = threading.RLock()
+        self.loaded = False
+        # Table generation the nodes reflect (None once out of step)
+        self.generation: Optional[int] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        if self.backend == "hnswlib":
+            self._graph = _HnswlibGraph(self.dim, self.M, self.ef_construction)
+        else:
+            self._graph = _NumpyGraph(self.dim, self.M, self.ef_construction)
+        self._node_image_ids: List[Optional[str]] = []
+        self._node_tiger_ids: List[Optional[str]] = []
+        self._nodes: Dict[str, int] = {}
+        self._tiger_nodes: Dict[str, set] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, image_id: str) -> bool:
+        return str(image_id) in self._nodes
+
+    @property
+    def graph_path(self) -> Optional[Path]:
+        suffix = "hnswlib.bin" if self.backend == "hnswlib" else "hnsw.npz"
+        return self.directory / f"{self.model_name}.{suffix}" if self.directory else None
+
+    @property
+    def ids_path(self) -> Optional[Path]:
+        return self.directory / f"{self.model_name}.hnsw.json" if self.directory else None
+
+    @property
+    def deleted_count(self) -> int:
+        return len(self._node_image_ids) - len(self._nodes)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _grow_alive(self, needed: int) -> None:
+        if needed > len(self._alive):
+            alive = np.zeros(max(needed, _INITIAL_CAPACITY, len(self._alive) * 2), dtype=bool)
+            alive[:len(self._alive)] = self._alive
+            self._alive = alive
+
+    def add(self, image_id: str, embedding: np.ndarray, tiger_id: Optional[str] = None) -> None:
+        """Add or replace one image's embedding."""
+        self.add_many([image_id], np.asarray(embedding).reshape(1, -1), [tiger_id])
+
+    def add_many(
+        self,
+        image_ids: List[str],
+        embeddings: np.ndarray,
+        tiger_ids: Optional[List[Optional[str]]] = None
+    ) -> None:
+        """
+        Add or replace several embeddings.
+
+        Replacing an image tombstones its old node and inserts a new one.
+
+        Args:
+            image_ids: Image UUIDs
+            embeddings: Matrix of shape (len(image_ids), dim)
+            tiger_ids: Owning tiger UUIDs (parallel to image_ids)
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected embeddings of shape (n, {self.dim}) for {self.model_name}, "
+                f"got {embeddings.shape}"
+            )
+        embeddings = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-10)
+        if tiger_ids is None:
+            tiger_ids = [None] * len(image_ids)
+
+        with self._lock:
+            for image_id in image_ids:
+                self._tombstone(str(image_id))
+
+            if self.backend == "hnswlib":
+                nodes = self._graph.add_many(embeddings)
+            else:
+                nodes = [self._graph.add(vector) for vector in embeddings]
+
+            self._grow_alive(nodes[-1] + 1 if nodes else 0)
+            for node, image_id, tiger_id in zip(nodes, image_ids, tiger_ids):
+                image_id = str(image_id)
+                self._node_image_ids.append(image_id)
+                self._node_tiger_ids.append(str(tiger_id) if tiger_id else None)
+                self._nodes[image_id] = node
+                self._alive[node] = True
+                if tiger_id:
+                    self._tiger_nodes.setdefault(str(tiger_id), set()).add(node)
+            self._dirty = True
+
+    def _tombstone(self, image_id: str) -> bool:
+        node = self._nodes.pop(image_id, None)
+        if node is None:
+            return False
+        self._alive[node] = False
+        tiger_id = self._node_tiger_ids[node]
+        if tiger_id:
+            self._tiger_nodes.get(tiger_id, set()).discard(node)
+        if self.backend == "hnswlib":
+            self._graph.mark_deleted(node)
+        return True
+
+    def remove(self, image_id: str) -> bool:
+        """
+        Remove an image's embedding (soft delete; compacted on save).
+
+        Returns:
+            True if the image was present
+        """
+        with self._lock:
+            removed = self._tombstone(str(image_id))
+            self._dirty = self._dirty or removed
+            return removed
+
+    def build_from(
+        self,
+        image_ids: List[str],
+        embeddings: np.ndarray,
+        tiger_ids: Optional[List[Optional[str]]] = None
+    ) -> int:
+        """Rebuild the graph from scratch."""
+        with self._lock:
+            self._reset()
+            if len(image_ids):
+                self.add_many(image_ids, embeddings, tiger_ids)
+            self.loaded = True
+            return len(self)
+
+    def rebuild_from_table(self, session: Session, table: str, batch_size: int = 5000) -> int:
+        """
+        Rebuild the graph from a per-model vec0 table.
+
+        Args:
+            session: Database session (sqlite-vec must be loaded)
+            table: vec0 table name for this model
+            batch_size: Rows fetched per round trip
+
+        Returns:
+            Number of nodes indexed
+        """
+        from backend.database.gallery_index import get_table_generation
+
+        with self._lock:
+            self._reset()
+            # Read before the rows so concurrent writes make it stale, not current
+            generation = get_table_generation(session, table)
+            last_id = ""
+            while True:
+                rows = session.execute(
+                    text(f"""
+                        SELECT ve.image_id, ve.embedding, ti.tiger_id
+                        FROM {table} ve
+                        LEFT JOIN tiger_images ti ON ve.image_id = ti.image_id
+                        WHERE ve.image_id > :last_id
+                        ORDER BY ve.image_id
+                        LIMIT :batch_size
+                    """),
+                    {"last_id": last_id, "batch_size": batch_size}
+                ).fetchall()
+                if not rows:
+                    break
+
+                self.add_many(
+                    [str(row.image_id) for row in rows],
+                    np.stack([np.frombuffer(row.embedding, dtype=np.float32) for row in rows]),
+                    [str(row.tiger_id) if row.tiger_id else None for row in rows]
+                )
+                last_id = str(rows[-1].image_id)
+
+            self.generation = generation
+            self.loaded = True
+            self.save()
+        return len(self)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        exclude_tiger_id: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        ef_search: Optional[int] = None,
+        eligible_ids: Optional[Set[str]] = None
+    ) -> List[Tuple[str, Optional[str], float]]:
+        """
+        Approximate top-k cosine search.
+
+        Args:
+            query_embedding: Query vector at the model's dimension
+            k: Number of results
+            exclude_tiger_id: Skip images belonging to this tiger
+            similarity_threshold: Drop results below this similarity
+            ef_search: Override the index's beam width for this query
+            eligible_ids: Only return these images (pre-filtered candidates);
+                the graph is still traversed through ineligible nodes
+
+        Returns:
+            List of (image_id, tiger_id, similarity), best first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dim:
+            raise ValueError(
+                f"Query dimension {query.shape[0]} does not match "
+                f"{self.model_name} index ({self.dim})"
+            )
+        query = query / (np.linalg.norm(query) + 1e-10)
+
+        with self._lock:
+            if not self._nodes or k <= 0:
+                return []
+
+            eligible = self._alive
+            if eligible_ids is not None:
+                eligible = np.zeros_like(self._alive)
+                eligible[[self._nodes[i] for i in eligible_ids if i in self._nodes]] = True
+            excluded = self._tiger_nodes.get(str(exclude_tiger_id)) if exclude_tiger_id else None
+            if excluded:
+                eligible = eligible.copy()
+                eligible[list(excluded)] = False
+
+            if eligible is not self._alive and eligible.sum() <= _EXACT_SCAN_MAX_ELIGIBLE:
+                hits = self._exact_knn(query, k, np.flatnonzero(eligible))
+            else:
+                hits = self._graph.knn(query, k, ef_search or self.ef_search, eligible)
+
+            results = []
+            for distance, node in hits:
+                similarity = 1.0 - float(distance)
+                if similarity_threshold is not None and similarity < similarity_threshold:
+                    break
+                results.append((self._node_image_ids[node], self._node_tiger_ids[node], similarity))
+        return results
+
+    def _exact_knn(self, query: np.ndarray, k: int, nodes: np.ndarray) -> List[Tuple[float, int]]:
+        """Exact top-k over a small set of eligible nodes."""
+        if len(nodes) == 0:
+            return []
+        distances = 1.0 - self._graph.vectors(nodes.tolist()) @ query
+        order = np.argsort(distances, kind="stable")[:k]
+        return [(float(distances[i]), int(nodes[i])) for i in order]
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        exclude_tiger_id: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        eligible_ids: Optional[Set[str]] = None
+    ) -> List[List[Tuple[str, Optional[str], float]]]:
+        """Approximate top-k search for each row of a (q, dim) query matrix."""
+        return [
+            self.search(query, k, exclude_tiger_id, similarity_threshold, eligible_ids=eligible_ids)
+            for query in np.asarray(query_embeddings)
+        ]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _compact(self) -> None:
+        """Rebuild the graph without tombstoned nodes."""
+        live = sorted(self._nodes.items(), key=lambda item: item[1])
+        vectors = self._graph.vectors([node for _, node in live])
+        image_ids = [image_id for image_id, _ in live]
+        tiger_ids = [self._node_tiger_ids[node] for _, node in live]
+        self.build_from(image_ids, vectors, tiger_ids)
+
+    def save(self) -> bool:
+        """
+        Write the graph and id sidecar.
+
+        Returns:
+            True if a snapshot was written
+        """
+        if not self.directory:
+            return False
+
+        with self._lock:
+            total = len(self._node_image_ids)
+            if total and self.deleted_count / total > _COMPACT_DELETED_RATIO:
+                self._compact()
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            graph_tmp = self.graph_path.with_name(self.graph_path.name + ".tmp")
+            ids_tmp = self.ids_path.with_name(self.ids_path.name + ".tmp")
+
+            self._graph.save(graph_tmp)
+            with open(ids_tmp, "w") as f:
+                json.dump({
+                    "model_name": self.model_name,
+                    "dim": self.dim,
+                    "backend": self.backend,
+                    "M": self.M,
+                    "node_count": len(self._node_image_ids),
+                    "generation": self.generation,
+                    "image_ids": self._node_image_ids,
+                    "tiger_ids": self._node_tiger_ids,
+                    "alive": [bool(a) for a in self._alive[:len(self._node_image_ids)]],
+                }, f)
+
+            os.replace(graph_tmp, self.graph_path)
+            os.replace(ids_tmp, self.ids_path)
+            self._dirty = False
+
+        logger.debug(f"Saved {self.model_name} HNSW index ({len(self)} live nodes)")
+        return True
+
+    def load(self) -> bool:
+        """
+        Load a saved graph.
+
+        Returns:
+            True if a compatible snapshot was loaded
+        """
+        if not self.graph_path or not self.graph_path.exists() or not self.ids_path.exists():
+            return False
+
+        try:
+            with open(self.ids_path) as f:
+                meta = json.load(f)
+            if meta.get("dim") != self.dim or meta.get("backend") != self.backend:
+                logger.warning(f"Ignoring incompatible {self.model_name} HNSW snapshot")
+                return False
+
+            with self._lock:
+                self._reset()
+                node_count = meta["node_count"]
+                if self.backend == "hnswlib":
+                    self._graph.load(self.graph_path, node_count)
+                else:
+                    self._graph.load(self.graph_path)
+
+                self._node_image_ids = meta["image_ids"]
+                self._node_tiger_ids = meta["tiger_ids"]
+                self._grow_alive(node_count)
+                self._alive[:node_count] = meta["alive"]
+                for node, image_id in enumerate(self._node_image_ids):
+                    if self._alive[node]:
+                        self._nodes[image_id] = node
+                        tiger_id = self._node_tiger_ids[node]
+                        if tiger_id:
+                            self._tiger_nodes.setdefault(tiger_id, set()).add(node)
+                self.generation = meta.get("generation")
+                self.loaded = True
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load {self.model_name} HNSW snapshot: {e}")
+            self._reset()
+            return False
+
+
+# ----------------------------------------------------------------------
+# Process-wide registry
+# ----------------------------------------------------------------------
+
+_indexes: Dict[str, HNSWIndex] = {}
+_indexes_lock = threading.Lock()
+_rebuilds: Dict[str, threading.Thread] = {}
+
+
+def get_hnsw_index(model_name: str) -> HNSWIndex:
+    """
+    Get (or create an empty) HNSW index for a model.
+
+    Args:
+        model_name: Model name (aliases allowed)
+
+    Returns:
+        HNSWIndex for the model
+    """
+    from backend.database.vector_search import resolve_model_name, get_model_embedding_dim
+    from backend.database.gallery_index import get_default_index_dir
+
+    canonical = resolve_model_name(model_name)
+    index = _indexes.get(canonical)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(canonical)
+            if index is None:
+                index = HNSWIndex(canonical, get_model_embedding_dim(canonical), get_default_index_dir())
+                _indexes[canonical] = index
+    return index
+
+
+def get_loaded_hnsw_index(model_name: str) -> Optional[HNSWIndex]:
+    """Get a model's HNSW index only if it has been loaded or built."""
+    from backend.database.vector_search import resolve_model_name
+
+    index = _indexes.get(resolve_model_name(model_name))
+    return index if index is not None and index.loaded else None
+
+
+def _rebuild_until_current(index: HNSWIndex, bind, table: str) -> None:
+    """Rebuild a graph on its own session, retrying if a write raced the scan."""
+    from backend.database.gallery_index import get_table_generation
+
+    with Session(bind=bind) as session:
+        for _ in range(_REBUILD_ATTEMPTS):
+            try:
+                index.rebuild_from_table(session, table)
+                # Commits from now on reach the live graph; earlier ones after
+                # the scan would show as a generation gap
+                session.rollback()
+                if index.generation is not None and index.generation == get_table_generation(session, table):
+                    logger.info(f"Rebuilt {index.model_name} HNSW index ({len(index)} nodes)")
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to rebuild {index.model_name} HNSW index: {e}")
+                index.loaded = False
+                return
+            index.loaded = False
+        logger.warning(f"{index.model_name} HNSW index kept changing during rebuild, using exact search")
+
+
+def load_hnsw_indexes(
+    session: Session,
+    directory: Optional[Path] = None,
+    background: bool = True
+) -> Dict[str, int]:
+    """
+    Load (or rebuild) HNSW indexes for every ReID model.
+
+    Graphs are reconciled against the vec0 tables like the gallery indexes;
+    a snapshot whose live node count or table generation differs is rebuilt
+    from the table. Building a large graph takes minutes (far longer with the
+    NumPy backend), so by default rebuilds run in background threads and
+    searches use the exact path until the graph is live.
+
+    Args:
+        session: Database session
+        directory: Snapshot directory (defaults to next to the SQLite file)
+        background: Rebuild stale graphs off the calling thread
+
+    Returns:
+        Dict of model name to live node count (0 while rebuilding)
+    """
+    from backend.database.gallery_index import get_default_index_dir, get_table_generation
+    from backend.database.vector_search import get_model_registry, get_vec_table_name
+
+    directory = Path(directory) if directory else get_default_index_dir()
+
+    counts = {}
+    for model_name in get_model_registry().list_reid_models():
+        index = get_hnsw_index(model_name)
+        index.directory = directory
+        table = get_vec_table_name(model_name)
+
+        snapshot_loaded = index.load()
+        generation = get_table_generation(session, table)
+        current = snapshot_loaded and generation is not None and index.generation == generation
+        try:
+            table_count = session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() or 0
+        except Exception as e:
+            logger.debug(f"Cannot read {table} for HNSW reconciliation: {e}")
+            table_count = None
+
+        if table_count is not None and (not current or table_count != len(index)):
+            with index._lock:
+                index._reset()
+                index.loaded = False
+            if background:
+                running = _rebuilds.get(model_name)
+                if running is None or not running.is_alive():
+                    thread = threading.Thread(
+                        target=_rebuild_until_current,
+                        args=(index, session.get_bind(), table),
+                        daemon=True,
+                        name=f"HNSW-Rebuild-{model_name}"
+                    )
+                    _rebuilds[model_name] = thread
+                    thread.start()
+                    logger.info(f"Rebuilding {model_name} HNSW index in the background ({table_count} rows)")
+            else:
+                _rebuild_until_current(index, session.get_bind(), table)
+        elif snapshot_loaded and not current:
+            logger.warning(f"Dropping stale {model_name} HNSW snapshot ({table} unreadable)")
+            with index._lock:
+                index._reset()
+                index.loaded = False
+
+        counts[model_name] = len(index)
+
+    logger.info(f"HNSW indexes loaded ({'hnswlib' if HNSWLIB_AVAILABLE else 'numpy'}): {counts}")
+    return counts
+
+
+def save_hnsw_indexes() -> None:
+    """Write snapshots for every HNSW index with unsaved changes."""
+    for index in list(_indexes.values()):
+        if index._dirty:
+            try:
+                index.save()
+            except Exception as e:
+                logger.warning(f"Failed to save {index.model_name} HNSW index: {e}")
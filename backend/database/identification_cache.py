@@ -0,0 +1,352 @@
+"""Persistent cache of tiger identification results
+
+Investigators often re-submit the same evidence photo. ``TigerIdentificationService``
+looks each upload up here before running detection, embedding and search,
+and stores the result of every pipeline run that completes.
+
+Entries are keyed on the SHA-256 of the uploaded bytes, the ensemble mode
+and request parameters, the active model versions and a gallery generation
+counter. The counter is bumped whenever gallery embeddings or tiger, image
+or facility records change (after the writing transaction commits), which
+makes every older entry unreachable; they are purged on the bump. Activating
+a different model version changes the key the same way. A result computed
+while the generation moved on is not stored.
+
+The cache is a SQLite file next to the database (``IDENTIFICATION_CACHE_PATH``
+overrides it) so entries survive restarts and are shared by worker
+processes. It is disabled for in-memory databases.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, object_session
+
+from backend.database.models import Facility, Tiger, TigerImage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENABLED = os.getenv("IDENTIFICATION_CACHE_ENABLED", "true").lower() == "true"
+DEFAULT_MAX_ENTRIES = int(os.getenv("IDENTIFICATION_CACHE_SIZE", "10000"))
+
+# session.info key for a generation bump applied when the session commits
+_PENDING_KEY = "identification_cache_stale"
+
+
+def get_default_cache_path() -> Optional[Path]:
+    """
+    Cache file location (next to the SQLite file).
+
+    Returns:
+        Cache path, or None for in-memory databases
+    """
+    override = os.getenv("IDENTIFICATION_CACHE_PATH")
+    if override:
+        return Path(override)
+
+    url = os.getenv("DATABASE_URL", "sqlite:///data/tiger_id.db")
+    if not url.startswith("sqlite:///") or ":memory:" in url:
+        return None
+    return Path(url.replace("sqlite:///", "")).parent / "identification_cache.db"
+
+
+def make_cache_key(
+    image_sha256: str,
+    generation: int,
+    model_versions: Dict[str, str],
+    **params: Any
+) -> str:
+    """
+    Build the cache key for one identification request.
+
+    Args:
+        image_sha256: Hex SHA-256 of the uploaded image bytes
+        generation: Gallery generation the result is computed against
+        model_versions: Active version per model name
+        **params: Ensemble mode and request parameters affecting the result
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = json.dumps(
+        {"image": image_sha256, "generation": generation, "models": model_versions, **params},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_active_model_versions(session: Session) -> Dict[str, str]:
+    """Active version of every registered model (empty without the table)."""
+    try:
+        rows = session.execute(text("""
+            SELECT model_name, version, model_id FROM model_versions
+            WHERE is_active = 1
+        """))
+        return {str(row.model_name): f"{row.version}:{row.model_id}" for row in rows}
+    except Exception as e:
+        logger.debug(f"Could not read active model versions: {e}")
+        return {}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class IdentificationCache:
+    """SQLite-backed cache of identification results by request key."""
+
+    def __init__(self, path: Union[str, Path], max_entries: Optional[int] = None):
+        """
+        Open (or create) a cache file.
+
+        Args:
+            path: SQLite file, or ":memory:"
+            max_entries: Entries kept before the least recently used are
+                evicted (defaults to IDENTIFICATION_CACHE_SIZE)
+        """
+        self.path = str(path)
+        self.max_entries = max_entries or DEFAULT_MAX_ENTRIES
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS identification_results (
+                cache_key TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_identification_results_last_used
+                ON identification_results(last_used_at);
+            CREATE TABLE IF NOT EXISTS cache_meta (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO cache_meta(name, value) VALUES ('gallery_generation', 0);
+        """)
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM identification_results").fetchone()[0]
+
+    def generation(self) -> int:
+        """Current gallery generation."""
+        with self._lock:
+            return self._generation()
+
+    def _generation(self) -> int:
+        return self._conn.execute(
+            "SELECT value FROM cache_meta WHERE name = 'gallery_generation'"
+        ).fetchone()[0]
+
+    def bump_generation(self) -> int:
+        """Invalidate every entry by moving to a new gallery generation."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE cache_meta SET value = value + 1 WHERE name = 'gallery_generation'"
+                )
+                generation = self._generation()
+                self._conn.execute(
+                    "DELETE FROM identification_results WHERE generation < ?", (generation,)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.debug(f"Identification cache moved to gallery generation {generation}")
+        return generation
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            cache_key: Key from ``make_cache_key``
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM identification_results WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE identification_results SET last_used_at = ? WHERE cache_key = ?",
+                (time.time(), cache_key)
+            )
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, generation: int, result: Dict[str, Any]) -> bool:
+        """
+        Store a result computed against ``generation``.
+
+        Args:
+            cache_key: Key from ``make_cache_key``
+            generation: Gallery generation the result was computed against
+            result: JSON-serializable identification result
+
+        Returns:
+            True if stored (False for stale or unserializable results)
+        """
+        try:
+            payload = json.dumps(result, default=_json_default)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Identification result not cacheable: {e}")
+            return False
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if generation < self._generation():
+                    # The gallery changed while the result was computed
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO identification_results
+                        (cache_key, generation, result, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (cache_key, generation, payload, now, now)
+                )
+                self._conn.execute(
+                    """
+                    DELETE FROM identification_results WHERE cache_key IN (
+                        SELECT cache_key FROM identification_results
+                        ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def clear(self) -> None:
+        """Drop every entry (the generation is kept)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM identification_results")
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count, hit rate and current generation."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "generation": self.generation(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[IdentificationCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_identification_cache() -> Optional[IdentificationCache]:
+    """Get the process-wide identification cache (None when disabled)."""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        with _cache_lock:
+            if not _cache_loaded:
+                path = get_default_cache_path() if DEFAULT_ENABLED else None
+                if path is not None:
+                    try:
+                        _cache = IdentificationCache(path)
+                    except Exception as e:
+                        logger.warning(f"Identification cache disabled ({path}): {e}")
+                _cache_loaded = True
+    return _cache
+
+
+def bump_gallery_generation(session: Optional[Session] = None) -> None:
+    """
+    Invalidate cached identifications after a gallery change.
+
+    Args:
+        session: Bump once this session's transaction commits (a rollback
+            cancels it). Bumps immediately when omitted.
+    """
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+        return
+    cache = get_identification_cache()
+    if cache is not None:
+        try:
+            cache.bump_generation()
+        except Exception as e:
+            logger.warning(f"Failed to invalidate identification cache: {e}")
+
+
+# ----------------------------------------------------------------------
+# Invalidation hooks
+# ----------------------------------------------------------------------
+
+@event.listens_for(Tiger, "after_insert")
+@event.listens_for(Tiger, "after_update")
+@event.listens_for(Tiger, "after_delete")
+@event.listens_for(Facility, "after_update")
+@event.listens_for(Facility, "after_delete")
+@event.listens_for(TigerImage, "after_insert")
+@event.listens_for(TigerImage, "after_update")
+@event.listens_for(TigerImage, "after_delete")
+def _on_gallery_record_change(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session) -> None:
+    if session.info.pop(_PENDING_KEY, False):
+        bump_gallery_generation()
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,590 @@
+"""Persisted gallery k-NN graph for k-reciprocal re-ranking
+
+k-reciprocal re-ranking (``services/reranking_service.py``) needs every
+gallery image's nearest neighbours. Recomputing them per query costs a full
+gallery-by-gallery distance matrix, although the gallery only changes when
+embeddings are stored or deleted. ``GalleryKNNGraph`` keeps, per ReID model,
+the L2-normalized gallery vectors, each image's ``k`` nearest neighbours
+(itself first) with their squared Euclidean distances, and each row's
+farthest distance, which the re-ranker normalizes by.
+
+Adds merge the new rows into the existing neighbour lists; removals rescan
+only the rows that listed the removed image (or had it as their farthest
+point). ``store_embedding``/``delete_embedding`` keep loaded graphs current.
+Graphs are saved as ``.knn.npz`` snapshots with a JSON id sidecar in the
+gallery index directory and reconciled against the vec0 tables at startup.
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.database.gallery_index import get_default_index_dir, get_table_generation
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per image, including itself (re-ranking k1 + 1)
+DEFAULT_K = int(os.getenv("RERANKING_GRAPH_K", "21"))
+
+# Mutations after which a dirty graph is written back to disk (0 = only on
+# shutdown/explicit save)
+DEFAULT_AUTOSAVE_EVERY = int(os.getenv("RERANKING_GRAPH_AUTOSAVE_EVERY", "0"))
+
+_INITIAL_CAPACITY = 1024
+
+# Upper bound on elements in a dense distance block (~64MB of float32)
+_BLOCK_ELEMENTS = 1 << 24
+
+# Graph versions are unique across instances so derived caches never
+# mistake a reloaded graph for the one they were built from
+_versions = itertools.count(1)
+
+
+class KNNGraphView(NamedTuple):
+    """Consistent read-only view of a graph (valid inside ``read()``)."""
+    version: int
+    image_ids: List[str]
+    tiger_ids: List[Optional[str]]
+    vectors: np.ndarray
+    neighbours: np.ndarray
+    distances: np.ndarray
+    row_max: np.ndarray
+
+
+class GalleryKNNGraph:
+    """Exact k-nearest-neighbour lists over one model's gallery embeddings."""
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        k: Optional[int] = None,
+        directory: Optional[Path] = None
+    ):
+        """
+        Initialize an empty graph.
+
+        Args:
+            model_name: Canonical ReID model name
+            dim: Embedding dimension for the model
+            k: Neighbours kept per image, including the image itself
+            directory: Snapshot directory (no persistence if None)
+        """
+        self.model_name = model_name
+        self.dim = dim
+        self.k = max(1, k or DEFAULT_K)
+        self.directory = Path(directory) if directory else None
+
+        self._lock = threading.RLock()
+        self._dirty_count = 0
+        self.loaded = False
+        # Table generation the graph reflects (None once out of step)
+        self.generation: Optional[int] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._neighbours = np.zeros((0, self.k), dtype=np.int32)
+        self._distances = np.zeros((0, self.k), dtype=np.float32)
+        self._row_max = np.zeros(0, dtype=np.float32)
+        self._image_ids: List[str] = []
+        self._tiger_ids: List[Optional[str]] = []
+        self._positions: Dict[str, int] = {}
+        self._size = 0
+        self.version = next(_versions)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, image_id: str) -> bool:
+        return str(image_id) in self._positions
+
+    @property
+    def graph_path(self) -> Optional[Path]:
+        return self.directory / f"{self.model_name}.knn.npz" if self.directory else None
+
+    @property
+    def ids_path(self) -> Optional[Path]:
+        return self.directory / f"{self.model_name}.knn.ids.json" if self.directory else None
+
+    @contextmanager
+    def read(self) -> Iterator[KNNGraphView]:
+        """
+        Hold the graph lock and expose its arrays.
+
+        Yields:
+            KNNGraphView over the current rows; padding entries in short
+            neighbour lists (fewer than k images) are -1 with distance inf
+        """
+        with self._lock:
+            size = self._size
+            yield KNNGraphView(
+                version=self.version,
+                image_ids=self._image_ids,
+                tiger_ids=self._tiger_ids,
+                vectors=self._vectors[:size],
+                neighbours=self._neighbours[:size],
+                distances=self._distances[:size],
+                row_max=self._row_max[:size],
+            )
+
+    def position(self, image_id: str) -> Optional[int]:
+        """Row of an image in the graph arrays."""
+        return self._positions.get(str(image_id))
+
+    # ------------------------------------------------------------------
+    # Distances
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        return embeddings / (norms + 1e-10)
+
+    def _distance_block(self, rows: np.ndarray, cols: slice) -> np.ndarray:
+        """Squared Euclidean distances between normalized rows."""
+        dots = self._vectors[rows] @ self._vectors[cols].T
+        return np.maximum(2 - 2 * dots, 0)
+
+    def _rebuild_lists(self, rows: np.ndarray) -> None:
+        """Recompute neighbour lists and row maxima of rows against the whole graph."""
+        size = self._size
+        k = min(self.k, size)
+        block = max(1, _BLOCK_ELEMENTS // max(size, 1))
+        for start in range(0, len(rows), block):
+            block_rows = rows[start:start + block]
+            dist = self._distance_block(block_rows, slice(0, size))
+            dist[np.arange(len(block_rows)), block_rows] = 0
+            self._row_max[block_rows] = dist.max(axis=1)
+
+            if k < size:
+                nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            else:
+                nearest = np.broadcast_to(np.arange(size), (len(block_rows), size))
+            nearest_dist = np.take_along_axis(dist, nearest, axis=1)
+            order = np.argsort(nearest_dist, axis=1, kind="stable")
+
+            self._neighbours[block_rows] = -1
+            self._distances[block_rows] = np.inf
+            self._neighbours[block_rows, :k] = np.take_along_axis(nearest, order, axis=1)
+            self._distances[block_rows, :k] = np.take_along_axis(nearest_dist, order, axis=1)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        capacity = max(needed, _INITIAL_CAPACITY, capacity * 2)
+        for name, fill in (("_vectors", 0), ("_neighbours", -1), ("_distances", np.inf), ("_row_max", 0)):
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def add(self, image_id: str, embedding: np.ndarray, tiger_id: Optional[str] = None) -> None:
+        """
+        Add or replace one image's embedding.
+
+        Args:
+            image_id: Image UUID
+            embedding: Embedding vector (normalized here)
+            tiger_id: Owning tiger UUID
+        """
+        self.add_many([image_id], np.asarray(embedding).reshape(1, -1), [tiger_id])
+
+    def add_many(
+        self,
+        image_ids: List[str],
+        embeddings: np.ndarray,
+        tiger_ids: Optional[List[Optional[str]]] = None
+    ) -> None:
+        """
+        Add or replace several embeddings, merging them into existing lists.
+
+        Args:
+            image_ids: Image UUIDs
+            embeddings: Matrix of shape (len(image_ids), dim)
+            tiger_ids: Owning tiger UUIDs (parallel to image_ids)
+        """
+        embeddings = self._normalize(embeddings)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected embeddings of shape (n, {self.dim}) for {self.model_name}, "
+                f"got {embeddings.shape}"
+            )
+        if tiger_ids is None:
+            tiger_ids = [None] * len(image_ids)
+
+        # Last occurrence wins within a batch
+        latest = {str(image_id): i for i, image_id in enumerate(image_ids)}
+        if not latest:
+            return
+
+        with self._lock:
+            # Replaced images leave first so their old neighbours are repaired
+            for image_id in latest:
+                if image_id in self._positions:
+                    self._remove(image_id)
+
+            old_size = self._size
+            self._grow(old_size + len(latest))
+            for image_id, i in latest.items():
+                row = self._size
+                self._vectors[row] = embeddings[i]
+                self._image_ids.append(image_id)
+                self._tiger_ids.append(str(tiger_ids[i]) if tiger_ids[i] else None)
+                self._positions[image_id] = row
+                self._size += 1
+
+            new_rows = np.arange(old_size, self._size)
+            self._rebuild_lists(new_rows)
+            if old_size:
+                self._merge_new_rows(old_size, new_rows)
+
+            self.version = next(_versions)
+            self._mark_dirty(len(latest))
+
+    def _merge_new_rows(self, old_size: int, new_rows: np.ndarray) -> None:
+        """Insert new rows into the lists of existing rows they are closer to."""
+        block = max(1, _BLOCK_ELEMENTS // len(new_rows))
+        for start in range(0, old_size, block):
+            rows = np.arange(start, min(start + block, old_size))
+            dist = self._distance_block(rows, slice(new_rows[0], new_rows[-1] + 1))
+            self._row_max[rows] = np.maximum(self._row_max[rows], dist.max(axis=1))
+
+            closer = dist.min(axis=1) < self._distances[rows, -1]
+            if not closer.any():
+                continue
+            rows, dist = rows[closer], dist[closer]
+            merged = np.hstack([self._neighbours[rows], np.broadcast_to(new_rows, dist.shape)])
+            merged_dist = np.hstack([self._distances[rows], dist])
+            order = np.argsort(merged_dist, axis=1, kind="stable")[:, :self.k]
+            self._neighbours[rows] = np.take_along_axis(merged, order, axis=1)
+            self._distances[rows] = np.take_along_axis(merged_dist, order, axis=1)
+
+    def remove(self, image_id: str) -> bool:
+        """
+        Remove an image, repairing the lists that referenced it.
+
+        Returns:
+            True if the image was present
+        """
+        with self._lock:
+            if str(image_id) not in self._positions:
+                return False
+            self._remove(str(image_id))
+            self.version = next(_versions)
+            self._mark_dirty(1)
+            return True
+
+    def _remove(self, image_id: str) -> None:
+        """Drop one row by moving the last row into its slot (lock held)."""
+        row = self._positions.pop(image_id)
+        last = self._size - 1
+        size = self._size
+
+        # Rows that listed the removed image, or had it as their farthest point
+        removed_dist = self._distance_block(np.array([row]), slice(0, size))[0]
+        affected = (self._neighbours[:size] == row).any(axis=1)
+        affected |= removed_dist >= self._row_max[:size] * (1 - 1e-6)
+        affected[row] = False
+        affected = np.flatnonzero(affected)
+
+        if row != last:
+            moved = self._image_ids[last]
+            self._vectors[row] = self._vectors[last]
+            self._neighbours[row] = self._neighbours[last]
+            self._distances[row] = self._distances[last]
+            self._row_max[row] = self._row_max[last]
+            self._image_ids[row] = moved
+            self._tiger_ids[row] = self._tiger_ids[last]
+            self._positions[moved] = row
+            self._neighbours[:size][self._neighbours[:size] == last] = row
+            affected[affected == last] = row
+        self._image_ids.pop()
+        self._tiger_ids.pop()
+        self._neighbours[last] = -1
+        self._distances[last] = np.inf
+        self._size = last
+
+        if self._size and len(affected):
+            self._rebuild_lists(affected)
+
+    def build_from(
+        self,
+        image_ids: List[str],
+        embeddings: np.ndarray,
+        tiger_ids: Optional[List[Optional[str]]] = None
+    ) -> None:
+        """
+        Replace the graph with lists computed over a whole gallery.
+
+        Args:
+            image_ids: Image UUIDs
+            embeddings: Matrix of shape (len(image_ids), dim)
+            tiger_ids: Owning tiger UUIDs (parallel to image_ids)
+        """
+        embeddings = self._normalize(embeddings).reshape(-1, self.dim)
+        if tiger_ids is None:
+            tiger_ids = [None] * len(image_ids)
+
+        with self._lock:
+            self._reset()
+            self._grow(len(image_ids))
+            self._vectors[:len(image_ids)] = embeddings
+            self._image_ids = [str(i) for i in image_ids]
+            self._tiger_ids = [str(t) if t else None for t in tiger_ids]
+            self._positions = {image_id: row for row, image_id in enumerate(self._image_ids)}
+            self._size = len(image_ids)
+            self._rebuild_lists(np.arange(self._size))
+            self.loaded = True
+            self._mark_dirty(1)
+
+    def _mark_dirty(self, count: int) -> None:
+        self._dirty_count += count
+        if self.directory and DEFAULT_AUTOSAVE_EVERY and self._dirty_count >= DEFAULT_AUTOSAVE_EVERY:
+            self.save()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> bool:
+        """
+        Write the graph snapshot atomically.
+
+        Returns:
+            True if a snapshot was written
+        """
+        if not self.directory:
+            return False
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            graph_tmp = self.graph_path.with_name(self.graph_path.name + ".tmp")
+            ids_tmp = self.ids_path.with_name(self.ids_path.name + ".tmp")
+
+            size = self._size
+            with open(graph_tmp, "wb") as f:
+                np.savez(
+                    f,
+                    vectors=self._vectors[:size],
+                    neighbours=self._neighbours[:size],
+                    distances=self._distances[:size],
+                    row_max=self._row_max[:size],
+                )
+            with open(ids_tmp, "w") as f:
+                json.dump({
+                    "model_name": self.model_name,
+                    "dim": self.dim,
+                    "k": self.k,
+                    "count": size,
+                    "generation": self.generation,
+                    "image_ids": self._image_ids,
+                    "tiger_ids": self._tiger_ids,
+                }, f)
+
+            os.replace(graph_tmp, self.graph_path)
+            os.replace(ids_tmp, self.ids_path)
+            self._dirty_count = 0
+
+        logger.debug(f"Saved {self.model_name} gallery k-NN graph ({size} rows)")
+        return True
+
+    def load(self) -> bool:
+        """
+        Load the graph snapshot.
+
+        Returns:
+            True if a valid snapshot was loaded
+        """
+        if not self.graph_path or not self.graph_path.exists() or not self.ids_path.exists():
+            return False
+
+        try:
+            with open(self.ids_path) as f:
+                meta = json.load(f)
+            with np.load(self.graph_path) as snapshot:
+                arrays = {name: snapshot[name] for name in ("vectors", "neighbours", "distances", "row_max")}
+        except Exception as e:
+            logger.warning(f"Failed to read {self.model_name} gallery k-NN graph snapshot: {e}")
+            return False
+
+        count = meta.get("count", 0)
+        if (
+            meta.get("dim") != self.dim
+            or meta.get("k") != self.k
+            or arrays["vectors"].shape != (count, self.dim)
+            or arrays["neighbours"].shape != (count, self.k)
+        ):
+            logger.warning(f"Ignoring {self.model_name} gallery k-NN graph snapshot with mismatched shape")
+            return False
+
+        with self._lock:
+            self._reset()
+            self._grow(count)
+            self._vectors[:count] = arrays["vectors"]
+            self._neighbours[:count] = arrays["neighbours"]
+            self._distances[:count] = arrays["distances"]
+            self._row_max[:count] = arrays["row_max"]
+            self._image_ids = list(meta["image_ids"])
+            self._tiger_ids = list(meta["tiger_ids"])
+            self._positions = {image_id: row for row, image_id in enumerate(self._image_ids)}
+            self._size = count
+            self.generation = meta.get("generation")
+            self._dirty_count = 0
+            self.loaded = True
+        return True
+
+    def rebuild_from_table(self, session: Session, table: str, batch_size: int = 5000) -> int:
+        """
+        Rebuild the graph from a per-model vec0 table.
+
+        Args:
+            session: Database session (sqlite-vec must be loaded)
+            table: vec0 table name for this model
+            batch_size: Rows fetched per round trip
+
+        Returns:
+            Number of images in the graph
+        """
+        # Read before the rows so concurrent writes make it stale, not current
+        generation = get_table_generation(session, table)
+        image_ids, tiger_ids, blocks = [], [], []
+        last_id = ""
+        while True:
+            rows = session.execute(
+                text(f"""
+                    SELECT ve.image_id, ve.embedding, ti.tiger_id
+                    FROM {table} ve
+                    LEFT JOIN tiger_images ti ON ve.image_id = ti.image_id
+                    WHERE ve.image_id > :last_id
+                    ORDER BY ve.image_id
+                    LIMIT :batch_size
+                """),
+                {"last_id": last_id, "batch_size": batch_size}
+            ).fetchall()
+            if not rows:
+                break
+            blocks.append(np.stack([np.frombuffer(row.embedding, dtype=np.float32) for row in rows]))
+            image_ids.extend(str(row.image_id) for row in rows)
+            tiger_ids.extend(str(row.tiger_id) if row.tiger_id else None for row in rows)
+            last_id = str(rows[-1].image_id)
+
+        embeddings = np.vstack(blocks) if blocks else np.zeros((0, self.dim), dtype=np.float32)
+        self.build_from(image_ids, embeddings, tiger_ids)
+        self.generation = generation
+        self.save()
+        return self._size
+
+
+# ----------------------------------------------------------------------
+# Process-wide registry
+# ----------------------------------------------------------------------
+
+_graphs: Dict[str, GalleryKNNGraph] = {}
+_graphs_lock = threading.Lock()
+_graph_dir: Optional[Path] = None
+
+
+def get_knn_graph(model_name: str) -> GalleryKNNGraph:
+    """
+    Get (or create an empty) gallery k-NN graph for a model.
+
+    Args:
+        model_name: Model name (aliases allowed)
+
+    Returns:
+        GalleryKNNGraph for the model
+    """
+    from backend.database.vector_search import resolve_model_name, get_model_embedding_dim
+
+    canonical = resolve_model_name(model_name)
+    graph = _graphs.get(canonical)
+    if graph is None:
+        with _graphs_lock:
+            graph = _graphs.get(canonical)
+            if graph is None:
+                graph = GalleryKNNGraph(canonical, get_model_embedding_dim(canonical), directory=_graph_dir)
+                _graphs[canonical] = graph
+    return graph
+
+
+def get_loaded_knn_graph(model_name: str) -> Optional[GalleryKNNGraph]:
+    """Get a model's k-NN graph only if it has been loaded or built."""
+    graph = get_knn_graph(model_name)
+    return graph if graph.loaded else None
+
+
+def load_knn_graphs(session: Session, directory: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Load (or rebuild) gallery k-NN graphs for every ReID model.
+
+    A snapshot whose row count or table generation differs from the vec0
+    table is rebuilt.
+
+    Args:
+        session: Database session
+        directory: Snapshot directory (defaults to the gallery index directory)
+
+    Returns:
+        Dict of model name to graph size
+    """
+    from backend.database.vector_search import get_model_registry, get_vec_table_name
+
+    global _graph_dir
+    _graph_dir = Path(directory) if directory else get_default_index_dir()
+
+    counts = {}
+    for model_name in get_model_registry().list_reid_models():
+        graph = get_knn_graph(model_name)
+        graph.directory = _graph_dir
+        table = get_vec_table_name(model_name)
+
+        snapshot_loaded = graph.load()
+        generation = get_table_generation(session, table)
+        current = snapshot_loaded and generation is not None and graph.generation == generation
+        try:
+            table_count = session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() or 0
+        except Exception as e:
+            logger.debug(f"Cannot read {table} for k-NN graph reconciliation: {e}")
+            table_count = None
+
+        if table_count is not None and (not current or table_count != len(graph)):
+            try:
+                graph.rebuild_from_table(session, table)
+            except Exception as e:
+                logger.warning(f"Failed to rebuild {model_name} gallery k-NN graph: {e}")
+        elif snapshot_loaded and not current:
+            logger.warning(f"Dropping stale {model_name} gallery k-NN graph snapshot ({table} unreadable)")
+            with graph._lock:
+                graph._reset()
+                graph.loaded = False
+
+        counts[model_name] = len(graph)
+
+    logger.info(f"Gallery k-NN graphs loaded: {counts}")
+    return counts
+
+
+def save_knn_graphs() -> None:
+    """Write snapshots for every graph with unsaved changes."""
+    for graph in list(_graphs.values()):
+        if graph._dirty_count:
+            try:
+                graph.save()
+            except Exception as e:
+                logger.warning(f"Failed to save {graph.model_name} gallery k-NN graph: {e}")
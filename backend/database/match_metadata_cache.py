@@ -0,0 +1,277 @@
+"""In-process cache of the metadata attached to vector search matches
+
+Every match returned by ``find_matching_tigers`` carries tiger and facility
+details (name, alias, last seen, facility name) that live in three tables.
+Searches rank on ids and distances only and hydrate the survivors through
+this cache, so repeat candidates cost a dict lookup instead of a join.
+
+Entries are invalidated by ORM events on tigers, facilities and
+tiger_images (again after the writing transaction commits) and expire after
+``MATCH_METADATA_CACHE_TTL`` seconds to bound staleness from raw SQL writes.
+A version counter bumped by every invalidation keeps a load that raced an
+update from caching the pre-update rows.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.orm import Session, object_session
+
+from backend.database.models import Facility, Tiger, TigerImage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("MATCH_METADATA_CACHE_SIZE", "100000"))
+DEFAULT_TTL_SECONDS = float(os.getenv("MATCH_METADATA_CACHE_TTL", "300"))
+
+# Match fields served from the cache (everything but the similarity)
+MATCH_METADATA_FIELDS = (
+    "tiger_id",
+    "tiger_name",
+    "tiger_alias",
+    "image_path",
+    "side_view",
+    "facility_id",
+    "facility_name",
+    "last_seen_location",
+    "last_seen_date",
+)
+
+# SQLite bound-parameter limit is 32766; stay well below it
+_LOAD_BATCH = 900
+
+_PENDING_KEY = "match_metadata_invalidations"
+
+
+def _load_metadata(session: Session, image_ids: List[str]) -> Dict[str, dict]:
+    """Fetch match metadata for images with one join per batch."""
+    query = text("""
+        SELECT
+            ti.image_id,
+            ti.tiger_id,
+            ti.image_path,
+            ti.side_view,
+            t.name as tiger_name,
+            t.alias as tiger_alias,
+            t.last_seen_location,
+            t.last_seen_date,
+            f.facility_id,
+            f.exhibitor_name as facility_name
+        FROM tiger_images ti
+        LEFT JOIN tigers t ON ti.tiger_id = t.tiger_id
+        LEFT JOIN facilities f ON t.origin_facility_id = f.facility_id
+        WHERE ti.image_id IN :image_ids
+    """).bindparams(bindparam("image_ids", expanding=True))
+
+    loaded = {}
+    for start in range(0, len(image_ids), _LOAD_BATCH):
+        batch = image_ids[start:start + _LOAD_BATCH]
+        for row in session.execute(query, {"image_ids": batch}):
+            loaded[str(row.image_id)] = {
+                "tiger_id": str(row.tiger_id) if row.tiger_id else None,
+                "tiger_name": row.tiger_name,
+                "tiger_alias": row.tiger_alias,
+                "image_path": row.image_path,
+                "side_view": row.side_view,
+                "facility_id": str(row.facility_id) if row.facility_id else None,
+                "facility_name": row.facility_name,
+                "last_seen_location": row.last_seen_location,
+                "last_seen_date": str(row.last_seen_date) if row.last_seen_date else None,
+            }
+    return loaded
+
+
+class MatchMetadataCache:
+    """Bounded LRU of image_id -> match metadata with targeted invalidation."""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached images (0 disables caching)
+            ttl_seconds: Entry lifetime in seconds
+        """
+        self.max_entries = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl_seconds = DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._by_tiger: Dict[str, Set[str]] = {}
+        self._by_facility: Dict[str, Set[str]] = {}
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, session: Session, image_ids: Iterable[str]) -> Dict[str, dict]:
+        """
+        Get match metadata for images, loading misses in one query.
+
+        Args:
+            session: Database session used for misses
+            image_ids: Image UUIDs
+
+        Returns:
+            Dict of image_id -> metadata for images that exist
+        """
+        image_ids = [str(i) for i in dict.fromkeys(image_ids)]
+        now = time.monotonic()
+        found: Dict[str, dict] = {}
+        missing: List[str] = []
+
+        with self._lock:
+            for image_id in image_ids:
+                entry = self._entries.get(image_id)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(image_id)
+                    found[image_id] = entry[1]
+                else:
+                    missing.append(image_id)
+            self.hits += len(found)
+            self.misses += len(missing)
+            version = self.version
+
+        if missing:
+            loaded = _load_metadata(session, missing)
+            found.update(loaded)
+            self._store(loaded, version, now + self.ttl_seconds)
+        return found
+
+    def _store(self, loaded: Dict[str, dict], version: int, expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            # An invalidation ran while loading; the rows may predate it
+            if version != self.version:
+                return
+            for image_id, metadata in loaded.items():
+                self._unlink(image_id)
+                self._entries[image_id] = (expires_at, metadata)
+                if metadata["tiger_id"]:
+                    self._by_tiger.setdefault(metadata["tiger_id"], set()).add(image_id)
+                if metadata["facility_id"]:
+                    self._by_facility.setdefault(metadata["facility_id"], set()).add(image_id)
+            while len(self._entries) > self.max_entries:
+                self._unlink(next(iter(self._entries)))
+
+    def _unlink(self, image_id: str) -> None:
+        """Drop one entry and its reverse-index links (lock held)."""
+        entry = self._entries.pop(image_id, None)
+        if entry is None:
+            return
+        metadata = entry[1]
+        for key, reverse in (("tiger_id", self._by_tiger), ("facility_id", self._by_facility)):
+            owner = metadata[key]
+            if owner and owner in reverse:
+                reverse[owner].discard(image_id)
+                if not reverse[owner]:
+                    del reverse[owner]
+
+    def invalidate(self, kind: str, key: Optional[str]) -> None:
+        """
+        Drop cached entries affected by a change.
+
+        Args:
+            kind: "image", "tiger" or "facility"
+            key: UUID of the changed row
+        """
+        if not key:
+            return
+        key = str(key)
+        with self._lock:
+            self.version += 1
+            if kind == "image":
+                affected = {key}
+            elif kind == "tiger":
+                affected = set(self._by_tiger.get(key, ()))
+            elif kind == "facility":
+                affected = set(self._by_facility.get(key, ()))
+            else:
+                raise ValueError(f"Unknown invalidation kind '{kind}'")
+            for image_id in affected:
+                self._unlink(image_id)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._by_tiger.clear()
+            self._by_facility.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Cache size and hit statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "version": self.version,
+        }
+
+
+_cache: Optional[MatchMetadataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_match_metadata_cache() -> MatchMetadataCache:
+    """Get the process-wide match metadata cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = MatchMetadataCache()
+    return _cache
+
+
+# ----------------------------------------------------------------------
+# Invalidation hooks
+# ----------------------------------------------------------------------
+
+def _invalidate(target, kind: str, key: Optional[str]) -> None:
+    """Invalidate now and again once the writing transaction commits."""
+    get_match_metadata_cache().invalidate(kind, key)
+    session = object_session(target)
+    if session is not None and key:
+        session.info.setdefault(_PENDING_KEY, set()).add((kind, str(key)))
+
+
+@event.listens_for(Tiger, "after_update")
+@event.listens_for(Tiger, "after_delete")
+def _on_tiger_change(mapper, connection, target) -> None:
+    _invalidate(target, "tiger", target.tiger_id)
+
+
+@event.listens_for(Facility, "after_update")
+@event.listens_for(Facility, "after_delete")
+def _on_facility_change(mapper, connection, target) -> None:
+    _invalidate(target, "facility", target.facility_id)
+
+
+@event.listens_for(TigerImage, "after_update")
+@event.listens_for(TigerImage, "after_delete")
+def _on_image_change(mapper, connection, target) -> None:
+    _invalidate(target, "image", target.image_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session) -> None:
+    # Readers may have cached pre-commit rows between flush and commit
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        cache = get_match_metadata_cache()
+        for kind, key in pending:
+            cache.invalidate(kind, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
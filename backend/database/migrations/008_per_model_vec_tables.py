@@ -0,0 +1,319 @@
+"""
+Migration 008: Per-model Vector Tables
+
+Replaces the single FLOAT[2048] ``vec_embeddings`` table with one vec0 table
+per registered ReID model, each sized to the model's native embedding
+dimension and using cosine distance:
+
+    vec_embeddings_tiger_reid        FLOAT[2048]
+    vec_embeddings_cvwc2019_reid     FLOAT[2048]
+    vec_embeddings_rapid_reid        FLOAT[2048]
+    vec_embeddings_wildlife_tools    FLOAT[1536]
+    vec_embeddings_megadescriptor_b  FLOAT[1024]
+    vec_embeddings_transreid         FLOAT[768]
+
+Tables are created with the filterable metadata columns mirrored from
+tiger_images (see migration 009), matching the schema ``init_db`` creates.
+
+Existing rows in ``vec_embeddings`` are moved into the table of the model
+that produced them (``--model``, default tiger_reid), with their metadata
+filled from tiger_images. Rows are removed from the legacy table as they
+are copied, so an interrupted run can be resumed.
+
+Table names and dimensions are fixed here rather than read from the live
+vector search code, so the migration keeps doing what it did when written.
+
+This migration is idempotent and safe to run multiple times.
+"""
+
+import sys
+import os
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+# Set UTF-8 encoding for Windows
+if sys.platform == "win32":
+    os.environ["PYTHONIOENCODING"] = "utf-8"
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+LEGACY_VEC_TABLE = "vec_embeddings"
+LEGACY_MODEL_NAME = "tiger_reid"
+
+# vec0 table and embedding dimension per ReID model
+MODEL_TABLES = {
+    "tiger_reid": ("vec_embeddings_tiger_reid", 2048),
+    "cvwc2019_reid": ("vec_embeddings_cvwc2019_reid", 2048),
+    "rapid_reid": ("vec_embeddings_rapid_reid", 2048),
+    "wildlife_tools": ("vec_embeddings_wildlife_tools", 1536),
+    "megadescriptor_b": ("vec_embeddings_megadescriptor_b", 1024),
+    "transreid": ("vec_embeddings_transreid", 768),
+}
+
+# Loader names accepted for --model
+MODEL_ALIASES = {"cvwc2019": "cvwc2019_reid", "rapid": "rapid_reid"}
+
+# Filterable columns mirrored from tiger_images
+METADATA_COLUMNS = ("tiger_id", "side_view", "is_reference", "verified")
+METADATA_SCHEMA = """
+    tiger_id TEXT,
+    side_view TEXT,
+    is_reference INTEGER,
+    verified INTEGER
+"""
+
+BATCH_SIZE = 500
+
+
+def _resolve_db_path(db_path: str | Path | None) -> Path:
+    """Resolve database path from argument or DATABASE_URL."""
+    if db_path is None:
+        db_url = os.getenv("DATABASE_URL", "sqlite:///data/tiger_id.db")
+        if db_url.startswith("sqlite:///"):
+            db_path = db_url.replace("sqlite:///", "")
+        else:
+            db_path = "data/tiger_id.db"
+    return Path(db_path)
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Open a connection with sqlite-vec loaded."""
+    import sqlite_vec
+
+    conn = sqlite3.connect(str(db_path))
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+    return conn
+
+
+def table_exists(cursor: sqlite3.Cursor, table_name: str) -> bool:
+    """Check whether a table exists."""
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)
+    )
+    return cursor.fetchone() is not None
+
+
+def has_metadata_columns(cursor: sqlite3.Cursor, table_name: str) -> bool:
+    """Check whether a vec0 table was created with the metadata columns."""
+    row = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table_name,)
+    ).fetchone()
+    return row is not None and all(column in row[0] for column in METADATA_COLUMNS)
+
+
+def create_model_tables(cursor: sqlite3.Cursor) -> list[str]:
+    """Create a vec0 table with metadata columns for each ReID model."""
+    tables = []
+    for table, dim in MODEL_TABLES.values():
+        existed = table_exists(cursor, table)
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING vec0(
+                image_id TEXT PRIMARY KEY,
+                embedding FLOAT[{dim}] distance_metric=cosine,
+                {METADATA_SCHEMA}
+            )
+        """)
+        print(f"  [{'SKIP' if existed else 'ADD '}] {table} FLOAT[{dim}]")
+        tables.append(table)
+    return tables
+
+
+def move_legacy_rows(conn: sqlite3.Connection, model_name: str) -> int:
+    """Move rows from the legacy table into the model's table in batches.
+
+    Metadata is filled from tiger_images. A table created by an earlier
+    run of this migration without metadata columns gets bare rows, which
+    migration 009 then rebuilds with their metadata.
+    """
+    cursor = conn.cursor()
+    target = MODEL_TABLES[model_name][0]
+    columns = ("image_id", "embedding")
+    if has_metadata_columns(cursor, target):
+        columns += METADATA_COLUMNS
+    placeholders = ", ".join("?" for _ in columns)
+    moved = 0
+
+    while True:
+        rows = cursor.execute(f"""
+            SELECT v.image_id, v.embedding,
+                   COALESCE(ti.tiger_id, ''),
+                   COALESCE(ti.side_view, ''),
+                   COALESCE(ti.is_reference, 0),
+                   COALESCE(ti.verified, 0)
+            FROM {LEGACY_VEC_TABLE} v
+            LEFT JOIN tiger_images ti ON v.image_id = ti.image_id
+            LIMIT ?
+        """, (BATCH_SIZE,)).fetchall()
+        if not rows:
+            break
+
+        for image_id, embedding, tiger_id, side_view, is_reference, verified in rows:
+            values = (image_id, embedding, tiger_id, side_view, int(is_reference), int(verified))
+            # vec0 does not support INSERT OR REPLACE
+            cursor.execute(f"DELETE FROM {target} WHERE image_id = ?", (image_id,))
+            cursor.execute(
+                f"INSERT INTO {target}({', '.join(columns)}) VALUES ({placeholders})",
+                values[:len(columns)],
+            )
+            cursor.execute(f"DELETE FROM {LEGACY_VEC_TABLE} WHERE image_id = ?", (image_id,))
+
+        conn.commit()
+        moved += len(rows)
+        print(f"  [MOVE] {moved} rows -> {target}")
+
+    return moved
+
+
+def migrate(
+    db_path: str | Path | None = None,
+    model_name: str = LEGACY_MODEL_NAME,
+    drop_legacy: bool = False,
+) -> bool:
+    """Run the migration.
+
+    Args:
+        db_path: Path to SQLite database. If None, uses DATABASE_URL env var
+                 or defaults to data/tiger_id.db
+        model_name: Model that produced the rows in the legacy table
+        drop_legacy: Drop the legacy table once it is empty
+
+    Returns:
+        True if migration succeeded, False otherwise
+    """
+    db_path = _resolve_db_path(db_path)
+
+    if not db_path.exists():
+        print(f"[ERROR] Database not found: {db_path}")
+        print("        Run 'python -c \"from backend.database import init_db; init_db()\"' first")
+        return False
+
+    model_name = MODEL_ALIASES.get(model_name, model_name)
+    if MODEL_TABLES.get(model_name, (None, None))[1] != 2048:
+        print(f"[ERROR] Legacy embeddings are 2048-dim; {model_name} is not a 2048-dim ReID model")
+        return False
+
+    print("=" * 70)
+    print("MIGRATION 008: Per-model Vector Tables")
+    print("=" * 70)
+    print(f"\nDatabase: {db_path}")
+    print(f"Legacy model: {model_name}")
+    print(f"Started:  {datetime.now().isoformat()}")
+    print()
+
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        print("[1/2] Creating per-model vec0 tables...")
+        create_model_tables(cursor)
+        conn.commit()
+        print()
+
+        print(f"[2/2] Moving rows from {LEGACY_VEC_TABLE}...")
+        if not table_exists(cursor, LEGACY_VEC_TABLE):
+            print(f"  [SKIP] {LEGACY_VEC_TABLE} does not exist")
+        else:
+            moved = move_legacy_rows(conn, model_name)
+            print(f"  Moved {moved} embeddings")
+
+            if drop_legacy:
+                cursor.execute(f"DROP TABLE {LEGACY_VEC_TABLE}")
+                conn.commit()
+                print(f"  [DROP] {LEGACY_VEC_TABLE}")
+
+        print()
+        print("=" * 70)
+        print("[OK] MIGRATION COMPLETE")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"\n[ERROR] Migration failed: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def verify(db_path: str | Path | None = None) -> dict:
+    """Verify that the migration has been applied.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        Dictionary with verification results
+    """
+    db_path = _resolve_db_path(db_path)
+
+    if not db_path.exists():
+        return {"error": f"Database not found: {db_path}"}
+
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        tables = {}
+        for table, _ in MODEL_TABLES.values():
+            exists = table_exists(cursor, table)
+            tables[table] = {
+                "exists": exists,
+                "rows": cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] if exists else 0,
+            }
+
+        legacy_rows = 0
+        if table_exists(cursor, LEGACY_VEC_TABLE):
+            legacy_rows = cursor.execute(f"SELECT COUNT(*) FROM {LEGACY_VEC_TABLE}").fetchone()[0]
+
+        return {
+            "database": str(db_path),
+            "tables": tables,
+            "all_tables_present": all(t["exists"] for t in tables.values()),
+            "legacy_rows_remaining": legacy_rows,
+        }
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migration 008: Per-model Vector Tables")
+    parser.add_argument(
+        "--db",
+        type=str,
+        default=None,
+        help="Path to SQLite database (default: uses DATABASE_URL or data/tiger_id.db)",
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=LEGACY_MODEL_NAME,
+        help=f"Model that produced the legacy 2048-dim embeddings (default: {LEGACY_MODEL_NAME})",
+    )
+    parser.add_argument(
+        "--drop-legacy",
+        action="store_true",
+        help=f"Drop {LEGACY_VEC_TABLE} after moving its rows",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Only verify migration status, don't run migration",
+    )
+
+    args = parser.parse_args()
+
+    if args.verify:
+        result = verify(args.db)
+        import json
+        print(json.dumps(result, indent=2))
+        sys.exit(0 if result.get("all_tables_present") and not result.get("legacy_rows_remaining") else 1)
+    else:
+        success = migrate(args.db, model_name=args.model, drop_legacy=args.drop_legacy)
+        sys.exit(0 if success else 1)
@@ -0,0 +1,270 @@
+"""
+Migration 009: Filterable Vector Table Metadata
+
+Rebuilds each per-model vec0 table with metadata columns mirrored from
+tiger_images so KNN queries filter inside the index instead of after it:
+
+    tiger_id      TEXT     (exclusion of the query tiger)
+    side_view     TEXT     (left/right/both/unknown)
+    is_reference  INTEGER  (ATRW/reference gallery)
+    verified      INTEGER
+
+vec0 tables cannot be altered or renamed, so rows are staged in a plain
+``<table>_staging`` table, the vec0 table is recreated, and rows are copied
+back with their metadata. Staged rows are removed as they are copied, so an
+interrupted run can be resumed.
+
+This migration is idempotent and safe to run multiple times.
+"""
+
+import sys
+import os
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+# Set UTF-8 encoding for Windows
+if sys.platform == "win32":
+    os.environ["PYTHONIOENCODING"] = "utf-8"
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from backend.database.vector_search import (  # noqa: E402
+    VEC_METADATA_COLUMNS,
+    VEC_METADATA_SCHEMA,
+    get_vec_table_name,
+)
+from backend.infrastructure.modal.model_registry import get_model_registry  # noqa: E402
+
+BATCH_SIZE = 500
+
+
+def _resolve_db_path(db_path: str | Path | None) -> Path:
+    """Resolve database path from argument or DATABASE_URL."""
+    if db_path is None:
+        db_url = os.getenv("DATABASE_URL", "sqlite:///data/tiger_id.db")
+        if db_url.startswith("sqlite:///"):
+            db_path = db_url.replace("sqlite:///", "")
+        else:
+            db_path = "data/tiger_id.db"
+    return Path(db_path)
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Open a connection with sqlite-vec loaded."""
+    import sqlite_vec
+
+    conn = sqlite3.connect(str(db_path))
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+    return conn
+
+
+def table_exists(cursor: sqlite3.Cursor, table_name: str) -> bool:
+    """Check whether a table exists."""
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)
+    )
+    return cursor.fetchone() is not None
+
+
+def has_metadata_columns(cursor: sqlite3.Cursor, table_name: str) -> bool:
+    """Check whether a vec0 table was created with the metadata columns."""
+    row = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table_name,)
+    ).fetchone()
+    return row is not None and all(column in row[0] for column in VEC_METADATA_COLUMNS)
+
+
+def stage_rows(conn: sqlite3.Connection, table: str) -> int:
+    """Copy a vec0 table's rows into a plain staging table and drop it."""
+    cursor = conn.cursor()
+    staging = f"{table}_staging"
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {staging} (
+            image_id TEXT PRIMARY KEY,
+            embedding BLOB NOT NULL
+        )
+    """)
+    cursor.execute(f"INSERT OR REPLACE INTO {staging} SELECT image_id, embedding FROM {table}")
+    staged = cursor.execute(f"SELECT COUNT(*) FROM {staging}").fetchone()[0]
+    cursor.execute(f"DROP TABLE {table}")
+    conn.commit()
+    return staged
+
+
+def restore_rows(conn: sqlite3.Connection, table: str, dim: int) -> int:
+    """Recreate the vec0 table with metadata and copy staged rows back."""
+    cursor = conn.cursor()
+    staging = f"{table}_staging"
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING vec0(
+            image_id TEXT PRIMARY KEY,
+            embedding FLOAT[{dim}] distance_metric=cosine,
+            {VEC_METADATA_SCHEMA}
+        )
+    """)
+    columns = ", ".join(VEC_METADATA_COLUMNS)
+    placeholders = ", ".join("?" for _ in VEC_METADATA_COLUMNS)
+    restored = 0
+
+    while True:
+        rows = cursor.execute(f"""
+            SELECT s.image_id, s.embedding,
+                   COALESCE(ti.tiger_id, ''),
+                   COALESCE(ti.side_view, ''),
+                   COALESCE(ti.is_reference, 0),
+                   COALESCE(ti.verified, 0)
+            FROM {staging} s
+            LEFT JOIN tiger_images ti ON s.image_id = ti.image_id
+            LIMIT ?
+        """, (BATCH_SIZE,)).fetchall()
+        if not rows:
+            break
+
+        for image_id, embedding, *metadata in rows:
+            # vec0 does not support INSERT OR REPLACE
+            cursor.execute(f"DELETE FROM {table} WHERE image_id = ?", (image_id,))
+            cursor.execute(
+                f"INSERT INTO {table}(image_id, embedding, {columns}) VALUES (?, ?, {placeholders})",
+                (image_id, embedding, metadata[0], metadata[1], int(metadata[2]), int(metadata[3])),
+            )
+            cursor.execute(f"DELETE FROM {staging} WHERE image_id = ?", (image_id,))
+
+        conn.commit()
+        restored += len(rows)
+        print(f"  [COPY] {restored} rows -> {table}")
+
+    cursor.execute(f"DROP TABLE {staging}")
+    conn.commit()
+    return restored
+
+
+def migrate(db_path: str | Path | None = None) -> bool:
+    """Run the migration.
+
+    Args:
+        db_path: Path to SQLite database. If None, uses DATABASE_URL env var
+                 or defaults to data/tiger_id.db
+
+    Returns:
+        True if migration succeeded, False otherwise
+    """
+    db_path = _resolve_db_path(db_path)
+
+    if not db_path.exists():
+        print(f"[ERROR] Database not found: {db_path}")
+        print("        Run 'python -c \"from backend.database import init_db; init_db()\"' first")
+        return False
+
+    print("=" * 70)
+    print("MIGRATION 009: Filterable Vector Table Metadata")
+    print("=" * 70)
+    print(f"\nDatabase: {db_path}")
+    print(f"Started:  {datetime.now().isoformat()}")
+    print()
+
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        registry = get_model_registry()
+        for model_name in registry.list_reid_models():
+            table = get_vec_table_name(model_name)
+            staging = f"{table}_staging"
+
+            if has_metadata_columns(cursor, table) and not table_exists(cursor, staging):
+                print(f"  [SKIP] {table} already has metadata columns")
+                continue
+
+            if table_exists(cursor, table) and not has_metadata_columns(cursor, table):
+                staged = stage_rows(conn, table)
+                print(f"  [STAGE] {staged} rows from {table}")
+
+            if table_exists(cursor, staging):
+                restored = restore_rows(conn, table, registry.get_embedding_dim(model_name))
+                print(f"  [OK] {table}: {restored} rows with metadata")
+            else:
+                print(f"  [SKIP] {table} does not exist (created by init_db)")
+
+        print()
+        print("=" * 70)
+        print("[OK] MIGRATION COMPLETE")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"\n[ERROR] Migration failed: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def verify(db_path: str | Path | None = None) -> dict:
+    """Verify that the migration has been applied.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        Dictionary with verification results
+    """
+    db_path = _resolve_db_path(db_path)
+
+    if not db_path.exists():
+        return {"error": f"Database not found: {db_path}"}
+
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        tables = {}
+        for model_name in get_model_registry().list_reid_models():
+            table = get_vec_table_name(model_name)
+            tables[table] = {
+                "exists": table_exists(cursor, table),
+                "has_metadata": has_metadata_columns(cursor, table),
+                "staging_pending": table_exists(cursor, f"{table}_staging"),
+            }
+
+        return {
+            "database": str(db_path),
+            "tables": tables,
+            "all_tables_migrated": all(
+                t["has_metadata"] and not t["staging_pending"] for t in tables.values()
+            ),
+        }
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migration 009: Filterable Vector Table Metadata")
+    parser.add_argument(
+        "--db",
+        type=str,
+        default=None,
+        help="Path to SQLite database (default: uses DATABASE_URL or data/tiger_id.db)",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Only verify migration status, don't run migration",
+    )
+
+    args = parser.parse_args()
+
+    if args.verify:
+        result = verify(args.db)
+        import json
+        print(json.dumps(result, indent=2))
+        sys.exit(0 if result.get("all_tables_migrated") else 1)
+    else:
+        success = migrate(args.db)
+        sys.exit(0 if success else 1)
@@ -483,6 +483,15 @@ class ModelInference(Base):
     created_at = Column(DateTime, server_default=text('CURRENT_TIMESTAMP'), index=True)
 
 
+# VecTableGeneration model
+class VecTableGeneration(Base):
+    """Write counter per sqlite-vec table, bumped in every embedding write transaction"""
+    __tablename__ = "vec_table_generations"
+
+    table_name = Column(String(100), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+
 # Notification model
 class Notification(Base):
     """Notification model"""
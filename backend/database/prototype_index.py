@@ -0,0 +1,358 @@
+"""Per-tiger prototype embeddings for two-stage identification
+
+A tiger with dozens of gallery images (ATRW references, discovery crawls)
+costs dozens of comparisons in a flat image search. ``PrototypeIndex`` keeps
+one fused vector per tiger per ReID model: the re-normalized mean of the
+tiger's normalized image embeddings (``EmbeddingService``'s "average" fusion).
+
+Two-stage search first ranks tigers against their prototypes, then re-scores
+only the member images of the top-N tigers (see ``find_matching_tigers``).
+Enable it with ``PROTOTYPE_SEARCH_TOP_TIGERS=N`` (0 disables).
+
+Prototypes are marked stale whenever a tiger's images change
+(``store_embedding``, ``delete_embedding``, ORM edits to tiger_images) and
+are recomputed from the vec table before the next ranking.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Tigers whose member images are re-scored in the second stage (0 = disabled)
+DEFAULT_TOP_TIGERS = int(os.getenv("PROTOTYPE_SEARCH_TOP_TIGERS", "0"))
+
+_INITIAL_CAPACITY = 256
+
+# Stale tigers recomputed per metadata query
+_REFRESH_BATCH = 500
+
+
+class PrototypeIndex:
+    """One fused, normalized embedding per tiger for a single ReID model."""
+
+    def __init__(self, model_name: str, dim: int):
+        """
+        Initialize an empty index.
+
+        Args:
+            model_name: Canonical ReID model name
+            dim: Embedding dimension for the model
+        """
+        self.model_name = model_name
+        self.dim = dim
+        self._lock = threading.RLock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._matrix = np.zeros((_INITIAL_CAPACITY, self.dim), dtype=np.float32)
+        self._counts = np.zeros(_INITIAL_CAPACITY, dtype=np.int64)
+        self._tiger_ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._stale: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, tiger_id: str) -> bool:
+        return str(tiger_id) in self._positions
+
+    @property
+    def stale_count(self) -> int:
+        return len(self._stale)
+
+    def member_count(self, tiger_id: str) -> int:
+        """Number of images fused into a tiger's prototype."""
+        row = self._positions.get(str(tiger_id))
+        return int(self._counts[row]) if row is not None else 0
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _set(self, tiger_id: str, prototype: np.ndarray, count: int) -> None:
+        row = self._positions.get(tiger_id)
+        if row is None:
+            row = len(self._tiger_ids)
+            if row >= len(self._matrix):
+                capacity = len(self._matrix) * 2
+                matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+                matrix[:row] = self._matrix[:row]
+                counts = np.zeros(capacity, dtype=np.int64)
+                counts[:row] = self._counts[:row]
+                self._matrix, self._counts = matrix, counts
+            self._tiger_ids.append(tiger_id)
+            self._positions[tiger_id] = row
+        self._matrix[row] = prototype
+        self._counts[row] = count
+
+    def _drop(self, tiger_id: str) -> None:
+        """Remove a tiger by moving the last row into its slot."""
+        row = self._positions.pop(tiger_id, None)
+        if row is None:
+            return
+        last = len(self._tiger_ids) - 1
+        if row != last:
+            moved = self._tiger_ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._counts[row] = self._counts[last]
+            self._tiger_ids[row] = moved
+            self._positions[moved] = row
+        self._tiger_ids.pop()
+
+    def set_members(self, tiger_id: str, embeddings: np.ndarray) -> None:
+        """
+        Replace a tiger's prototype with the fusion of its member embeddings.
+
+        Args:
+            tiger_id: Tiger UUID
+            embeddings: Member embeddings of shape (n, dim); n == 0 drops the tiger
+        """
+        tiger_id = str(tiger_id)
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            self._stale.discard(tiger_id)
+            if len(embeddings) == 0:
+                self._drop(tiger_id)
+                return
+
+            normed = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-10)
+            fused = normed.mean(axis=0)
+            self._set(tiger_id, fused / (np.linalg.norm(fused) + 1e-10), len(embeddings))
+
+    def mark_stale(self, tiger_ids: Iterable[Optional[str]]) -> None:
+        """Schedule tigers for recomputation before the next ranking."""
+        with self._lock:
+            self._stale.update(str(t) for t in tiger_ids if t)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def refresh(self, session: Session, table: str) -> int:
+        """
+        Recompute stale prototypes from the vec table.
+
+        Args:
+            session: Database session
+            table: vec0 table name for this model
+
+        Returns:
+            Number of tigers recomputed
+        """
+        with self._lock:
+            stale = sorted(self._stale)
+            for start in range(0, len(stale), _REFRESH_BATCH):
+                batch = stale[start:start + _REFRESH_BATCH]
+                members: Dict[str, List[np.ndarray]] = {tiger_id: [] for tiger_id in batch}
+
+                query = text(f"""
+                    SELECT ti.tiger_id, ve.embedding
+                    FROM tiger_images ti
+                    JOIN {table} ve ON ve.image_id = ti.image_id
+                    WHERE ti.tiger_id IN :tiger_ids
+                """).bindparams(bindparam("tiger_ids", expanding=True))
+                for row in session.execute(query, {"tiger_ids": batch}):
+                    members[str(row.tiger_id)].append(np.frombuffer(row.embedding, dtype=np.float32))
+
+                for tiger_id, vectors in members.items():
+                    self.set_members(
+                        tiger_id,
+                        np.stack(vectors) if vectors else np.zeros((0, self.dim), dtype=np.float32)
+                    )
+            return len(stale)
+
+    def rebuild_from_table(self, session: Session, table: str, batch_size: int = 5000) -> int:
+        """
+        Rebuild every prototype from a per-model vec0 table.
+
+        Args:
+            session: Database session (sqlite-vec must be loaded)
+            table: vec0 table name for this model
+            batch_size: Rows fetched per round trip
+
+        Returns:
+            Number of tigers indexed
+        """
+        sums: Dict[str, np.ndarray] = {}
+        counts: Dict[str, int] = {}
+        last_id = ""
+        while True:
+            rows = session.execute(
+                text(f"""
+                    SELECT ve.image_id, ve.embedding, ti.tiger_id
+                    FROM {table} ve
+                    JOIN tiger_images ti ON ve.image_id = ti.image_id
+                    WHERE ve.image_id > :last_id
+                    ORDER BY ve.image_id
+                    LIMIT :batch_size
+                """),
+                {"last_id": last_id, "batch_size": batch_size}
+            ).fetchall()
+            if not rows:
+                break
+
+            for row in rows:
+                if not row.tiger_id:
+                    continue
+                tiger_id = str(row.tiger_id)
+                vector = np.frombuffer(row.embedding, dtype=np.float32)
+                vector = vector / (np.linalg.norm(vector) + 1e-10)
+                if tiger_id in sums:
+                    sums[tiger_id] += vector
+                    counts[tiger_id] += 1
+                else:
+                    sums[tiger_id] = vector.copy()
+                    counts[tiger_id] = 1
+            last_id = str(rows[-1].image_id)
+
+        with self._lock:
+            self._reset()
+            for tiger_id, total in sums.items():
+                self._set(tiger_id, total / (np.linalg.norm(total) + 1e-10), counts[tiger_id])
+            self.loaded = True
+        return len(self)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def rank(
+        self,
+        query_embeddings: np.ndarray,
+        top_n: int,
+        exclude_tiger_id: Optional[str] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Rank tigers by prototype similarity.
+
+        Args:
+            query_embeddings: Query vector (dim,) or matrix (q, dim)
+            top_n: Number of tigers per query
+            exclude_tiger_id: Skip this tiger
+
+        Returns:
+            One list of (tiger_id, similarity) per query, best first
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(-1, self.dim)
+        queries = queries / (np.linalg.norm(queries, axis=1, keepdims=True) + 1e-10)
+
+        with self._lock:
+            size = len(self._tiger_ids)
+            if size == 0 or top_n <= 0:
+                return [[] for _ in range(len(queries))]
+
+            similarities = queries @ self._matrix[:size].T
+            excluded = self._positions.get(str(exclude_tiger_id)) if exclude_tiger_id else None
+            if excluded is not None:
+                similarities[:, excluded] = -np.inf
+
+            top_n = min(top_n, size)
+            if top_n < size:
+                top = np.argpartition(-similarities, top_n - 1, axis=1)[:, :top_n]
+            else:
+                top = np.broadcast_to(np.arange(size), (len(queries), size))
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            return [
+                [
+                    (self._tiger_ids[row], float(score))
+                    for row, score in zip(rows, scores)
+                    if score != -np.inf
+                ]
+                for rows, scores in zip(top, top_scores)
+            ]
+
+
+# ----------------------------------------------------------------------
+# Process-wide registry
+# ----------------------------------------------------------------------
+
+_indexes: Dict[str, PrototypeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_prototype_index(model_name: str) -> PrototypeIndex:
+    """
+    Get (or create an empty) prototype index for a model.
+
+    Args:
+        model_name: Model name (aliases allowed)
+
+    Returns:
+        PrototypeIndex for the model
+    """
+    from backend.database.vector_search import resolve_model_name, get_model_embedding_dim
+
+    canonical = resolve_model_name(model_name)
+    index = _indexes.get(canonical)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(canonical)
+            if index is None:
+                index = PrototypeIndex(canonical, get_model_embedding_dim(canonical))
+                _indexes[canonical] = index
+    return index
+
+
+def get_loaded_prototype_index(model_name: str) -> Optional[PrototypeIndex]:
+    """Get a model's prototype index only if it has been built."""
+    from backend.database.vector_search import resolve_model_name
+
+    index = _indexes.get(resolve_model_name(model_name))
+    return index if index is not None and index.loaded else None
+
+
+def mark_prototypes_stale(tiger_ids: Iterable[Optional[str]], model_name: Optional[str] = None) -> None:
+    """
+    Mark tigers stale in loaded prototype indexes.
+
+    Args:
+        tiger_ids: Tigers whose images changed
+        model_name: Only this model's index (all loaded indexes when omitted)
+    """
+    tiger_ids = [t for t in tiger_ids if t]
+    if not tiger_ids:
+        return
+    if model_name is not None:
+        index = get_loaded_prototype_index(model_name)
+        indexes = [index] if index is not None else []
+    else:
+        indexes = [index for index in list(_indexes.values()) if index.loaded]
+    for index in indexes:
+        index.mark_stale(tiger_ids)
+
+
+def load_prototype_indexes(session: Session) -> Dict[str, int]:
+    """
+    Build prototype indexes for every ReID model from the vec tables.
+
+    Args:
+        session: Database session
+
+    Returns:
+        Dict of model name to tiger count
+    """
+    from backend.database.vector_search import get_model_registry, get_vec_table_name
+
+    counts = {}
+    for model_name in get_model_registry().list_reid_models():
+        index = get_prototype_index(model_name)
+        try:
+            index.rebuild_from_table(session, get_vec_table_name(model_name))
+        except Exception as e:
+            logger.warning(f"Failed to build {model_name} prototype index: {e}")
+        counts[model_name] = len(index)
+
+    logger.info(f"Prototype indexes built: {counts}")
+    return counts
@@ -3,15 +3,47 @@
 Tiger ID uses sqlite-vec extension for fast approximate nearest neighbor search
 on tiger embeddings. This provides efficient vector similarity queries for
 tiger re-identification.
+
+Each registered ReID model gets its own vec0 table sized to the model's native
+embedding dimension (e.g. ``vec_embeddings_wildlife_tools`` is FLOAT[1536]),
+so a query only ever scans vectors produced by the same model. Tables also
+carry tiger_id/side_view/is_reference/verified metadata columns, so search
+filters are applied inside the KNN and never starve the result list.
+
+When sqlite-vec is unavailable (or a vec0 query fails) searches fall back to
+the per-model in-memory ``GalleryIndex`` (see ``gallery_index.py``). Set
+``GALLERY_INDEX_QUANTIZATION=int8`` (or ``float16``) to scan a quantized copy
+and re-score the top candidates in float32.
+
+``VECTOR_SEARCH_ENGINE`` selects the first-stage engine per deployment:
+``sqlite_vec`` (default, exact) or ``hnsw`` (approximate graph search, see
+``hnsw_index.py``). HNSW searches fall back to the exact path on failure.
 """
 
-import json
 import logging
-from typing import List, Optional
-from sqlalchemy import text
+import os
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import bindparam, event, inspect, text
 from sqlalchemy.orm import Session
 import numpy as np
 
+from backend.database.gallery_index import (
+    bump_table_generation,
+    follow_table_generation,
+    get_loaded_gallery_index,
+)
+from backend.database.hnsw_index import get_loaded_hnsw_index
+from backend.database.identification_cache import bump_gallery_generation
+from backend.database.knn_graph import get_loaded_knn_graph
+from backend.database.match_metadata_cache import get_match_metadata_cache
+from backend.database.models import TigerImage
+from backend.database.prototype_index import (
+    DEFAULT_TOP_TIGERS,
+    get_prototype_index,
+    mark_prototypes_stale,
+)
+from backend.infrastructure.modal.model_registry import get_model_registry
+
 logger = logging.getLogger(__name__)
 
 # Verify sqlite-vec is available
@@ -20,12 +52,172 @@ try:
     SQLITE_VEC_AVAILABLE = True
 except ImportError:
     SQLITE_VEC_AVAILABLE = False
-    logger.warning("sqlite-vec not installed. Vector search will use slower Python fallback.")
+    logger.warning("sqlite-vec not installed. Vector search will use the in-memory gallery index.")
+
+# First-stage search engine: "sqlite_vec" (exact) or "hnsw" (approximate)
+VECTOR_SEARCH_ENGINES = ("sqlite_vec", "hnsw")
+VECTOR_SEARCH_ENGINE = os.getenv("VECTOR_SEARCH_ENGINE", "sqlite_vec").lower()
+if VECTOR_SEARCH_ENGINE not in VECTOR_SEARCH_ENGINES:
+    logger.warning(f"Unknown VECTOR_SEARCH_ENGINE '{VECTOR_SEARCH_ENGINE}', using sqlite_vec")
+    VECTOR_SEARCH_ENGINE = "sqlite_vec"
 
 
 # Valid embedding dimensions for tiger ReID models
 VALID_EMBEDDING_DIMS = {768, 1024, 1536, 2048}
 
+# Single FLOAT[2048] table used before per-model tables were introduced
+LEGACY_VEC_TABLE = "vec_embeddings"
+
+# Model assumed to have produced the rows in the legacy table
+LEGACY_MODEL_NAME = "tiger_reid"
+
+# ModelLoader keys that differ from their ModelRegistry names
+MODEL_NAME_ALIASES = {
+    "cvwc2019": "cvwc2019_reid",
+    "rapid": "rapid_reid",
+}
+
+# Model used when a caller does not say which model produced an embedding.
+# 2048-dim is shared by several models, so it maps to the legacy default.
+DEFAULT_MODEL_BY_DIM = {
+    768: "transreid",
+    1024: "megadescriptor_b",
+    1536: "wildlife_tools",
+    2048: LEGACY_MODEL_NAME,
+}
+
+
+def resolve_model_name(
+    model_name: Optional[str] = None,
+    embedding_dim: Optional[int] = None
+) -> str:
+    """
+    Resolve a model name to its canonical ModelRegistry name.
+
+    Args:
+        model_name: Model name (ModelLoader or ModelRegistry naming)
+        embedding_dim: Embedding dimension, used when model_name is None
+
+    Returns:
+        Canonical model name
+
+    Raises:
+        ValueError: If the model is unknown or cannot be inferred
+    """
+    if model_name is None:
+        if embedding_dim not in DEFAULT_MODEL_BY_DIM:
+            raise ValueError(
+                f"Cannot infer model for embedding dimension {embedding_dim}; "
+                f"pass model_name explicitly"
+            )
+        return DEFAULT_MODEL_BY_DIM[embedding_dim]
+
+    canonical = MODEL_NAME_ALIASES.get(model_name, model_name)
+    if not get_model_registry().is_reid_model(canonical):
+        raise ValueError(f"Model '{model_name}' is not a ReID model")
+    return canonical
+
+
+def get_model_embedding_dim(model_name: str) -> int:
+    """Get the native embedding dimension for a ReID model (aliases allowed)."""
+    return get_model_registry().get_embedding_dim(resolve_model_name(model_name))
+
+
+def get_vec_table_name(model_name: str) -> str:
+    """Get the vec0 table name holding embeddings for a model."""
+    return f"vec_embeddings_{resolve_model_name(model_name)}"
+
+
+def _build_model_to_table() -> Dict[str, str]:
+    """Map every ReID model name (including loader aliases) to its vec0 table."""
+    mapping = {
+        name: get_vec_table_name(name)
+        for name in get_model_registry().list_reid_models()
+    }
+    for alias, canonical in MODEL_NAME_ALIASES.items():
+        mapping[alias] = mapping[canonical]
+    return mapping
+
+
+MODEL_TO_TABLE: Dict[str, str] = _build_model_to_table()
+
+# tiger_images attributes mirrored into vec0 metadata columns so filters are
+# applied inside the KNN instead of after it (vec0 metadata cannot be NULL)
+VEC_METADATA_COLUMNS = ("tiger_id", "side_view", "is_reference", "verified")
+
+VEC_METADATA_SCHEMA = """
+    tiger_id TEXT,
+    side_view TEXT,
+    is_reference INTEGER,
+    verified INTEGER
+"""
+
+# Side views that match a left/right query
+_SIDE_VIEW_WILDCARDS = ("both", "unknown")
+
+
+def create_vec_tables(connection) -> List[str]:
+    """
+    Create one vec0 virtual table per registered ReID model.
+
+    Tables use the model's native dimension and cosine distance, plus the
+    filterable ``VEC_METADATA_COLUMNS`` from tiger_images.
+
+    Args:
+        connection: SQLAlchemy connection or session
+
+    Returns:
+        List of table names created (or already present)
+    """
+    registry = get_model_registry()
+    created = []
+    for model_name in registry.list_reid_models():
+        table = get_vec_table_name(model_name)
+        dim = registry.get_embedding_dim(model_name)
+        try:
+            connection.execute(text(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING vec0(
+                    image_id TEXT PRIMARY KEY,
+                    embedding FLOAT[{dim}] distance_metric=cosine,
+                    {VEC_METADATA_SCHEMA}
+                )
+            """))
+            created.append(table)
+        except Exception as e:
+            logger.warning(f"Failed to create {table} table: {e}")
+    return created
+
+
+def _prepare_query_embedding(
+    query_embedding: np.ndarray,
+    model_name: Optional[str]
+) -> str:
+    """Validate a query embedding and resolve the model that produced it."""
+    if not isinstance(query_embedding, np.ndarray):
+        raise ValueError(f"Embedding must be numpy array, got {type(query_embedding)}")
+
+    if query_embedding.ndim != 1:
+        raise ValueError(f"Embedding must be 1-dimensional, got shape {query_embedding.shape}")
+
+    embedding_dim = query_embedding.shape[0]
+    if embedding_dim not in VALID_EMBEDDING_DIMS:
+        logger.warning(
+            f"Unexpected embedding dimension {embedding_dim}. "
+            f"Valid dimensions are: {sorted(VALID_EMBEDDING_DIMS)}"
+        )
+
+    if np.allclose(query_embedding, 0):
+        raise ValueError("Embedding cannot be all zeros")
+
+    model_name = resolve_model_name(model_name, embedding_dim)
+    expected_dim = get_model_registry().get_embedding_dim(model_name)
+    if embedding_dim != expected_dim:
+        raise ValueError(
+            f"Embedding dimension {embedding_dim} does not match "
+            f"{model_name} ({expected_dim})"
+        )
+    return model_name
+
 
 def find_matching_tigers(
     session: Session,
@@ -33,11 +225,23 @@ def find_matching_tigers(
     tiger_id: Optional[str] = None,
     side_view: Optional[str] = None,
     limit: int = 5,
-    similarity_threshold: float = 0.8
+    similarity_threshold: float = 0.8,
+    model_name: Optional[str] = None,
+    is_reference: Optional[bool] = None,
+    verified: Optional[bool] = None,
+    top_tigers: Optional[int] = None,
+    hydrate: bool = True
 ) -> List[dict]:
     """
     Find matching tigers based on embedding similarity using sqlite-vec.
 
+    Filters are applied inside the KNN (vec0 metadata columns, or an
+    eligibility mask for the in-memory indexes), so up to ``limit`` matches
+    are returned however selective the filters are.
+
+    With ``top_tigers`` set, tigers are first ranked against their prototype
+    embeddings and only the top tigers' images are searched.
+
     Args:
         session: Database session
         query_embedding: Query embedding vector (numpy array with valid dimension)
@@ -45,270 +249,711 @@ def find_matching_tigers(
         side_view: Optional side view filter (left/right)
         limit: Maximum number of results
         similarity_threshold: Minimum similarity score (0-1)
+        model_name: Model that produced the embedding. Only that model's
+            vectors are searched. Inferred from the dimension when omitted.
+        is_reference: Only search reference (True) or non-reference (False) images
+        verified: Only search verified (True) or unverified (False) images
+        top_tigers: Two-stage search over this many prototype-ranked tigers
+            (defaults to PROTOTYPE_SEARCH_TOP_TIGERS; 0 searches every image)
+        hydrate: Attach tiger/facility metadata. When False only image_id,
+            tiger_id and similarity are returned; callers merging several
+            searches hydrate the final list once with ``hydrate_matches``.
 
     Returns:
         List of matching tiger records with similarity scores
 
     Raises:
         ValueError: If embedding is invalid (wrong type, shape, or all zeros)
+            or does not match the model's embedding dimension
     """
-    # Validate embedding
-    if not isinstance(query_embedding, np.ndarray):
-        raise ValueError(f"Embedding must be numpy array, got {type(query_embedding)}")
+    model_name = _prepare_query_embedding(query_embedding, model_name)
+    table = get_vec_table_name(model_name)
+    filters = SearchFilters(tiger_id, side_view, is_reference, verified)
 
-    if query_embedding.ndim != 1:
-        raise ValueError(f"Embedding must be 1-dimensional, got shape {query_embedding.shape}")
+    candidate_tigers = _prototype_candidates(
+        session, model_name, query_embedding,
+        DEFAULT_TOP_TIGERS if top_tigers is None else top_tigers, tiger_id
+    )
+    if candidate_tigers is not None:
+        filters = filters._replace(tiger_ids=candidate_tigers)
 
-    embedding_dim = query_embedding.shape[0]
-    if embedding_dim not in VALID_EMBEDDING_DIMS:
-        logger.warning(
-            f"Unexpected embedding dimension {embedding_dim}. "
-            f"Valid dimensions are: {sorted(VALID_EMBEDDING_DIMS)}"
-        )
+    scored: Optional[List[Tuple[str, Optional[str], float]]] = None
 
-    if np.allclose(query_embedding, 0):
-        raise ValueError("Embedding cannot be all zeros")
+    if VECTOR_SEARCH_ENGINE == "hnsw":
+        index = get_loaded_hnsw_index(model_name)
+        if index is not None:
+            try:
+                scored = index.search(
+                    query_embedding, limit,
+                    exclude_tiger_id=tiger_id,
+                    similarity_threshold=similarity_threshold,
+                    eligible_ids=_eligible_image_ids(session, filters)
+                )
+            except Exception as e:
+                logger.warning(f"HNSW search failed, using exact search: {e}")
 
-    if SQLITE_VEC_AVAILABLE:
+    if scored is None and SQLITE_VEC_AVAILABLE:
         try:
-            return _find_matching_tigers_sqlite_vec(
-                session, query_embedding, tiger_id, side_view, limit, similarity_threshold
-            )
+            scored = _knn_sqlite_vec(session, table, query_embedding, limit, filters)
         except Exception as e:
             logger.warning(f"sqlite-vec search failed, using fallback: {e}")
 
-    # Fallback to Python-based similarity calculation
-    return _find_matching_tigers_python_fallback(
-        session, query_embedding, tiger_id, side_view, limit, similarity_threshold
+    if scored is None:
+        # Fallback to the in-memory gallery matrix
+        scored = _knn_gallery_index(session, model_name, query_embedding, limit, filters)
+
+    matches = [
+        _scored_match(image_id, owner, similarity)
+        for image_id, owner, similarity in scored
+        if similarity >= similarity_threshold
+    ][:limit]
+    return hydrate_matches(session, matches) if hydrate else matches
+
+
+class SearchFilters(NamedTuple):
+    """Attribute filters applied during a KNN search."""
+
+    exclude_tiger_id: Optional[str] = None
+    side_view: Optional[str] = None
+    is_reference: Optional[bool] = None
+    verified: Optional[bool] = None
+    tiger_ids: Optional[Tuple[str, ...]] = None
+
+    @property
+    def has_attribute_filters(self) -> bool:
+        """True if any filter other than tiger exclusion is set."""
+        return (
+            bool(self.side_view)
+            or self.is_reference is not None
+            or self.verified is not None
+            or self.tiger_ids is not None
+        )
+
+
+def _filter_conditions(filters: SearchFilters, params: dict, alias: str) -> List[str]:
+    """
+    Build SQL conditions for search filters and add their bind params.
+
+    Args:
+        filters: Filters to apply
+        params: Bind parameters (updated in place)
+        alias: Table alias carrying the filter columns (vec0 table or tiger_images)
+    """
+    conditions = []
+    if filters.exclude_tiger_id:
+        conditions.append(f"{alias}.tiger_id != :exclude_tiger_id")
+        params["exclude_tiger_id"] = str(filters.exclude_tiger_id)
+
+    if filters.side_view:
+        conditions.append(
+            f"{alias}.side_view IN (:side_view, "
+            f"{', '.join(repr(v) for v in _SIDE_VIEW_WILDCARDS)})"
+        )
+        params["side_view"] = filters.side_view
+
+    if filters.is_reference is not None:
+        conditions.append(f"{alias}.is_reference = :is_reference")
+        params["is_reference"] = int(filters.is_reference)
+
+    if filters.verified is not None:
+        conditions.append(f"{alias}.verified = :verified")
+        params["verified"] = int(filters.verified)
+
+    if filters.tiger_ids is not None:
+        names = [f"tiger_id_{i}" for i in range(len(filters.tiger_ids))]
+        params.update(zip(names, filters.tiger_ids))
+        conditions.append(f"{alias}.tiger_id IN ({', '.join(':' + n for n in names) or 'NULL'})")
+    return conditions
+
+
+def _prototype_candidates(
+    session: Session,
+    model_name: str,
+    query_embeddings: np.ndarray,
+    top_tigers: int,
+    exclude_tiger_id: Optional[str] = None
+) -> Optional[Tuple[str, ...]]:
+    """
+    First stage of two-stage search: the top tigers by prototype similarity.
+
+    Returns:
+        Candidate tiger ids (the union across queries), or None to search
+        every image (disabled, unavailable, or no smaller than the gallery)
+    """
+    if top_tigers <= 0:
+        return None
+
+    index = get_prototype_index(model_name)
+    table = get_vec_table_name(model_name)
+    try:
+        if not index.loaded:
+            index.rebuild_from_table(session, table)
+        elif index.stale_count:
+            index.refresh(session, table)
+    except Exception as e:
+        logger.warning(f"Prototype index unavailable, searching all images: {e}")
+        return None
+
+    if len(index) <= top_tigers:
+        return None
+
+    ranked = index.rank(query_embeddings, top_tigers, exclude_tiger_id)
+    return tuple(sorted({tiger_id for hits in ranked for tiger_id, _ in hits}))
+
+
+def _eligible_image_ids(session: Session, filters: SearchFilters) -> Optional[Set[str]]:
+    """
+    Pre-filter candidate images for the in-memory indexes.
+
+    Tiger exclusion is handled by the indexes themselves.
+
+    Returns:
+        Image ids passing the attribute filters, or None if there are none
+    """
+    if not filters.has_attribute_filters:
+        return None
+
+    params: dict = {}
+    conditions = _filter_conditions(filters._replace(exclude_tiger_id=None), params, "ti")
+    rows = session.execute(
+        text(f"SELECT ti.image_id FROM tiger_images ti WHERE {' AND '.join(conditions)}"),
+        params
     )
+    return {str(row.image_id) for row in rows}
 
 
-def _find_matching_tigers_sqlite_vec(
+def _knn_sqlite_vec(
     session: Session,
+    table: str,
     query_embedding: np.ndarray,
-    tiger_id: Optional[str] = None,
-    side_view: Optional[str] = None,
     limit: int = 5,
-    similarity_threshold: float = 0.8
-) -> List[dict]:
-    """SQLite implementation using sqlite-vec extension for fast vector search."""
+    filters: SearchFilters = SearchFilters()
+) -> List[Tuple[str, Optional[str], float]]:
+    """sqlite-vec KNN returning (image_id, tiger_id, similarity), best first."""
     # Normalize query embedding for cosine similarity
     query_norm = query_embedding / (np.linalg.norm(query_embedding) + 1e-10)
     embedding_blob = query_norm.astype(np.float32).tobytes()
 
-    # Build filter conditions
-    conditions = []
-    params = {"limit": limit * 2, "query_embedding": embedding_blob}
+    # Filters go on vec0 metadata columns so the KNN only visits eligible rows
+    params = {"limit": limit, "query_embedding": embedding_blob}
+    conditions = _filter_conditions(filters, params, table)
+    filter_clause = "".join(f"\n          AND {c}" for c in conditions)
 
-    if tiger_id:
-        conditions.append("ti.tiger_id != :tiger_id")
-        params["tiger_id"] = tiger_id
+    # Ids and distances only; metadata is hydrated after ranking
+    # Tables use distance_metric=cosine (0 = identical, 2 = opposite)
+    query = text(f"""
+        SELECT image_id, tiger_id, distance FROM {table}
+        WHERE embedding MATCH :query_embedding
+          AND k = :limit{filter_clause}
+        ORDER BY distance ASC
+    """)
 
-    if side_view:
-        conditions.append("ti.side_view IN (:side_view, 'both', 'unknown')")
-        params["side_view"] = side_view
+    return [
+        (str(row.image_id), row.tiger_id or None, 1 - row.distance)
+        for row in session.execute(query, params)
+    ]
 
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
 
-    # Query using sqlite-vec's KNN search with facility info
-    # vec_distance_cosine returns distance (0 = identical, 2 = opposite)
-    query = text(f"""
-        SELECT
-            ti.image_id,
-            ti.tiger_id,
-            ti.image_path,
-            ti.side_view,
-            t.name as tiger_name,
-            t.alias as tiger_alias,
-            t.last_seen_location,
-            t.last_seen_date,
-            f.facility_id,
-            f.exhibitor_name as facility_name,
-            ve.distance
-        FROM vec_embeddings ve
-        JOIN tiger_images ti ON ve.image_id = ti.image_id
-        LEFT JOIN tigers t ON ti.tiger_id = t.tiger_id
-        LEFT JOIN facilities f ON t.origin_facility_id = f.facility_id
-        WHERE ve.embedding MATCH :query_embedding
-          AND k = :limit
-          AND {where_clause}
-        ORDER BY ve.distance ASC
-    """)
+def _knn_gallery_index(
+    session: Session,
+    model_name: str,
+    query_embedding: np.ndarray,
+    limit: int = 5,
+    filters: SearchFilters = SearchFilters()
+) -> List[Tuple[str, Optional[str], float]]:
+    """In-memory fallback: exact top-k over the model's GalleryIndex matrix."""
+    from backend.database.gallery_index import get_gallery_index
 
-    results = session.execute(query, params)
+    index = get_gallery_index(model_name)
+    if not index.loaded:
+        # Build lazily from the vec table if startup did not load a snapshot
+        index.rebuild_from_table(session, get_vec_table_name(model_name))
+
+    return index.search(
+        query_embedding, limit,
+        exclude_tiger_id=filters.exclude_tiger_id,
+        eligible_ids=_eligible_image_ids(session, filters)
+    )
 
-    matches = []
-    for row in results:
-        # Convert distance to similarity (cosine distance range is 0-2)
-        similarity = 1 - (row.distance / 2)
 
-        if similarity >= similarity_threshold:
-            matches.append({
-                "image_id": str(row.image_id),
-                "tiger_id": str(row.tiger_id) if row.tiger_id else None,
-                "tiger_name": row.tiger_name,
-                "tiger_alias": row.tiger_alias,
-                "image_path": row.image_path,
-                "side_view": row.side_view,
-                "similarity": float(similarity),
-                "facility_id": str(row.facility_id) if row.facility_id else None,
-                "facility_name": row.facility_name,
-                "last_seen_location": row.last_seen_location,
-                "last_seen_date": str(row.last_seen_date) if row.last_seen_date else None
-            })
+def _scored_match(image_id: str, tiger_id: Optional[str], similarity: float) -> dict:
+    """Build an un-hydrated match record."""
+    return {
+        "image_id": str(image_id),
+        "tiger_id": str(tiger_id) if tiger_id else None,
+        "similarity": float(similarity)
+    }
 
-    return matches[:limit]
 
+def hydrate_matches(session: Session, matches: List[dict]) -> List[dict]:
+    """
+    Attach tiger/facility metadata to match records.
+
+    Metadata comes from the process-wide ``MatchMetadataCache``, so only
+    images not seen recently cost a query. Matches whose image no longer
+    exists are dropped.
+
+    Args:
+        session: Database session
+        matches: Records with at least image_id and similarity
+
+    Returns:
+        Hydrated match records in the same order
+    """
+    metadata = get_match_metadata_cache().get_many(session, [m["image_id"] for m in matches])
+    return [
+        {**match, **metadata[match["image_id"]]}
+        for match in matches
+        if match["image_id"] in metadata
+    ]
 
-def _find_matching_tigers_python_fallback(
+
+def _prepare_query_batch(
+    query_embeddings: np.ndarray,
+    model_name: Optional[str]
+) -> Tuple[np.ndarray, str]:
+    """Validate a (q, d) query matrix and resolve the model that produced it."""
+    if not isinstance(query_embeddings, np.ndarray):
+        raise ValueError(f"Embeddings must be numpy array, got {type(query_embeddings)}")
+
+    if query_embeddings.ndim != 2:
+        raise ValueError(f"Embeddings must be 2-dimensional (q, d), got shape {query_embeddings.shape}")
+
+    query_embeddings = query_embeddings.astype(np.float32, copy=False)
+    if len(query_embeddings) == 0:
+        return query_embeddings, resolve_model_name(model_name, query_embeddings.shape[1])
+
+    if np.any(np.all(np.isclose(query_embeddings, 0), axis=1)):
+        raise ValueError("Embeddings cannot contain all-zero rows")
+
+    return query_embeddings, _prepare_query_embedding(query_embeddings[0], model_name)
+
+
+# SQLite caps compound SELECTs at 500 terms; stay well below it
+_VEC0_QUERIES_PER_STATEMENT = 64
+
+
+def _knn_batch_sqlite_vec(
     session: Session,
-    query_embedding: np.ndarray,
+    table: str,
+    query_embeddings: np.ndarray,
+    k: int,
+    filters: SearchFilters = SearchFilters()
+) -> List[List[Tuple[str, Optional[str], float]]]:
+    """Run one vec0 KNN per query, UNION ALL'd into a single statement."""
+    norms = np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+    blobs = [row.tobytes() for row in (query_embeddings / (norms + 1e-10)).astype(np.float32)]
+
+    filter_params: dict = {}
+    filter_clause = "".join(
+        f" AND {c}" for c in _filter_conditions(filters, filter_params, table)
+    )
+
+    results: List[List[Tuple[str, Optional[str], float]]] = [[] for _ in blobs]
+    for start in range(0, len(blobs), _VEC0_QUERIES_PER_STATEMENT):
+        chunk = range(start, min(start + _VEC0_QUERIES_PER_STATEMENT, len(blobs)))
+        params = {"k": k, **filter_params}
+        selects = []
+        for i in chunk:
+            params[f"q{i}"] = blobs[i]
+            selects.append(f"""
+                SELECT {i} AS query_index, image_id, tiger_id, distance FROM (
+                    SELECT image_id, tiger_id, distance FROM {table}
+                    WHERE embedding MATCH :q{i} AND k = :k{filter_clause}
+                )
+            """)
+        for row in session.execute(text(" UNION ALL ".join(selects)), params):
+            results[row.query_index].append(
+                (str(row.image_id), row.tiger_id or None, 1 - float(row.distance))
+            )
+
+    for hits in results:
+        hits.sort(key=lambda hit: -hit[2])
+    return results
+
+
+def find_matching_tigers_batch(
+    session: Session,
+    query_embeddings: np.ndarray,
+    model_name: Optional[str] = None,
+    limit: int = 5,
     tiger_id: Optional[str] = None,
     side_view: Optional[str] = None,
-    limit: int = 5,
-    similarity_threshold: float = 0.8
-) -> List[dict]:
-    """Python fallback using scipy for cosine similarity (slower, O(n))."""
-    from scipy.spatial.distance import cosine
-
-    # Build WHERE conditions
-    conditions = []
-    params = {}
+    similarity_threshold: float = 0.8,
+    is_reference: Optional[bool] = None,
+    verified: Optional[bool] = None,
+    top_tigers: Optional[int] = None,
+    hydrate: bool = True
+) -> List[List[dict]]:
+    """
+    Find matching tigers for several query embeddings in one pass.
 
-    if tiger_id:
-        conditions.append("ti.tiger_id != :tiger_id")
-        params["tiger_id"] = tiger_id
+    Runs a single multi-row vec0 statement (or one matrix product against the
+    in-memory gallery index) and hydrates metadata for all hits at once.
 
-    if side_view:
-        conditions.append("ti.side_view IN (:side_view, 'both', 'unknown')")
-        params["side_view"] = side_view
+    Args:
+        session: Database session
+        query_embeddings: Query matrix of shape (q, d) from the same model
+        model_name: Model that produced the embeddings. Inferred from the
+            dimension when omitted.
+        limit: Maximum number of results per query
+        tiger_id: Optional tiger_id to exclude from results
+        side_view: Optional side view filter (left/right)
+        similarity_threshold: Minimum similarity score (0-1)
+        is_reference: Only search reference (True) or non-reference (False) images
+        verified: Only search verified (True) or unverified (False) images
+        top_tigers: Two-stage search over this many prototype-ranked tigers
+            per query (defaults to PROTOTYPE_SEARCH_TOP_TIGERS)
+        hydrate: Attach tiger/facility metadata (see ``find_matching_tigers``)
 
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    Returns:
+        One list of match records per query row, in query order
 
-    # Get all embeddings from vec_embeddings table with facility info
-    query = text(f"""
-        SELECT
-            ti.image_id,
-            ti.tiger_id,
-            ti.image_path,
-            ti.side_view,
-            t.name as tiger_name,
-            t.alias as tiger_alias,
-            t.last_seen_location,
-            t.last_seen_date,
-            f.facility_id,
-            f.exhibitor_name as facility_name,
-            ve.embedding
-        FROM vec_embeddings ve
-        JOIN tiger_images ti ON ve.image_id = ti.image_id
-        LEFT JOIN tigers t ON ti.tiger_id = t.tiger_id
-        LEFT JOIN facilities f ON t.origin_facility_id = f.facility_id
-        WHERE {where_clause}
-    """)
+    Raises:
+        ValueError: If the embeddings are invalid or do not match the
+            model's embedding dimension
+    """
+    query_embeddings, model_name = _prepare_query_batch(query_embeddings, model_name)
+    if len(query_embeddings) == 0:
+        return []
 
-    results = session.execute(query, params)
+    filters = SearchFilters(tiger_id, side_view, is_reference, verified)
+    scored: Optional[List[List[Tuple[str, Optional[str], float]]]] = None
 
-    # Calculate similarity in Python
-    matches = []
-    for row in results:
-        if not row.embedding:
-            continue
+    # One shared second stage over the union of each query's top tigers
+    candidate_tigers = _prototype_candidates(
+        session, model_name, query_embeddings,
+        DEFAULT_TOP_TIGERS if top_tigers is None else top_tigers, tiger_id
+    )
+    if candidate_tigers is not None:
+        filters = filters._replace(tiger_ids=candidate_tigers)
 
+    hnsw_index = get_loaded_hnsw_index(model_name) if VECTOR_SEARCH_ENGINE == "hnsw" else None
+    if hnsw_index is not None:
         try:
-            # Parse embedding from blob
-            if isinstance(row.embedding, bytes):
-                db_embedding = np.frombuffer(row.embedding, dtype=np.float32)
-            else:
-                continue
-
-            # Ensure same shape
-            if db_embedding.shape[0] != query_embedding.shape[0]:
-                continue
-
-            # Calculate cosine similarity
-            cos_dist = cosine(query_embedding.flatten(), db_embedding.flatten())
-            similarity = 1 - cos_dist
-
-            if similarity >= similarity_threshold:
-                matches.append({
-                    "image_id": str(row.image_id),
-                    "tiger_id": str(row.tiger_id) if row.tiger_id else None,
-                    "tiger_name": row.tiger_name,
-                    "tiger_alias": row.tiger_alias,
-                    "image_path": row.image_path,
-                    "side_view": row.side_view,
-                    "similarity": float(similarity),
-                    "facility_id": str(row.facility_id) if row.facility_id else None,
-                    "facility_name": row.facility_name,
-                    "last_seen_location": row.last_seen_location,
-                    "last_seen_date": str(row.last_seen_date) if row.last_seen_date else None
-                })
+            scored = hnsw_index.search_batch(
+                query_embeddings, limit,
+                exclude_tiger_id=tiger_id,
+                eligible_ids=_eligible_image_ids(session, filters)
+            )
+        except Exception as e:
+            logger.warning(f"HNSW batch search failed, using exact search: {e}")
 
+    if scored is None and SQLITE_VEC_AVAILABLE:
+        try:
+            scored = _knn_batch_sqlite_vec(
+                session, get_vec_table_name(model_name), query_embeddings, limit, filters
+            )
         except Exception as e:
-            logger.debug(f"Skipping invalid embedding: {e}")
-            continue
+            logger.warning(f"sqlite-vec batch search failed, using fallback: {e}")
+
+    if scored is None:
+        from backend.database.gallery_index import get_gallery_index
+
+        index = get_gallery_index(model_name)
+        if not index.loaded:
+            index.rebuild_from_table(session, get_vec_table_name(model_name))
+        scored = index.search_batch(
+            query_embeddings, limit,
+            exclude_tiger_id=tiger_id,
+            eligible_ids=_eligible_image_ids(session, filters)
+        )
+
+    results = [
+        [
+            _scored_match(image_id, owner, similarity)
+            for image_id, owner, similarity in hits
+            if similarity >= similarity_threshold
+        ][:limit]
+        for hits in scored
+    ]
+    if not hydrate:
+        return results
+
+    # Hydrate every candidate across all queries in one cache lookup
+    metadata = get_match_metadata_cache().get_many(
+        session, [match["image_id"] for matches in results for match in matches]
+    )
+    return [
+        [{**match, **metadata[match["image_id"]]} for match in matches if match["image_id"] in metadata]
+        for matches in results
+    ]
+
+
+def _vec_metadata_values(session: Session, image_id: str) -> Dict[str, object]:
+    """Read an image's filterable attributes as vec0 metadata values."""
+    row = session.execute(
+        text("""
+            SELECT tiger_id, side_view, is_reference, verified
+            FROM tiger_images WHERE image_id = :image_id
+        """),
+        {"image_id": str(image_id)}
+    ).fetchone()
+    return _vec_metadata_from_row(row)
+
+
+def _vec_metadata_from_row(row) -> Dict[str, object]:
+    """Map a tiger_images row (or None) to non-NULL vec0 metadata values."""
+    if row is None:
+        return {"tiger_id": "", "side_view": "", "is_reference": 0, "verified": 0}
+    return {
+        "tiger_id": str(row.tiger_id) if row.tiger_id else "",
+        "side_view": row.side_view or "",
+        "is_reference": int(bool(row.is_reference)),
+        "verified": int(bool(row.verified)),
+    }
+
+
+def update_vec_metadata(connection, image_id: str, values: Dict[str, object]) -> None:
+    """
+    Write an image's filter attributes to every per-model vec table.
+
+    Args:
+        connection: SQLAlchemy connection or session
+        image_id: Image UUID
+        values: Metadata values keyed by ``VEC_METADATA_COLUMNS`` names
+    """
+    assignments = ", ".join(f"{column} = :{column}" for column in values)
+    for table in sorted(set(MODEL_TO_TABLE.values())):
+        connection.execute(
+            text(f"UPDATE {table} SET {assignments} WHERE image_id = :image_id"),
+            {"image_id": str(image_id), **values}
+        )
+        # Snapshots hold tiger ids too, so they are stale after this
+        bump_table_generation(connection, table)
 
-    # Sort by similarity (highest first) and limit
-    matches.sort(key=lambda x: x["similarity"], reverse=True)
-    return matches[:limit]
+
+# Rows per DELETE/INSERT round trip in store_embeddings_bulk
+_BULK_WRITE_CHUNK = 500
+
+# session.info key for index updates applied when the session commits
+_PENDING_INDEX_UPDATES = "vec_index_updates"
 
 
 def store_embedding(
     session: Session,
     image_id: str,
-    embedding: np.ndarray
+    embedding: np.ndarray,
+    model_name: Optional[str] = None,
+    tiger_id: Optional[str] = None,
+    commit: bool = True
 ) -> bool:
     """
-    Store embedding vector for an image in sqlite-vec virtual table.
+    Store embedding vector for an image in the model's sqlite-vec table.
+
+    The model's in-memory gallery and HNSW indexes are updated once the
+    write commits. Use ``store_embeddings_bulk`` for more than a handful of
+    images.
 
     Args:
         session: Database session
         image_id: Image UUID (string)
-        embedding: Embedding vector (2048-dim numpy array)
+        embedding: Embedding vector at the model's native dimension
+        model_name: Model that produced the embedding. Inferred from the
+            dimension when omitted.
+        tiger_id: Owning tiger, looked up from tiger_images when omitted
+        commit: Commit the transaction (see ``store_embeddings_bulk``)
 
     Returns:
         True if successful
     """
-    # Normalize embedding for cosine similarity
-    embedding_norm = embedding / (np.linalg.norm(embedding) + 1e-10)
-    embedding_blob = embedding_norm.astype(np.float32).tobytes()
+    embedding = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+    return store_embeddings_bulk(session, model_name, [image_id], embedding, [tiger_id], commit) == 1
+
+
+def store_embeddings_bulk(
+    session: Session,
+    model_name: Optional[str],
+    image_ids: List[str],
+    embeddings: np.ndarray,
+    tiger_ids: Optional[List[Optional[str]]] = None,
+    commit: bool = True
+) -> int:
+    """
+    Store many embeddings for one model in a single transaction.
+
+    Rows are written with chunked ``executemany`` DELETE/INSERT batches and
+    committed once. The model's in-memory gallery and HNSW indexes receive
+    the whole batch when the transaction commits; a rollback discards it.
+
+    Args:
+        session: Database session
+        model_name: Model that produced the embeddings. Inferred from the
+            dimension when omitted.
+        image_ids: Image UUIDs (a repeated id keeps its last embedding)
+        embeddings: Matrix of shape (len(image_ids), dim)
+        tiger_ids: Owning tigers parallel to image_ids; None entries (or
+            None) are looked up from tiger_images
+        commit: Commit the transaction. Pass False to write alongside the
+            caller's own records and commit them together.
+
+    Returns:
+        Number of embeddings stored (0 on failure, after rolling back)
+
+    Raises:
+        Exception: On failure when ``commit`` is False. The transaction
+            holds the caller's records too, so it is left for the caller
+            to roll back.
+    """
+    if len(image_ids) == 0:
+        return 0
 
     try:
-        # Insert or replace in vec_embeddings
-        session.execute(
-            text("""
-                INSERT OR REPLACE INTO vec_embeddings(image_id, embedding)
-                VALUES (:image_id, :embedding)
-            """),
-            {"image_id": image_id, "embedding": embedding_blob}
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(image_ids):
+            raise ValueError(
+                f"Expected embeddings of shape ({len(image_ids)}, dim), got {embeddings.shape}"
+            )
+        model_name = resolve_model_name(model_name, embeddings.shape[1])
+        expected_dim = get_model_registry().get_embedding_dim(model_name)
+        if embeddings.shape[1] != expected_dim:
+            raise ValueError(
+                f"Embedding dimension {embeddings.shape[1]} does not match "
+                f"{model_name} ({expected_dim})"
+            )
+        table = get_vec_table_name(model_name)
+
+        # Last write wins for repeated ids
+        if tiger_ids is None:
+            tiger_ids = [None] * len(image_ids)
+        rows = {
+            str(image_id): (row, tiger_id)
+            for row, (image_id, tiger_id) in enumerate(zip(image_ids, tiger_ids))
+        }
+        ids = list(rows)
+        positions = [rows[image_id][0] for image_id in ids]
+
+        # Normalize embeddings for cosine similarity
+        normed = embeddings[positions]
+        normed = normed / (np.linalg.norm(normed, axis=1, keepdims=True) + 1e-10)
+
+        delete = text(f"DELETE FROM {table} WHERE image_id IN :image_ids").bindparams(
+            bindparam("image_ids", expanding=True)
         )
-        session.commit()
-        logger.debug(f"Stored embedding for image {image_id}")
-        return True
+        insert = text(f"""
+            INSERT INTO {table}(image_id, embedding, {", ".join(VEC_METADATA_COLUMNS)})
+            VALUES (:image_id, :embedding, {", ".join(":" + c for c in VEC_METADATA_COLUMNS)})
+        """)
+        lookup = text("""
+            SELECT image_id, tiger_id, side_view, is_reference, verified
+            FROM tiger_images WHERE image_id IN :image_ids
+        """).bindparams(bindparam("image_ids", expanding=True))
+
+        owners: List[Optional[str]] = []
+        for start in range(0, len(ids), _BULK_WRITE_CHUNK):
+            chunk = ids[start:start + _BULK_WRITE_CHUNK]
+            known = {
+                str(row.image_id): row
+                for row in session.execute(lookup, {"image_ids": chunk})
+            }
+
+            params = []
+            for offset, image_id in enumerate(chunk):
+                metadata = _vec_metadata_from_row(known.get(image_id))
+                tiger_id = rows[image_id][1]
+                if tiger_id is not None:
+                    metadata["tiger_id"] = str(tiger_id)
+                owners.append(metadata["tiger_id"] or None)
+                params.append({
+                    "image_id": image_id,
+                    "embedding": normed[start + offset].tobytes(),
+                    **metadata
+                })
+
+            # vec0 tables do not support INSERT OR REPLACE, so delete first
+            session.execute(delete, {"image_ids": chunk})
+            session.execute(insert, params)
+
+        generation = bump_table_generation(session, table)
+        session.info.setdefault(_PENDING_INDEX_UPDATES, []).append(
+            (model_name, ids, normed, owners, generation)
+        )
+        bump_gallery_generation(session)
+        if commit:
+            session.commit()
+        logger.debug(f"Stored {len(ids)} {model_name} embeddings")
+        return len(ids)
 
     except Exception as e:
-        logger.error(f"Failed to store embedding: {e}")
+        logger.error(f"Failed to store embeddings: {e}")
+        if not commit:
+            raise
         session.rollback()
-        return False
+        return 0
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_index_updates(session) -> None:
+    """Add committed embeddings to the loaded in-memory indexes."""
+    updates = session.info.pop(_PENDING_INDEX_UPDATES, ())
+    for model_name, image_ids, embeddings, tiger_ids, generation in updates:
+        for index in (
+            get_loaded_gallery_index(model_name),
+            get_loaded_hnsw_index(model_name),
+            get_loaded_knn_graph(model_name),
+        ):
+            if index is not None:
+                index.add_many(image_ids, embeddings, tiger_ids)
+                follow_table_generation(index, generation)
+        mark_prototypes_stale(tiger_ids, model_name)
 
 
-def delete_embedding(session: Session, image_id: str) -> bool:
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_index_updates(session) -> None:
+    session.info.pop(_PENDING_INDEX_UPDATES, None)
+
+
+def delete_embedding(
+    session: Session,
+    image_id: str,
+    model_name: Optional[str] = None
+) -> bool:
     """
-    Delete embedding for an image from sqlite-vec virtual table.
+    Delete embedding for an image from sqlite-vec virtual tables.
 
     Args:
         session: Database session
         image_id: Image UUID (string)
+        model_name: Only delete this model's embedding. Deletes the image
+            from every model table when omitted.
 
     Returns:
         True if successful
     """
+    if model_name is not None:
+        models = [resolve_model_name(model_name)]
+    else:
+        models = get_model_registry().list_reid_models()
+
     try:
-        session.execute(
-            text("DELETE FROM vec_embeddings WHERE image_id = :image_id"),
-            {"image_id": image_id}
-        )
+        owners = set()
+        generations = {}
+        for name in models:
+            table = get_vec_table_name(name)
+            owners.update(
+                row.tiger_id for row in session.execute(
+                    text(f"SELECT tiger_id FROM {table} WHERE image_id = :image_id"),
+                    {"image_id": str(image_id)}
+                )
+            )
+            session.execute(
+                text(f"DELETE FROM {table} WHERE image_id = :image_id"),
+                {"image_id": str(image_id)}
+            )
+            generations[name] = bump_table_generation(session, table)
         session.commit()
+
+        for name in models:
+            for index in (
+                get_loaded_gallery_index(name),
+                get_loaded_hnsw_index(name),
+                get_loaded_knn_graph(name),
+            ):
+                if index is not None:
+                    index.remove(str(image_id))
+                    follow_table_generation(index, generations[name])
+            mark_prototypes_stale(owners, name)
+        bump_gallery_generation()
         return True
     except Exception as e:
         logger.error(f"Failed to delete embedding: {e}")
@@ -316,32 +961,127 @@ def delete_embedding(session: Session, image_id: str) -> bool:
         return False
 
 
-def sync_embeddings(session: Session) -> int:
+def get_tiger_embeddings(
+    session: Session,
+    tiger_id: str,
+    model_name: str,
+    side_views: Optional[List[str]] = None
+) -> Dict[str, np.ndarray]:
     """
-    Sync all embeddings from tiger_images to vec_embeddings virtual table.
+    Get a tiger's stored embeddings for one model.
 
-    This is useful when migrating data or rebuilding the vector index.
+    Args:
+        session: Database session
+        tiger_id: Tiger UUID
+        model_name: Model whose vec table to read
+        side_views: Only images with these side views
 
     Returns:
-        Number of embeddings synced
+        Dictionary mapping image_id -> normalized embedding
+    """
+    conditions = ["ti.tiger_id = :tiger_id"]
+    params: dict = {"tiger_id": str(tiger_id)}
+    if side_views:
+        conditions.append("ti.side_view IN :side_views")
+        params["side_views"] = list(side_views)
+
+    query = text(f"""
+        SELECT ti.image_id, ve.embedding
+        FROM tiger_images ti
+        JOIN {get_vec_table_name(model_name)} ve ON ve.image_id = ti.image_id
+        WHERE {" AND ".join(conditions)}
+    """)
+    if side_views:
+        query = query.bindparams(bindparam("side_views", expanding=True))
+
+    return {
+        str(row.image_id): np.frombuffer(row.embedding, dtype=np.float32).copy()
+        for row in session.execute(query, params)
+    }
+
+
+async def sync_embeddings(
+    session: Session,
+    model_name: Optional[str] = None,
+    batch_size: int = 32,
+    job_id: Optional[str] = None,
+    resume: bool = True
+) -> Dict[str, object]:
     """
-    # This function would need to read embeddings from wherever they're stored
-    # and insert them into the vec_embeddings virtual table
-    logger.info("Syncing embeddings to vec_embeddings table...")
+    Re-embed every tiger image into a model's vec table.
+
+    Streams tiger_images in image_id order, embeds batches through the
+    model client and bulk-writes them, checkpointing to a BackgroundJob so an
+    interrupted run resumes where it stopped (see ``EmbeddingSyncService``).
+
+    Args:
+        session: Database session
+        model_name: Model to rebuild (defaults to wildlife_tools)
+        batch_size: Images per embedding call and per transaction
+        job_id: Resume this BackgroundJob
+        resume: Resume the model's latest unfinished job when job_id is omitted
+
+    Returns:
+        Job progress including counts and images_per_sec
+    """
+    from backend.services.embedding_sync_service import EmbeddingSyncService
+
+    return await EmbeddingSyncService(session).run(
+        model_name=model_name, batch_size=batch_size, job_id=job_id, resume=resume
+    )
 
-    # Count existing entries
-    result = session.execute(text("SELECT COUNT(*) FROM vec_embeddings")).fetchone()
-    count = result[0] if result else 0
 
-    logger.info(f"vec_embeddings contains {count} entries")
-    return count
+def get_embedding_counts_by_table(session: Session) -> Dict[str, int]:
+    """Get the number of embeddings in each per-model vec table."""
+    counts = {}
+    for table in sorted(set(MODEL_TO_TABLE.values())):
+        try:
+            result = session.execute(text(f"SELECT COUNT(*) FROM {table}")).fetchone()
+            counts[table] = result[0] if result else 0
+        except Exception as e:
+            logger.debug(f"Failed to count {table}: {e}")
+            counts[table] = 0
+    return counts
 
 
-def get_embedding_count(session: Session) -> int:
-    """Get the number of embeddings in the vec_embeddings table."""
+def get_embedding_count(session: Session, model_name: Optional[str] = None) -> int:
+    """
+    Get the number of stored embeddings.
+
+    Args:
+        session: Database session
+        model_name: Count only this model's table. Counts all tables when omitted.
+    """
+    if model_name is None:
+        return sum(get_embedding_counts_by_table(session).values())
+
     try:
-        result = session.execute(text("SELECT COUNT(*) FROM vec_embeddings")).fetchone()
+        table = get_vec_table_name(model_name)
+        result = session.execute(text(f"SELECT COUNT(*) FROM {table}")).fetchone()
         return result[0] if result else 0
     except Exception as e:
         logger.error(f"Failed to count embeddings: {e}")
         return 0
+
+
+@event.listens_for(TigerImage, "after_update")
+def _sync_vec_metadata_on_update(mapper, connection, target) -> None:
+    """Keep vec0 filter metadata in step with ORM edits to tiger_images."""
+    state = inspect(target)
+    if not any(state.attrs[column].history.has_changes() for column in VEC_METADATA_COLUMNS):
+        return
+
+    tiger_history = state.attrs.tiger_id.history
+    if tiger_history.has_changes():
+        mark_prototypes_stale([*tiger_history.deleted, *tiger_history.added])
+
+    try:
+        update_vec_metadata(connection, target.image_id, _vec_metadata_from_row(target))
+    except Exception as e:
+        logger.debug(f"Failed to update vec metadata for image {target.image_id}: {e}")
+
+
+@event.listens_for(TigerImage, "after_delete")
+def _mark_prototype_stale_on_delete(mapper, connection, target) -> None:
+    """A deleted image no longer contributes to its tiger's prototype."""
+    mark_prototypes_stale([target.tiger_id])
@@ -0,0 +1,761 @@
+"""Persistent store of gallery-side MatchAnything verification features
+
+``VerifiedEnsembleStrategy`` used to open up to ``MAX_GALLERY_IMAGES``
+full-resolution files per candidate from disk on every query and upload
+full-size image pairs for every comparison, although the gallery side never
+changes between queries.
+
+MatchAnything-ELoFTR is a detector-free matcher: keypoints are produced
+jointly for an image pair, so no per-image keypoint list or descriptor set
+exists to cache. What is per-image is the matcher input itself; the
+processor resizes every image to ``MATCHER_INPUT_SIZE`` and converts it to
+grayscale before the backbone sees it. This module stores exactly that
+input, losslessly encoded, once per gallery image:
+
+    store = get_gallery_feature_store()
+    features = store.get_or_compute([(image_id, image_path), ...])
+    await matcher.match_pair(query_features, features[image_id])
+
+Features are computed when a ``TigerImage`` with an ``image_path`` is
+committed (in a background thread), recomputed when the file's size or
+mtime changes and dropped when the image is deleted. Images ingested before
+the store existed are filled on first use or by ``backfill_gallery_features``.
+
+The store also keeps a preselection of the best ``DEFAULT_SELECTION_SIZE``
+gallery images per tiger and query side (``gallery_rank_key`` order), so
+verification loads its candidates' gallery with one lookup instead of an
+ORDER BY and a Python re-sort per candidate:
+
+    refs = store.select_gallery(tiger_ids, query_side_view="left")
+
+The selection is derived from a mirror of each image's ranking columns.
+When images are added, deleted, verified or otherwise re-ranked, the mirror
+and the affected tigers' selections are updated as the session commits.
+Tigers whose images predate the store are seeded from the database by
+``build_gallery_selection``: at startup, or on first verification.
+
+The store is a SQLite file next to the database (``VERIFICATION_FEATURES_PATH``
+overrides it). It is disabled for in-memory databases.
+"""
+
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from backend.database.models import Tiger, TigerImage
+from backend.utils.image_artifact import ImageArtifact, to_pil
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENABLED = os.getenv("VERIFICATION_FEATURES_ENABLED", "true").lower() == "true"
+
+# Input size (width, height) the MatchAnything-ELoFTR processor resizes to
+MATCHER_INPUT_SIZE = (640, 480)
+
+# Bumped whenever extract_verification_features changes its output
+FEATURE_VERSION = 1
+
+# Gallery images preselected per tiger and query side
+DEFAULT_SELECTION_SIZE = int(os.getenv("VERIFICATION_GALLERY_IMAGES", "3"))
+# Selection for queries without a known side view
+ANY_SIDE = "any"
+SELECTION_SIDES = (ANY_SIDE, "left", "right", "both")
+
+# TigerImage columns that change a tiger's preselection
+_RANKING_ATTRS = ("tiger_id", "image_path", "side_view", "is_reference", "verified", "quality_score")
+
+# session.info keys for changes applied when the session commits
+_PENDING_KEY = "verification_features_pending"
+_DELETED_KEY = "verification_features_deleted"
+_RANKED_KEY = "verification_selection_ranked"
+_DIRTY_TIGERS_KEY = "verification_selection_dirty"
+_NEW_TIGERS_KEY = "verification_selection_new_tigers"
+
+# (image_id, image_path) of a gallery image
+GalleryImageRef = Tuple[str, str]
+
+
+class GalleryImageRow(NamedTuple):
+    """Ranking columns of one gallery image."""
+    image_id: str
+    tiger_id: Optional[str]
+    image_path: str
+    side_view: Optional[str]
+    is_reference: bool
+    verified: bool
+    quality_score: Optional[float]
+
+    @classmethod
+    def of(cls, image: Any) -> "GalleryImageRow":
+        """Row for a TigerImage (or a query row with the same columns)."""
+        return cls(
+            str(image.image_id),
+            str(image.tiger_id) if image.tiger_id else None,
+            str(image.image_path),
+            _side_value(image.side_view),
+            bool(image.is_reference),
+            bool(image.verified),
+            image.quality_score,
+        )
+
+
+def get_default_store_path() -> Optional[Path]:
+    """
+    Feature store location (next to the SQLite file).
+
+    Returns:
+        Store path, or None for in-memory databases
+    """
+    override = os.getenv("VERIFICATION_FEATURES_PATH")
+    if override:
+        return Path(override)
+
+    url = os.getenv("DATABASE_URL", "sqlite:///data/tiger_id.db")
+    if not url.startswith("sqlite:///") or ":memory:" in url:
+        return None
+    return Path(url.replace("sqlite:///", "")).parent / "verification_features.db"
+
+
+def extract_verification_features(image: Union[ImageArtifact, Image.Image, bytes]) -> bytes:
+    """
+    Matcher-ready input for one image.
+
+    Resizes to ``MATCHER_INPUT_SIZE`` and converts to grayscale the way the
+    MatchAnything processor does, then encodes losslessly as PNG.
+
+    Args:
+        image: Artifact, PIL image or encoded bytes
+
+    Returns:
+        PNG bytes accepted by ``MatchAnythingModel.match_pair``
+    """
+    resized = to_pil(image).convert("RGB").resize(MATCHER_INPUT_SIZE, Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    resized.convert("L").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _side_value(side_view: Any) -> str:
+    """Side view as a plain string (the column holds strings, not SideView)."""
+    return getattr(side_view, "value", side_view) or "unknown"
+
+
+def gallery_rank_key(image: Any, query_side_view: Optional[str] = None) -> Tuple:
+    """
+    Sort key (descending) for choosing gallery images to verify against.
+
+    Prefers the query's side view, then 'both', then reference, verified
+    and higher-quality images.
+
+    Args:
+        image: TigerImage or row with side_view, is_reference, verified
+            and quality_score
+        query_side_view: Side view of the query image
+
+    Returns:
+        Tuple to sort with ``reverse=True``
+    """
+    side_match = 0
+    if query_side_view and query_side_view != "unknown":
+        side = _side_value(image.side_view)
+        side_match = 2 if side == query_side_view else (1 if side == "both" else 0)
+    return (side_match, bool(image.is_reference), bool(image.verified), image.quality_score or 0)
+
+
+def _selection_side(query_side_view: Optional[str]) -> str:
+    return query_side_view if query_side_view in SELECTION_SIDES else ANY_SIDE
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class GalleryFeatureStore:
+    """SQLite-backed verification features by gallery image id."""
+
+    def __init__(self, path: Union[str, Path], selection_size: Optional[int] = None):
+        """
+        Open (or create) a feature store.
+
+        Args:
+            path: SQLite file, or ":memory:"
+            selection_size: Gallery images preselected per tiger and side
+                (defaults to VERIFICATION_GALLERY_IMAGES)
+        """
+        self.path = str(path)
+        self.selection_size = selection_size or DEFAULT_SELECTION_SIZE
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS gallery_features (
+                image_id TEXT PRIMARY KEY,
+                source_path TEXT NOT NULL,
+                source_mtime_ns INTEGER NOT NULL,
+                source_size INTEGER NOT NULL,
+                feature_version INTEGER NOT NULL,
+                features BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS gallery_images (
+                image_id TEXT PRIMARY KEY,
+                tiger_id TEXT,
+                image_path TEXT NOT NULL,
+                side_view TEXT,
+                is_reference INTEGER NOT NULL,
+                verified INTEGER NOT NULL,
+                quality_score REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_gallery_images_tiger ON gallery_images(tiger_id);
+            CREATE TABLE IF NOT EXISTS gallery_selection (
+                tiger_id TEXT NOT NULL,
+                side TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                image_id TEXT NOT NULL,
+                image_path TEXT NOT NULL,
+                PRIMARY KEY (tiger_id, side, rank)
+            );
+            CREATE TABLE IF NOT EXISTS gallery_selection_state (
+                tiger_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                built INTEGER NOT NULL
+            );
+        """)
+
+        self.hits = 0
+        self.misses = 0
+        self.computed = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM gallery_features").fetchone()[0]
+
+    def get_many(self, refs: Iterable[GalleryImageRef]) -> Dict[str, bytes]:
+        """
+        Stored features that are still current for their source files.
+
+        Args:
+            refs: (image_id, image_path) pairs
+
+        Returns:
+            Features by image id (stale or missing entries are omitted)
+        """
+        refs = list(refs)
+        if not refs:
+            return {}
+
+        placeholders = ",".join("?" * len(refs))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT image_id, source_path, source_mtime_ns, source_size, features
+                FROM gallery_features
+                WHERE image_id IN ({placeholders}) AND feature_version = ?
+                """,
+                [image_id for image_id, _ in refs] + [FEATURE_VERSION]
+            ).fetchall()
+        stored = {row[0]: row for row in rows}
+
+        found = {}
+        for image_id, path in refs:
+            row = stored.get(image_id)
+            if row is not None and row[1] == str(path) and (row[2], row[3]) == _file_stamp(path):
+                found[image_id] = row[4]
+        self.hits += len(found)
+        self.misses += len(refs) - len(found)
+        return found
+
+    def put(self, image_id: str, source_path: str, features: bytes, stamp: Tuple[int, int]) -> None:
+        """
+        Store features computed from ``source_path``.
+
+        Args:
+            image_id: Gallery image id
+            source_path: File the features were computed from
+            features: Output of ``extract_verification_features``
+            stamp: (mtime_ns, size) of the file when it was read
+        """
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO gallery_features
+                    (image_id, source_path, source_mtime_ns, source_size,
+                     feature_version, features, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (image_id, str(source_path), stamp[0], stamp[1], FEATURE_VERSION, features, time.time())
+            )
+
+    def compute(self, image_id: str, source_path: str) -> Optional[bytes]:
+        """
+        Read a gallery file, extract its features and store them.
+
+        Args:
+            image_id: Gallery image id
+            source_path: Image file
+
+        Returns:
+            The features, or None if the file is missing or unreadable
+        """
+        stamp = _file_stamp(source_path)
+        if stamp is None:
+            logger.debug(f"Gallery image path does not exist: {source_path}")
+            return None
+        try:
+            with Image.open(source_path) as image:
+                features = extract_verification_features(image)
+        except Exception as e:
+            logger.warning(f"Failed to extract verification features from {source_path}: {e}")
+            return None
+        self.put(image_id, source_path, features, stamp)
+        self.computed += 1
+        return features
+
+    def get_or_compute(self, refs: Iterable[GalleryImageRef]) -> Dict[str, bytes]:
+        """
+        Features for every readable image, computing and storing misses.
+
+        Args:
+            refs: (image_id, image_path) pairs
+
+        Returns:
+            Features by image id
+        """
+        refs = list(refs)
+        found = self.get_many(refs)
+        for image_id, path in refs:
+            if image_id not in found:
+                features = self.compute(image_id, path)
+                if features is not None:
+                    found[image_id] = features
+        return found
+
+    def delete(self, image_ids: Iterable[str]) -> int:
+        """Drop features of deleted or moved images; returns rows removed."""
+        image_ids = list(image_ids)
+        if not image_ids:
+            return 0
+        placeholders = ",".join("?" * len(image_ids))
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM gallery_features WHERE image_id IN ({placeholders})", image_ids
+            )
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Gallery preselection
+    # ------------------------------------------------------------------
+
+    def select_gallery(
+        self,
+        tiger_ids: Sequence[str],
+        query_side_view: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[GalleryImageRef]]:
+        """
+        Preselected gallery images of several tigers in one lookup.
+
+        Args:
+            tiger_ids: Tigers to look up
+            query_side_view: Side view of the query image
+            limit: Images per tiger (at most ``selection_size``)
+
+        Returns:
+            Best-first (image_id, image_path) lists by tiger id; tigers whose
+            selection is not built (or invalidated) are omitted
+        """
+        tiger_ids = [str(t) for t in tiger_ids]
+        if not tiger_ids:
+            return {}
+        limit = min(limit or self.selection_size, self.selection_size)
+
+        placeholders = ",".join("?" * len(tiger_ids))
+        with self._lock:
+            built = self._conn.execute(
+                f"""
+                SELECT tiger_id FROM gallery_selection_state
+                WHERE built = 1 AND tiger_id IN ({placeholders})
+                """,
+                tiger_ids
+            ).fetchall()
+            rows = self._conn.execute(
+                f"""
+                SELECT tiger_id, image_id, image_path FROM gallery_selection
+                WHERE side = ? AND rank < ? AND tiger_id IN ({placeholders})
+                ORDER BY tiger_id, rank
+                """,
+                [_selection_side(query_side_view), limit] + tiger_ids
+            ).fetchall()
+
+        selected: Dict[str, List[GalleryImageRef]] = {row[0]: [] for row in built}
+        for tiger_id, image_id, image_path in rows:
+            if tiger_id in selected:
+                selected[tiger_id].append((image_id, image_path))
+        return selected
+
+    def selection_versions(self, tiger_ids: Sequence[str]) -> Dict[str, int]:
+        """Current selection version per tiger (0 for unseen tigers)."""
+        tiger_ids = [str(t) for t in tiger_ids]
+        if not tiger_ids:
+            return {}
+        placeholders = ",".join("?" * len(tiger_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT tiger_id, version FROM gallery_selection_state WHERE tiger_id IN ({placeholders})",
+                tiger_ids
+            ).fetchall()
+        versions = dict.fromkeys(tiger_ids, 0)
+        versions.update(rows)
+        return versions
+
+    def update_gallery(
+        self,
+        images: Iterable[GalleryImageRow] = (),
+        deleted: Iterable[str] = (),
+        tiger_ids: Iterable[str] = (),
+        new_tiger_ids: Iterable[str] = ()
+    ) -> None:
+        """
+        Apply committed image changes and re-rank the affected tigers.
+
+        Tigers never seeded (images predating the store) keep no selection
+        until ``seed_gallery`` sees all of their images.
+
+        Args:
+            images: Added or changed images
+            deleted: Ids of deleted images
+            tiger_ids: Tigers whose images changed
+            new_tiger_ids: Tigers created in the same commit (no other images)
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO gallery_selection_state (tiger_id, version, built) VALUES (?, 0, 1)",
+                    [(str(t),) for t in new_tiger_ids]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO gallery_images VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    list(images)
+                )
+                self._conn.executemany(
+                    "DELETE FROM gallery_images WHERE image_id = ?", [(i,) for i in deleted]
+                )
+                for tiger_id in {str(t) for t in tiger_ids}:
+                    self._conn.execute(
+                        """
+                        INSERT INTO gallery_selection_state (tiger_id, version, built) VALUES (?, 1, 0)
+                        ON CONFLICT(tiger_id) DO UPDATE SET version = version + 1
+                        """,
+                        (tiger_id,)
+                    )
+                    built = self._conn.execute(
+                        "SELECT built FROM gallery_selection_state WHERE tiger_id = ?", (tiger_id,)
+                    ).fetchone()[0]
+                    self._rank_tiger(tiger_id, seeded=bool(built))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def seed_gallery(self, tiger_id: str, images: Iterable[GalleryImageRow], version: int) -> bool:
+        """
+        Replace a tiger's mirrored images with all of its images and rank them.
+
+        Args:
+            tiger_id: Tiger id
+            images: Every gallery image of the tiger
+            version: ``selection_versions`` value read before the images were queried
+
+        Returns:
+            True if stored (False when the tiger changed since ``version``)
+        """
+        tiger_id = str(tiger_id)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT version FROM gallery_selection_state WHERE tiger_id = ?", (tiger_id,)
+                ).fetchone()
+                if (row[0] if row else 0) != version:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute("DELETE FROM gallery_images WHERE tiger_id = ?", (tiger_id,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO gallery_images VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    list(images)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO gallery_selection_state (tiger_id, version, built) VALUES (?, ?, 1)",
+                    (tiger_id, version)
+                )
+                self._rank_tiger(tiger_id, seeded=True)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def _rank_tiger(self, tiger_id: str, seeded: bool) -> None:
+        """Rebuild one tiger's selection from its mirrored images (in a transaction)."""
+        self._conn.execute("DELETE FROM gallery_selection WHERE tiger_id = ?", (tiger_id,))
+        if not seeded:
+            return
+        images = [
+            GalleryImageRow(*row) for row in self._conn.execute(
+                "SELECT * FROM gallery_images WHERE tiger_id = ?", (tiger_id,)
+            )
+        ]
+        rows = []
+        for side in SELECTION_SIDES:
+            ranked = sorted(
+                images,
+                key=lambda img: gallery_rank_key(img, None if side == ANY_SIDE else side),
+                reverse=True
+            )
+            rows.extend(
+                (tiger_id, side, rank, img.image_id, img.image_path)
+                for rank, img in enumerate(ranked[:self.selection_size])
+            )
+        self._conn.executemany(
+            "INSERT INTO gallery_selection (tiger_id, side, rank, image_id, image_path) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM gallery_features")
+            self._conn.execute("DELETE FROM gallery_images")
+            self._conn.execute("DELETE FROM gallery_selection")
+            self._conn.execute("DELETE FROM gallery_selection_state")
+        self.hits = 0
+        self.misses = 0
+        self.computed = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count, hit rate and features computed by this process."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "computed": self.computed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[GalleryFeatureStore] = None
+_store_loaded = False
+_store_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_gallery_feature_store() -> Optional[GalleryFeatureStore]:
+    """Get the process-wide feature store (None when disabled)."""
+    global _store, _store_loaded
+    if not _store_loaded:
+        with _store_lock:
+            if not _store_loaded:
+                path = get_default_store_path() if DEFAULT_ENABLED else None
+                if path is not None:
+                    try:
+                        _store = GalleryFeatureStore(path)
+                    except Exception as e:
+                        logger.warning(f"Verification feature store disabled ({path}): {e}")
+                _store_loaded = True
+    return _store
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Single background worker so ingest never waits on feature extraction."""
+    global _executor
+    if _executor is None:
+        with _store_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="verification-features")
+    return _executor
+
+
+def _precompute(refs: List[GalleryImageRef]) -> None:
+    store = get_gallery_feature_store()
+    if store is None:
+        return
+    try:
+        store.get_or_compute(refs)
+    except Exception as e:
+        logger.warning(f"Verification feature precompute failed: {e}")
+
+
+def build_gallery_selection(session: Session, tiger_ids: Optional[Sequence[str]] = None) -> int:
+    """
+    Seed tigers' preselection from the database.
+
+    Args:
+        session: Database session
+        tiger_ids: Tigers to seed (every tiger with images when omitted)
+
+    Returns:
+        Number of tigers whose selection was stored
+    """
+    store = get_gallery_feature_store()
+    if store is None:
+        return 0
+
+    query = session.query(
+        TigerImage.image_id,
+        TigerImage.tiger_id,
+        TigerImage.image_path,
+        TigerImage.side_view,
+        TigerImage.is_reference,
+        TigerImage.verified,
+        TigerImage.quality_score,
+    ).filter(TigerImage.image_path.isnot(None), TigerImage.tiger_id.isnot(None))
+    if tiger_ids is not None:
+        tiger_ids = [str(t) for t in tiger_ids]
+        if not tiger_ids:
+            return 0
+        query = query.filter(TigerImage.tiger_id.in_(tiger_ids))
+
+    # Versions are read first so a commit during the query wins
+    versions = store.selection_versions(tiger_ids) if tiger_ids is not None else None
+    rows = query.all()
+    images: Dict[str, List[GalleryImageRow]] = {t: [] for t in tiger_ids or ()}
+    for row in rows:
+        images.setdefault(str(row.tiger_id), []).append(GalleryImageRow.of(row))
+    if versions is None:
+        versions = store.selection_versions(list(images))
+
+    return sum(
+        store.seed_gallery(tiger_id, tiger_images, versions.get(tiger_id, 0))
+        for tiger_id, tiger_images in images.items()
+    )
+
+
+def backfill_gallery_features(session: Session, batch_size: int = 500) -> int:
+    """
+    Compute features for gallery images that have none (or stale ones),
+    and build the preselection of every tiger.
+
+    Args:
+        session: Database session
+        batch_size: Images looked up per store query
+
+    Returns:
+        Number of features computed
+    """
+    store = get_gallery_feature_store()
+    if store is None:
+        return 0
+
+    rows = session.query(TigerImage.image_id, TigerImage.image_path).filter(
+        TigerImage.image_path.isnot(None)
+    ).all()
+    refs = [(str(image_id), path) for image_id, path in rows]
+
+    computed = 0
+    for start in range(0, len(refs), batch_size):
+        batch = refs[start:start + batch_size]
+        found = store.get_many(batch)
+        for image_id, path in batch:
+            if image_id not in found and store.compute(image_id, path) is not None:
+                computed += 1
+    if computed:
+        logger.info(f"Computed verification features for {computed} gallery images")
+
+    build_gallery_selection(session)
+    return computed
+
+
+# ----------------------------------------------------------------------
+# Ingest hooks
+# ----------------------------------------------------------------------
+
+@event.listens_for(TigerImage, "after_insert")
+@event.listens_for(TigerImage, "after_update")
+def _on_image_write(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    attrs = inspect(target).attrs
+
+    # Re-rank the old and new owner when anything the ranking uses changed
+    if any(attrs[name].history.has_changes() for name in _RANKING_ATTRS):
+        tiger_history = attrs.tiger_id.history
+        owners = {*tiger_history.deleted, *tiger_history.added, target.tiger_id}
+        session.info.setdefault(_DIRTY_TIGERS_KEY, set()).update(str(t) for t in owners if t)
+        session.info.setdefault(_RANKED_KEY, {})[str(target.image_id)] = GalleryImageRow.of(target)
+
+    # Updates that leave the file alone keep their features
+    if target.image_path and attrs.image_path.history.has_changes():
+        session.info.setdefault(_PENDING_KEY, {})[str(target.image_id)] = target.image_path
+
+
+@event.listens_for(TigerImage, "after_delete")
+def _on_image_delete(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DELETED_KEY, set()).add(str(target.image_id))
+        session.info.get(_RANKED_KEY, {}).pop(str(target.image_id), None)
+        if target.tiger_id:
+            session.info.setdefault(_DIRTY_TIGERS_KEY, set()).add(str(target.tiger_id))
+
+
+@event.listens_for(Tiger, "after_insert")
+def _on_tiger_insert(mapper, connection, target) -> None:
+    # A new tiger's images all arrive through the hooks above
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_NEW_TIGERS_KEY, set()).add(str(target.tiger_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    deleted = session.info.pop(_DELETED_KEY, None) or set()
+    ranked = session.info.pop(_RANKED_KEY, None) or {}
+    dirty = session.info.pop(_DIRTY_TIGERS_KEY, None) or set()
+    new_tigers = session.info.pop(_NEW_TIGERS_KEY, None) or set()
+    if not pending and not deleted and not dirty and not new_tigers:
+        return
+    store = get_gallery_feature_store()
+    if store is None:
+        return
+    try:
+        if deleted:
+            store.delete(deleted)
+        store.update_gallery(ranked.values(), deleted, dirty, new_tigers)
+    except Exception as e:
+        logger.warning(f"Failed to update verification gallery: {e}")
+    if pending:
+        refs = [(image_id, path) for image_id, path in pending.items() if image_id not in deleted]
+        _get_executor().submit(_precompute, refs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session) -> None:
+    for key in (_PENDING_KEY, _DELETED_KEY, _RANKED_KEY, _DIRTY_TIGERS_KEY, _NEW_TIGERS_KEY):
+        session.info.pop(key, None)
@@ -0,0 +1,18 @@
+"""Local CPU inference module.
+
+Runs ReID and detection models exported to ONNX with ONNX Runtime, for
+models whose ModelRegistry backend is "local".
+"""
+
+from backend.infrastructure.local.onnx_client import (
+    LocalInferenceClient,
+    get_local_inference_client,
+)
+from backend.infrastructure.local.specs import LOCAL_MODEL_SPECS, LocalModelSpec
+
+__all__ = [
+    "LocalInferenceClient",
+    "get_local_inference_client",
+    "LOCAL_MODEL_SPECS",
+    "LocalModelSpec",
+]
@@ -0,0 +1,344 @@
+"""ONNX Runtime client running ReID and detection models on CPU.
+
+Serves models whose ModelRegistry backend is "local" with the same
+response dictionaries as the Modal methods, so callers of ModalClient get
+real embeddings and detections without a GPU service. Graphs are exported
+from the weights in data/models/ by scripts/export_onnx_models.py.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from backend.infrastructure.local.specs import (
+    DEFAULT_LOCAL_INT8,
+    DEFAULT_LOCAL_MODEL_DIR,
+    DEFAULT_LOCAL_THREADS,
+    LocalModelSpec,
+    get_local_spec,
+    onnx_model_path,
+)
+from backend.utils.image_artifact import ImageArtifact, to_pil
+from backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# MegaDetector v5 classes (see MegaDetectorModel in modal_app.py)
+DETECTION_CATEGORIES = {0: "animal", 1: "person", 2: "vehicle"}
+DETECTION_IOU_THRESHOLD = 0.45
+_LETTERBOX_COLOR = (114, 114, 114)
+
+
+def _center_crop(image: Image.Image, target_size: int) -> Image.Image:
+    """Resize keeping aspect ratio, then center crop a square (as on Modal)."""
+    width, height = image.size
+    if width < height:
+        new_width, new_height = target_size, int(target_size * height / width)
+    else:
+        new_width, new_height = int(target_size * width / height), target_size
+    image = image.resize((new_width, new_height), Image.LANCZOS)
+    left = (new_width - target_size) // 2
+    top = (new_height - target_size) // 2
+    return image.crop((left, top, left + target_size, top + target_size))
+
+
+def letterbox(
+    image: Image.Image,
+    size: Tuple[int, int]
+) -> Tuple[Image.Image, float, Tuple[float, float]]:
+    """Resize keeping aspect ratio and pad to size (YOLOv5 letterbox).
+
+    Returns:
+        Tuple of (padded image, scale, (pad_x, pad_y))
+    """
+    height, width = size
+    scale = min(width / image.width, height / image.height)
+    resized = image.resize(
+        (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+        Image.BILINEAR
+    )
+    pad_x = (width - resized.width) / 2
+    pad_y = (height - resized.height) / 2
+    canvas = Image.new("RGB", (width, height), _LETTERBOX_COLOR)
+    canvas.paste(resized, (int(pad_x), int(pad_y)))
+    return canvas, scale, (int(pad_x), int(pad_y))
+
+
+def preprocess(image: Image.Image, spec: LocalModelSpec) -> np.ndarray:
+    """Turn an image into a (1, 3, H, W) float32 model input.
+
+    Detection inputs must already be letterboxed to the input size.
+    """
+    image = image.convert("RGB")
+    height, width = spec.input_size
+    if spec.resize == "center_crop":
+        image = _center_crop(image, height)
+    elif image.size != (width, height):
+        image = image.resize((width, height), Image.BILINEAR)
+
+    array = np.asarray(image, dtype=np.float32) / 255.0
+    array = (array - np.asarray(spec.mean, dtype=np.float32)) / np.asarray(spec.std, dtype=np.float32)
+    return np.ascontiguousarray(array.transpose(2, 0, 1)[None], dtype=np.float32)
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> List[int]:
+    """Greedy NMS over xyxy boxes; returns kept indices, best first."""
+    order = np.argsort(-scores, kind="stable")
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(int(best))
+        rest = order[1:]
+        x1 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return keep
+
+
+def decode_yolo_output(
+    output: np.ndarray,
+    confidence_threshold: float,
+    scale: float,
+    pad: Tuple[float, float],
+    image_size: Tuple[int, int],
+    iou_threshold: float = DETECTION_IOU_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """Turn raw YOLOv5 predictions into Modal-style detections.
+
+    Args:
+        output: (N, 5 + classes) rows of cx, cy, w, h, objectness, class scores
+        confidence_threshold: Minimum objectness x class score
+        scale: Letterbox scale
+        pad: Letterbox (pad_x, pad_y)
+        image_size: Original (width, height) to clip boxes to
+        iou_threshold: Per-class NMS IoU threshold
+
+    Returns:
+        Detections with bbox [x1, y1, x2, y2] in original pixels
+    """
+    output = np.asarray(output, dtype=np.float32).reshape(-1, output.shape[-1])
+    class_scores = output[:, 5:] * output[:, 4:5]
+    class_ids = class_scores.argmax(axis=1)
+    confidences = class_scores[np.arange(len(output)), class_ids]
+    mask = confidences >= confidence_threshold
+    if not mask.any():
+        return []
+
+    rows, class_ids, confidences = output[mask], class_ids[mask], confidences[mask]
+    boxes = np.stack([
+        rows[:, 0] - rows[:, 2] / 2,
+        rows[:, 1] - rows[:, 3] / 2,
+        rows[:, 0] + rows[:, 2] / 2,
+        rows[:, 1] + rows[:, 3] / 2,
+    ], axis=1)
+    boxes -= np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)
+    boxes /= scale
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, image_size[0])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, image_size[1])
+
+    detections = []
+    for class_id in np.unique(class_ids):
+        indices = np.flatnonzero(class_ids == class_id)
+        for i in non_max_suppression(boxes[indices], confidences[indices], iou_threshold):
+            index = indices[i]
+            detections.append({
+                "bbox": [float(x) for x in boxes[index]],
+                "confidence": float(confidences[index]),
+                "category": DETECTION_CATEGORIES.get(int(class_id), "unknown"),
+                "class_id": int(class_id)
+            })
+    detections.sort(key=lambda d: d["confidence"], reverse=True)
+    return detections
+
+
+class LocalInferenceClient:
+    """Runs exported ONNX graphs with ONNX Runtime on CPU.
+
+    One InferenceSession per model is created on first use and shared;
+    ONNX Runtime sessions are safe to run from several threads. Inference
+    runs in a worker thread so the event loop stays responsive.
+    """
+
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        int8: Optional[bool] = None
+    ):
+        """Initialize local inference client.
+
+        Args:
+            model_dir: Directory of exported graphs (defaults to LOCAL_MODEL_DIR)
+            num_threads: Intra-op threads per session, 0 for all cores
+                (defaults to LOCAL_INFERENCE_THREADS)
+            int8: Prefer dynamically quantized INT8 graphs when exported
+                (defaults to LOCAL_INFERENCE_INT8)
+        """
+        self.model_dir = model_dir or DEFAULT_LOCAL_MODEL_DIR
+        self.num_threads = DEFAULT_LOCAL_THREADS if num_threads is None else num_threads
+        self.int8 = DEFAULT_LOCAL_INT8 if int8 is None else int8
+        self._sessions: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "failures": 0}
+
+    def model_path(self, model_name: str):
+        """Graph used for a model: the INT8 variant when preferred and exported."""
+        if self.int8:
+            quantized = onnx_model_path(model_name, self.model_dir, int8=True)
+            if quantized.exists():
+                return quantized
+        return onnx_model_path(model_name, self.model_dir)
+
+    def is_available(self, model_name: str) -> bool:
+        """Whether ONNX Runtime is installed and the model has been exported."""
+        return ONNXRUNTIME_AVAILABLE and self.model_path(model_name).exists()
+
+    def _get_session(self, model_name: str):
+        """Create (once) and return the model's InferenceSession."""
+        session = self._sessions.get(model_name)
+        if session is not None:
+            return session
+
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed (pip install onnxruntime)")
+        path = self.model_path(model_name)
+        if not path.exists():
+            raise RuntimeError(
+                f"No ONNX graph for {model_name} at {path} "
+                f"(run scripts/export_onnx_models.py --models {model_name})"
+            )
+
+        with self._lock:
+            if model_name not in self._sessions:
+                options = ort.SessionOptions()
+                options.intra_op_num_threads = self.num_threads
+                options.inter_op_num_threads = 1
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                self._sessions[model_name] = ort.InferenceSession(
+                    str(path), sess_options=options, providers=["CPUExecutionProvider"]
+                )
+                logger.info(f"[LOCAL] Loaded {model_name} from {path}")
+        return self._sessions[model_name]
+
+    def _run(self, model_name: str, inputs: np.ndarray) -> np.ndarray:
+        """Run a model's graph on a preprocessed batch."""
+        session = self._get_session(model_name)
+        input_name = session.get_inputs()[0].name
+        return session.run(None, {input_name: inputs})[0]
+
+    def embed(
+        self,
+        model_name: str,
+        image: Union[bytes, Image.Image, ImageArtifact]
+    ) -> Dict[str, Any]:
+        """Generate an embedding synchronously.
+
+        Returns:
+            Dictionary like the Modal generate_embedding response, with the
+            embedding as a float32 array
+        """
+        self.stats["requests"] += 1
+        try:
+            spec = get_local_spec(model_name)
+            embedding = np.asarray(
+                self._run(model_name, preprocess(to_pil(image), spec)), dtype=np.float32
+            ).reshape(-1)
+            if spec.l2_normalize:
+                norm = np.linalg.norm(embedding)
+                if norm > 0:
+                    embedding = embedding / norm
+            return {
+                "embedding": embedding,
+                "shape": embedding.shape,
+                "backend": "local",
+                "success": True
+            }
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error(f"[LOCAL] {model_name} embedding failed: {e}")
+            return {"embedding": None, "error": str(e), "backend": "local", "success": False}
+
+    async def generate_embedding(
+        self,
+        model_name: str,
+        image: Union[bytes, Image.Image, ImageArtifact]
+    ) -> Dict[str, Any]:
+        """Generate an embedding in a worker thread."""
+        return await asyncio.to_thread(self.embed, model_name, image)
+
+    def detect_sync(
+        self,
+        image: Union[bytes, Image.Image, ImageArtifact],
+        confidence_threshold: float = 0.5
+    ) -> Dict[str, Any]:
+        """Detect animals synchronously with the local MegaDetector graph.
+
+        Returns:
+            Dictionary like the Modal detect response
+        """
+        self.stats["requests"] += 1
+        try:
+            spec = get_local_spec("megadetector")
+            pil_image = to_pil(image).convert("RGB")
+            padded, scale, pad = letterbox(pil_image, spec.input_size)
+            output = self._run("megadetector", preprocess(padded, spec))
+            detections = decode_yolo_output(
+                output[0], confidence_threshold, scale, pad, pil_image.size
+            )
+            return {
+                "detections": detections,
+                "num_detections": len(detections),
+                "backend": "local",
+                "success": True
+            }
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error(f"[LOCAL] MegaDetector failed: {e}")
+            return {"detections": [], "error": str(e), "backend": "local", "success": False}
+
+    async def detect(
+        self,
+        image: Union[bytes, Image.Image, ImageArtifact],
+        confidence_threshold: float = 0.5
+    ) -> Dict[str, Any]:
+        """Detect animals in a worker thread."""
+        return await asyncio.to_thread(self.detect_sync, image, confidence_threshold)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get local inference statistics."""
+        return {
+            **self.stats,
+            "loaded_models": sorted(self._sessions),
+            "int8": self.int8,
+            "num_threads": self.num_threads
+        }
+
+
+# Singleton instance
+_local_client: Optional[LocalInferenceClient] = None
+
+
+def get_local_inference_client() -> LocalInferenceClient:
+    """Get the singleton local inference client.
+
+    Returns:
+        LocalInferenceClient instance
+    """
+    global _local_client
+    if _local_client is None:
+        _local_client = LocalInferenceClient()
+    return _local_client
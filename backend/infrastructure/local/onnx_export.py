@@ -0,0 +1,199 @@
+"""Export ReID and detection models to ONNX for local CPU inference.
+
+Builds each model the way its Modal class does (modal_app.py), loads the
+weights from data/models/ (see ModelSettings) and exports a graph with a
+dynamic batch axis. Optionally writes a dynamically quantized INT8 copy.
+
+Requires torch (and timm for the MegaDescriptor/TransReID models); run via
+scripts/export_onnx_models.py.
+"""
+
+from pathlib import Path
+from typing import Any, Optional
+
+from backend.infrastructure.local.specs import get_local_spec, onnx_model_path
+from backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_OPSET = 17
+
+
+def _load_state_dict(path: Path) -> Optional[dict]:
+    """Load a checkpoint's state dict, or None when the file is missing."""
+    import torch
+
+    if not path.exists():
+        logger.warning(f"No weights at {path}, exporting pretrained weights")
+        return None
+    checkpoint = torch.load(path, map_location="cpu")
+    if isinstance(checkpoint, dict):
+        return checkpoint.get("state_dict", checkpoint)
+    return checkpoint
+
+
+def _resnet50_embedder(weights_path: Optional[Path] = None) -> Any:
+    """ResNet50 with the classifier removed (TigerReID and RAPID)."""
+    import torch
+    import torchvision.models as models
+
+    model = models.resnet50(pretrained=True)
+    model.fc = torch.nn.Identity()
+    state_dict = _load_state_dict(weights_path) if weights_path else None
+    if state_dict:
+        model.load_state_dict(
+            {k: v for k, v in state_dict.items() if "classifier" not in k}, strict=False
+        )
+    return model
+
+
+def _cvwc2019_global_stream(weights_path: Path) -> Any:
+    """CVWC2019 global stream, loading weights as CVWC2019ReIDModel does."""
+    import torch.nn as nn
+    import torchvision.models as models
+
+    class GlobalStream(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.backbone = nn.Sequential(*list(models.resnet152(pretrained=True).children())[:-2])
+            self.gap = nn.AdaptiveAvgPool2d(1)
+            self.bn = nn.BatchNorm1d(2048)
+
+        def forward(self, x):
+            feat = self.gap(self.backbone(x))
+            return self.bn(feat.view(feat.size(0), -1))
+
+    model = GlobalStream()
+    state_dict = _load_state_dict(weights_path) or {}
+    # Same key mapping as modal_app.py, so local embeddings match the gallery
+    for key, value in state_dict.items():
+        if key.startswith("glabole.base."):
+            parts = key[len("glabole.base."):].split(".")
+            module = model.backbone
+        elif key.startswith("glabole.bottleneck."):
+            parts = key[len("glabole.bottleneck."):].split(".")[:1]
+            module = model.bn
+        else:
+            continue
+        try:
+            for part in parts[:-1]:
+                module = module[int(part)] if part.isdigit() else getattr(module, part)
+            param = getattr(module, parts[-1], None)
+            if param is not None and param.shape == value.shape:
+                param.data.copy_(value)
+        except (AttributeError, IndexError):
+            pass
+    return model
+
+
+def _timm_embedder(name: str) -> Any:
+    """timm backbone without its classification head."""
+    import timm
+
+    return timm.create_model(name, pretrained=True, num_classes=0)
+
+
+def _megadetector(weights_path: Path) -> Any:
+    """MegaDetector v5 (YOLOv5) returning raw (N, anchors, 5 + classes) predictions."""
+    import torch
+
+    class RawPredictions(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, x):
+            output = self.model(x)
+            return output[0] if isinstance(output, (list, tuple)) else output
+
+    model = torch.hub.load(
+        "ultralytics/yolov5", "custom", path=str(weights_path), autoshape=False, device="cpu"
+    )
+    return RawPredictions(model)
+
+
+def build_torch_model(model_name: str) -> Any:
+    """Build a model with the weights from data/models/, ready to export.
+
+    Args:
+        model_name: ModelRegistry model name
+
+    Returns:
+        torch.nn.Module in eval mode
+    """
+    from backend.config.settings import get_settings
+
+    settings = get_settings().models
+    builders = {
+        # TigerReIDModel on Modal runs ImageNet weights, so the gallery does too
+        "tiger_reid": lambda: _resnet50_embedder(),
+        "rapid_reid": lambda: _resnet50_embedder(Path(settings.rapid.path)),
+        "cvwc2019_reid": lambda: _cvwc2019_global_stream(Path(settings.cvwc2019.path)),
+        "wildlife_tools": lambda: _timm_embedder("hf-hub:BVRA/MegaDescriptor-L-384"),
+        "megadescriptor_b": lambda: _timm_embedder("hf-hub:BVRA/MegaDescriptor-B-224"),
+        "transreid": lambda: _timm_embedder("vit_base_patch16_224"),
+        "megadetector": lambda: _megadetector(Path(settings.detection.path)),
+    }
+    if model_name not in builders:
+        raise ValueError(f"No ONNX export for model: {model_name}. Available: {list(builders)}")
+    return builders[model_name]().eval()
+
+
+def quantize_int8(onnx_path: Path, output_path: Optional[Path] = None) -> Path:
+    """Write a dynamically quantized (INT8 weights) copy of a graph.
+
+    Args:
+        onnx_path: Exported float32 graph
+        output_path: Destination (defaults to <model>.int8.onnx beside it)
+
+    Returns:
+        Path of the quantized graph
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_path = output_path or onnx_path.with_name(onnx_path.name.replace(".onnx", ".int8.onnx"))
+    quantize_dynamic(str(onnx_path), str(output_path), weight_type=QuantType.QInt8)
+    logger.info(f"Quantized {onnx_path.name} -> {output_path}")
+    return output_path
+
+
+def export_onnx_model(
+    model_name: str,
+    model_dir: Optional[str] = None,
+    int8: bool = False,
+    opset: int = DEFAULT_OPSET
+) -> Path:
+    """Export a model to ONNX (and optionally INT8) for LocalInferenceClient.
+
+    Args:
+        model_name: ModelRegistry model name
+        model_dir: Output directory (defaults to LOCAL_MODEL_DIR)
+        int8: Also write the dynamically quantized INT8 graph
+        opset: ONNX opset version
+
+    Returns:
+        Path of the float32 graph
+    """
+    import torch
+
+    spec = get_local_spec(model_name)
+    path = onnx_model_path(model_name, model_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    model = build_torch_model(model_name)
+    height, width = spec.input_size
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            torch.zeros(1, 3, height, width),
+            str(path),
+            input_names=["input"],
+            output_names=["output"],
+            dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+            opset_version=opset
+        )
+    logger.info(f"Exported {model_name} -> {path}")
+
+    if int8:
+        quantize_int8(path)
+    return path
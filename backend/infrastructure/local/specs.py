@@ -0,0 +1,81 @@
+"""Input specs and file locations for local (CPU) ONNX inference.
+
+Preprocessing mirrors the Modal classes in modal_app.py so local
+embeddings land in the same vector space as the gallery built on Modal.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+# modal_app.py hands MegaDescriptor's DeepFeatures the center-cropped uint8
+# pixels as they are (no scaling or normalization), so the gallery was built
+# from [0, 255] inputs; undo the /255 in preprocessing to match it
+RAW_PIXEL_MEAN = (0.0, 0.0, 0.0)
+RAW_PIXEL_STD = (1 / 255, 1 / 255, 1 / 255)
+
+# Exported graphs live in data/models/onnx/<model>.onnx (<model>.int8.onnx
+# for the dynamically quantized variant)
+DEFAULT_LOCAL_MODEL_DIR = os.getenv("LOCAL_MODEL_DIR", "./data/models/onnx")
+# ONNX Runtime intra-op threads per session (0 lets it use every core)
+DEFAULT_LOCAL_THREADS = int(os.getenv("LOCAL_INFERENCE_THREADS", "0"))
+# Prefer the INT8 graph when it has been exported
+DEFAULT_LOCAL_INT8 = os.getenv("LOCAL_INFERENCE_INT8", "false").lower() == "true"
+
+
+@dataclass(frozen=True)
+class LocalModelSpec:
+    """How a model's ONNX graph is fed and its output post-processed.
+
+    Attributes:
+        input_size: (height, width) of the model input
+        resize: "stretch" (resize to the exact size, like torchvision
+            Resize), "center_crop" (keep aspect ratio, then crop a square)
+            or "letterbox" (detection: keep aspect ratio, pad to size)
+        mean: Per-channel normalization mean
+        std: Per-channel normalization std
+        l2_normalize: Whether the Modal class L2 normalizes the embedding
+    """
+    input_size: Tuple[int, int]
+    resize: str = "stretch"
+    mean: Tuple[float, float, float] = IMAGENET_MEAN
+    std: Tuple[float, float, float] = IMAGENET_STD
+    l2_normalize: bool = False
+
+
+LOCAL_MODEL_SPECS: Dict[str, LocalModelSpec] = {
+    "tiger_reid": LocalModelSpec((256, 256)),
+    "wildlife_tools": LocalModelSpec(
+        (384, 384), "center_crop", RAW_PIXEL_MEAN, RAW_PIXEL_STD
+    ),
+    "megadescriptor_b": LocalModelSpec(
+        (224, 224), "center_crop", RAW_PIXEL_MEAN, RAW_PIXEL_STD
+    ),
+    "rapid_reid": LocalModelSpec((256, 128), l2_normalize=True),
+    "cvwc2019_reid": LocalModelSpec((256, 128), l2_normalize=True),
+    "transreid": LocalModelSpec((224, 224), l2_normalize=True),
+    "megadetector": LocalModelSpec((640, 640), "letterbox", (0.0, 0.0, 0.0), (1.0, 1.0, 1.0)),
+}
+
+
+def get_local_spec(model_name: str) -> LocalModelSpec:
+    """Get the local inference spec for a model.
+
+    Raises:
+        ValueError: If the model has no local backend
+    """
+    if model_name not in LOCAL_MODEL_SPECS:
+        raise ValueError(
+            f"No local backend for model: {model_name}. "
+            f"Available: {list(LOCAL_MODEL_SPECS)}"
+        )
+    return LOCAL_MODEL_SPECS[model_name]
+
+
+def onnx_model_path(model_name: str, model_dir: Optional[str] = None, int8: bool = False) -> Path:
+    """Path of a model's exported ONNX graph."""
+    suffix = ".int8.onnx" if int8 else ".onnx"
+    return Path(model_dir or DEFAULT_LOCAL_MODEL_DIR) / f"{model_name}{suffix}"
@@ -10,6 +10,7 @@ from backend.infrastructure.modal.base_client import (
 )
 from backend.infrastructure.modal.model_registry import ModelRegistry
 from backend.infrastructure.modal.mock_provider import MockResponseProvider
+from backend.infrastructure.modal.micro_batcher import MicroBatcher
 
 __all__ = [
     "BaseModalClient",
@@ -17,4 +18,5 @@ __all__ = [
     "ModalUnavailableError",
     "ModelRegistry",
     "MockResponseProvider",
+    "MicroBatcher",
 ]
@@ -1,9 +1,15 @@
 """Base Modal client with retry logic and connection management."""
 
 import asyncio
+from functools import partial
 from typing import Any, Optional, Dict
 from abc import ABC, abstractmethod
 
+from backend.infrastructure.modal.single_flight import (
+    DEFAULT_SINGLE_FLIGHT_ENABLED,
+    SingleFlight,
+    content_key,
+)
 from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -27,6 +33,7 @@ class BaseModalClient(ABC):
     - Request timeout handling
     - Statistics tracking
     - Lazy function loading
+    - Sharing one call between concurrent identical requests
     """
 
     def __init__(
@@ -34,7 +41,8 @@ class BaseModalClient(ABC):
         max_retries: int = 3,
         retry_delay: float = 1.0,
         timeout: int = 120,
-        use_mock: Optional[bool] = None
+        use_mock: Optional[bool] = None,
+        single_flight: Optional[bool] = None
     ):
         """Initialize base Modal client.
 
@@ -43,10 +51,16 @@ class BaseModalClient(ABC):
             retry_delay: Initial delay between retries (exponential backoff)
             timeout: Request timeout in seconds
             use_mock: Use mock responses instead of real Modal
+            single_flight: Share one call between concurrent calls with
+                the same method and arguments (defaults to MODAL_SINGLE_FLIGHT)
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.timeout = timeout
+        self.single_flight = (
+            DEFAULT_SINGLE_FLIGHT_ENABLED if single_flight is None else single_flight
+        )
+        self._single_flight = SingleFlight(name=self.__class__.__name__)
 
         # Check if mock mode enabled via environment variable
         import os
@@ -120,6 +134,9 @@ class BaseModalClient(ABC):
     ) -> Any:
         """Call Modal function method with retry logic.
 
+        Concurrent calls with the same method and arguments share one
+        Modal call (see single_flight.py).
+
         Args:
             method_name: Name of the method to call
             *args: Positional arguments
@@ -131,6 +148,21 @@ class BaseModalClient(ABC):
         Raises:
             ModalClientError: If all retries fail
         """
+        call = partial(self._call_with_retry_uncoalesced, method_name, *args, **kwargs)
+        if not self.single_flight:
+            return await call()
+
+        digest = content_key(*args, **kwargs)
+        key = (method_name, self.class_name, digest) if digest is not None else None
+        return await self._single_flight.do(key, call)
+
+    async def _call_with_retry_uncoalesced(
+        self,
+        method_name: str,
+        *args,
+        **kwargs
+    ) -> Any:
+        """Call Modal function method with retry logic, on its own."""
         last_error = None
 
         logger.info(
@@ -186,9 +218,13 @@ class BaseModalClient(ABC):
         """Get client statistics.
 
         Returns:
-            Dictionary with statistics
+            Dictionary with statistics (``requests_deduplicated`` counts
+            calls that joined an identical call in flight)
         """
-        return self.stats.copy()
+        return {
+            **self.stats,
+            "requests_deduplicated": self._single_flight.stats["deduplicated"],
+        }
 
     def reset_stats(self) -> None:
         """Reset statistics counters."""
@@ -197,3 +233,4 @@ class BaseModalClient(ABC):
             "requests_succeeded": 0,
             "requests_failed": 0,
         }
+        self._single_flight.reset_stats()
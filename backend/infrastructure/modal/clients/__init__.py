@@ -12,6 +12,7 @@ from backend.infrastructure.modal.clients.cvwc2019_client import CVWC2019Client
 from backend.infrastructure.modal.clients.transreid_client import TransReIDClient
 from backend.infrastructure.modal.clients.megadescriptor_b_client import MegaDescriptorBClient
 from backend.infrastructure.modal.clients.matchanything_client import MatchAnythingClient
+from backend.infrastructure.modal.clients.multi_embedding_client import MultiEmbeddingClient
 
 __all__ = [
     # Base class
@@ -26,4 +27,5 @@ __all__ = [
     "TransReIDClient",
     "MegaDescriptorBClient",
     "MatchAnythingClient",
+    "MultiEmbeddingClient",
 ]
@@ -4,12 +4,13 @@ This module provides a specialized base class for Modal clients that generate
 embeddings from images. It builds on the core BaseModalClient and adds:
 - Common image-to-bytes conversion
 - Mock response handling with fallback
+- Micro-batching of concurrent embedding requests
 - Generic singleton factory pattern
 """
 
 from abc import abstractmethod
-from typing import Dict, Any, Optional, Callable, TypeVar, Type
-import io
+from functools import partial
+from typing import Dict, Any, List, Optional, Callable, TypeVar, Type, Union
 from PIL import Image
 
 from backend.infrastructure.modal.base_client import (
@@ -17,7 +18,15 @@ from backend.infrastructure.modal.base_client import (
     ModalUnavailableError,
     ModalClientError,
 )
+from backend.infrastructure.modal.embedding_codec import (
+    DEFAULT_EMBEDDING_ENCODING,
+    EMBEDDING_ENCODINGS,
+    decode_embedding_result,
+)
+from backend.infrastructure.modal.micro_batcher import DEFAULT_BATCHING_ENABLED, MicroBatcher
 from backend.infrastructure.modal.mock_provider import MockResponseProvider
+from backend.infrastructure.modal.single_flight import content_key
+from backend.utils.image_artifact import ImageArtifact, encode_image
 from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -33,6 +42,8 @@ class EmbeddingModalClient(CoreModalClient):
     - Image to bytes conversion
     - Mock mode handling with automatic fallback
     - Standard generate_embedding interface
+    - Micro-batching: concurrent requests are sent together through the
+      Modal class's generate_embedding_batch method
 
     Subclasses must implement:
     - app_name: Modal app name
@@ -61,6 +72,41 @@ class EmbeddingModalClient(CoreModalClient):
     # Subclasses must override this
     EMBEDDING_DIM: int = NotImplemented
 
+    def __init__(
+        self,
+        *args,
+        batching: Optional[bool] = None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        encoding: Optional[str] = None,
+        **kwargs
+    ):
+        """Initialize embedding client.
+
+        Args:
+            *args: Passed to BaseModalClient
+            batching: Coalesce concurrent requests into batch calls
+                (defaults to MODAL_MICRO_BATCHING)
+            max_batch_size: Largest batch sent at once
+            max_wait_ms: Longest a request waits for a batch to fill
+            encoding: Embedding wire format requested from Modal
+                (defaults to MODAL_EMBEDDING_ENCODING)
+            **kwargs: Passed to BaseModalClient
+        """
+        super().__init__(*args, **kwargs)
+        self.encoding = encoding or DEFAULT_EMBEDDING_ENCODING
+        if self.encoding not in EMBEDDING_ENCODINGS:
+            raise ValueError(f"Unknown embedding encoding: {self.encoding}")
+        batching = DEFAULT_BATCHING_ENABLED if batching is None else batching
+        self._batcher: Optional[MicroBatcher[bytes, Dict[str, Any]]] = (
+            MicroBatcher(
+                self._embed_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                name=self.__class__.__name__
+            ) if batching else None
+        )
+
     @abstractmethod
     def _get_mock_response(self) -> Dict[str, Any]:
         """Return mock response for this model.
@@ -80,36 +126,78 @@ class EmbeddingModalClient(CoreModalClient):
         """
         return self.class_name
 
-    def _image_to_bytes(self, image: Image.Image, format: str = 'JPEG') -> bytes:
-        """Convert PIL Image to bytes.
+    def _image_to_bytes(
+        self,
+        image: Union[Image.Image, ImageArtifact],
+        format: str = 'JPEG'
+    ) -> bytes:
+        """Convert an image to bytes.
 
         Args:
-            image: PIL Image to convert
+            image: PIL Image, or ImageArtifact (its cached encoding is reused)
             format: Image format (default: JPEG)
 
         Returns:
             Image as bytes
         """
-        buffer = io.BytesIO()
-        image.save(buffer, format=format)
-        return buffer.getvalue()
+        return encode_image(image, format)
+
+    def _encoding_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments requesting the configured embedding encoding.
+
+        Nothing is sent for "list" so deployments that predate binary
+        transport keep working.
+        """
+        return {} if self.encoding == "list" else {"encoding": self.encoding}
 
-    async def generate_embedding(self, image: Image.Image) -> Dict[str, Any]:
+    async def _embed_batch(self, images: List[bytes]) -> List[Dict[str, Any]]:
+        """Embed a micro-batch; a lone request uses the single-image method."""
+        if len(images) == 1:
+            result = await self._call_with_retry(
+                "generate_embedding", images[0], **self._encoding_kwargs()
+            )
+            return [decode_embedding_result(result)]
+        results = await self._call_with_retry(
+            "generate_embedding_batch", images, **self._encoding_kwargs()
+        )
+        if not isinstance(results, list) or len(results) != len(images):
+            raise ModalClientError(
+                f"{self.model_name} batch returned an invalid response for {len(images)} images"
+            )
+        return [decode_embedding_result(result) for result in results]
+
+    async def _embed_bytes(self, image_bytes: bytes) -> Dict[str, Any]:
+        """Embed one encoded image, batched with concurrent requests.
+
+        Concurrent requests for the same image share one batch slot.
+        """
+        if self._batcher is None:
+            result = await self._call_with_retry(
+                "generate_embedding", image_bytes, **self._encoding_kwargs()
+            )
+            return decode_embedding_result(result)
+        if not self.single_flight:
+            return await self._batcher.submit(image_bytes)
+        # Keyed apart from the generate_embedding call made inside the batch
+        key = ("embedding", self.class_name, content_key(image_bytes))
+        return await self._single_flight.do(key, partial(self._batcher.submit, image_bytes))
+
+    async def generate_embedding(self, image: Union[Image.Image, ImageArtifact]) -> Dict[str, Any]:
         """Generate embedding for an image.
 
         Handles:
         - Mock mode (returns mock response immediately)
         - Image to bytes conversion
-        - Modal call with retry
+        - Modal call with retry (batched with concurrent requests)
         - Fallback to mock on error
 
         Args:
-            image: PIL Image to generate embedding for
+            image: PIL Image or ImageArtifact to generate embedding for
 
         Returns:
             Dictionary with embedding vector and metadata:
             - success: bool
-            - embedding: List[float] of length EMBEDDING_DIM
+            - embedding: float32 np.ndarray of length EMBEDDING_DIM
             - shape: Tuple of embedding dimensions
             - mock: bool (True if mock response)
         """
@@ -119,10 +207,7 @@ class EmbeddingModalClient(CoreModalClient):
         try:
             image_bytes = self._image_to_bytes(image)
 
-            return await self._call_with_retry(
-                "generate_embedding",
-                image_bytes
-            )
+            return await self._embed_bytes(image_bytes)
 
         except (ModalUnavailableError, ModalClientError) as e:
             logger.error(f"Modal failed for {self.model_name}: {e}")
@@ -147,16 +232,20 @@ class EmbeddingModalClient(CoreModalClient):
             return self._get_mock_response()
 
         try:
-            return await self._call_with_retry(
-                "generate_embedding",
-                image_bytes
-            )
+            return await self._embed_bytes(image_bytes)
 
         except (ModalUnavailableError, ModalClientError) as e:
             logger.error(f"Modal failed for {self.model_name}: {e}")
             logger.warning("Falling back to mock response")
             return self._get_mock_response()
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get client statistics, including micro-batching when enabled."""
+        stats = super().get_stats()
+        if self._batcher is not None:
+            stats["batching"] = self._batcher.get_stats()
+        return stats
+
 
 def create_singleton_getter(
     client_class: Type[T],
@@ -1,7 +1,6 @@
 """MatchAnything Modal client."""
 
-from typing import Dict, Any
-import io
+from typing import Dict, Any, Union
 from PIL import Image
 
 from backend.infrastructure.modal.base_client import (
@@ -11,6 +10,7 @@ from backend.infrastructure.modal.base_client import (
 )
 from backend.infrastructure.modal.clients.base_client import create_singleton_getter
 from backend.infrastructure.modal.mock_provider import MockResponseProvider
+from backend.utils.image_artifact import ImageArtifact, encode_image
 from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -37,23 +37,25 @@ class MatchAnythingClient(BaseModalClient):
     def class_name(self) -> str:
         return "MatchAnythingModel"
 
-    def _image_to_bytes(self, image: Image.Image, format: str = 'JPEG') -> bytes:
-        """Convert PIL Image to bytes."""
-        buffer = io.BytesIO()
-        image.save(buffer, format=format)
-        return buffer.getvalue()
+    def _image_to_bytes(
+        self,
+        image: Union[Image.Image, ImageArtifact],
+        format: str = 'JPEG'
+    ) -> bytes:
+        """Convert an image to bytes (reusing an ImageArtifact's cached encoding)."""
+        return encode_image(image, format)
 
     async def match_images(
         self,
-        image1: Image.Image,
-        image2: Image.Image,
+        image1: Union[Image.Image, ImageArtifact],
+        image2: Union[Image.Image, ImageArtifact],
         threshold: float = 0.2
     ) -> Dict[str, Any]:
         """Match two images and return keypoint correspondences.
 
         Args:
-            image1: First PIL Image (query)
-            image2: Second PIL Image (candidate)
+            image1: First PIL Image or ImageArtifact (query)
+            image2: Second PIL Image or ImageArtifact (candidate)
             threshold: Confidence threshold for keypoint filtering
 
         Returns:
@@ -0,0 +1,129 @@
+"""Multi-model embedding Modal client."""
+
+from typing import Any, Dict, Iterable, Optional, Union
+from PIL import Image
+
+from backend.infrastructure.modal.base_client import (
+    BaseModalClient,
+    ModalUnavailableError,
+    ModalClientError,
+)
+from backend.infrastructure.modal.clients.base_client import create_singleton_getter
+from backend.infrastructure.modal.embedding_codec import (
+    DEFAULT_EMBEDDING_ENCODING,
+    EMBEDDING_ENCODINGS,
+    decode_embedding_result,
+)
+from backend.infrastructure.modal.mock_provider import MockResponseProvider
+from backend.utils.image_artifact import ImageArtifact, encode_image
+from backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Models served by MultiReIDModel (MULTI_EMBEDDING_INPUTS in modal_app.py)
+MULTI_EMBEDDING_MODELS = (
+    "tiger_reid",
+    "wildlife_tools",
+    "megadescriptor_b",
+    "rapid_reid",
+    "cvwc2019_reid",
+    "transreid",
+)
+
+
+def multi_embedding_name(model_name: str) -> Optional[str]:
+    """Map an ensemble model name ('rapid', 'cvwc2019', ...) to its MultiReIDModel name.
+
+    Returns:
+        The served model name, or None if MultiReIDModel does not serve it
+    """
+    for name in (model_name, f"{model_name}_reid"):
+        if name in MULTI_EMBEDDING_MODELS:
+            return name
+    return None
+
+
+class MultiEmbeddingClient(BaseModalClient):
+    """Client for MultiReIDModel on Modal.
+
+    Uploads a crop once and gets every requested ReID embedding back in
+    one response, instead of one round trip per model.
+
+    Unlike the per-model clients, a failed call is not replaced by mock
+    embeddings: the response has ``success`` False so callers can fall back
+    to the per-model clients.
+    """
+
+    def __init__(self, *args, encoding: Optional[str] = None, **kwargs):
+        """Initialize multi-model embedding client.
+
+        Args:
+            *args: Passed to BaseModalClient
+            encoding: Embedding wire format requested from Modal
+                (defaults to MODAL_EMBEDDING_ENCODING)
+            **kwargs: Passed to BaseModalClient
+        """
+        super().__init__(*args, **kwargs)
+        self.encoding = encoding or DEFAULT_EMBEDDING_ENCODING
+        if self.encoding not in EMBEDDING_ENCODINGS:
+            raise ValueError(f"Unknown embedding encoding: {self.encoding}")
+
+    @property
+    def app_name(self) -> str:
+        return "tiger-id-models"
+
+    @property
+    def class_name(self) -> str:
+        return "MultiReIDModel"
+
+    async def generate_all_embeddings(
+        self,
+        image: Union[Image.Image, ImageArtifact, bytes],
+        models: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """Generate embeddings from several models in one request.
+
+        Args:
+            image: PIL Image, ImageArtifact (its cached encoding is reused)
+                or encoded image bytes
+            models: MultiReIDModel model names (defaults to all of
+                MULTI_EMBEDDING_MODELS)
+
+        Returns:
+            Dictionary with:
+            - embeddings: model name -> embedding result, with the
+              embedding decoded to a float32 np.ndarray
+            - success: bool (True if any model succeeded)
+            - mock: bool (True if mock response)
+        """
+        models = list(models) if models is not None else list(MULTI_EMBEDDING_MODELS)
+
+        if self.use_mock:
+            return {
+                "embeddings": {
+                    name: MockResponseProvider.get_embedding_response(name) for name in models
+                },
+                "success": True,
+                "mock": True
+            }
+
+        try:
+            image_bytes = image if isinstance(image, bytes) else encode_image(image)
+            kwargs = {} if self.encoding == "list" else {"encoding": self.encoding}
+            response = await self._call_with_retry(
+                "generate_all_embeddings", image_bytes, models=models, **kwargs
+            )
+            if not isinstance(response, dict) or not isinstance(response.get("embeddings"), dict):
+                raise ModalClientError("MultiReIDModel returned an invalid response")
+
+            for result in response["embeddings"].values():
+                decode_embedding_result(result)
+            return response
+
+        except (ModalUnavailableError, ModalClientError) as e:
+            logger.error(f"Modal failed for MultiReIDModel: {e}")
+            return {"embeddings": {}, "error": str(e), "success": False}
+
+
+# Singleton getter
+get_multi_embedding_client = create_singleton_getter(MultiEmbeddingClient, "MultiEmbedding")
@@ -0,0 +1,74 @@
+"""Binary wire format for embeddings returned by Modal.
+
+Embeddings travel as raw little-endian float32 (or float16) bytes with
+dtype and shape headers instead of a list of Python floats:
+
+    {"data": b"...", "dtype": "<f4", "shape": [1536]}
+
+Clients request it by passing ``encoding`` to the Modal embedding methods
+and decode with ``np.frombuffer``. The ``list`` encoding is the original
+format, still returned when no encoding is requested.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+EMBEDDING_ENCODINGS = ("float32", "float16", "list")
+_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+# Embedding encoding requested from Modal. "list" sends no encoding argument,
+# which older deployments reject (and the client would fall back to mock
+# embeddings), so switch to "float32" only after redeploying modal_app.py
+DEFAULT_EMBEDDING_ENCODING = os.getenv("MODAL_EMBEDDING_ENCODING", "list").lower()
+
+
+def encode_embedding(
+    embedding: np.ndarray,
+    encoding: str = "float32"
+) -> Union[Dict[str, Any], List[float]]:
+    """
+    Encode an embedding for the wire.
+
+    Mirrored by ``_encode_embedding`` in modal_app.py, which cannot import
+    the backend package inside Modal containers.
+
+    Args:
+        embedding: Embedding array
+        encoding: "float32", "float16" or "list"
+
+    Returns:
+        Binary payload dictionary, or a list of floats for "list"
+    """
+    if encoding == "list":
+        return np.asarray(embedding).tolist()
+    if encoding not in _DTYPES:
+        raise ValueError(f"Unknown embedding encoding: {encoding}")
+    array = np.ascontiguousarray(embedding, dtype=_DTYPES[encoding])
+    return {"data": array.tobytes(), "dtype": _DTYPES[encoding], "shape": list(array.shape)}
+
+
+def decode_embedding(payload: Any) -> Optional[np.ndarray]:
+    """
+    Decode an embedding payload in either wire format to float32.
+
+    Args:
+        payload: Binary payload dictionary, list of floats, array or None
+
+    Returns:
+        Writable float32 array, or None for a missing embedding
+    """
+    if payload is None:
+        return None
+    if isinstance(payload, dict):
+        array = np.frombuffer(payload["data"], dtype=np.dtype(payload["dtype"]))
+        return array.reshape(payload["shape"]).astype(np.float32)
+    return np.asarray(payload, dtype=np.float32)
+
+
+def decode_embedding_result(result: Any) -> Any:
+    """Decode the ``embedding`` of a Modal embedding response in place."""
+    if isinstance(result, dict) and result.get("embedding") is not None:
+        result["embedding"] = decode_embedding(result["embedding"])
+    return result
@@ -0,0 +1,155 @@
+"""Async micro-batching for Modal inference calls.
+
+Concurrent single-image requests (batch identification, discovery and
+ingestion bursts) are collected for up to ``max_batch_size`` items or
+``max_wait_ms`` milliseconds and sent as one batch call; each caller gets
+its own result back. Callers on different event loops (the API and the
+investigation task runner's thread) are batched separately, so every
+future is resolved on the loop that awaits it.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+from backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Micro-batching of embedding requests to Modal. Off by default: batches go
+# to generate_embedding_batch, which older deployments lack (every call
+# would fail over to mock embeddings), so redeploy modal_app.py first
+DEFAULT_BATCHING_ENABLED = os.getenv("MODAL_MICRO_BATCHING", "false").lower() == "true"
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("MODAL_BATCH_MAX_SIZE", "16"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("MODAL_BATCH_MAX_WAIT_MS", "10"))
+
+
+class _LoopQueue:
+    """Items queued by callers on one event loop, and their flush timer."""
+
+    __slots__ = ("pending", "timer")
+
+    def __init__(self):
+        self.pending: List[Tuple[Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesce concurrent ``submit`` calls into batched ``batch_fn`` calls.
+
+    ``batch_fn`` receives the queued items in submission order and must
+    return one result per item, in the same order. If it raises, every
+    caller in that batch gets the exception.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        name: str = "batcher"
+    ):
+        """Initialize micro-batcher.
+
+        Args:
+            batch_fn: Coroutine function processing a list of items
+            max_batch_size: Items that trigger an immediate flush
+                (defaults to MODAL_BATCH_MAX_SIZE)
+            max_wait_ms: Longest time the first queued item waits for
+                company (defaults to MODAL_BATCH_MAX_WAIT_MS)
+            name: Name for logging
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size or DEFAULT_MAX_BATCH_SIZE)
+        self.max_wait_ms = DEFAULT_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        self.name = name
+
+        self._queues: Dict[asyncio.AbstractEventLoop, _LoopQueue] = {}
+        self._lock = threading.Lock()
+        self._in_flight: Set[asyncio.Task] = set()
+
+        self.stats = {"items": 0, "batches": 0, "largest_batch": 0}
+
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for its result from the next batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            queue = self._queues.setdefault(loop, _LoopQueue())
+            queue.pending.append((item, future))
+            full = len(queue.pending) >= self.max_batch_size
+            if not full and queue.timer is None:
+                queue.timer = loop.call_later(self.max_wait_ms / 1000, self._flush, loop)
+
+        if full:
+            self._flush(loop)
+
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Dispatch the items queued on ``loop`` as one batch (runs on ``loop``)."""
+        with self._lock:
+            queue = self._queues.get(loop)
+            if queue is None:
+                return
+            if queue.timer is not None:
+                queue.timer.cancel()
+                queue.timer = None
+
+            batch = queue.pending[:self.max_batch_size]
+            queue.pending = queue.pending[self.max_batch_size:]
+            if queue.pending:
+                queue.timer = loop.call_later(self.max_wait_ms / 1000, self._flush, loop)
+            else:
+                del self._queues[loop]
+        if not batch:
+            return
+
+        task = loop.create_task(self._dispatch(batch))
+        with self._lock:
+            self._in_flight.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        with self._lock:
+            self._in_flight.discard(task)
+
+    async def _dispatch(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        """Run one batch call and hand each result to its caller."""
+        # Callers that gave up (cancelled) are dropped from the batch
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+
+        with self._lock:
+            self.stats["items"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+        try:
+            results = await self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"{self.name}: batch returned {len(results)} results for {len(batch)} items"
+                )
+        except Exception as e:
+            logger.warning(f"[{self.name}] Batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["avg_batch_size"] = stats["items"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
@@ -29,7 +29,7 @@ class MockResponseProvider:
         logger.info(f"[MOCK] Generating TigerReID embedding ({embedding_dim}d)")
         return {
             "success": True,
-            "embedding": np.random.rand(embedding_dim).tolist(),
+            "embedding": np.random.rand(embedding_dim).astype(np.float32),
             "shape": (embedding_dim,),
             "mock": True
         }
@@ -47,7 +47,7 @@ class MockResponseProvider:
         logger.info(f"[MOCK] Generating WildlifeTools embedding ({embedding_dim}d)")
         return {
             "success": True,
-            "embedding": np.random.rand(embedding_dim).tolist(),
+            "embedding": np.random.rand(embedding_dim).astype(np.float32),
             "shape": (embedding_dim,),
             "mock": True
         }
@@ -65,7 +65,7 @@ class MockResponseProvider:
         logger.info(f"[MOCK] Generating RAPID embedding ({embedding_dim}d)")
         return {
             "success": True,
-            "embedding": np.random.rand(embedding_dim).tolist(),
+            "embedding": np.random.rand(embedding_dim).astype(np.float32),
             "shape": (embedding_dim,),
             "mock": True
         }
@@ -83,7 +83,7 @@ class MockResponseProvider:
         logger.info(f"[MOCK] Generating CVWC2019 embedding ({embedding_dim}d)")
         return {
             "success": True,
-            "embedding": np.random.rand(embedding_dim).tolist(),
+            "embedding": np.random.rand(embedding_dim).astype(np.float32),
             "shape": (embedding_dim,),
             "mock": True
         }
@@ -133,7 +133,7 @@ class MockResponseProvider:
         logger.info("[MOCK] Generating TransReID embedding")
         return {
             "success": True,
-            "embedding": np.random.rand(768).tolist(),
+            "embedding": np.random.rand(768).astype(np.float32),
             "shape": (768,),
             "model_info": {
                 "architecture": "TransReID",
@@ -156,7 +156,7 @@ class MockResponseProvider:
         logger.info(f"[MOCK] Generating MegaDescriptor-B embedding ({embedding_dim}d)")
         return {
             "success": True,
-            "embedding": np.random.rand(embedding_dim).tolist(),
+            "embedding": np.random.rand(embedding_dim).astype(np.float32),
             "shape": (embedding_dim,),
             "mock": True
         }
@@ -218,7 +218,7 @@ class MockResponseProvider:
         logger.info(f"[MOCK] Generating {model_name} embedding ({dim}d)")
         return {
             "success": True,
-            "embedding": np.random.rand(dim).tolist(),
+            "embedding": np.random.rand(dim).astype(np.float32),
             "shape": (dim,),
             "model": model_name,
             "mock": True
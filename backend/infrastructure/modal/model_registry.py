@@ -1,12 +1,20 @@
-"""Model registry for Modal function references."""
+"""Model registry for Modal function references and inference backends."""
 
+import os
 from typing import Dict, Tuple, Optional
 from dataclasses import dataclass
 
+from backend.infrastructure.local.specs import DEFAULT_LOCAL_INT8
 from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Where each model runs: "modal" (GPU service) or "local" (ONNX Runtime on
+# CPU, see backend.infrastructure.local). MODEL_BACKEND sets the default;
+# MODEL_BACKEND_<MODEL_NAME> (e.g. MODEL_BACKEND_CVWC2019_REID) overrides it.
+INFERENCE_BACKENDS = ("modal", "local")
+DEFAULT_INFERENCE_BACKEND = os.getenv("MODEL_BACKEND", "modal").lower()
+
 
 @dataclass
 class ModelConfig:
@@ -17,11 +25,16 @@ class ModelConfig:
         class_name: Modal class name
         embedding_dim: Embedding dimension (for ReID models)
         description: Human-readable description
+        backend: Inference backend, "modal" or "local"
+        version: Weights version; bump when a model's weights change so
+            cached embeddings are recomputed
     """
     app_name: str
     class_name: str
     embedding_dim: Optional[int] = None
     description: str = ""
+    backend: str = "modal"
+    version: str = "1"
 
 
 class ModelRegistry:
@@ -81,6 +94,19 @@ class ModelRegistry:
         """Initialize the model registry."""
         self._models = self._MODELS.copy()
         self._custom_models: Dict[str, ModelConfig] = {}
+        self._backends: Dict[str, str] = {}
+        for model_name in self._models:
+            backend = os.getenv(f"MODEL_BACKEND_{model_name.upper()}")
+            if backend is None and DEFAULT_INFERENCE_BACKEND != "modal":
+                backend = DEFAULT_INFERENCE_BACKEND
+            if backend is not None:
+                self.set_backend(model_name, backend)
+        # MODEL_VERSION_<MODEL_NAME> overrides a model's weights version
+        self._versions: Dict[str, str] = {
+            model_name: os.environ[f"MODEL_VERSION_{model_name.upper()}"]
+            for model_name in self._models
+            if f"MODEL_VERSION_{model_name.upper()}" in os.environ
+        }
 
     def get_config(self, model_name: str) -> ModelConfig:
         """Get configuration for a model.
@@ -175,6 +201,62 @@ class ModelRegistry:
             return True
         return False
 
+    def get_backend(self, model_name: str) -> str:
+        """Get the inference backend a model runs on.
+
+        Args:
+            model_name: Name of the model
+
+        Returns:
+            "modal" or "local"
+        """
+        return self._backends.get(model_name) or self.get_config(model_name).backend
+
+    def set_backend(self, model_name: str, backend: str) -> None:
+        """Select the inference backend for a model.
+
+        Args:
+            model_name: Name of the model
+            backend: "modal" or "local"
+
+        Raises:
+            ValueError: If model or backend is unknown
+        """
+        backend = backend.lower()
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(
+                f"Unknown inference backend: {backend}. Available: {list(INFERENCE_BACKENDS)}"
+            )
+        self.get_config(model_name)
+        self._backends[model_name] = backend
+        logger.info(f"Model {model_name} uses the {backend} backend")
+
+    def get_embedding_version(self, model_name: str) -> str:
+        """Get the version embeddings from a model are cached under.
+
+        Combines the weights version with the backend, since ONNX Runtime
+        (and its INT8 graphs) do not reproduce Modal's vectors exactly.
+
+        Args:
+            model_name: Name of the model
+
+        Returns:
+            Version string such as "1/modal" or "1/local-int8"
+        """
+        version = self._versions.get(model_name) or self.get_config(model_name).version
+        backend = self.get_backend(model_name)
+        if backend == "local" and DEFAULT_LOCAL_INT8:
+            backend = "local-int8"
+        return f"{version}/{backend}"
+
+    def list_local_models(self) -> list:
+        """Get list of models running on the local backend.
+
+        Returns:
+            List of model names
+        """
+        return [name for name in self.list_models() if self.get_backend(name) == "local"]
+
     def is_reid_model(self, model_name: str) -> bool:
         """Check if a model is a ReID model.
 
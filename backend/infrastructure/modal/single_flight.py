@@ -0,0 +1,172 @@
+"""Single-flight coalescing of identical in-flight Modal calls.
+
+When discovery, a user upload and an auto-triggered investigation reach
+the same image at once, each would call Modal for the same crop. Calls are
+keyed by (method, model, content hash of the arguments); while one is in
+flight, identical calls await its result instead of sending their own.
+Callers on other threads' event loops (the investigation task runner)
+join the same call.
+"""
+
+import asyncio
+import concurrent.futures
+import copy
+import hashlib
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+import numpy as np
+
+from backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+R = TypeVar('R')
+
+# Share one Modal call between concurrent identical requests (disable to
+# send every request on its own)
+DEFAULT_SINGLE_FLIGHT_ENABLED = os.getenv("MODAL_SINGLE_FLIGHT", "true").lower() == "true"
+
+
+class _Unhashable(Exception):
+    """An argument has no stable byte representation."""
+
+
+def _feed(digest: Any, value: Any) -> None:
+    """Add a value to the digest, tagged with its type."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        digest.update(f"bytes:{len(data)}:".encode())
+        digest.update(data)
+    elif isinstance(value, np.ndarray):
+        digest.update(f"ndarray:{value.dtype.str}:{value.shape}:".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)}[".encode())
+        for item in value:
+            _feed(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)}{{".encode())
+        for name in sorted(value, key=repr):
+            _feed(digest, name)
+            _feed(digest, value[name])
+        digest.update(b"}")
+    else:
+        raise _Unhashable(type(value).__name__)
+
+
+def content_key(*args: Any, **kwargs: Any) -> Optional[str]:
+    """SHA-256 over call arguments (image bytes, arrays and plain values).
+
+    Returns:
+        Hex digest, or None when an argument (e.g. a PIL image) has no
+        stable byte form and the call must not be coalesced
+    """
+    digest = hashlib.sha256()
+    try:
+        _feed(digest, args)
+        _feed(digest, kwargs)
+    except _Unhashable:
+        return None
+    return digest.hexdigest()
+
+
+class _Flight:
+    """A shared in-flight call and how many callers await it."""
+
+    __slots__ = ("future", "task", "waiters")
+
+    def __init__(self):
+        # Thread-safe, so callers on any event loop can await it
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 1
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share it.
+
+    The call runs in its own task on the first caller's loop, so a caller
+    that is cancelled does not cancel it for the others. Callers on other
+    loops await the same result. A failure is raised to every caller
+    sharing the call. Shared results are deep-copied per caller, since
+    callers decode and annotate response dictionaries in place.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        """Initialize single-flight group.
+
+        Args:
+            name: Name for logging
+        """
+        self.name = name
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "executed": 0, "deduplicated": 0}
+
+    async def do(self, key: Optional[Hashable], fn: Callable[[], Awaitable[R]]) -> R:
+        """Run ``fn``, or join the identical call already in flight.
+
+        Args:
+            key: Identity of the call (None runs it without coalescing)
+            fn: Coroutine function performing the call
+
+        Returns:
+            The call's result
+        """
+        if key is None:
+            with self._lock:
+                self.stats["calls"] += 1
+                self.stats["executed"] += 1
+            return await fn()
+
+        with self._lock:
+            self.stats["calls"] += 1
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = _Flight()
+                self.stats["executed"] += 1
+            else:
+                flight.waiters += 1
+                self.stats["deduplicated"] += 1
+
+        if owner:
+            flight.task = asyncio.get_running_loop().create_task(fn())
+            flight.task.add_done_callback(lambda task: self._finish(key, flight, task))
+        else:
+            logger.debug(f"[{self.name}] Joined in-flight call ({flight.waiters} waiting)")
+
+        result = await asyncio.shield(asyncio.wrap_future(flight.future))
+        return copy.deepcopy(result) if flight.waiters > 1 else result
+
+    def _finish(self, key: Hashable, flight: _Flight, task: asyncio.Task) -> None:
+        # Stop new callers joining before the result is handed out
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if task.cancelled():
+            flight.future.cancel()
+        elif task.exception() is not None:
+            flight.future.set_exception(task.exception())
+        else:
+            flight.future.set_result(task.result())
+
+    def reset_stats(self) -> None:
+        """Reset statistics counters (calls in flight are kept)."""
+        self.stats = {"calls": 0, "executed": 0, "deduplicated": 0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics."""
+        calls = self.stats["calls"]
+        with self._lock:
+            in_flight = len(self._flights)
+        return {
+            **self.stats,
+            "in_flight": in_flight,
+            "dedup_rate": self.stats["deduplicated"] / calls if calls else 0.0
+        }
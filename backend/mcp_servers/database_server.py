@@ -84,7 +84,14 @@ class DatabaseMCPServer(MCPServerBase):
                             "description": "Minimum similarity score",
                             "default": 0.8
                         },
-                        "limit": {"type": "integer", "description": "Maximum results", "default": 10}
+                        "limit": {"type": "integer", "description": "Maximum results", "default": 10},
+                        "model_name": {
+                            "type": "string",
+                            "description": "ReID model that produced the embedding (inferred from dimension if omitted)"
+                        },
+                        "side_view": {"type": "string", "description": "Only match this side view (left/right)"},
+                        "is_reference": {"type": "boolean", "description": "Only match reference (true) or non-reference (false) images"},
+                        "verified": {"type": "boolean", "description": "Only match verified (true) or unverified (false) images"}
                     },
                     "required": ["embedding"]
                 },
@@ -230,7 +237,11 @@ class DatabaseMCPServer(MCPServerBase):
         self,
         embedding: List[float],
         similarity_threshold: float = 0.8,
-        limit: int = 10
+        limit: int = 10,
+        model_name: Optional[str] = None,
+        side_view: Optional[str] = None,
+        is_reference: Optional[bool] = None,
+        verified: Optional[bool] = None
     ) -> Dict[str, Any]:
         """Handle embedding similarity search"""
         session = self.db or get_db_session()
@@ -242,7 +253,11 @@ class DatabaseMCPServer(MCPServerBase):
                 session,
                 query_embedding=embedding_array,
                 similarity_threshold=similarity_threshold,
-                limit=limit
+                limit=limit,
+                model_name=model_name,
+                side_view=side_view,
+                is_reference=is_reference,
+                verified=verified
             )
             
             return {
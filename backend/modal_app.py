@@ -10,6 +10,9 @@ This module provides serverless GPU compute for all ML models:
 - TransReID: Vision Transformer-based re-identification (ViT-Base, 768-dim)
 
 Model weights are cached in Modal volumes for efficient loading.
+Embedding models also expose generate_embedding_batch, used by the
+micro-batching clients to embed concurrent requests in one call, and
+MultiReIDModel serves every ReID embedding for a crop in one request.
 """
 
 import modal
@@ -87,6 +90,125 @@ matchanything_image = (
 )
 
 
+def _encode_embedding(embedding: np.ndarray, encoding: str = "list") -> Any:
+    """
+    Encode an embedding for the response.
+
+    "list" returns Python floats (the original format). "float32" and
+    "float16" return raw little-endian bytes with dtype and shape headers,
+    decoded by the clients with np.frombuffer (see
+    backend/infrastructure/modal/embedding_codec.py, which this mirrors).
+
+    Args:
+        embedding: Embedding array
+        encoding: "list", "float32" or "float16"
+
+    Returns:
+        List of floats, or {"data", "dtype", "shape"} dictionary
+    """
+    if encoding == "list":
+        return np.asarray(embedding).tolist()
+    dtypes = {"float32": "<f4", "float16": "<f2"}
+    if encoding not in dtypes:
+        raise ValueError(f"Unknown embedding encoding: {encoding}")
+    array = np.ascontiguousarray(embedding, dtype=dtypes[encoding])
+    return {"data": array.tobytes(), "dtype": dtypes[encoding], "shape": list(array.shape)}
+
+
+def _embed_batch(
+    images: List[bytes],
+    preprocess,
+    embed,
+    normalize: bool = False,
+    encoding: str = "list",
+    **extra: Any
+) -> List[Dict[str, Any]]:
+    """
+    Embed a batch of encoded images in one forward pass.
+
+    Images that fail to decode get an error result; the rest are embedded
+    together. Results are returned in input order.
+
+    Args:
+        images: List of images as bytes
+        preprocess: Callable turning image bytes into a model input
+        embed: Callable turning a list of model inputs into embeddings
+        normalize: Whether to L2 normalize each embedding
+        encoding: Embedding wire format ("list", "float32" or "float16")
+        **extra: Additional keys for successful results
+
+    Returns:
+        List of embedding results, one per image
+    """
+    import traceback
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(images)
+    inputs = []
+    valid_indices = []
+    for i, image_bytes in enumerate(images):
+        try:
+            inputs.append(preprocess(image_bytes))
+            valid_indices.append(i)
+        except Exception as e:
+            results[i] = {"embedding": None, "error": str(e), "success": False}
+
+    if inputs:
+        try:
+            embeddings = np.asarray(embed(inputs)).reshape(len(inputs), -1)
+            if normalize:
+                norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+                norms[norms == 0] = 1
+                embeddings = embeddings / norms
+            for j, i in enumerate(valid_indices):
+                results[i] = {
+                    "embedding": _encode_embedding(embeddings[j], encoding),
+                    "shape": embeddings[j].shape,
+                    **extra,
+                    "success": True
+                }
+        except Exception as e:
+            error_result = {
+                "embedding": None,
+                "error": str(e),
+                "traceback": traceback.format_exc(),
+                "success": False
+            }
+            for i in valid_indices:
+                results[i] = dict(error_result)
+
+    return results
+
+
+def _resize_center_crop(image_bytes: bytes, target_size: int) -> np.ndarray:
+    """Decode, resize (keeping aspect ratio) and center crop to a square."""
+    from PIL import Image
+
+    return _center_crop_image(Image.open(io.BytesIO(image_bytes)).convert('RGB'), target_size)
+
+
+def _center_crop_image(image, target_size: int) -> np.ndarray:
+    """Resize a decoded RGB image (keeping aspect ratio) and center crop to a square."""
+    from PIL import Image
+
+    # Resize maintaining aspect ratio
+    width, height = image.size
+    if width < height:
+        new_width = target_size
+        new_height = int(target_size * height / width)
+    else:
+        new_height = target_size
+        new_width = int(target_size * width / height)
+
+    image = image.resize((new_width, new_height), Image.LANCZOS)
+
+    # Center crop to target_size x target_size
+    left = (new_width - target_size) // 2
+    top = (new_height - target_size) // 2
+    image = image.crop((left, top, left + target_size, top + target_size))
+
+    return np.array(image)
+
+
 # ==================== TigerReID Model ====================
 
 @app.cls(
@@ -124,12 +246,13 @@ class TigerReIDModel:
         ])
     
     @modal.method()
-    def generate_embedding(self, image_bytes: bytes) -> Dict[str, Any]:
+    def generate_embedding(self, image_bytes: bytes, encoding: str = "list") -> Dict[str, Any]:
         """
         Generate embedding for a tiger image.
         
         Args:
             image_bytes: Image as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
             
         Returns:
             Dictionary with embedding vector and metadata
@@ -152,7 +275,7 @@ class TigerReIDModel:
             embedding_array = embedding.cpu().numpy().flatten()
             
             return {
-                "embedding": embedding_array.tolist(),
+                "embedding": _encode_embedding(embedding_array, encoding),
                 "shape": embedding_array.shape,
                 "success": True
             }
@@ -164,6 +287,34 @@ class TigerReIDModel:
                 "success": False
             }
 
+    @modal.method()
+    def generate_embedding_batch(
+        self,
+        images: List[bytes],
+        encoding: str = "list"
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate embeddings for a batch of tiger images.
+
+        Args:
+            images: List of images as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
+
+        Returns:
+            List of embedding results
+        """
+        import torch
+        from PIL import Image
+
+        def preprocess(image_bytes: bytes):
+            return self.transform(Image.open(io.BytesIO(image_bytes)).convert('RGB'))
+
+        def embed(tensors):
+            with torch.no_grad():
+                return self.model(torch.stack(tensors).to(self.device)).cpu().numpy()
+
+        return _embed_batch(images, preprocess, embed, encoding=encoding)
+
 
 # ==================== MegaDetector Model ====================
 
@@ -213,6 +364,7 @@ class MegaDetectorModel:
         
         Args:
             image_bytes: Image as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
             confidence_threshold: Confidence threshold for detections
             
         Returns:
@@ -287,12 +439,13 @@ class WildlifeToolsModel:
         )
     
     @modal.method()
-    def generate_embedding(self, image_bytes: bytes) -> Dict[str, Any]:
+    def generate_embedding(self, image_bytes: bytes, encoding: str = "list") -> Dict[str, Any]:
         """
         Generate embedding using WildlifeTools.
         
         Args:
             image_bytes: Image as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
             
         Returns:
             Dictionary with embedding vector
@@ -303,42 +456,16 @@ class WildlifeToolsModel:
         from torch.utils.data import Dataset, DataLoader
         
         try:
-            # Load image
-            image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-            
             # MegaDescriptor-L-384 expects 384x384 images
             # Resize while maintaining aspect ratio, then center crop
-            target_size = 384
-            
-            # Resize maintaining aspect ratio
-            width, height = image.size
-            if width < height:
-                new_width = target_size
-                new_height = int(target_size * height / width)
-            else:
-                new_height = target_size
-                new_width = int(target_size * width / height)
-            
-            image = image.resize((new_width, new_height), Image.LANCZOS)
-            
-            # Center crop to 384x384
-            left = (new_width - target_size) // 2
-            top = (new_height - target_size) // 2
-            right = left + target_size
-            bottom = top + target_size
-            image = image.crop((left, top, right, bottom))
-            
-            # Wildlife-tools DeepFeatures is callable directly
-            # It expects a list of images (numpy arrays)
-            # Convert to numpy array
-            image_np = np.array(image)
+            image_np = _resize_center_crop(image_bytes, 384)
             
             # Call extractor directly (it's a callable object, not a method)
             # Returns numpy array of embeddings
             embeddings = self.extractor([image_np])
             
             return {
-                "embedding": embeddings[0].tolist(),
+                "embedding": _encode_embedding(embeddings[0], encoding),
                 "shape": embeddings[0].shape,
                 "success": True
             }
@@ -354,6 +481,31 @@ class WildlifeToolsModel:
                 "success": False
             }
 
+    @modal.method()
+    def generate_embedding_batch(
+        self,
+        images: List[bytes],
+        encoding: str = "list"
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate WildlifeTools embeddings for a batch of images.
+
+        The extractor batches internally (batch_size=32).
+
+        Args:
+            images: List of images as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
+
+        Returns:
+            List of embedding results
+        """
+        return _embed_batch(
+            images,
+            lambda image_bytes: _resize_center_crop(image_bytes, 384),
+            self.extractor,
+            encoding=encoding
+        )
+
 
 # ==================== MegaDescriptor-B-224 Model ====================
 
@@ -400,11 +552,12 @@ class MegaDescriptorBModel:
         self.embedding_dim = 1024  # Swin-Base outputs 1024-dim
 
     @modal.method()
-    def generate_embedding(self, image_bytes: bytes) -> Dict[str, Any]:
+    def generate_embedding(self, image_bytes: bytes, encoding: str = "list") -> Dict[str, Any]:
         """Generate embedding using MegaDescriptor-B-224.
 
         Args:
             image_bytes: Image as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
 
         Returns:
             Dictionary with embedding vector
@@ -413,38 +566,14 @@ class MegaDescriptorBModel:
         import numpy as np
 
         try:
-            # Load image
-            image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-
             # MegaDescriptor-B-224 expects 224x224 images
-            target_size = 224
-
-            # Resize maintaining aspect ratio
-            width, height = image.size
-            if width < height:
-                new_width = target_size
-                new_height = int(target_size * height / width)
-            else:
-                new_height = target_size
-                new_width = int(target_size * width / height)
-
-            image = image.resize((new_width, new_height), Image.LANCZOS)
-
-            # Center crop to 224x224
-            left = (new_width - target_size) // 2
-            top = (new_height - target_size) // 2
-            right = left + target_size
-            bottom = top + target_size
-            image = image.crop((left, top, right, bottom))
-
-            # Convert to numpy array
-            image_np = np.array(image)
+            image_np = _resize_center_crop(image_bytes, 224)
 
             # Call extractor
             embeddings = self.extractor([image_np])
 
             return {
-                "embedding": embeddings[0].tolist(),
+                "embedding": _encode_embedding(embeddings[0], encoding),
                 "shape": embeddings[0].shape,
                 "model": "megadescriptor_b_224",
                 "success": True
@@ -460,6 +589,31 @@ class MegaDescriptorBModel:
                 "success": False
             }
 
+    @modal.method()
+    def generate_embedding_batch(
+        self,
+        images: List[bytes],
+        encoding: str = "list"
+    ) -> List[Dict[str, Any]]:
+        """Generate MegaDescriptor-B-224 embeddings for a batch of images.
+
+        The extractor batches internally (batch_size=64).
+
+        Args:
+            images: List of images as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
+
+        Returns:
+            List of embedding results
+        """
+        return _embed_batch(
+            images,
+            lambda image_bytes: _resize_center_crop(image_bytes, 224),
+            self.extractor,
+            encoding=encoding,
+            model="megadescriptor_b_224"
+        )
+
 
 # ==================== RAPID ReID Model ====================
 
@@ -492,6 +646,56 @@ def download_rapid_weights(volume_path: Path, models_volume_ref):
     return None
 
 
+def _load_rapid_backbone(device):
+    """
+    Load the RAPID ResNet50 backbone, with trained weights from the volume
+    when present.
+
+    Shared by RAPIDReIDModel and MultiReIDModel.
+    """
+    import torch
+    import torchvision.models as models
+
+    # Check for weights in Modal volume
+    weight_path = Path(MODEL_CACHE_DIR) / "rapid" / "checkpoints" / "model.pth"
+    
+    # Try to download weights if they don't exist
+    if not weight_path.exists():
+        print("RAPID weights not found in volume. Attempting to download...")
+        download_rapid_weights(Path(MODEL_CACHE_DIR), models_volume)
+    
+    # For now, use ResNet50 as base architecture
+    # TODO: Replace with actual RAPID architecture when weights are available
+    # RAPID is designed for real-time pattern matching on edge devices
+    # The actual architecture may differ from standard ResNet
+    
+    model = models.resnet50(pretrained=True)
+    model.fc = torch.nn.Identity()  # Remove classifier, use features
+    
+    # If trained weights exist, load them
+    if weight_path.exists():
+        try:
+            checkpoint = torch.load(weight_path, map_location=device)
+            # Load state dict, skipping classifier if present
+            if isinstance(checkpoint, dict):
+                state_dict = checkpoint.get('state_dict', checkpoint)
+            else:
+                state_dict = checkpoint
+            
+            # Filter out classifier weights
+            filtered_dict = {k: v for k, v in state_dict.items() if 'classifier' not in k}
+            model.load_state_dict(filtered_dict, strict=False)
+            print(f"Loaded RAPID weights from {weight_path}")
+        except Exception as e:
+            print(f"Warning: Could not load RAPID weights: {e}")
+            print("Using ImageNet pretrained weights instead")
+    
+    model = model.to(device)
+    model.eval()
+
+    return model
+
+
 @app.cls(
     image=tiger_reid_image,
     gpu=GPU_CONFIG_T4,
@@ -505,47 +709,11 @@ class RAPIDReIDModel:
     def load_model(self):
         """Load RAPID model with weights from Modal volume."""
         import torch
-        import torchvision.models as models
         from torchvision import transforms
         
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
-        # Check for weights in Modal volume
-        weight_path = Path(MODEL_CACHE_DIR) / "rapid" / "checkpoints" / "model.pth"
-        
-        # Try to download weights if they don't exist
-        if not weight_path.exists():
-            print("RAPID weights not found in volume. Attempting to download...")
-            download_rapid_weights(Path(MODEL_CACHE_DIR), models_volume)
-        
-        # For now, use ResNet50 as base architecture
-        # TODO: Replace with actual RAPID architecture when weights are available
-        # RAPID is designed for real-time pattern matching on edge devices
-        # The actual architecture may differ from standard ResNet
-        
-        self.model = models.resnet50(pretrained=True)
-        self.model.fc = torch.nn.Identity()  # Remove classifier, use features
-        
-        # If trained weights exist, load them
-        if weight_path.exists():
-            try:
-                checkpoint = torch.load(weight_path, map_location=self.device)
-                # Load state dict, skipping classifier if present
-                if isinstance(checkpoint, dict):
-                    state_dict = checkpoint.get('state_dict', checkpoint)
-                else:
-                    state_dict = checkpoint
-                
-                # Filter out classifier weights
-                filtered_dict = {k: v for k, v in state_dict.items() if 'classifier' not in k}
-                self.model.load_state_dict(filtered_dict, strict=False)
-                print(f"Loaded RAPID weights from {weight_path}")
-            except Exception as e:
-                print(f"Warning: Could not load RAPID weights: {e}")
-                print("Using ImageNet pretrained weights instead")
-        
-        self.model = self.model.to(self.device)
-        self.model.eval()
+        self.model = _load_rapid_backbone(self.device)
         
         self.transform = transforms.Compose([
             transforms.Resize((256, 128)),  # RAPID uses different size
@@ -554,7 +722,7 @@ class RAPIDReIDModel:
         ])
     
     @modal.method()
-    def generate_embedding(self, image_bytes: bytes) -> Dict[str, Any]:
+    def generate_embedding(self, image_bytes: bytes, encoding: str = "list") -> Dict[str, Any]:
         """Generate RAPID embedding."""
         import torch
         from PIL import Image
@@ -574,7 +742,7 @@ class RAPIDReIDModel:
                 embedding_array = embedding_array / norm
             
             return {
-                "embedding": embedding_array.tolist(),
+                "embedding": _encode_embedding(embedding_array, encoding),
                 "shape": embedding_array.shape,
                 "success": True
             }
@@ -586,6 +754,25 @@ class RAPIDReIDModel:
                 "success": False
             }
 
+    @modal.method()
+    def generate_embedding_batch(
+        self,
+        images: List[bytes],
+        encoding: str = "list"
+    ) -> List[Dict[str, Any]]:
+        """Generate normalized RAPID embeddings for a batch of images."""
+        import torch
+        from PIL import Image
+
+        def preprocess(image_bytes: bytes):
+            return self.transform(Image.open(io.BytesIO(image_bytes)).convert('RGB'))
+
+        def embed(tensors):
+            with torch.no_grad():
+                return self.model(torch.stack(tensors).to(self.device)).cpu().numpy()
+
+        return _embed_batch(images, preprocess, embed, normalize=True, encoding=encoding)
+
 
 # ==================== TransReID Model ====================
 
@@ -644,12 +831,13 @@ class TransReIDModel:
         print(f"TransReID model loaded. Output dimension: {self.embedding_dim}")
 
     @modal.method()
-    def generate_embedding(self, image_bytes: bytes) -> Dict[str, Any]:
+    def generate_embedding(self, image_bytes: bytes, encoding: str = "list") -> Dict[str, Any]:
         """
         Generate TransReID embedding using Vision Transformer.
 
         Args:
             image_bytes: Image as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
 
         Returns:
             Dictionary with embedding vector and metadata
@@ -672,7 +860,7 @@ class TransReIDModel:
                 embedding_array = embedding_array / norm
 
             return {
-                "embedding": embedding_array.tolist(),
+                "embedding": _encode_embedding(embedding_array, encoding),
                 "shape": embedding_array.shape,
                 "model_info": {
                     "architecture": "TransReID",
@@ -692,12 +880,17 @@ class TransReIDModel:
             }
 
     @modal.method()
-    def generate_embedding_batch(self, images: List[bytes]) -> List[Dict[str, Any]]:
+    def generate_embedding_batch(
+        self,
+        images: List[bytes],
+        encoding: str = "list"
+    ) -> List[Dict[str, Any]]:
         """
         Generate embeddings for a batch of images.
 
         Args:
             images: List of images as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
 
         Returns:
             List of embedding results
@@ -740,7 +933,7 @@ class TransReIDModel:
 
                 for j, idx in enumerate(valid_indices):
                     results.insert(idx, {
-                        "embedding": embeddings_np[j].tolist(),
+                        "embedding": _encode_embedding(embeddings_np[j], encoding),
                         "shape": embeddings_np[j].shape,
                         "success": True
                     })
@@ -794,6 +987,115 @@ cvwc2019_image = pytorch_base.pip_install(
 )
 
 
+def _load_cvwc2019_global_stream(device):
+    """
+    Build the CVWC2019 global stream (ResNet152 backbone, pooling and
+    BNNeck), loading trained weights from the volume when present.
+
+    Shared by CVWC2019ReIDModel and MultiReIDModel.
+
+    Returns:
+        Tuple of (backbone, gap, bn) modules on the device
+    """
+    import torch
+    import torch.nn as nn
+    import torchvision.models as models
+
+    # Check for weights in Modal volume
+    weight_path = Path(MODEL_CACHE_DIR) / "cvwc2019" / "best_model.pth"
+    pretrained_global_path = Path(MODEL_CACHE_DIR) / "cvwc2019" / "resnet152-b121ed2d.pth"
+
+    # Try to check for weights if they don't exist
+    if not weight_path.exists():
+        print("CVWC2019 weights not found in volume.")
+        print("To add weights, use: scripts/upload_weights_to_modal.py")
+        download_cvwc2019_weights(Path(MODEL_CACHE_DIR), models_volume)
+
+    # Build multi-stream architecture using ResNet152 global stream
+    print("Building CVWC2019 global stream (ResNet152)...")
+
+    # Create ResNet152 backbone
+    global_backbone = models.resnet152(pretrained=True)
+
+    # If we have pretrained weights for ResNet152, load them
+    if pretrained_global_path.exists():
+        try:
+            state_dict = torch.load(pretrained_global_path, map_location='cpu')
+            global_backbone.load_state_dict(state_dict, strict=False)
+            print(f"Loaded pretrained ResNet152 from {pretrained_global_path}")
+        except Exception as e:
+            print(f"Could not load pretrained weights: {e}")
+
+    # Create global feature extractor (remove classifier)
+    # Extract all layers except avgpool and fc
+    backbone_layers = list(global_backbone.children())[:-2]
+    backbone = nn.Sequential(*backbone_layers)
+    gap = nn.AdaptiveAvgPool2d(1)
+    bn = nn.BatchNorm1d(2048)
+    bn.bias.requires_grad_(False)
+
+    # If trained CVWC2019 weights exist, try to load them
+    if weight_path.exists():
+        try:
+            checkpoint = torch.load(weight_path, map_location='cpu')
+            if isinstance(checkpoint, dict):
+                state_dict = checkpoint.get('state_dict', checkpoint)
+            else:
+                state_dict = checkpoint
+
+            # Try to load weights that match our architecture
+            loaded_count = 0
+            for k, v in state_dict.items():
+                # Map CVWC2019 keys to our model keys
+                if k.startswith('glabole.base.'):
+                    # These are backbone weights
+                    try:
+                        # Try to find matching layer in backbone
+                        parts = k.replace('glabole.base.', '').split('.')
+                        # Navigate to the correct module
+                        module = backbone
+                        for part in parts[:-1]:
+                            if part.isdigit():
+                                module = module[int(part)]
+                            else:
+                                module = getattr(module, part)
+                        param_name = parts[-1]
+                        if hasattr(module, param_name):
+                            param = getattr(module, param_name)
+                            if param.shape == v.shape:
+                                param.data.copy_(v)
+                                loaded_count += 1
+                    except Exception:
+                        pass
+                elif k.startswith('glabole.bottleneck.'):
+                    # These are batch norm weights
+                    bn_key = k.replace('glabole.bottleneck.', '')
+                    if hasattr(bn, bn_key.split('.')[0]):
+                        try:
+                            param = getattr(bn, bn_key.split('.')[0])
+                            if param.shape == v.shape:
+                                param.data.copy_(v)
+                                loaded_count += 1
+                        except Exception:
+                            pass
+
+            print(f"Loaded {loaded_count} parameter tensors from CVWC2019 weights")
+
+        except Exception as e:
+            print(f"Warning: Could not load CVWC2019 weights: {e}")
+            print("Using ImageNet pretrained weights")
+
+    backbone = backbone.to(device)
+    gap = gap.to(device)
+    bn = bn.to(device)
+
+    backbone.requires_grad_(False)
+    gap.requires_grad_(False)
+    bn.requires_grad_(False)
+
+    return backbone, gap, bn
+
+
 @app.cls(
     image=cvwc2019_image,
     gpu=GPU_CONFIG_T4,
@@ -817,103 +1119,11 @@ class CVWC2019ReIDModel:
     def load_model(self):
         """Load CVWC2019 multi-stream model with weights from Modal volume."""
         import torch
-        import torch.nn as nn
         from torchvision import transforms
-        import torchvision.models as models
 
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-        # Check for weights in Modal volume
-        weight_path = Path(MODEL_CACHE_DIR) / "cvwc2019" / "best_model.pth"
-        pretrained_global_path = Path(MODEL_CACHE_DIR) / "cvwc2019" / "resnet152-b121ed2d.pth"
-
-        # Try to check for weights if they don't exist
-        if not weight_path.exists():
-            print("CVWC2019 weights not found in volume.")
-            print("To add weights, use: scripts/upload_weights_to_modal.py")
-            download_cvwc2019_weights(Path(MODEL_CACHE_DIR), models_volume)
-
-        # Build multi-stream architecture using ResNet152 global stream
-        print("Building CVWC2019 global stream (ResNet152)...")
-
-        # Create ResNet152 backbone
-        global_backbone = models.resnet152(pretrained=True)
-
-        # If we have pretrained weights for ResNet152, load them
-        if pretrained_global_path.exists():
-            try:
-                state_dict = torch.load(pretrained_global_path, map_location='cpu')
-                global_backbone.load_state_dict(state_dict, strict=False)
-                print(f"Loaded pretrained ResNet152 from {pretrained_global_path}")
-            except Exception as e:
-                print(f"Could not load pretrained weights: {e}")
-
-        # Create global feature extractor (remove classifier)
-        # Extract all layers except avgpool and fc
-        backbone_layers = list(global_backbone.children())[:-2]
-        self.backbone = nn.Sequential(*backbone_layers)
-        self.gap = nn.AdaptiveAvgPool2d(1)
-        self.bn = nn.BatchNorm1d(2048)
-        self.bn.bias.requires_grad_(False)
-
-        # If trained CVWC2019 weights exist, try to load them
-        if weight_path.exists():
-            try:
-                checkpoint = torch.load(weight_path, map_location='cpu')
-                if isinstance(checkpoint, dict):
-                    state_dict = checkpoint.get('state_dict', checkpoint)
-                else:
-                    state_dict = checkpoint
-
-                # Try to load weights that match our architecture
-                loaded_count = 0
-                for k, v in state_dict.items():
-                    # Map CVWC2019 keys to our model keys
-                    if k.startswith('glabole.base.'):
-                        # These are backbone weights
-                        try:
-                            # Try to find matching layer in backbone
-                            parts = k.replace('glabole.base.', '').split('.')
-                            # Navigate to the correct module
-                            module = self.backbone
-                            for part in parts[:-1]:
-                                if part.isdigit():
-                                    module = module[int(part)]
-                                else:
-                                    module = getattr(module, part)
-                            param_name = parts[-1]
-                            if hasattr(module, param_name):
-                                param = getattr(module, param_name)
-                                if param.shape == v.shape:
-                                    param.data.copy_(v)
-                                    loaded_count += 1
-                        except Exception:
-                            pass
-                    elif k.startswith('glabole.bottleneck.'):
-                        # These are batch norm weights
-                        bn_key = k.replace('glabole.bottleneck.', '')
-                        if hasattr(self.bn, bn_key.split('.')[0]):
-                            try:
-                                param = getattr(self.bn, bn_key.split('.')[0])
-                                if param.shape == v.shape:
-                                    param.data.copy_(v)
-                                    loaded_count += 1
-                            except Exception:
-                                pass
-
-                print(f"Loaded {loaded_count} parameter tensors from CVWC2019 weights")
-
-            except Exception as e:
-                print(f"Warning: Could not load CVWC2019 weights: {e}")
-                print("Using ImageNet pretrained weights")
-
-        self.backbone = self.backbone.to(self.device)
-        self.gap = self.gap.to(self.device)
-        self.bn = self.bn.to(self.device)
-
-        self.backbone.requires_grad_(False)
-        self.gap.requires_grad_(False)
-        self.bn.requires_grad_(False)
+        self.backbone, self.gap, self.bn = _load_cvwc2019_global_stream(self.device)
 
         # Transform for global image (128x256 as per config)
         self.transform = transforms.Compose([
@@ -925,7 +1135,7 @@ class CVWC2019ReIDModel:
         print(f"CVWC2019 model loaded. Using ResNet152 backbone with 2048-dim output")
 
     @modal.method()
-    def generate_embedding(self, image_bytes: bytes) -> Dict[str, Any]:
+    def generate_embedding(self, image_bytes: bytes, encoding: str = "list") -> Dict[str, Any]:
         """
         Generate CVWC2019 embedding using global stream.
 
@@ -935,6 +1145,7 @@ class CVWC2019ReIDModel:
 
         Args:
             image_bytes: Image as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
 
         Returns:
             Dictionary with embedding vector and metadata
@@ -960,7 +1171,7 @@ class CVWC2019ReIDModel:
                 embedding_array = embedding_array / norm
 
             return {
-                "embedding": embedding_array.tolist(),
+                "embedding": _encode_embedding(embedding_array, encoding),
                 "shape": embedding_array.shape,
                 "model_info": {
                     "architecture": "CVWC2019-GlobalStream",
@@ -979,6 +1190,224 @@ class CVWC2019ReIDModel:
                 "success": False
             }
 
+    @modal.method()
+    def generate_embedding_batch(
+        self,
+        images: List[bytes],
+        encoding: str = "list"
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate CVWC2019 global-stream embeddings for a batch of images.
+
+        Args:
+            images: List of images as bytes
+            encoding: Embedding wire format ("list", "float32" or "float16")
+
+        Returns:
+            List of embedding results
+        """
+        import torch
+        from PIL import Image
+
+        def preprocess(image_bytes: bytes):
+            return self.transform(Image.open(io.BytesIO(image_bytes)).convert('RGB'))
+
+        def embed(tensors):
+            with torch.no_grad():
+                feat = self.backbone(torch.stack(tensors).to(self.device))
+                feat = self.gap(feat)
+                feat = feat.view(feat.size(0), -1)
+                return self.bn(feat).cpu().numpy()
+
+        return _embed_batch(
+            images,
+            preprocess,
+            embed,
+            normalize=True,
+            encoding=encoding,
+            model_info={
+                "architecture": "CVWC2019-GlobalStream",
+                "backbone": "ResNet152",
+                "output_dim": 2048
+            }
+        )
+
+
+# ==================== Multi-Model Embeddings ====================
+
+# Models served by MultiReIDModel: (input kind, size, L2 normalize). "tensor"
+# inputs are ImageNet-normalized tensors resized to (height, width); "crop"
+# inputs are center-cropped squares for the MegaDescriptor extractors.
+# Models with the same input share one preprocessed copy of the image.
+MULTI_EMBEDDING_INPUTS = {
+    "tiger_reid": ("tensor", (256, 256), False),
+    "wildlife_tools": ("crop", 384, False),
+    "megadescriptor_b": ("crop", 224, False),
+    "rapid_reid": ("tensor", (256, 128), True),
+    "cvwc2019_reid": ("tensor", (256, 128), True),
+    "transreid": ("tensor", (224, 224), True),
+}
+
+
+@app.cls(
+    image=wildlife_tools_image,
+    gpu=GPU_CONFIG_A100,
+    volumes={MODEL_CACHE_DIR: models_volume},
+    timeout=600,
+)
+class MultiReIDModel:
+    """
+    All ReID embedding models in one container.
+
+    generate_all_embeddings takes a single upload of a crop, decodes it once
+    and returns every requested model's embedding in one response, so an
+    ensemble identification costs one round trip instead of one per model.
+    Embeddings match those of the per-model classes.
+    """
+
+    @modal.enter()
+    def load_model(self):
+        """Load every ReID model; one that fails is reported per request."""
+        import torch
+        import timm
+        import torchvision.models as models
+        from torchvision import transforms
+        from wildlife_tools.features import DeepFeatures
+
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+        def torch_embedder(module):
+            def embed(tensor):
+                with torch.no_grad():
+                    return module(tensor.unsqueeze(0).to(self.device)).cpu().numpy()
+            return embed
+
+        def load_tiger_reid():
+            model = models.resnet50(pretrained=True)
+            model.fc = torch.nn.Identity()
+            return torch_embedder(model.to(self.device).eval())
+
+        def load_megadescriptor(hub_name: str, batch_size: int):
+            backbone = timm.create_model(f"hf-hub:BVRA/{hub_name}", num_classes=0, pretrained=True)
+            extractor = DeepFeatures(model=backbone, batch_size=batch_size, device=self.device)
+            return lambda image_np: extractor([image_np])[0]
+
+        def load_cvwc2019():
+            backbone, gap, bn = _load_cvwc2019_global_stream(self.device)
+
+            def embed(tensor):
+                with torch.no_grad():
+                    feat = gap(backbone(tensor.unsqueeze(0).to(self.device)))
+                    return bn(feat.view(feat.size(0), -1)).cpu().numpy()
+            return embed
+
+        def load_transreid():
+            model = timm.create_model('vit_base_patch16_224', pretrained=True, num_classes=0)
+            return torch_embedder(model.to(self.device).eval())
+
+        loaders = {
+            "tiger_reid": load_tiger_reid,
+            "wildlife_tools": lambda: load_megadescriptor("MegaDescriptor-L-384", 32),
+            "megadescriptor_b": lambda: load_megadescriptor("MegaDescriptor-B-224", 64),
+            "rapid_reid": lambda: torch_embedder(_load_rapid_backbone(self.device)),
+            "cvwc2019_reid": load_cvwc2019,
+            "transreid": load_transreid,
+        }
+
+        self.embedders = {}
+        self.load_errors = {}
+        for name, load in loaders.items():
+            try:
+                self.embedders[name] = load()
+            except Exception as e:
+                print(f"Warning: Could not load {name}: {e}")
+                self.load_errors[name] = str(e)
+
+        # One transform per tensor input size
+        self.transforms = {
+            size: transforms.Compose([
+                transforms.Resize(size),
+                transforms.ToTensor(),
+                transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+            ])
+            for kind, size, _ in MULTI_EMBEDDING_INPUTS.values()
+            if kind == "tensor"
+        }
+
+        print(f"MultiReIDModel loaded: {sorted(self.embedders)}")
+
+    @modal.method()
+    def generate_all_embeddings(
+        self,
+        image_bytes: bytes,
+        models: Optional[List[str]] = None,
+        encoding: str = "list"
+    ) -> Dict[str, Any]:
+        """
+        Generate embeddings from several models for one image.
+
+        Args:
+            image_bytes: Image as bytes
+            models: Models to run (defaults to all of MULTI_EMBEDDING_INPUTS)
+            encoding: Embedding wire format ("list", "float32" or "float16")
+
+        Returns:
+            Dictionary with "embeddings" mapping each requested model to its
+            own embedding result (same keys as generate_embedding)
+        """
+        from PIL import Image
+
+        try:
+            image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+        except Exception as e:
+            return {"embeddings": {}, "error": str(e), "success": False}
+
+        inputs: Dict[Any, Any] = {}
+        embeddings: Dict[str, Dict[str, Any]] = {}
+        for name in models or list(MULTI_EMBEDDING_INPUTS):
+            if name not in MULTI_EMBEDDING_INPUTS:
+                embeddings[name] = {
+                    "embedding": None,
+                    "error": f"Unknown model: {name}",
+                    "success": False
+                }
+                continue
+            if name not in self.embedders:
+                embeddings[name] = {
+                    "embedding": None,
+                    "error": self.load_errors.get(name, "Model not loaded"),
+                    "success": False
+                }
+                continue
+
+            kind, size, normalize = MULTI_EMBEDDING_INPUTS[name]
+            try:
+                key = (kind, size)
+                if key not in inputs:
+                    inputs[key] = (
+                        self.transforms[size](image) if kind == "tensor"
+                        else _center_crop_image(image, size)
+                    )
+
+                embedding_array = np.asarray(self.embedders[name](inputs[key])).flatten()
+                if normalize:
+                    norm = np.linalg.norm(embedding_array)
+                    if norm > 0:
+                        embedding_array = embedding_array / norm
+
+                embeddings[name] = {
+                    "embedding": _encode_embedding(embedding_array, encoding),
+                    "shape": embedding_array.shape,
+                    "success": True
+                }
+            except Exception as e:
+                embeddings[name] = {"embedding": None, "error": str(e), "success": False}
+
+        return {
+            "embeddings": embeddings,
+            "success": any(result["success"] for result in embeddings.values())
+        }
+
 
 # ==================== MatchAnything Model ====================
 
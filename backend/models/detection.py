@@ -1,10 +1,8 @@
 """MegaDetector v5 integration for tiger detection using Modal"""
 
-from PIL import Image
-import numpy as np
-from typing import List, Dict, Any, Optional
-import io
+from typing import List, Dict, Any, Optional, Union
 
+from backend.utils.image_artifact import ImageArtifact
 from backend.utils.logging import get_logger
 from backend.services.modal_client import get_modal_client
 from backend.config.settings import get_settings
@@ -56,24 +54,25 @@ class TigerDetectionModel(BaseDetectionModel):
         logger.info("Model loading handled by Modal backend")
         pass
     
-    async def detect(self, image_bytes: bytes) -> Dict[str, Any]:
+    async def detect(self, image: Union[bytes, ImageArtifact]) -> Dict[str, Any]:
         """
         Detect tigers in an image using Modal.
         
         Args:
-            image_bytes: Image bytes
+            image: Image bytes, or an ImageArtifact to decode only once
             
         Returns:
-            Dictionary with detections including bounding boxes and crops
+            Dictionary with detections including bounding boxes and crops.
+            Each detection carries its crop as a PIL image ("crop") and as an
+            ImageArtifact ("artifact") for downstream stages to reuse.
         """
         try:
-            # Load image for cropping
-            image = Image.open(io.BytesIO(image_bytes))
-            original_size = image.size
+            artifact = ImageArtifact.coerce(image)
+            original_size = artifact.size
             
             # Call Modal service
             result = await self.modal_client.megadetector_detect(
-                image,
+                artifact,
                 confidence_threshold=self.confidence_threshold
             )
             
@@ -92,13 +91,14 @@ class TigerDetectionModel(BaseDetectionModel):
                         x2 = max(0, min(x2, original_size[0]))
                         y2 = max(0, min(y2, original_size[1]))
                         
-                        # Crop tiger from image
-                        crop = image.crop((x1, y1, x2, y2))
+                        # Crop tiger from the already decoded pixels
+                        crop = artifact.crop((x1, y1, x2, y2))
                         
                         detections.append({
                             "bbox": [float(x1), float(y1), float(x2), float(y2)],
                             "confidence": float(detection.get("confidence", 0.0)),
-                            "crop": crop,
+                            "crop": crop.image,
+                            "artifact": crop,
                             "original_size": original_size,
                             "category": detection.get("category", "animal"),
                             "class_id": detection.get("class_id", 0)
@@ -107,7 +107,8 @@ class TigerDetectionModel(BaseDetectionModel):
                 return {
                     "detections": detections,
                     "count": len(detections),
-                    "image_size": original_size
+                    "image_size": original_size,
+                    "artifact": artifact
                 }
             else:
                 error_msg = result.get("error", "Unknown error")
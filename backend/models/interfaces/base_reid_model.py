@@ -9,6 +9,8 @@ from typing import Optional, List, Tuple
 import numpy as np
 from PIL import Image
 
+from backend.utils.image_artifact import ImageArtifact
+
 
 class BaseReIDModel(ABC):
     """Abstract base class for Re-ID (Re-Identification) models.
@@ -98,6 +100,24 @@ class BaseReIDModel(ABC):
             image = image.convert('RGB')
         return await self.generate_embedding(image)
 
+    async def generate_embedding_from_artifact(self, artifact: ImageArtifact) -> np.ndarray:
+        """Generate an embedding vector from a shared image artifact.
+
+        The default uses the artifact's decoded image, so pipeline stages
+        never decode the same bytes twice. Remote models override this to
+        pass the artifact on and reuse its cached encodings.
+
+        Args:
+            artifact: Decoded image shared across pipeline stages
+
+        Returns:
+            Normalized embedding vector as numpy array
+
+        Raises:
+            RuntimeError: If embedding generation fails
+        """
+        return await self.generate_embedding(artifact.image)
+
     def compute_similarity(
         self,
         embedding1: np.ndarray,
@@ -15,11 +15,11 @@ Integration approach:
 Requires: pip install "git+https://github.com/huggingface/transformers@22e89e538529420b2ddae6af70865655bc5c22d8"
 """
 
-from typing import Dict, List, Tuple, Any, Optional
-import io
+from typing import Dict, List, Tuple, Any, Optional, Union
 import numpy as np
 from PIL import Image
 
+from backend.utils.image_artifact import ImageArtifact, encode_image, to_pil
 from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -120,15 +120,18 @@ class MatchAnythingModel:
 
     async def match_pair(
         self,
-        img1: Image.Image,
-        img2: Image.Image
+        img1: Union[Image.Image, ImageArtifact, bytes],
+        img2: Union[Image.Image, ImageArtifact, bytes]
     ) -> Dict[str, Any]:
         """
         Compare two images and return match quality metrics.
 
         Args:
-            img1: First PIL Image (query)
-            img2: Second PIL Image (candidate)
+            img1: First PIL Image, ImageArtifact or encoded bytes (query); an
+                artifact is decoded and encoded once across repeated
+                comparisons, bytes (e.g. precomputed verification features)
+                are sent as-is
+            img2: Second PIL Image, ImageArtifact or encoded bytes (candidate)
 
         Returns:
             Dictionary with matching metrics:
@@ -143,8 +146,8 @@ class MatchAnythingModel:
 
     async def _match_pair_local(
         self,
-        img1: Image.Image,
-        img2: Image.Image
+        img1: Union[Image.Image, ImageArtifact, bytes],
+        img2: Union[Image.Image, ImageArtifact, bytes]
     ) -> Dict[str, Any]:
         """Run matching locally."""
         if self._model is None:
@@ -156,8 +159,8 @@ class MatchAnythingModel:
 
         try:
             # Ensure RGB
-            img1 = img1.convert("RGB")
-            img2 = img2.convert("RGB")
+            img1 = to_pil(img1).convert("RGB")
+            img2 = to_pil(img2).convert("RGB")
 
             # Prepare inputs
             inputs = self._processor([img1, img2], return_tensors="pt")
@@ -192,8 +195,8 @@ class MatchAnythingModel:
 
     async def _match_pair_modal(
         self,
-        img1: Image.Image,
-        img2: Image.Image
+        img1: Union[Image.Image, ImageArtifact, bytes],
+        img2: Union[Image.Image, ImageArtifact, bytes]
     ) -> Dict[str, Any]:
         """Run matching via Modal."""
         if self._modal_client is None:
@@ -201,14 +204,9 @@ class MatchAnythingModel:
             self._modal_client = get_modal_client()
 
         try:
-            # Convert images to bytes
-            buffer1 = io.BytesIO()
-            img1.save(buffer1, format='JPEG')
-            img1_bytes = buffer1.getvalue()
-
-            buffer2 = io.BytesIO()
-            img2.save(buffer2, format='JPEG')
-            img2_bytes = buffer2.getvalue()
+            # Convert images to bytes (artifacts reuse their cached JPEG)
+            img1_bytes = img1 if isinstance(img1, bytes) else encode_image(img1)
+            img2_bytes = img2 if isinstance(img2, bytes) else encode_image(img2)
 
             # Call Modal
             result = await self._modal_client.matchanything_match(
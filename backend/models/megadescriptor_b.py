@@ -15,6 +15,7 @@ import io
 import numpy as np
 from PIL import Image
 
+from backend.utils.image_artifact import ImageArtifact
 from backend.utils.logging import get_logger
 from backend.services.modal_client import get_modal_client
 from backend.config.settings import get_settings
@@ -49,11 +50,14 @@ class MegaDescriptorBReIDModel(BaseReIDModel):
         logger.info("Model loading handled by Modal backend")
         pass
 
-    async def generate_embedding(self, image: Union[Image.Image, bytes]) -> np.ndarray:
+    async def generate_embedding(
+        self,
+        image: Union[Image.Image, bytes, ImageArtifact]
+    ) -> np.ndarray:
         """Generate embedding for an image using Modal.
 
         Args:
-            image: PIL Image or image bytes
+            image: PIL Image, image bytes or ImageArtifact
 
         Returns:
             Embedding vector (numpy array)
@@ -66,14 +70,14 @@ class MegaDescriptorBReIDModel(BaseReIDModel):
             if isinstance(image, bytes):
                 image = Image.open(io.BytesIO(image))
 
-            if image.mode != 'RGB':
+            if isinstance(image, Image.Image) and image.mode != 'RGB':
                 image = image.convert('RGB')
 
             # Call Modal service
             result = await self.modal_client.megadescriptor_b_embedding(image)
 
             if result.get("success"):
-                embedding = np.array(result["embedding"])
+                embedding = np.asarray(result["embedding"])
 
                 # Normalize
                 embedding = self.normalize_embedding(embedding)
@@ -87,6 +91,17 @@ class MegaDescriptorBReIDModel(BaseReIDModel):
             logger.error(f"Failed to generate embedding: {e}")
             raise RuntimeError(f"Failed to generate embedding: {e}")
 
+    async def generate_embedding_from_artifact(self, artifact: ImageArtifact) -> np.ndarray:
+        """Generate embedding, reusing the artifact's cached JPEG encoding.
+
+        Args:
+            artifact: Decoded image shared across pipeline stages
+
+        Returns:
+            Embedding vector (numpy array)
+        """
+        return await self.generate_embedding(artifact)
+
     async def generate_embedding_from_bytes(self, image_bytes: bytes) -> np.ndarray:
         """Generate embedding directly from image bytes.
 
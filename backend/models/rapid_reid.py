@@ -9,6 +9,7 @@ import io
 from PIL import Image
 import numpy as np
 
+from backend.utils.image_artifact import ImageArtifact
 from backend.utils.logging import get_logger
 from backend.services.modal_client import get_modal_client
 from backend.config.settings import get_settings
@@ -54,12 +55,15 @@ class RAPIDReIDModel(BaseReIDModel):
         logger.info("Model loading handled by Modal backend")
         pass
     
-    async def generate_embedding(self, image: Union[Image.Image, bytes]) -> np.ndarray:
+    async def generate_embedding(
+        self,
+        image: Union[Image.Image, bytes, ImageArtifact]
+    ) -> np.ndarray:
         """
         Generate embedding for an image using RAPID via Modal.
 
         Args:
-            image: PIL Image or image bytes
+            image: PIL Image, image bytes or ImageArtifact
 
         Returns:
             Embedding vector (numpy array)
@@ -76,7 +80,7 @@ class RAPIDReIDModel(BaseReIDModel):
             result = await self.modal_client.rapid_reid_embedding(image)
 
             if result.get("success"):
-                embedding = np.array(result["embedding"])
+                embedding = np.asarray(result["embedding"])
 
                 # Normalize
                 embedding = self.normalize_embedding(embedding)
@@ -95,7 +99,18 @@ class RAPIDReIDModel(BaseReIDModel):
         except Exception as e:
             logger.error(f"Error generating RAPID embedding: {e}")
             raise RuntimeError(f"Failed to generate embedding: {e}")
-    
+
+    async def generate_embedding_from_artifact(self, artifact: ImageArtifact) -> np.ndarray:
+        """Generate embedding, reusing the artifact's cached JPEG encoding.
+
+        Args:
+            artifact: Decoded image shared across pipeline stages
+
+        Returns:
+            Embedding vector (numpy array)
+        """
+        return await self.generate_embedding(artifact)
+
     def compare_embeddings(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
         Compare two embeddings and return similarity score using cosine similarity.
@@ -3,9 +3,10 @@
 import os
 from PIL import Image
 import numpy as np
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
 import io
 
+from backend.utils.image_artifact import ImageArtifact
 from backend.utils.logging import get_logger
 from backend.services.modal_client import get_modal_client
 from backend.config.settings import get_settings
@@ -48,14 +49,14 @@ class TigerReIDModel(BaseReIDModel):
     
     async def generate_embedding(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, ImageArtifact],
         use_flip: bool = False
     ) -> np.ndarray:
         """
         Generate embedding for a tiger image using Modal.
         
         Args:
-            image: PIL Image of tiger
+            image: PIL Image or ImageArtifact of tiger
             use_flip: Whether to also use horizontally flipped version (not supported in Modal yet)
             
         Returns:
@@ -66,7 +67,7 @@ class TigerReIDModel(BaseReIDModel):
             result = await self.modal_client.tiger_reid_embedding(image)
             
             if result.get("success"):
-                embedding = np.array(result["embedding"])
+                embedding = np.asarray(result["embedding"])
                 
                 # Normalize
                 embedding = embedding / np.linalg.norm(embedding)
@@ -81,6 +82,17 @@ class TigerReIDModel(BaseReIDModel):
             logger.error("Error generating embedding", error=str(e))
             raise
     
+    async def generate_embedding_from_artifact(self, artifact: ImageArtifact) -> np.ndarray:
+        """Generate embedding, reusing the artifact's cached JPEG encoding.
+
+        Args:
+            artifact: Decoded image shared across pipeline stages
+
+        Returns:
+            Embedding vector (numpy array)
+        """
+        return await self.generate_embedding(artifact)
+
     async def generate_embedding_from_bytes(self, image_bytes: bytes) -> np.ndarray:
         """Generate embedding from image bytes"""
         image = Image.open(io.BytesIO(image_bytes))
@@ -9,6 +9,7 @@ from backend.repositories.tiger_repository import TigerRepository
 from backend.repositories.investigation_repository import InvestigationRepository
 from backend.repositories.facility_repository import FacilityRepository
 from backend.repositories.user_repository import UserRepository
+from backend.repositories.background_job_repository import BackgroundJobRepository
 
 __all__ = [
     "BaseRepository",
@@ -16,4 +17,5 @@ __all__ = [
     "InvestigationRepository",
     "FacilityRepository",
     "UserRepository",
+    "BackgroundJobRepository",
 ]
@@ -0,0 +1,34 @@
+"""Repository for BackgroundJob data access."""
+
+from typing import List
+from sqlalchemy.orm import Session
+from sqlalchemy import desc
+
+from backend.database.models import BackgroundJob
+from backend.repositories.base import BaseRepository
+
+
+class BackgroundJobRepository(BaseRepository[BackgroundJob]):
+    """Repository for BackgroundJob data access."""
+
+    def __init__(self, db: Session):
+        super().__init__(db, BackgroundJob)
+
+    def get_unfinished(self, job_type: str) -> List[BackgroundJob]:
+        """Get jobs of a type that have not completed, newest first.
+
+        Args:
+            job_type: Job type to filter by
+
+        Returns:
+            List of BackgroundJob objects
+        """
+        return (
+            self.db.query(BackgroundJob)
+            .filter(
+                BackgroundJob.job_type == job_type,
+                BackgroundJob.status != "completed"
+            )
+            .order_by(desc(BackgroundJob.created_at), desc(BackgroundJob.started_at))
+            .all()
+        )
@@ -14,8 +14,11 @@ import numpy as np
 
 from backend.database.models import TigerImage, Tiger
 from backend.database.vector_search import (
+    LEGACY_MODEL_NAME,
     store_embedding,
+    store_embeddings_bulk,
     find_matching_tigers,
+    get_tiger_embeddings,
 )
 from backend.utils.logging import get_logger
 
@@ -31,10 +34,22 @@ class EmbeddingService:
     def store_image_embedding(
         self,
         image_id: UUID,
-        embedding: np.ndarray
+        embedding: np.ndarray,
+        model_name: Optional[str] = None
     ) -> bool:
-        """Store embedding vector for an image"""
-        return store_embedding(self.session, str(image_id), embedding)
+        """Store embedding vector for an image in its model's vector table"""
+        return store_embedding(self.session, str(image_id), embedding, model_name=model_name)
+    
+    def store_image_embeddings(
+        self,
+        image_ids: List[UUID],
+        embeddings: np.ndarray,
+        model_name: Optional[str] = None
+    ) -> int:
+        """Store one model's embeddings for many images in a single transaction"""
+        return store_embeddings_bulk(
+            self.session, model_name, [str(image_id) for image_id in image_ids], embeddings
+        )
     
     def find_matching_tigers_by_embedding(
         self,
@@ -42,7 +57,10 @@ class EmbeddingService:
         tiger_id: Optional[UUID] = None,
         side_view: Optional[str] = None,
         limit: int = 5,
-        similarity_threshold: float = 0.8
+        similarity_threshold: float = 0.8,
+        model_name: Optional[str] = None,
+        is_reference: Optional[bool] = None,
+        verified: Optional[bool] = None
     ) -> List[Dict]:
         """Find matching tigers based on embedding similarity"""
         return find_matching_tigers(
@@ -51,22 +69,27 @@ class EmbeddingService:
             str(tiger_id) if tiger_id else None,
             side_view,
             limit,
-            similarity_threshold
+            similarity_threshold,
+            model_name=model_name,
+            is_reference=is_reference,
+            verified=verified
         )
     
     def search_similar_images(
         self,
         query_embedding: np.ndarray,
         limit: int = 10,
-        similarity_threshold: float = 0.8
+        similarity_threshold: float = 0.8,
+        model_name: Optional[str] = None
     ) -> List[Dict]:
         """Search for similar images using embedding"""
-        # Use find_matching_tigers which queries vec_embeddings
+        # Use find_matching_tigers which queries the model's vec_embeddings_* table
         return find_matching_tigers(
             self.session,
             query_embedding,
             limit=limit,
-            similarity_threshold=similarity_threshold
+            similarity_threshold=similarity_threshold,
+            model_name=model_name
         )
     
     def get_image_embedding(self, image_id: UUID) -> Optional[np.ndarray]:
@@ -85,7 +108,8 @@ class EmbeddingService:
         self,
         image_id: UUID,
         embedding: np.ndarray,
-        side_view: Optional[str] = None
+        side_view: Optional[str] = None,
+        model_name: Optional[str] = None
     ) -> bool:
         """
         Update embedding for an image.
@@ -94,6 +118,8 @@ class EmbeddingService:
             image_id: UUID of the image to update
             embedding: Embedding vector (numpy array)
             side_view: Optional side view identifier (e.g., 'left', 'right')
+            model_name: Model that produced the embedding (inferred from
+                dimension if None)
 
         Returns:
             True if update was successful, False if image not found
@@ -112,7 +138,7 @@ class EmbeddingService:
 
         try:
             # Store embedding (this commits its own transaction)
-            store_embedding(self.session, str(image_id), embedding)
+            store_embedding(self.session, str(image_id), embedding, model_name=model_name)
 
             # Update side_view if provided (separate update)
             if side_view:
@@ -183,7 +209,8 @@ class EmbeddingService:
     def get_tiger_multi_view_embeddings(
         self,
         tiger_id: UUID,
-        side_views: Optional[List[str]] = None
+        side_views: Optional[List[str]] = None,
+        model_name: str = LEGACY_MODEL_NAME
     ) -> Dict[str, np.ndarray]:
         """
         Get all embeddings for a tiger, optionally filtered by side view.
@@ -192,46 +219,38 @@ class EmbeddingService:
             tiger_id: Tiger UUID
             side_views: Optional list of side views to include
                        (e.g., ["left_flank", "right_flank"])
+            model_name: Model whose vector table to read
 
         Returns:
             Dictionary mapping image_id -> embedding
         """
-        query = self.session.query(TigerImage).filter(
-            TigerImage.tiger_id == tiger_id,
-            TigerImage.embedding.isnot(None)
-        )
-
-        if side_views:
-            query = query.filter(TigerImage.side_view.in_(side_views))
-
-        images = query.all()
-
-        embeddings = {}
-        for image in images:
-            if image.embedding is not None:
-                embeddings[str(image.image_id)] = np.array(image.embedding)
+        embeddings = get_tiger_embeddings(self.session, str(tiger_id), model_name, side_views)
 
-        logger.info(f"Retrieved {len(embeddings)} embeddings for tiger {tiger_id}")
+        logger.info(f"Retrieved {len(embeddings)} {model_name} embeddings for tiger {tiger_id}")
         return embeddings
 
     def get_fused_tiger_embedding(
         self,
         tiger_id: UUID,
-        fusion_method: str = "average"
+        fusion_method: str = "average",
+        model_name: str = LEGACY_MODEL_NAME
     ) -> Optional[np.ndarray]:
         """
         Get a fused embedding for a tiger from all their stored images.
 
         This creates a more robust representation by combining multiple views.
+        With "average" fusion this is the tiger's prototype used by two-stage
+        search (see ``prototype_index.py``).
 
         Args:
             tiger_id: Tiger UUID
             fusion_method: How to combine embeddings ("average", "max", "weighted")
+            model_name: Model whose embeddings to fuse
 
         Returns:
             Fused embedding or None if no embeddings found
         """
-        embeddings_dict = self.get_tiger_multi_view_embeddings(tiger_id)
+        embeddings_dict = self.get_tiger_multi_view_embeddings(tiger_id, model_name=model_name)
 
         if not embeddings_dict:
             return None
@@ -244,7 +263,8 @@ class EmbeddingService:
         query_embeddings: List[np.ndarray],
         limit: int = 5,
         similarity_threshold: float = 0.8,
-        fusion_method: str = "average"
+        fusion_method: str = "average",
+        model_name: Optional[str] = None
     ) -> List[Dict]:
         """
         Find matching tigers using multiple query embeddings (multi-view query).
@@ -257,6 +277,7 @@ class EmbeddingService:
             limit: Maximum number of results
             similarity_threshold: Minimum similarity for a match
             fusion_method: How to fuse query embeddings
+            model_name: Model that produced the query embeddings
 
         Returns:
             List of match dictionaries
@@ -272,7 +293,8 @@ class EmbeddingService:
             self.session,
             fused_query,
             limit=limit,
-            similarity_threshold=similarity_threshold
+            similarity_threshold=similarity_threshold,
+            model_name=model_name
         )
 
     def filter_embedding_quality(
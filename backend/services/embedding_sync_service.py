@@ -0,0 +1,332 @@
+"""
+Resumable re-index of the per-model embedding tables.
+
+Walks tiger_images in image_id (keyset) order, loads each image, embeds
+batches through the model's client and writes every batch with
+``store_embeddings_bulk``. Progress is checkpointed to a ``BackgroundJob``
+row in the same transaction as the batch it describes, so a run that
+crashes resumes after the last committed image instead of starting over.
+A batch the model fails to embed (or answers with mock or fallback
+embeddings while Modal is down) fails the job at that checkpoint, so the
+resumed run embeds it again rather than leaving a hole in the gallery.
+
+Use it to rebuild a gallery after a model upgrade or a corrupted vec table:
+
+    python scripts/sync_embeddings.py --model wildlife_tools
+"""
+
+import asyncio
+import io
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from backend.database.models import BackgroundJob
+from backend.database.vector_search import (
+    MODEL_NAME_ALIASES,
+    get_vec_table_name,
+    resolve_model_name,
+    store_embeddings_bulk,
+)
+from backend.database.gallery_index import (
+    bump_table_generation,
+    follow_table_generation,
+    get_loaded_gallery_index,
+)
+from backend.database.hnsw_index import get_loaded_hnsw_index
+from backend.database.identification_cache import bump_gallery_generation
+from backend.database.knn_graph import get_loaded_knn_graph
+from backend.database.prototype_index import mark_prototypes_stale
+from backend.models.interfaces.base_reid_model import BaseReIDModel
+from backend.repositories.background_job_repository import BackgroundJobRepository
+from backend.services.modal_client import track_fallbacks
+from backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+JOB_TYPE = "embedding_sync"
+DEFAULT_BATCH_SIZE = 32
+
+# Relative image paths are resolved against the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class EmbeddingSyncService:
+    """Service for rebuilding a model's embedding table from tiger_images"""
+
+    def __init__(
+        self,
+        session: Session,
+        model: Optional[BaseReIDModel] = None,
+        image_root: Optional[Path] = None
+    ):
+        """
+        Initialize the sync service.
+
+        Args:
+            session: Database session
+            model: ReID model client (defaults to the ModelLoader instance)
+            image_root: Base directory for relative image paths
+        """
+        self.session = session
+        self.job_repo = BackgroundJobRepository(session)
+        self._model = model
+        self.image_root = Path(image_root) if image_root else PROJECT_ROOT
+
+    def _get_model(self, model_name: str) -> BaseReIDModel:
+        if self._model is None:
+            from backend.services.tiger.model_loader import get_model_loader
+
+            # ModelLoader keys are the short aliases (e.g. "cvwc2019")
+            loader_names = {canonical: alias for alias, canonical in MODEL_NAME_ALIASES.items()}
+            self._model = get_model_loader().get_model(loader_names.get(model_name, model_name))
+        return self._model
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def find_resumable_job(self, model_name: str) -> Optional[BackgroundJob]:
+        """Get the most recent unfinished sync job for a model."""
+        for job in self.job_repo.get_unfinished(JOB_TYPE):
+            if json.loads(job.parameters or "{}").get("model_name") == model_name:
+                return job
+        return None
+
+    def _start_job(
+        self,
+        model_name: str,
+        batch_size: int,
+        job_id: Optional[str],
+        resume: bool
+    ) -> BackgroundJob:
+        if job_id is not None:
+            job = self.job_repo.get_by_id(job_id)
+            if job is None or job.job_type != JOB_TYPE:
+                raise ValueError(f"Embedding sync job {job_id} not found")
+        else:
+            job = self.find_resumable_job(model_name) if resume else None
+
+        if job is None:
+            job = BackgroundJob(
+                job_type=JOB_TYPE,
+                status="running",
+                parameters=json.dumps({"model_name": model_name, "batch_size": batch_size}),
+                result=json.dumps(_empty_progress()),
+                started_at=datetime.utcnow()
+            )
+            self.session.add(job)
+        else:
+            logger.info(f"Resuming embedding sync job {job.job_id}")
+            job.status = "running"
+            job.error_message = None
+            job.retry_count = (job.retry_count or 0) + 1
+
+        self.session.commit()
+        return job
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    async def run(
+        self,
+        model_name: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        job_id: Optional[str] = None,
+        resume: bool = True,
+        prune_orphans: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Re-embed every tiger image for one model.
+
+        Args:
+            model_name: Model to rebuild (defaults to wildlife_tools)
+            batch_size: Images per embedding call and per transaction
+            job_id: Resume this BackgroundJob
+            resume: Resume the model's latest unfinished job when job_id is
+                not given (False always starts from the first image)
+            prune_orphans: Remove vec rows for images that no longer exist
+                once every image has been synced
+
+        Returns:
+            Progress dict with job_id, status, counts and images_per_sec
+        """
+        model_name = resolve_model_name(model_name or "wildlife_tools")
+        job = self._start_job(model_name, batch_size, job_id, resume)
+        progress = {**_empty_progress(), **json.loads(job.result or "{}")}
+
+        started = time.monotonic()
+        processed_this_run = 0
+        try:
+            model = self._get_model(model_name)
+            while True:
+                rows = self._next_batch(progress["last_image_id"], batch_size)
+                if not rows:
+                    break
+
+                images = await asyncio.to_thread(self._load_images, rows)
+                loaded = [(row, image) for row, image in zip(rows, images) if image is not None]
+                progress["skipped"] += len(rows) - len(loaded)
+
+                ids, embeddings, tiger_ids = await self._embed(model, loaded)
+                progress["failed"] += len(loaded) - len(ids)
+                if ids:
+                    progress["stored"] += store_embeddings_bulk(
+                        self.session, model_name, ids, np.stack(embeddings), tiger_ids, commit=False
+                    )
+
+                # Checkpoint in the same transaction as the batch
+                processed_this_run += len(rows)
+                elapsed = time.monotonic() - started
+                progress["processed"] += len(rows)
+                progress["last_image_id"] = str(rows[-1].image_id)
+                progress["images_per_sec"] = round(processed_this_run / elapsed, 2) if elapsed > 0 else 0.0
+                job.result = json.dumps(progress)
+                self.session.commit()
+
+                logger.info(
+                    f"Embedding sync {model_name}: {progress['processed']} images "
+                    f"({progress['stored']} stored, {progress['failed']} failed, "
+                    f"{progress['skipped']} skipped) at {progress['images_per_sec']:.1f} images/sec"
+                )
+
+            if prune_orphans:
+                progress["pruned"] = self._prune_orphans(model_name)
+
+            job.status = "completed"
+            job.completed_at = datetime.utcnow()
+            job.result = json.dumps(progress)
+            self.session.commit()
+
+        except Exception as e:
+            logger.error(f"Embedding sync job {job.job_id} failed: {e}", exc_info=True)
+            self.session.rollback()
+            job.status = "failed"
+            job.error_message = str(e)
+            self.session.commit()
+            progress = json.loads(job.result or "{}")
+
+        return {"job_id": job.job_id, "model_name": model_name, "status": job.status, **progress}
+
+    def _next_batch(self, after: str, batch_size: int) -> List[Any]:
+        """Next images after ``after`` in image_id order."""
+        return self.session.execute(
+            text("""
+                SELECT image_id, tiger_id, image_path FROM tiger_images
+                WHERE image_id > :after
+                ORDER BY image_id
+                LIMIT :batch_size
+            """),
+            {"after": after, "batch_size": batch_size}
+        ).fetchall()
+
+    def _resolve_path(self, image_path: Optional[str]) -> Optional[Path]:
+        if not image_path:
+            return None
+        path = Path(image_path)
+        if not path.is_absolute() and not path.exists():
+            path = self.image_root / path
+        return path if path.exists() else None
+
+    def _load_images(self, rows: List[Any]) -> List[Optional[Image.Image]]:
+        """Read and decode a batch of images (runs in a worker thread)."""
+        images = []
+        for row in rows:
+            path = self._resolve_path(row.image_path)
+            if path is None:
+                logger.debug(f"Image file missing for {row.image_id}: {row.image_path}")
+                images.append(None)
+                continue
+            try:
+                image = Image.open(io.BytesIO(path.read_bytes()))
+                images.append(image.convert("RGB") if image.mode != "RGB" else image)
+            except Exception as e:
+                logger.warning(f"Failed to load image {row.image_id}: {e}")
+                images.append(None)
+        return images
+
+    async def _embed(
+        self,
+        model: BaseReIDModel,
+        loaded: List[Tuple[Any, Image.Image]]
+    ) -> Tuple[List[str], List[np.ndarray], List[Optional[str]]]:
+        """Embed one batch, dropping images the model could not embed.
+
+        Raises:
+            RuntimeError: If the batch call fails or any embedding came from
+                a mock or fallback response, so the job stops before its
+                checkpoint moves past the batch
+        """
+        if not loaded:
+            return [], [], []
+        try:
+            with track_fallbacks() as fallbacks:
+                embeddings = await model.batch_generate_embeddings([image for _, image in loaded])
+        except Exception as e:
+            raise RuntimeError(f"Batch embedding failed ({len(loaded)} images): {e}") from e
+        if fallbacks:
+            raise RuntimeError(
+                f"Batch embedding used mock or fallback responses for {sorted(set(fallbacks))}"
+            )
+
+        ids, vectors, tiger_ids = [], [], []
+        for (row, _), embedding in zip(loaded, embeddings):
+            if embedding is None:
+                continue
+            ids.append(str(row.image_id))
+            vectors.append(np.asarray(embedding, dtype=np.float32).reshape(-1))
+            tiger_ids.append(str(row.tiger_id) if row.tiger_id else None)
+        return ids, vectors, tiger_ids
+
+    def _prune_orphans(self, model_name: str) -> int:
+        """Delete vec rows whose image no longer exists."""
+        table = get_vec_table_name(model_name)
+        rows = self.session.execute(text(f"""
+            SELECT image_id, tiger_id FROM {table}
+            WHERE image_id NOT IN (SELECT image_id FROM tiger_images)
+        """)).fetchall()
+        if not rows:
+            return 0
+
+        orphans = [str(row.image_id) for row in rows]
+        owners = {row.tiger_id for row in rows if row.tiger_id}
+        delete = text(f"DELETE FROM {table} WHERE image_id IN :image_ids").bindparams(
+            bindparam("image_ids", expanding=True)
+        )
+        for start in range(0, len(orphans), 500):
+            self.session.execute(delete, {"image_ids": orphans[start:start + 500]})
+        generation = bump_table_generation(self.session, table)
+        self.session.commit()
+
+        for index in (
+            get_loaded_gallery_index(model_name),
+            get_loaded_hnsw_index(model_name),
+            get_loaded_knn_graph(model_name),
+        ):
+            if index is not None:
+                for image_id in orphans:
+                    index.remove(image_id)
+                follow_table_generation(index, generation)
+        mark_prototypes_stale(owners, model_name)
+        bump_gallery_generation()
+        logger.info(f"Pruned {len(orphans)} orphaned {model_name} embeddings")
+        return len(orphans)
+
+
+def _empty_progress() -> Dict[str, Any]:
+    return {
+        "last_image_id": "",
+        "processed": 0,
+        "stored": 0,
+        "failed": 0,
+        "skipped": 0,
+        "images_per_sec": 0.0,
+    }
@@ -32,7 +32,11 @@ from PIL import Image
 from sqlalchemy.orm import Session
 
 from backend.database.models import Tiger, TigerImage, Facility, TigerStatus, SideView
-from backend.database.vector_search import find_matching_tigers, store_embedding
+from backend.database.vector_search import (
+    find_matching_tigers,
+    find_matching_tigers_batch,
+    store_embedding,
+)
 from backend.services.tiger_service import TigerService
 from backend.services.facility_crawler_service import DiscoveredImage
 from backend.services.investigation_trigger_service import InvestigationTriggerService
@@ -61,6 +65,17 @@ class QualityScore:
     issues: List[str]
 
 
+@dataclass
+class PreparedImage:
+    """Discovered image that has been downloaded, detected, cropped and embedded."""
+    source: DiscoveredImage
+    image_bytes: bytes
+    cropped_bytes: bytes
+    embeddings: Dict[str, np.ndarray]
+    detection: Dict[str, Any]
+    quality: QualityScore
+
+
 @dataclass
 class ProcessedTiger:
     """Result of processing a tiger image."""
@@ -196,14 +211,38 @@ class ImagePipelineService:
 
         processed_tigers: List[ProcessedTiger] = []
 
+        # 1-5. Download, dedupe, quality check, detect, crop and embed
+        prepared_images: List[PreparedImage] = []
+        seen_hashes = set()
         for image in images:
             try:
-                result = await self._process_single_image(image, facility)
+                prepared = await self._prepare_image(image, seen_hashes)
+                if prepared:
+                    prepared_images.append(prepared)
+            except Exception as e:
+                logger.warning(f"Failed to process image {image.url}: {e}")
+                continue
+
+        # 6. Search the gallery for every crop in one batched query
+        batch_matches = await self._find_matches_batch(
+            [prepared.embeddings for prepared in prepared_images]
+        )
+
+        # 7-8. Create/update records in discovery order. Tigers stored earlier
+        # in this batch are not in the batched search results, so match
+        # against them in memory.
+        stored: List[Tuple[str, np.ndarray]] = []
+        for prepared, matches in zip(prepared_images, batch_matches):
+            try:
+                matches = self._merge_batch_matches(prepared.embeddings, matches, stored)
+                result = await self._finalize_image(prepared, matches, facility)
                 if result:
                     processed_tigers.append(result)
-
+                    stored.append((str(result.tiger.tiger_id), prepared.embeddings["primary"]))
             except Exception as e:
-                logger.warning(f"Failed to process image {image.url}: {e}")
+                logger.warning(f"Failed to process image {prepared.source.url}: {e}")
+                # Drop this image's uncommitted records before the next one
+                self.db.rollback()
                 continue
 
         new_tigers = sum(1 for t in processed_tigers if t.is_new)
@@ -226,6 +265,30 @@ class ImagePipelineService:
         Returns:
             ProcessedTiger if successful, None otherwise
         """
+        prepared = await self._prepare_image(image)
+        if not prepared:
+            return None
+
+        # 6. Search for matches
+        matches = await self._find_matches(prepared.embeddings)
+
+        return await self._finalize_image(prepared, matches, facility)
+
+    async def _prepare_image(
+        self,
+        image: DiscoveredImage,
+        seen_hashes: Optional[set] = None
+    ) -> Optional[PreparedImage]:
+        """
+        Run the per-image steps that do not depend on the gallery.
+
+        Args:
+            image: Discovered image to process
+            seen_hashes: Content hashes already taken by this batch
+
+        Returns:
+            PreparedImage if the image should be matched, None otherwise
+        """
         self._stats["images_processed"] += 1
 
         # 1. Download image
@@ -242,6 +305,13 @@ class ImagePipelineService:
             self._stats["duplicates_skipped"] += 1
             return None
 
+        if seen_hashes is not None:
+            if content_hash in seen_hashes:
+                logger.debug(f"Duplicate image skipped: {image.url} (repeated in batch)")
+                self._stats["duplicates_skipped"] += 1
+                return None
+            seen_hashes.add(content_hash)
+
         # Store hash in image metadata for later use
         image.content_hash = content_hash
 
@@ -272,8 +342,36 @@ class ImagePipelineService:
             logger.warning(f"Failed to generate embeddings for {image.url}")
             return None
 
-        # 6. Search for matches
-        matches = await self._find_matches(embeddings)
+        return PreparedImage(
+            source=image,
+            image_bytes=image_bytes,
+            cropped_bytes=cropped_bytes,
+            embeddings=embeddings,
+            detection=detection,
+            quality=quality
+        )
+
+    async def _finalize_image(
+        self,
+        prepared: PreparedImage,
+        matches: List[Dict],
+        facility: Facility
+    ) -> ProcessedTiger:
+        """
+        Create or update the tiger record for a prepared image.
+
+        Args:
+            prepared: Image that has been detected and embedded
+            matches: Ranked gallery matches for the image
+            facility: Associated facility
+
+        Returns:
+            ProcessedTiger for the new or updated tiger
+        """
+        image = prepared.source
+        cropped_bytes = prepared.cropped_bytes
+        embeddings = prepared.embeddings
+        detection = prepared.detection
 
         # 7. Create or update tiger record
         processed_tiger: ProcessedTiger
@@ -313,9 +411,9 @@ class ImagePipelineService:
         # 8. Trigger auto-investigation if criteria met (fire-and-forget, non-blocking)
         await self._maybe_trigger_auto_investigation(
             processed_tiger=processed_tiger,
-            image_bytes=image_bytes,
+            image_bytes=prepared.image_bytes,
             facility=facility,
-            quality_score=quality.score
+            quality_score=prepared.quality.score
         )
 
         return processed_tiger
@@ -549,8 +647,9 @@ class ImagePipelineService:
             matches = find_matching_tigers(
                 self.db,
                 primary_embedding,
-                top_k=5,
-                min_similarity=0.5
+                limit=5,
+                similarity_threshold=0.5,
+                model_name="wildlife_tools"
             )
 
             return matches
@@ -559,6 +658,72 @@ class ImagePipelineService:
             logger.warning(f"Match search failed: {e}")
             return []
 
+    async def _find_matches_batch(
+        self,
+        embeddings_list: List[Dict[str, np.ndarray]]
+    ) -> List[List[Dict]]:
+        """
+        Search database for matching tigers for a batch of crops at once.
+
+        Args:
+            embeddings_list: Embedding dicts (with a "primary" entry) per crop
+
+        Returns:
+            Ranked matches per crop, in input order
+        """
+        if not embeddings_list:
+            return []
+
+        try:
+            matrix = np.stack([
+                np.asarray(embeddings["primary"], dtype=np.float32).reshape(-1)
+                for embeddings in embeddings_list
+            ])
+            return find_matching_tigers_batch(
+                self.db,
+                matrix,
+                model_name="wildlife_tools",
+                limit=5,
+                similarity_threshold=0.5
+            )
+
+        except Exception as e:
+            logger.warning(f"Batch match search failed, searching per image: {e}")
+            return [await self._find_matches(embeddings) for embeddings in embeddings_list]
+
+    def _merge_batch_matches(
+        self,
+        embeddings: Dict[str, np.ndarray],
+        matches: List[Dict],
+        stored: List[Tuple[str, np.ndarray]]
+    ) -> List[Dict]:
+        """
+        Add matches against tigers stored earlier in the same batch.
+
+        Args:
+            embeddings: Embeddings for the current crop
+            matches: Matches from the batched gallery search
+            stored: (tiger_id, primary embedding) stored earlier in the batch
+
+        Returns:
+            Matches re-ranked by similarity
+        """
+        if not stored:
+            return matches
+
+        query = np.asarray(embeddings["primary"], dtype=np.float32).reshape(-1)
+        query = query / (np.linalg.norm(query) + 1e-10)
+        gallery = np.stack([np.asarray(e, dtype=np.float32).reshape(-1) for _, e in stored])
+        gallery = gallery / (np.linalg.norm(gallery, axis=1, keepdims=True) + 1e-10)
+        similarities = gallery @ query
+
+        merged = list(matches)
+        for (tiger_id, _), similarity in zip(stored, similarities):
+            if similarity >= 0.5:
+                merged.append({"tiger_id": tiger_id, "similarity": float(similarity)})
+        merged.sort(key=lambda m: m.get("similarity", 0), reverse=True)
+        return merged[:5]
+
     async def _create_new_tiger(
         self,
         image_bytes: bytes,
@@ -624,8 +789,11 @@ class ImagePipelineService:
         )
         self.db.add(tiger_image)
 
-        # Store embedding in vector search
-        store_embedding(self.db, tiger_image.image_id, embeddings.get("primary"))
+        # Store embedding in vector search (committed with the records below)
+        store_embedding(
+            self.db, str(tiger_image.image_id), embeddings.get("primary"),
+            model_name="wildlife_tools", tiger_id=str(tiger.tiger_id), commit=False
+        )
 
         self.db.commit()
         self._stats["new_tigers"] += 1
@@ -680,8 +848,11 @@ class ImagePipelineService:
         )
         self.db.add(tiger_image)
 
-        # Store embedding
-        store_embedding(self.db, tiger_image.image_id, embeddings.get("primary"))
+        # Store embedding (committed with the records below)
+        store_embedding(
+            self.db, str(tiger_image.image_id), embeddings.get("primary"),
+            model_name="wildlife_tools", tiger_id=str(tiger.tiger_id), commit=False
+        )
 
         self.db.commit()
         self._stats["existing_tigers"] += 1
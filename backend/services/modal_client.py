@@ -4,17 +4,38 @@ Modal client service for communicating with Modal inference functions.
 This service handles:
 - Communication with Modal endpoints
 - Request queueing and retry logic
+- Micro-batching of concurrent embedding requests
+- Routing models with a "local" registry backend to ONNX Runtime on CPU
+- Persistent content-addressed embedding cache
+- Sharing one Modal call between concurrent identical requests
 - Fallback handling when Modal is unavailable
 - Caching and error handling
 """
 
 import asyncio
-import io
-from typing import Optional, Dict, Any, List
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Optional, Dict, Any, Iterator, List, Union
 from pathlib import Path
 import numpy as np
 from PIL import Image
 
+from backend.database.embedding_cache import get_embedding_cache, sha256_hex
+from backend.infrastructure.local.onnx_client import get_local_inference_client
+from backend.infrastructure.modal.embedding_codec import (
+    DEFAULT_EMBEDDING_ENCODING,
+    EMBEDDING_ENCODINGS,
+    decode_embedding_result,
+)
+from backend.infrastructure.modal.micro_batcher import DEFAULT_BATCHING_ENABLED, MicroBatcher
+from backend.infrastructure.modal.model_registry import get_model_registry
+from backend.infrastructure.modal.single_flight import (
+    DEFAULT_SINGLE_FLIGHT_ENABLED,
+    SingleFlight,
+    content_key,
+)
+from backend.utils.image_artifact import ImageArtifact, encode_image
 from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -30,6 +51,34 @@ class ModalUnavailableError(ModalClientError):
     pass
 
 
+# Models served by a mock or fallback response in the current context
+_fallbacks: ContextVar[Optional[List[str]]] = ContextVar("modal_fallbacks", default=None)
+
+
+@contextmanager
+def track_fallbacks() -> Iterator[List[str]]:
+    """
+    Collect the models answered by mock or fallback responses.
+
+    Requests made inside the block (including tasks it starts) append the
+    model name to the yielded list whenever the selected backend did not
+    produce the response, so callers can tell a degraded result apart.
+    """
+    fallbacks: List[str] = []
+    token = _fallbacks.set(fallbacks)
+    try:
+        yield fallbacks
+    finally:
+        _fallbacks.reset(token)
+
+
+def record_fallback(model_name: str) -> None:
+    """Note that ``model_name`` was answered by a mock or fallback response."""
+    fallbacks = _fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append(model_name)
+
+
 class ModalClient:
     """Client for communicating with Modal ML inference services."""
     
@@ -44,7 +93,10 @@ class ModalClient:
         timeout: int = 60,
         queue_max_size: int = 100,
         use_mock: bool = None,
-        max_total_timeout: int = None
+        max_total_timeout: int = None,
+        batching: bool = None,
+        encoding: str = None,
+        single_flight: bool = None
     ):
         """
         Initialize Modal client.
@@ -56,6 +108,12 @@ class ModalClient:
             queue_max_size: Maximum size of request queue
             use_mock: Use mock responses instead of real Modal (for development)
             max_total_timeout: Maximum total time for all retries (prevents gateway timeouts)
+            batching: Send concurrent embedding requests to a model as one
+                batch call (defaults to MODAL_MICRO_BATCHING)
+            encoding: Embedding wire format requested from Modal, "float32",
+                "float16" or "list" (defaults to MODAL_EMBEDDING_ENCODING)
+            single_flight: Share one Modal call between concurrent identical
+                requests (defaults to MODAL_SINGLE_FLIGHT)
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
@@ -98,6 +156,19 @@ class ModalClient:
         self._rapid_reid = None
         self._cvwc2019_reid = None
         self._transreid = None
+
+        # Per-model micro-batchers for embedding requests (lazy created)
+        self.batching = DEFAULT_BATCHING_ENABLED if batching is None else batching
+        self._batchers: Dict[str, MicroBatcher] = {}
+
+        # Binary embedding transport ("list" keeps the original format)
+        self.encoding = encoding or DEFAULT_EMBEDDING_ENCODING
+        if self.encoding not in EMBEDDING_ENCODINGS:
+            raise ValueError(f"Unknown embedding encoding: {self.encoding}")
+
+        # Coalescing of concurrent identical requests
+        self.single_flight = DEFAULT_SINGLE_FLIGHT_ENABLED if single_flight is None else single_flight
+        self._single_flight = SingleFlight(name="ModalClient")
         
         # Stats
         self.stats = {
@@ -125,6 +196,7 @@ class ModalClient:
         self._transreid = None
         self._megadescriptor_b = None
         self._matchanything = None
+        self._batchers.clear()
 
         # Clear the request queue
         while not self.request_queue.empty():
@@ -339,18 +411,153 @@ class ModalClient:
             logger.error(f"Request queue is full (max: {self.queue_max_size})")
             raise ModalClientError("Request queue is full")
     
+    async def _call_model(self, model_name: str, method_name: str, *args, **kwargs) -> Any:
+        """
+        Call a model method with retry logic.
+
+        Concurrent calls with the same model, method and arguments share one
+        Modal call.
+
+        Args:
+            model_name: Name of the model
+            method_name: Name of the Modal method
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            Method result
+        """
+        model = self._get_modal_function(model_name)
+        call = partial(self._call_with_retry, getattr(model, method_name), *args, **kwargs)
+        if not self.single_flight:
+            return await call()
+        digest = content_key(*args, **kwargs)
+        key = (method_name, model_name, digest) if digest is not None else None
+        return await self._single_flight.do(key, call)
+
+    def _encoding_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments requesting the configured embedding encoding.
+
+        Nothing is sent for "list" so deployments that predate binary
+        transport keep working.
+        """
+        return {} if self.encoding == "list" else {"encoding": self.encoding}
+
+    async def _embed_batch(self, model_name: str, images: List[bytes]) -> List[Dict[str, Any]]:
+        """Embed a micro-batch; a lone request uses the single-image method."""
+        model = self._get_modal_function(model_name)
+        if len(images) == 1:
+            result = await self._call_with_retry(
+                model.generate_embedding, images[0], **self._encoding_kwargs()
+            )
+            return [decode_embedding_result(result)]
+        results = await self._call_with_retry(
+            model.generate_embedding_batch, images, **self._encoding_kwargs()
+        )
+        if not isinstance(results, list) or len(results) != len(images):
+            raise ModalClientError(
+                f"{model_name} batch returned an invalid response for {len(images)} images"
+            )
+        return [decode_embedding_result(result) for result in results]
+
+    async def _embed(self, model_name: str, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Generate an embedding, served from the persistent embedding cache
+        when this crop was embedded by the same model version before.
+
+        Args:
+            model_name: Name of the model
+            image_bytes: Encoded image
+
+        Concurrent requests for the same crop and model share one lookup
+        and Modal call.
+
+        Returns:
+            The model's embedding response for this image (``cached`` is
+            True when served from the cache)
+        """
+        call = partial(self._embed_cached, model_name, image_bytes)
+        if not self.single_flight:
+            return await call()
+        # Keyed apart from the generate_embedding calls made underneath
+        return await self._single_flight.do(("embedding", model_name, sha256_hex(image_bytes)), call)
+
+    async def _embed_cached(self, model_name: str, image_bytes: bytes) -> Dict[str, Any]:
+        """Serve an embedding from the embedding cache, computing it on a miss."""
+        cache = get_embedding_cache()
+        if cache is None:
+            return await self._compute_embedding(model_name, image_bytes)
+
+        registry = get_model_registry()
+        key = (sha256_hex(image_bytes), model_name, registry.get_embedding_version(model_name))
+        embedding = cache.get(*key)
+        if embedding is not None:
+            return {"success": True, "embedding": embedding, "shape": embedding.shape, "cached": True}
+
+        result = await self._compute_embedding(model_name, image_bytes)
+        # Only vectors from the backend the version names (not a local
+        # fallback for a Modal model) are stored
+        if (
+            result.get("success", True)
+            and result.get("embedding") is not None
+            and result.get("backend", "modal") == registry.get_backend(model_name)
+        ):
+            cache.put(*key, result["embedding"])
+        return result
+
+    async def _compute_embedding(self, model_name: str, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Generate an embedding, batched with concurrent requests to the model.
+
+        Models whose ModelRegistry backend is "local" run on CPU with ONNX
+        Runtime instead of Modal. When Modal fails and the model has an
+        exported ONNX graph, the local backend serves the request before
+        callers fall back to mock embeddings.
+
+        Args:
+            model_name: Name of the model
+            image_bytes: Encoded image
+
+        Returns:
+            The model's embedding response for this image
+        """
+        local_client = get_local_inference_client()
+        if get_model_registry().get_backend(model_name) == "local":
+            return await local_client.generate_embedding(model_name, image_bytes)
+
+        try:
+            if not self.batching:
+                model = self._get_modal_function(model_name)
+                result = await self._call_with_retry(
+                    model.generate_embedding, image_bytes, **self._encoding_kwargs()
+                )
+                return decode_embedding_result(result)
+
+            batcher = self._batchers.get(model_name)
+            if batcher is None:
+                batcher = MicroBatcher(partial(self._embed_batch, model_name), name=model_name)
+                self._batchers[model_name] = batcher
+            return await batcher.submit(image_bytes)
+
+        except (ModalUnavailableError, ModalClientError) as e:
+            if not local_client.is_available(model_name):
+                raise
+            logger.warning(f"[MODAL CLIENT] Modal failed for {model_name} ({e}), using local backend")
+            record_fallback(model_name)
+            return await local_client.generate_embedding(model_name, image_bytes)
+
     # ==================== TigerReID Methods ====================
     
     async def tiger_reid_embedding(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, ImageArtifact],
         fallback_to_queue: bool = True
     ) -> Dict[str, Any]:
         """
         Generate tiger ReID embedding.
         
         Args:
-            image: PIL Image
+            image: PIL Image or ImageArtifact (reuses its cached JPEG)
             fallback_to_queue: Whether to queue request if Modal unavailable
             
         Returns:
@@ -360,25 +567,18 @@ class ModalClient:
             # Mock mode for development
             if self.use_mock:
                 logger.info(f"[MODAL CLIENT] 🚧 Using MOCK TigerReID embedding")
+                record_fallback("tiger_reid")
                 return {
                     "success": True,
-                    "embedding": np.random.rand(2048).tolist(),
+                    "embedding": np.random.rand(2048).astype(np.float32),
                     "shape": (2048,)
                 }
             
             # Convert image to bytes
-            buffer = io.BytesIO()
-            image.save(buffer, format='JPEG')
-            image_bytes = buffer.getvalue()
+            image_bytes = encode_image(image)
             
-            # Get Modal function
-            model = self._get_modal_function("tiger_reid")
-            
-            # Call with retry
-            result = await self._call_with_retry(
-                model.generate_embedding,
-                image_bytes
-            )
+            # Call with retry, batched with concurrent requests
+            result = await self._embed("tiger_reid", image_bytes)
             
             return result
             
@@ -387,9 +587,10 @@ class ModalClient:
             logger.warning(f"[MODAL CLIENT] Falling back to MOCK TigerReID embedding")
             
             # Return mock embedding
+            record_fallback("tiger_reid")
             return {
                 "success": True,
-                "embedding": np.random.rand(2048).tolist(),
+                "embedding": np.random.rand(2048).astype(np.float32),
                 "shape": (2048,),
                 "mock": True
             }
@@ -398,7 +599,7 @@ class ModalClient:
     
     async def megadetector_detect(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, ImageArtifact],
         confidence_threshold: float = 0.5,
         fallback_to_queue: bool = True
     ) -> Dict[str, Any]:
@@ -406,7 +607,7 @@ class ModalClient:
         Detect animals using MegaDetector.
         
         Args:
-            image: PIL Image
+            image: PIL Image or ImageArtifact (reuses its cached JPEG)
             confidence_threshold: Detection confidence threshold
             fallback_to_queue: Whether to queue request if Modal unavailable
             
@@ -415,7 +616,7 @@ class ModalClient:
         """
         try:
             logger.info(f"[MODAL CLIENT] megadetector_detect() called")
-            logger.info(f"[MODAL CLIENT] Image size: {image.size}, mode: {image.mode}")
+            logger.info(f"[MODAL CLIENT] Image size: {image.size}")
             logger.info(f"[MODAL CLIENT] Confidence threshold: {confidence_threshold}")
             
             # Mock mode for development
@@ -423,6 +624,7 @@ class ModalClient:
                 logger.info(f"[MODAL CLIENT] 🚧 Using MOCK detection response")
                 # Return mock detection of a tiger
                 w, h = image.size
+                record_fallback("megadetector")
                 return {
                     "success": True,
                     "detections": [
@@ -435,22 +637,20 @@ class ModalClient:
                     ]
                 }
             
+            # Local CPU backend selected through the model registry
+            if get_model_registry().get_backend("megadetector") == "local":
+                return await get_local_inference_client().detect(image, confidence_threshold)
+
             # Convert image to bytes
             logger.info(f"[MODAL CLIENT] Converting image to bytes...")
-            buffer = io.BytesIO()
-            image.save(buffer, format='JPEG')
-            image_bytes = buffer.getvalue()
+            image_bytes = encode_image(image)
             logger.info(f"[MODAL CLIENT] Image bytes: {len(image_bytes)} bytes")
             
-            # Get Modal function
-            logger.info(f"[MODAL CLIENT] Getting Modal function for megadetector...")
-            model = self._get_modal_function("megadetector")
-            logger.info(f"[MODAL CLIENT] Modal function obtained")
-            
-            # Call with retry
+            # Call with retry, shared with identical requests in flight
             logger.info(f"[MODAL CLIENT] Calling model.detect() via Modal...")
-            result = await self._call_with_retry(
-                model.detect,
+            result = await self._call_model(
+                "megadetector",
+                "detect",
                 image_bytes,
                 confidence_threshold
             )
@@ -464,6 +664,7 @@ class ModalClient:
             
             # Return mock detection instead of queuing
             w, h = image.size
+            record_fallback("megadetector")
             return {
                 "success": True,
                 "detections": [
@@ -481,14 +682,14 @@ class ModalClient:
     
     async def wildlife_tools_embedding(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, ImageArtifact],
         fallback_to_queue: bool = True
     ) -> Dict[str, Any]:
         """
         Generate WildlifeTools embedding.
         
         Args:
-            image: PIL Image
+            image: PIL Image or ImageArtifact (reuses its cached JPEG)
             fallback_to_queue: Whether to queue request if Modal unavailable
             
         Returns:
@@ -498,35 +699,29 @@ class ModalClient:
             # Mock mode for development
             if self.use_mock:
                 logger.info(f"[MODAL CLIENT] 🚧 Using MOCK WildlifeTools embedding")
+                record_fallback("wildlife_tools")
                 return {
                     "success": True,
-                    "embedding": np.random.rand(2048).tolist(),
+                    "embedding": np.random.rand(2048).astype(np.float32),
                     "shape": (2048,),
                     "mock": True
                 }
             
             # Convert image to bytes
-            buffer = io.BytesIO()
-            image.save(buffer, format='JPEG')
-            image_bytes = buffer.getvalue()
-            
-            # Get Modal function
-            model = self._get_modal_function("wildlife_tools")
+            image_bytes = encode_image(image)
             
-            # Call with retry
-            result = await self._call_with_retry(
-                model.generate_embedding,
-                image_bytes
-            )
+            # Call with retry, batched with concurrent requests
+            result = await self._embed("wildlife_tools", image_bytes)
             
             return result
             
         except (ModalUnavailableError, ModalClientError) as e:
             logger.error(f"Modal unavailable/failed for WildlifeTools: {e}")
             logger.warning(f"[MODAL CLIENT] Falling back to MOCK WildlifeTools embedding")
+            record_fallback("wildlife_tools")
             return {
                 "success": True,
-                "embedding": np.random.rand(2048).tolist(),
+                "embedding": np.random.rand(2048).astype(np.float32),
                 "shape": (2048,),
                 "mock": True
             }
@@ -535,14 +730,14 @@ class ModalClient:
 
     async def megadescriptor_b_embedding(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, ImageArtifact],
         fallback_to_queue: bool = True
     ) -> Dict[str, Any]:
         """
         Generate MegaDescriptor-B-224 embedding (faster variant).
 
         Args:
-            image: PIL Image
+            image: PIL Image or ImageArtifact (reuses its cached JPEG)
             fallback_to_queue: Whether to queue request if Modal unavailable
 
         Returns:
@@ -552,35 +747,29 @@ class ModalClient:
             # Mock mode for development
             if self.use_mock:
                 logger.info(f"[MODAL CLIENT] Using MOCK MegaDescriptor-B embedding")
+                record_fallback("megadescriptor_b")
                 return {
                     "success": True,
-                    "embedding": np.random.rand(1024).tolist(),
+                    "embedding": np.random.rand(1024).astype(np.float32),
                     "shape": (1024,),
                     "mock": True
                 }
 
             # Convert image to bytes
-            buffer = io.BytesIO()
-            image.save(buffer, format='JPEG')
-            image_bytes = buffer.getvalue()
+            image_bytes = encode_image(image)
 
-            # Get Modal function
-            model = self._get_modal_function("megadescriptor_b")
-
-            # Call with retry
-            result = await self._call_with_retry(
-                model.generate_embedding,
-                image_bytes
-            )
+            # Call with retry, batched with concurrent requests
+            result = await self._embed("megadescriptor_b", image_bytes)
 
             return result
 
         except (ModalUnavailableError, ModalClientError) as e:
             logger.error(f"Modal unavailable/failed for MegaDescriptor-B: {e}")
             logger.warning(f"[MODAL CLIENT] Falling back to MOCK MegaDescriptor-B embedding")
+            record_fallback("megadescriptor_b")
             return {
                 "success": True,
-                "embedding": np.random.rand(1024).tolist(),
+                "embedding": np.random.rand(1024).astype(np.float32),
                 "shape": (1024,),
                 "mock": True
             }
@@ -589,14 +778,14 @@ class ModalClient:
     
     async def rapid_reid_embedding(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, ImageArtifact],
         fallback_to_queue: bool = True
     ) -> Dict[str, Any]:
         """
         Generate RAPID ReID embedding.
         
         Args:
-            image: PIL Image
+            image: PIL Image or ImageArtifact (reuses its cached JPEG)
             fallback_to_queue: Whether to queue request if Modal unavailable
             
         Returns:
@@ -606,35 +795,29 @@ class ModalClient:
             # Mock mode for development
             if self.use_mock:
                 logger.info(f"[MODAL CLIENT] 🚧 Using MOCK RAPID embedding")
+                record_fallback("rapid_reid")
                 return {
                     "success": True,
-                    "embedding": np.random.rand(2048).tolist(),
+                    "embedding": np.random.rand(2048).astype(np.float32),
                     "shape": (2048,),
                     "mock": True
                 }
             
             # Convert image to bytes
-            buffer = io.BytesIO()
-            image.save(buffer, format='JPEG')
-            image_bytes = buffer.getvalue()
-            
-            # Get Modal function
-            model = self._get_modal_function("rapid_reid")
+            image_bytes = encode_image(image)
             
-            # Call with retry
-            result = await self._call_with_retry(
-                model.generate_embedding,
-                image_bytes
-            )
+            # Call with retry, batched with concurrent requests
+            result = await self._embed("rapid_reid", image_bytes)
             
             return result
             
         except (ModalUnavailableError, ModalClientError) as e:
             logger.error(f"Modal unavailable/failed for RAPID: {e}")
             logger.warning(f"[MODAL CLIENT] Falling back to MOCK RAPID embedding")
+            record_fallback("rapid_reid")
             return {
                 "success": True,
-                "embedding": np.random.rand(2048).tolist(),
+                "embedding": np.random.rand(2048).astype(np.float32),
                 "shape": (2048,),
                 "mock": True
             }
@@ -643,14 +826,14 @@ class ModalClient:
     
     async def cvwc2019_reid_embedding(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, ImageArtifact],
         fallback_to_queue: bool = True
     ) -> Dict[str, Any]:
         """
         Generate CVWC2019 ReID embedding.
         
         Args:
-            image: PIL Image
+            image: PIL Image or ImageArtifact (reuses its cached JPEG)
             fallback_to_queue: Whether to queue request if Modal unavailable
             
         Returns:
@@ -660,35 +843,29 @@ class ModalClient:
             # Mock mode for development
             if self.use_mock:
                 logger.info(f"[MODAL CLIENT] 🚧 Using MOCK CVWC2019 embedding")
+                record_fallback("cvwc2019_reid")
                 return {
                     "success": True,
-                    "embedding": np.random.rand(2048).tolist(),  # 2048-dim for CVWC2019
+                    "embedding": np.random.rand(2048).astype(np.float32),  # 2048-dim for CVWC2019
                     "shape": (2048,),
                     "mock": True
                 }
             
             # Convert image to bytes
-            buffer = io.BytesIO()
-            image.save(buffer, format='JPEG')
-            image_bytes = buffer.getvalue()
-            
-            # Get Modal function
-            model = self._get_modal_function("cvwc2019_reid")
+            image_bytes = encode_image(image)
             
-            # Call with retry
-            result = await self._call_with_retry(
-                model.generate_embedding,
-                image_bytes
-            )
+            # Call with retry, batched with concurrent requests
+            result = await self._embed("cvwc2019_reid", image_bytes)
             
             return result
             
         except (ModalUnavailableError, ModalClientError) as e:
             logger.error(f"Modal unavailable/failed for CVWC2019: {e}")
             logger.warning(f"[MODAL CLIENT] Falling back to MOCK CVWC2019 embedding")
+            record_fallback("cvwc2019_reid")
             return {
                 "success": True,
-                "embedding": np.random.rand(2048).tolist(),
+                "embedding": np.random.rand(2048).astype(np.float32),
                 "shape": (2048,),
                 "mock": True
             }
@@ -715,20 +892,16 @@ class ModalClient:
         """
         if self.use_mock:
             logger.info(f"[MODAL CLIENT] Using MOCK TransReID embedding")
+            record_fallback("transreid")
             return {
                 "success": True,
-                "embedding": np.random.rand(768).tolist(),
+                "embedding": np.random.rand(768).astype(np.float32),
                 "shape": (768,),
                 "mock": True
             }
 
         try:
-            model = self._get_modal_function("transreid")
-            result = await self._call_with_retry(
-                model.generate_embedding,
-                image_bytes
-            )
-            return result
+            return await self._embed("transreid", image_bytes)
 
         except ModalUnavailableError as e:
             logger.error(f"Modal unavailable for TransReID: {e}")
@@ -782,6 +955,7 @@ class ModalClient:
             logger.info("[MODAL CLIENT] Using MOCK MatchAnything match")
             num_matches = np.random.randint(50, 200)
             scores = np.random.uniform(0.3, 0.9, num_matches)
+            record_fallback("matchanything")
             return {
                 "success": True,
                 "num_matches": num_matches,
@@ -792,9 +966,9 @@ class ModalClient:
             }
 
         try:
-            model = self._get_modal_function("matchanything")
-            result = await self._call_with_retry(
-                model.match_images,
+            result = await self._call_model(
+                "matchanything",
+                "match_images",
                 image1_bytes,
                 image2_bytes,
                 threshold
@@ -868,10 +1042,14 @@ class ModalClient:
         Returns:
             Dictionary with statistics
         """
+        cache = get_embedding_cache()
         return {
             **self.stats,
             "queue_size": self.request_queue.qsize(),
-            "queue_max_size": self.queue_max_size
+            "queue_max_size": self.queue_max_size,
+            "batching": {name: batcher.get_stats() for name, batcher in self._batchers.items()},
+            "embedding_cache": cache.get_stats() if cache is not None else None,
+            "single_flight": self._single_flight.get_stats()
         }
 
 
@@ -14,6 +14,7 @@ from functools import lru_cache
 import asyncio
 from collections import defaultdict
 
+from backend.database.embedding_cache import get_embedding_cache
 from backend.utils.logging import get_logger
 from backend.config.settings import get_settings
 
@@ -32,9 +33,8 @@ class ModelCacheService:
         self._model_cache: Dict[str, Any] = {}
         self._model_load_times: Dict[str, float] = {}
         
-        # Embedding cache (for frequently queried images)
-        self._embedding_cache: Dict[str, np.ndarray] = {}
-        self._cache_max_size = 1000  # Maximum cached embeddings
+        # Embedding cache (persistent, shared across processes; None when disabled)
+        self._embedding_cache = get_embedding_cache()
         
         # Batch processing queue
         self._batch_queue: List[Dict[str, Any]] = []
@@ -90,38 +90,95 @@ class ModelCacheService:
             self._model_load_times.clear()
             logger.info("Cleared all model cache")
     
-    def get_cached_embedding(self, image_hash: str) -> Optional[np.ndarray]:
+    def get_cached_embedding(
+        self,
+        image_hash: str,
+        model_name: str = "default",
+        model_version: str = "1"
+    ) -> Optional[np.ndarray]:
         """
         Get cached embedding for an image
         
         Args:
-            image_hash: Hash of the image
+            image_hash: SHA-256 of the image bytes
+            model_name: Model that produced the embedding
+            model_version: Version of that model
             
         Returns:
             Cached embedding or None
         """
-        return self._embedding_cache.get(image_hash)
+        if self._embedding_cache is None:
+            return None
+        return self._embedding_cache.get(image_hash, model_name, model_version)
     
-    def cache_embedding(self, image_hash: str, embedding: np.ndarray) -> None:
+    def get_cached_embeddings(
+        self,
+        image_hashes: List[str],
+        model_name: str = "default",
+        model_version: str = "1"
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get cached embeddings for several images in one lookup
+        
+        Args:
+            image_hashes: SHA-256 of each image's bytes
+            model_name: Model that produced the embeddings
+            model_version: Version of that model
+            
+        Returns:
+            Cached embeddings by image hash (misses are omitted)
+        """
+        if self._embedding_cache is None:
+            return {}
+        found = self._embedding_cache.get_many(
+            (image_hash, model_name, model_version) for image_hash in image_hashes
+        )
+        return {key[0]: embedding for key, embedding in found.items()}
+    
+    def cache_embedding(
+        self,
+        image_hash: str,
+        embedding: np.ndarray,
+        model_name: str = "default",
+        model_version: str = "1"
+    ) -> None:
         """
         Cache an embedding
         
         Args:
-            image_hash: Hash of the image
+            image_hash: SHA-256 of the image bytes
             embedding: Embedding vector to cache
+            model_name: Model that produced the embedding
+            model_version: Version of that model
         """
-        # Evict oldest entries if cache is full
-        if len(self._embedding_cache) >= self._cache_max_size:
-            # Remove oldest entry (simple FIFO)
-            oldest_key = next(iter(self._embedding_cache))
-            del self._embedding_cache[oldest_key]
-        
-        self._embedding_cache[image_hash] = embedding
+        self.cache_embeddings({image_hash: embedding}, model_name, model_version)
         logger.debug(f"Cached embedding for image: {image_hash[:8]}...")
     
+    def cache_embeddings(
+        self,
+        embeddings: Dict[str, np.ndarray],
+        model_name: str = "default",
+        model_version: str = "1"
+    ) -> None:
+        """
+        Cache several embeddings in one transaction
+        
+        Args:
+            embeddings: Embedding vector by image hash
+            model_name: Model that produced the embeddings
+            model_version: Version of that model
+        """
+        if self._embedding_cache is None:
+            return
+        self._embedding_cache.put_many({
+            (image_hash, model_name, model_version): embedding
+            for image_hash, embedding in embeddings.items()
+        })
+    
     def clear_embedding_cache(self) -> None:
         """Clear embedding cache"""
-        self._embedding_cache.clear()
+        if self._embedding_cache is not None:
+            self._embedding_cache.clear()
         logger.info("Cleared embedding cache")
     
     async def batch_process_embeddings(
@@ -281,8 +338,7 @@ class ModelCacheService:
         """
         return {
             'models_cached': len(self._model_cache),
-            'embeddings_cached': len(self._embedding_cache),
-            'embedding_cache_max_size': self._cache_max_size,
+            'embedding_cache': self._embedding_cache.get_stats() if self._embedding_cache else None,
             'model_load_times': self._model_load_times.copy(),
             'gpu_memory': self.manage_gpu_memory()
         }
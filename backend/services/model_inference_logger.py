@@ -4,11 +4,12 @@ Model inference logging service.
 Tracks model inference performance, errors, and usage statistics.
 """
 
+import os
 import time
 import json
-from typing import Dict, List, Any, Optional
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 import numpy as np
 
 from backend.utils.logging import get_logger
@@ -18,6 +19,15 @@ from backend.database.models import ModelInference, ModelVersion
 
 logger = get_logger(__name__)
 
+# Recent latencies kept per model for percentile estimates
+LATENCY_WINDOW = 200
+# Samples needed before a model's latency percentiles are reported
+MIN_LATENCY_SAMPLES = 5
+# Seconds after which a latency sample stops counting. A model is only
+# measured while it runs, so without expiry a burst of slow samples (Modal
+# cold starts) would keep it planned out for good (0 disables expiry)
+LATENCY_MAX_AGE_SECONDS = float(os.getenv("MODEL_LATENCY_MAX_AGE_SECONDS", "900"))
+
 
 class ModelInferenceLogger:
     """Service for logging model inference"""
@@ -37,6 +47,45 @@ class ModelInferenceLogger:
             'max_time': 0.0,
             'errors': []
         })
+        # (recorded at, seconds) per model, oldest first
+        self._latencies: Dict[str, Deque[Tuple[float, float]]] = defaultdict(
+            lambda: deque(maxlen=LATENCY_WINDOW)
+        )
+        self._clock = time.monotonic
+    
+    def record_latency(self, model_name: str, inference_time: float) -> None:
+        """
+        Record an inference latency without logging the inference
+        
+        Used on hot paths (ensemble fan-out) where only the rolling latency
+        window is needed for planning.
+        
+        Args:
+            model_name: Name of the model
+            inference_time: Time taken for inference (seconds)
+        """
+        self._latencies[model_name].append((self._clock(), inference_time))
+    
+    def get_latency_percentile(self, model_name: str, percentile: float) -> Optional[float]:
+        """
+        Get a percentile of a model's recent inference latencies
+        
+        Args:
+            model_name: Name of the model
+            percentile: Percentile to compute (0-100)
+            
+        Returns:
+            Latency in seconds, or None until MIN_LATENCY_SAMPLES recent
+            samples are recorded
+        """
+        samples = self._latencies.get(model_name)
+        if samples and LATENCY_MAX_AGE_SECONDS > 0:
+            cutoff = self._clock() - LATENCY_MAX_AGE_SECONDS
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+        if not samples or len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return float(np.percentile([seconds for _, seconds in samples], percentile))
     
     def log_inference(
         self,
@@ -73,6 +122,8 @@ class ModelInferenceLogger:
                     stats['errors'] = stats['errors'][-100:]
         
         # Update timing statistics
+        if success:
+            self.record_latency(model_name, inference_time)
         stats['total_time'] += inference_time
         stats['min_time'] = min(stats['min_time'], inference_time)
         stats['max_time'] = max(stats['max_time'], inference_time)
@@ -175,6 +226,8 @@ class ModelInferenceLogger:
                     'avg_time': stats['total_time'] / stats['total_inferences'],
                     'min_time': stats['min_time'] if stats['min_time'] != float('inf') else 0,
                     'max_time': stats['max_time'],
+                    'p50_time': self.get_latency_percentile(model_name, 50),
+                    'p95_time': self.get_latency_percentile(model_name, 95),
                     'recent_errors': stats['errors'][-10:]  # Last 10 errors
                 }
             return {'model': model_name, 'no_data': True}
@@ -190,7 +243,9 @@ class ModelInferenceLogger:
                         'success_rate': stats['successful'] / stats['total_inferences'],
                         'avg_time': stats['total_time'] / stats['total_inferences'],
                         'min_time': stats['min_time'] if stats['min_time'] != float('inf') else 0,
-                        'max_time': stats['max_time']
+                        'max_time': stats['max_time'],
+                        'p50_time': self.get_latency_percentile(model, 50),
+                        'p95_time': self.get_latency_percentile(model, 95)
                     }
             return all_stats
     
@@ -213,8 +268,10 @@ class ModelInferenceLogger:
                     'errors': []
                 }
                 logger.info(f"Reset statistics for model: {model_name}")
+            self._latencies.pop(model_name, None)
         else:
             self._stats.clear()
+            self._latencies.clear()
             logger.info("Reset all inference statistics")
 
 
@@ -7,14 +7,38 @@ results. Based on CVPR 2017 paper:
 by Zhong et al. (https://arxiv.org/abs/1701.08398)
 
 This improves mAP by 3-5% by using gallery-gallery relationships.
+
+The encoding is computed with sparse (CSR) matrices: neighbour lists come
+from a blockwise top-k over the distance matrix, reciprocal sets and their
+expansion from sparse products, and the Jaccard term from the overlap of
+the query rows with the sparse encoding. Only O((N + Q) * k1) state plus
+one block of distances is kept in memory, so galleries of tens of
+thousands of images re-rank without materializing any (N + Q)^2 matrix.
+
+For online identification, ``k_reciprocal_rerank_graph`` re-ranks against
+a model's persisted gallery k-NN graph (``database/knn_graph.py``): only
+query-to-gallery distances are computed per query, and the gallery's
+encoding is rebuilt from the cached neighbour lists only when the gallery
+changes.
 """
 
+import threading
 import numpy as np
-from typing import Optional, Tuple, List
+from scipy import sparse
+from typing import Any, Callable, Dict, Optional, Tuple, List
+from backend.database.knn_graph import GalleryKNNGraph, KNNGraphView, get_loaded_knn_graph
 from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Upper bound on elements in any dense working block (~64MB of float32)
+_BLOCK_ELEMENTS = 1 << 24
+
+# Gallery encodings built from k-NN graphs: (model, k1, k2) ->
+# (graph version, encoding before query expansion, encoding after it as CSC)
+_graph_encodings: Dict[Tuple[str, int, int], Tuple[int, sparse.csr_matrix, sparse.csc_matrix]] = {}
+_graph_encodings_lock = threading.Lock()
+
 
 def k_reciprocal_rerank(
     query_features: np.ndarray,
@@ -52,133 +76,536 @@ def k_reciprocal_rerank(
     # Concatenate query and gallery features
     all_features = np.vstack([query_features, gallery_features])
 
-    # Compute original distance matrix (Euclidean distance squared)
-    if use_gpu:
-        try:
-            import torch
-            feat = torch.from_numpy(all_features).cuda()
-            dist_sq = torch.pow(feat, 2).sum(dim=1, keepdim=True)
-            distmat = dist_sq.expand(all_num, all_num) + dist_sq.t()
-            distmat = distmat - 2 * torch.mm(feat, feat.t())
-            original_dist = distmat.cpu().numpy()
-            del feat, distmat
-        except Exception as e:
-            logger.warning(f"GPU computation failed, falling back to CPU: {e}")
-            original_dist = _compute_euclidean_distance(all_features)
-    else:
-        original_dist = _compute_euclidean_distance(all_features)
-
-    # Normalize distances
-    original_dist = original_dist / np.max(original_dist, axis=0, keepdims=True)
-    original_dist = original_dist.T
-
-    # Initialize V (k-reciprocal expansion)
-    V = np.zeros((all_num, all_num), dtype=np.float32)
-
-    # Get initial ranking
-    initial_rank = np.argsort(original_dist, axis=1).astype(np.int32)
-
-    # Compute k-reciprocal neighbors for each item
-    for i in range(all_num):
-        # Forward k-nearest neighbors
-        forward_k_neigh_index = initial_rank[i, :k1 + 1]
-
-        # Backward k-nearest neighbors of forward neighbors
-        backward_k_neigh_index = initial_rank[forward_k_neigh_index, :k1 + 1]
-
-        # Find reciprocal neighbors (mutual k-nearest)
-        fi = np.where(backward_k_neigh_index == i)[0]
-        k_reciprocal_index = forward_k_neigh_index[fi]
-        k_reciprocal_expansion_index = k_reciprocal_index.copy()
-
-        # Expand k-reciprocal neighbors
-        for j in range(len(k_reciprocal_index)):
-            candidate = k_reciprocal_index[j]
-            candidate_forward_k_neigh_index = initial_rank[candidate, :int(np.around(k1 / 2)) + 1]
-            candidate_backward_k_neigh_index = initial_rank[
-                candidate_forward_k_neigh_index, :int(np.around(k1 / 2)) + 1
-            ]
-            fi_candidate = np.where(candidate_backward_k_neigh_index == candidate)[0]
-            candidate_k_reciprocal_index = candidate_forward_k_neigh_index[fi_candidate]
-
-            # Add candidate's reciprocal neighbors if sufficient overlap
-            if len(np.intersect1d(candidate_k_reciprocal_index, k_reciprocal_index)) > \
-                    2 / 3 * len(candidate_k_reciprocal_index):
-                k_reciprocal_expansion_index = np.append(
-                    k_reciprocal_expansion_index, candidate_k_reciprocal_index
-                )
-
-        k_reciprocal_expansion_index = np.unique(k_reciprocal_expansion_index)
-
-        # Compute Gaussian kernel weights
-        weight = np.exp(-original_dist[i, k_reciprocal_expansion_index])
-        V[i, k_reciprocal_expansion_index] = weight / np.sum(weight)
-
-    # Query expansion
-    if k2 != 1:
-        V_qe = np.zeros_like(V, dtype=np.float32)
-        for i in range(all_num):
-            V_qe[i, :] = np.mean(V[initial_rank[i, :k2], :], axis=0)
-        V = V_qe
-        del V_qe
-
-    del initial_rank
-
-    # Compute Jaccard distance
-    invIndex = []
-    for i in range(all_num):
-        invIndex.append(np.where(V[:, i] != 0)[0])
-
-    jaccard_dist = np.zeros((query_num, all_num), dtype=np.float32)
-
-    for i in range(query_num):
-        temp_min = np.zeros((1, all_num), dtype=np.float32)
-        indNonZero = np.where(V[i, :] != 0)[0]
-        indImages = [invIndex[ind] for ind in indNonZero]
+    # Initial ranking (top neighbours only) and per-row normalization,
+    # computed one block of rows at a time
+    rank_k = min(max(k1 + 1, k2), all_num)
+    initial_rank, row_max, query_dist = _initial_rank(
+        all_features, query_num, rank_k, _distance_rows(all_features, use_gpu)
+    )
 
-        for j in range(len(indNonZero)):
-            temp_min[0, indImages[j]] = temp_min[0, indImages[j]] + np.minimum(
-                V[i, indNonZero[j]], V[indImages[j], indNonZero[j]]
-            )
+    _, V = _k_reciprocal_encoding(all_features, initial_rank, row_max, k1, k2)
 
-        jaccard_dist[i] = 1 - temp_min / (2 - temp_min + 1e-10)
+    del initial_rank
 
-    # Final distance: combine Jaccard and original distance
-    original_dist_query = original_dist[:query_num, :]
-    final_dist = jaccard_dist * (1 - lambda_value) + original_dist_query * lambda_value
+    # Jaccard distance for query rows, combined with the original distance
+    V_csc = V.tocsc()
+    chunk = max(1, _BLOCK_ELEMENTS // all_num)
+    final_blocks = []
+    for start in range(0, query_num, chunk):
+        stop = min(start + chunk, query_num)
+        temp_min = _min_overlap(V[start:stop], V_csc)
+        jaccard_dist = (1 - temp_min / (2 - temp_min + 1e-10)).astype(np.float32)
+        final_blocks.append(
+            jaccard_dist[:, query_num:] * (1 - lambda_value)
+            + query_dist[start:stop, query_num:] * lambda_value
+        )
 
-    # Return only query-gallery distances
-    final_dist = final_dist[:, query_num:]
+    final_dist = (
+        np.vstack(final_blocks) if final_blocks
+        else np.zeros((0, gallery_num), dtype=np.float32)
+    )
 
     # Clean up large intermediate arrays to prevent memory leaks
     del V
-    del original_dist
-    del original_dist_query
-    del jaccard_dist
-    del invIndex
+    del V_csc
+    del query_dist
 
     logger.info(f"Re-ranking complete. Output shape: {final_dist.shape}")
 
     return final_dist
 
 
-def _compute_euclidean_distance(features: np.ndarray) -> np.ndarray:
+def _k_reciprocal_encoding(
+    features: np.ndarray,
+    initial_rank: np.ndarray,
+    row_max: np.ndarray,
+    k1: int,
+    k2: int
+) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
     """
-    Compute pairwise Euclidean distance matrix.
+    Sparse k-reciprocal encoding of every row.
 
     Args:
         features: Feature matrix, shape (n, dim)
+        initial_rank: Nearest neighbours per row, nearest (itself) first,
+            at least max(k1 + 1, k2) columns or all n
+        row_max: Distance normalization per row
+        k1: K-reciprocal nearest neighbor parameter
+        k2: Number of neighbors for query expansion
 
     Returns:
-        Distance matrix, shape (n, n)
+        Tuple of (encoding before query expansion, encoding after it),
+        both (n, n) CSR
     """
     n = features.shape[0]
+
+    # k-reciprocal neighbors: j is in R(i, k) iff each is in the other's top-k
+    k_reciprocal = _reciprocal_neighbors(initial_rank[:, :k1 + 1])
+    half_reciprocal = _reciprocal_neighbors(initial_rank[:, :int(np.around(k1 / 2)) + 1])
+
+    # Expand with every candidate j in R(i, k1) whose own R(j, k1/2)
+    # overlaps R(i, k1) by more than two thirds
+    overlap = (k_reciprocal @ half_reciprocal.T).multiply(k_reciprocal).tocoo()
+    half_size = np.diff(half_reciprocal.indptr)
+    accepted = overlap.data > 2 / 3 * half_size[overlap.col]
+    accepted_candidates = sparse.csr_matrix(
+        (np.ones(int(accepted.sum()), dtype=np.int32), (overlap.row[accepted], overlap.col[accepted])),
+        shape=(n, n)
+    )
+    expansion = (k_reciprocal + accepted_candidates @ half_reciprocal).tocsr()
+    expansion.sort_indices()
+    del overlap, accepted_candidates, k_reciprocal, half_reciprocal
+
+    # Gaussian kernel weights over each expanded set, normalized per row
+    rows = np.repeat(np.arange(n), np.diff(expansion.indptr))
+    cols = expansion.indices
+    dist = _pair_distances(features, rows, cols) / row_max[rows]
+    weight = np.exp(-dist).astype(np.float32)
+    weight /= np.bincount(rows, weights=weight, minlength=n)[rows].astype(np.float32)
+    V = sparse.csr_matrix((weight, cols, expansion.indptr), shape=(n, n))
+    del expansion, rows, cols, dist, weight
+
+    # Query expansion: average each row with its k2 nearest neighbours' rows
+    if k2 != 1:
+        expand_k = min(k2, n)
+        neighbours = sparse.csr_matrix(
+            (
+                np.full(n * expand_k, 1 / expand_k, dtype=np.float32),
+                initial_rank[:, :k2].ravel(),
+                np.arange(0, n * expand_k + 1, expand_k)
+            ),
+            shape=(n, n)
+        )
+        V_qe = (neighbours @ V).tocsr()
+        del neighbours
+    else:
+        V_qe = V
+
+    return V, V_qe
+
+
+def _compute_euclidean_distance(
+    features: np.ndarray,
+    others: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Compute pairwise squared Euclidean distance matrix.
+
+    Args:
+        features: Feature matrix, shape (n, dim)
+        others: Features to measure against, shape (m, dim)
+            (defaults to features)
+
+    Returns:
+        Distance matrix, shape (n, m)
+    """
+    if others is None:
+        others = features
     dist_sq = np.sum(features ** 2, axis=1, keepdims=True)
-    distmat = dist_sq + dist_sq.T - 2 * np.dot(features, features.T)
+    other_sq = np.sum(others ** 2, axis=1, keepdims=True)
+    distmat = dist_sq + other_sq.T - 2 * np.dot(features, others.T)
     distmat = np.maximum(distmat, 0)  # Numerical stability
     return distmat
 
 
+def _distance_rows(
+    features: np.ndarray,
+    use_gpu: bool = False
+) -> Callable[[int, int], np.ndarray]:
+    """
+    Build a function computing distances from a block of rows to every row.
+
+    Args:
+        features: Feature matrix, shape (n, dim)
+        use_gpu: Whether to compute blocks on the GPU
+
+    Returns:
+        Callable (start, stop) -> distance block, shape (stop - start, n)
+    """
+    if use_gpu:
+        try:
+            import torch
+            feat = torch.from_numpy(np.ascontiguousarray(features)).cuda()
+            feat_sq = torch.pow(feat, 2).sum(dim=1)
+
+            def gpu_rows(start: int, stop: int) -> np.ndarray:
+                distmat = feat_sq[start:stop, None] + feat_sq[None, :]
+                distmat = distmat - 2 * torch.mm(feat[start:stop], feat.t())
+                return distmat.clamp_(min=0).cpu().numpy()
+
+            return gpu_rows
+        except Exception as e:
+            logger.warning(f"GPU computation failed, falling back to CPU: {e}")
+
+    def cpu_rows(start: int, stop: int) -> np.ndarray:
+        return _compute_euclidean_distance(features[start:stop], features)
+
+    return cpu_rows
+
+
+def _initial_rank(
+    features: np.ndarray,
+    query_num: int,
+    k: int,
+    distance_rows: Callable[[int, int], np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rank the k nearest neighbours of every row, one block of rows at a time.
+
+    Distances are normalized by each row's maximum; the distance matrix is
+    symmetric, so this equals the reference column-max normalization.
+
+    Args:
+        features: Query and gallery features, shape (n, dim)
+        query_num: Number of leading rows that are queries
+        k: Neighbours to keep per row
+        distance_rows: Block distance function from _distance_rows
+
+    Returns:
+        Tuple of (ranks (n, k) int32, row maxima (n,),
+        normalized query distances (query_num, n))
+    """
+    n = features.shape[0]
+    ranks = np.empty((n, k), dtype=np.int32)
+    row_max = None
+    query_dist = None
+
+    block = max(1, _BLOCK_ELEMENTS // n)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        dist = distance_rows(start, stop)
+        if row_max is None:
+            row_max = np.empty(n, dtype=dist.dtype)
+            query_dist = np.empty((query_num, n), dtype=dist.dtype)
+
+        peak = dist.max(axis=1)
+        peak[peak == 0] = 1  # all-identical features
+        row_max[start:stop] = peak
+        dist /= peak[:, None]
+
+        if start < query_num:
+            query_stop = min(stop, query_num)
+            query_dist[start:query_stop] = dist[:query_stop - start]
+
+        if k < n:
+            nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(dist, nearest, axis=1), axis=1)
+            ranks[start:stop] = np.take_along_axis(nearest, order, axis=1)
+        else:
+            ranks[start:stop] = np.argsort(dist, axis=1)
+
+    return ranks, row_max, query_dist
+
+
+def _reciprocal_neighbors(ranks: np.ndarray) -> sparse.csr_matrix:
+    """
+    Mutual nearest neighbours as a 0/1 CSR matrix.
+
+    Args:
+        ranks: Top neighbours per row, shape (n, k)
+
+    Returns:
+        (n, n) matrix with 1 where i and j are in each other's top-k
+    """
+    n, k = ranks.shape
+    knn = sparse.csr_matrix(
+        (np.ones(n * k, dtype=np.int32), ranks.ravel(), np.arange(0, n * k + 1, k)),
+        shape=(n, n)
+    )
+    return knn.multiply(knn.T).tocsr()
+
+
+def _pair_distances(features: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Squared Euclidean distances for individual (row, col) pairs.
+
+    Args:
+        features: Feature matrix, shape (n, dim)
+        rows: Row index per pair
+        cols: Column index per pair
+
+    Returns:
+        Distance per pair
+    """
+    dist = np.empty(len(rows), dtype=np.result_type(features.dtype, np.float32))
+    step = max(1, _BLOCK_ELEMENTS // max(1, features.shape[1]))
+    for start in range(0, len(rows), step):
+        r = features[rows[start:start + step]]
+        c = features[cols[start:start + step]]
+        dist[start:start + step] = (
+            np.sum(r ** 2, axis=1) + np.sum(c ** 2, axis=1) - 2 * np.einsum("ij,ij->i", r, c)
+        )
+    return np.maximum(dist, 0)
+
+
+def _min_overlap(rows: sparse.csr_matrix, V_csc: sparse.csc_matrix) -> np.ndarray:
+    """
+    Sum of element-wise minima between some rows of V and every row of V.
+
+    Only columns where a row is non-zero contribute, so each non-zero
+    (i, c) of ``rows`` is paired with the non-zeros of column c of V.
+
+    Args:
+        rows: Rows of V to compare, shape (m, n)
+        V_csc: The full encoding in CSC form, shape (n, n)
+
+    Returns:
+        Dense (m, n) matrix of summed minima
+    """
+    entries = rows.tocoo()
+    starts = V_csc.indptr[entries.col]
+    counts = V_csc.indptr[entries.col + 1] - starts
+    offsets = np.arange(int(counts.sum())) + np.repeat(starts - np.cumsum(counts) + counts, counts)
+
+    values = np.minimum(np.repeat(entries.data, counts), V_csc.data[offsets])
+    return sparse.coo_matrix(
+        (values, (np.repeat(entries.row, counts), V_csc.indices[offsets])),
+        shape=rows.shape
+    ).toarray()
+
+
+def k_reciprocal_rerank_graph(
+    query_features: np.ndarray,
+    graph: GalleryKNNGraph,
+    k1: int = 20,
+    k2: int = 6,
+    lambda_value: float = 0.3
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Re-rank queries against a model's cached gallery k-NN graph.
+
+    Only query-to-gallery distances are computed per call. The gallery's
+    own encoding is built from the graph's neighbour lists once per graph
+    version and reused. Each query is encoded as if inserted into the
+    gallery (it can become a reciprocal neighbour of gallery images), but
+    gallery encodings are not updated for it and queries are re-ranked
+    independently, so results approximate ``k_reciprocal_rerank`` over
+    the same gallery.
+
+    Args:
+        query_features: Query embeddings, shape (num_queries, embedding_dim)
+        graph: Gallery k-NN graph with at least max(k1 + 1, k2) neighbours
+        k1: K-reciprocal nearest neighbor parameter (default: 20)
+        k2: Number of neighbors for query expansion (default: 6)
+        lambda_value: Weight for original distance (default: 0.3)
+
+    Returns:
+        Tuple of (gallery image IDs, re-ranked distance matrix of shape
+        (num_queries, num_gallery)). Lower values indicate more similar pairs.
+    """
+    if graph.k < max(k1 + 1, k2):
+        raise ValueError(
+            f"{graph.model_name} k-NN graph keeps {graph.k} neighbours, "
+            f"re-ranking needs {max(k1 + 1, k2)}"
+        )
+
+    queries = np.asarray(query_features, dtype=np.float32).reshape(-1, graph.dim)
+    queries = queries / (np.linalg.norm(queries, axis=1, keepdims=True) + 1e-10)
+
+    with graph.read() as view:
+        gallery_num = len(view.image_ids)
+        if gallery_num == 0:
+            return [], np.zeros((len(queries), 0), dtype=np.float32)
+
+        V_initial, V_csc = _graph_encoding(graph.model_name, view, k1, k2)
+        query_dist = np.maximum(2 - 2 * queries @ view.vectors.T, 0)
+        final_dist = np.vstack([
+            _rerank_graph_query(view, V_initial, V_csc, dist, k1, k2, lambda_value)
+            for dist in query_dist
+        ])
+        return list(view.image_ids), final_dist
+
+
+def _graph_encoding(
+    model_name: str,
+    view: KNNGraphView,
+    k1: int,
+    k2: int
+) -> Tuple[sparse.csr_matrix, sparse.csc_matrix]:
+    """Gallery encodings for a graph version (built on first use, lock held)."""
+    key = (model_name, k1, k2)
+    cached = _graph_encodings.get(key)
+    if cached is not None and cached[0] == view.version:
+        return cached[1], cached[2]
+
+    gallery_num = len(view.image_ids)
+    rank_k = min(view.neighbours.shape[1], gallery_num)
+    row_max = np.where(view.row_max > 0, view.row_max, 1).astype(np.float32)
+    V_initial, V = _k_reciprocal_encoding(view.vectors, view.neighbours[:, :rank_k], row_max, k1, k2)
+
+    with _graph_encodings_lock:
+        _graph_encodings[key] = (view.version, V_initial, V.tocsc())
+        return _graph_encodings[key][1], _graph_encodings[key][2]
+
+
+def _rerank_graph_query(
+    view: KNNGraphView,
+    V_initial: sparse.csr_matrix,
+    V_csc: sparse.csc_matrix,
+    query_dist: np.ndarray,
+    k1: int,
+    k2: int,
+    lambda_value: float
+) -> np.ndarray:
+    """
+    Re-ranked distances from one query to every gallery image.
+
+    The query takes index ``n`` (one past the gallery). It enters a gallery
+    image's top-d list when it is closer than that list's d-th entry,
+    pushing the last entry out. Only rows whose encoding that insertion
+    changes are re-encoded; every other row is read from the cached
+    gallery encoding, so the result equals ``k_reciprocal_rerank`` with a
+    single query.
+
+    Args:
+        view: Graph view
+        V_initial: Gallery encoding before query expansion
+        V_csc: Gallery encoding after query expansion, CSC
+        query_dist: Squared distances from the query to the gallery
+        k1: K-reciprocal nearest neighbor parameter
+        k2: Number of neighbors for query expansion
+        lambda_value: Weight for original distance
+
+    Returns:
+        Re-ranked distances, shape (num_gallery,)
+    """
+    n = len(query_dist)
+    q = n
+    q_max = float(query_dist.max()) or 1.0
+    half = int(np.around(k1 / 2)) + 1
+    depth = min(max(k1 + 1, k2), n + 1)
+
+    # The query's own ranking: itself, then its nearest gallery images
+    if depth - 1 < n:
+        nearest = np.argpartition(query_dist, depth - 2)[:depth - 1] if depth > 1 else np.empty(0, dtype=int)
+    else:
+        nearest = np.arange(n)
+    nearest = nearest[np.argsort(query_dist[nearest], kind="stable")]
+    query_rank = np.concatenate([[q], nearest]).astype(np.int64)
+
+    def enters(rows: np.ndarray, d: int) -> np.ndarray:
+        return query_dist[rows] < view.distances[rows, d - 1]
+
+    def top_list(x: int, d: int) -> np.ndarray:
+        """x's top-d list with the query inserted (order not preserved)."""
+        if x == q:
+            return query_rank[:d]
+        listed = view.neighbours[x, :d]
+        listed = listed[listed >= 0].astype(np.int64)
+        if enters(np.array([x]), d)[0]:
+            listed = np.append(listed[:d - 1], q)
+        return listed
+
+    def reciprocal(x: int, d: int, with_query: bool = True) -> np.ndarray:
+        """R(x, d), with or without the query inserted into the lists."""
+        if x == q:
+            members = query_rank[1:d]
+            return np.concatenate([[q], members[enters(members, d)]])
+        if not with_query:
+            listed = view.neighbours[x, :d]
+            listed = listed[listed >= 0]
+            return listed[(view.neighbours[listed, :d] == x).any(axis=1)]
+
+        listed = top_list(x, d)
+        gallery = listed[listed != q]
+        back = view.neighbours[gallery, :d]
+        mutual = (back == x).any(axis=1) & ~(enters(gallery, d) & (back[:, -1] == x))
+        members = gallery[mutual]
+        if len(gallery) < len(listed) and x in query_rank[1:d]:
+            members = np.append(members, q)
+        return members
+
+    def changed(d: int) -> np.ndarray:
+        """Gallery rows whose R(., d) the query changes: entered or pushed out."""
+        entered = np.flatnonzero(enters(np.arange(n), d))
+        pushed = view.neighbours[entered, d - 1]
+        return np.union1d(entered, pushed[pushed >= 0])
+
+    def encode_row(x: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row x of the encoding before query expansion, over n + 1 columns."""
+        k_reciprocal = reciprocal(x, k1 + 1)
+        k_reciprocal_set = set(k_reciprocal.tolist())
+        expansion = set(k_reciprocal_set)
+        for candidate in k_reciprocal:
+            candidate_set = set(reciprocal(int(candidate), half).tolist())
+            if len(candidate_set & k_reciprocal_set) > 2 / 3 * len(candidate_set):
+                expansion.update(candidate_set)
+        cols = np.array(sorted(expansion), dtype=np.int64)
+
+        gallery = cols[cols != q]
+        dist = np.zeros(len(cols), dtype=np.float32)
+        if x == q:
+            dist[cols != q] = query_dist[gallery]
+            scale = q_max
+        else:
+            dist[cols != q] = _pair_distances(view.vectors, np.full(len(gallery), x), gallery)
+            dist[cols == q] = query_dist[x]
+            scale = max(float(view.row_max[x]), float(query_dist[x])) or 1.0
+        weight = np.exp(-dist / scale).astype(np.float32)
+        return cols, weight / np.sum(weight)
+
+    # Rows whose initial encoding changes: own reciprocal set changed, a
+    # candidate's half-size set changed, or the query is their farthest point
+    re_encoded = [changed(k1 + 1), np.flatnonzero(query_dist > view.row_max)]
+    re_encoded += [reciprocal(int(c), k1 + 1, with_query=False) for c in changed(half)]
+    re_encoded = np.union1d(np.concatenate(re_encoded).astype(np.int64), [q])
+
+    new_rows = [encode_row(int(x)) for x in re_encoded]
+    new_initial = sparse.csr_matrix(
+        (
+            np.concatenate([w for _, w in new_rows]),
+            np.concatenate([c for c, _ in new_rows]),
+            np.concatenate([[0], np.cumsum([len(c) for c, _ in new_rows])])
+        ),
+        shape=(len(re_encoded), n + 1)
+    )
+    new_position = {int(x): i for i, x in enumerate(re_encoded)}
+
+    # Rows whose expanded encoding changes: the query entered their top-k2,
+    # or one of their top-k2 was re-encoded
+    expand_k = min(k2, n)
+    affected = np.isin(view.neighbours[:, :expand_k], re_encoded[:-1]).any(axis=1)
+    affected |= enters(np.arange(n), expand_k) if k2 != 1 else False
+    affected = np.append(np.flatnonzero(affected), q)
+
+    # Expanded rows as averages over cached and re-encoded initial rows
+    cached_rows, cached_cols, cached_vals = [], [], []
+    new_rows_idx, new_cols, new_vals = [], [], []
+    for i, x in enumerate(affected):
+        members = top_list(int(x), k2) if k2 != 1 else np.array([x])
+        for m in members:
+            if int(m) in new_position:
+                new_rows_idx.append(i)
+                new_cols.append(new_position[int(m)])
+                new_vals.append(1 / len(members))
+            else:
+                cached_rows.append(i)
+                cached_cols.append(m)
+                cached_vals.append(1 / len(members))
+    V_initial_ext = sparse.csr_matrix(
+        (V_initial.data, V_initial.indices, V_initial.indptr), shape=(n, n + 1)
+    )
+    expanded = (
+        sparse.csr_matrix((cached_vals, (cached_rows, cached_cols)), shape=(len(affected), n))
+        @ V_initial_ext
+        + sparse.csr_matrix((new_vals, (new_rows_idx, new_cols)), shape=(len(affected), len(re_encoded)))
+        @ new_initial
+    ).tocsr().astype(np.float32)
+    query_row = expanded[len(affected) - 1].toarray().ravel()
+
+    # Jaccard distance: cached rows for the untouched gallery, then the
+    # re-encoded rows (which may also weight the query's own column)
+    temp_min = _min_overlap(sparse.csr_matrix(query_row[:n]), V_csc)[0]
+    mins = np.minimum(expanded.data, query_row[expanded.indices])
+    row_sums = np.bincount(
+        np.repeat(np.arange(len(affected)), np.diff(expanded.indptr)), weights=mins, minlength=len(affected)
+    )
+    temp_min[affected[:-1]] = row_sums[:-1]
+
+    jaccard_dist = (1 - temp_min / (2 - temp_min + 1e-10)).astype(np.float32)
+    return jaccard_dist * (1 - lambda_value) + query_dist / q_max * lambda_value
+
+
 def rerank_matches(
     query_embedding: np.ndarray,
     gallery_embeddings: np.ndarray,
@@ -308,3 +735,72 @@ class RerankingService:
             k2=self.k2,
             lambda_value=self.lambda_value
         )
+
+    def rerank_against_graph(
+        self,
+        query_features: np.ndarray,
+        graph: GalleryKNNGraph
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Re-rank queries against a cached gallery k-NN graph.
+
+        Args:
+            query_features: Query embeddings
+            graph: Gallery k-NN graph for the queries' model
+
+        Returns:
+            Tuple of (gallery image IDs, re-ranked distance matrix)
+        """
+        return k_reciprocal_rerank_graph(
+            query_features,
+            graph,
+            k1=self.k1,
+            k2=self.k2,
+            lambda_value=self.lambda_value
+        )
+
+    def rerank_gallery_matches(
+        self,
+        model_name: str,
+        query_embedding: np.ndarray,
+        matches: List[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Reorder one model's vector search matches by re-ranked distance.
+
+        The pool's similarity scores are reassigned in the re-ranked order,
+        so the best re-ranked match carries the pool's best similarity and
+        calibration and thresholds keep their meaning. Each match keeps its
+        raw score as ``original_similarity``.
+
+        Args:
+            model_name: ReID model that produced the matches
+            query_embedding: The query's embedding for that model
+            matches: Match dicts with image_id and similarity
+
+        Returns:
+            Re-ranked copies of the matches, or None when the model has no
+            loaded k-NN graph (or one too small for k1/k2)
+        """
+        graph = get_loaded_knn_graph(model_name)
+        if graph is None or not matches or graph.k < max(self.k1 + 1, self.k2):
+            return None
+
+        image_ids, distances = self.rerank_against_graph(query_embedding, graph)
+        rerank_distance = dict(zip(image_ids, distances[0].tolist())) if image_ids else {}
+
+        # Images stored after the graph was built keep their place at the end
+        order = sorted(
+            range(len(matches)),
+            key=lambda i: (rerank_distance.get(str(matches[i].get("image_id")), float("inf")), i)
+        )
+        scores = sorted((m.get("similarity", 0.0) for m in matches), reverse=True)
+        return [
+            {
+                **matches[i],
+                "similarity": score,
+                "original_similarity": matches[i].get("similarity", 0.0),
+                "rerank_distance": rerank_distance.get(str(matches[i].get("image_id"))),
+            }
+            for i, score in zip(order, scores)
+        ]
@@ -14,6 +14,7 @@ from backend.services.tiger.ensemble_strategy import (
     WeightedEnsembleStrategy,
     VerifiedEnsembleStrategy,
 )
+from backend.services.tiger.ensemble_planner import EnsemblePlan, EnsemblePlanner
 from backend.services.tiger.model_loader import ModelLoader, get_model_loader
 
 __all__ = [
@@ -25,6 +26,8 @@ __all__ = [
     "ParallelEnsembleStrategy",
     "WeightedEnsembleStrategy",
     "VerifiedEnsembleStrategy",
+    "EnsemblePlan",
+    "EnsemblePlanner",
     "ModelLoader",
     "get_model_loader",
 ]
@@ -0,0 +1,177 @@
+"""Latency- and cost-budgeted model selection for ensemble strategies.
+
+Parallel and weighted ensembles run their models concurrently, so a
+request's latency is that of its slowest model while its compute cost is
+the sum over all models. Given a latency and/or cost budget, the planner
+picks the model subset with the highest summed ensemble weight (from
+``DEFAULT_MODEL_WEIGHTS``) whose predicted latency and cost fit, using the
+live latency percentiles tracked by ``ModelInferenceLogger``. Models
+without enough latency samples yet (e.g. after a restart) are assumed to
+fit, so they run until they are measured. Samples expire after
+``MODEL_LATENCY_MAX_AGE_SECONDS``, so a model planned out on slow samples
+is planned back in and re-measured once they age out.
+"""
+
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import os
+
+from backend.utils.logging import get_logger
+from backend.services.confidence_calibrator import DEFAULT_MODEL_WEIGHTS
+from backend.services.model_inference_logger import get_inference_logger
+
+logger = get_logger(__name__)
+
+_latency_budget = os.getenv("ENSEMBLE_LATENCY_BUDGET_MS")
+_cost_budget = os.getenv("ENSEMBLE_COST_BUDGET_MS")
+# Default budgets applied to parallel/weighted ensembles (unset runs every model)
+DEFAULT_LATENCY_BUDGET_MS: Optional[float] = float(_latency_budget) if _latency_budget else None
+DEFAULT_COST_BUDGET_MS: Optional[float] = float(_cost_budget) if _cost_budget else None
+# Percentile of a model's latency used to predict request latency
+DEFAULT_LATENCY_PERCENTILE = float(os.getenv("ENSEMBLE_LATENCY_PERCENTILE", "95"))
+# Latency assumed for models without enough samples yet. Optimistic, so an
+# unmeasured model is planned in and measured; a pessimistic prior above
+# the budget would keep it out (and unmeasured) for good
+PRIOR_LATENCY_MS = 0.0
+# Weight used by WeightedEnsembleStrategy for models missing from the weights
+DEFAULT_WEIGHT = 0.1
+
+
+def model_weight(weights: Dict[str, float], model_name: str) -> float:
+    """Ensemble weight of a model, accepting loader names ("cvwc2019") for
+    weights keyed by model id ("cvwc2019_reid")."""
+    if model_name in weights:
+        return weights[model_name]
+    return weights.get(f"{model_name}_reid", DEFAULT_WEIGHT)
+
+
+@dataclass
+class EnsemblePlan:
+    """Models chosen for one identification and their predicted cost."""
+
+    models: List[str]
+    predicted_latency_ms: float
+    predicted_cost_ms: float
+    expected_score: float
+    within_budget: bool
+    latency_budget_ms: Optional[float] = None
+    cost_budget_ms: Optional[float] = None
+    skipped: List[str] = field(default_factory=list)
+    model_latency_ms: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form returned with identification results."""
+        return {
+            "models": self.models,
+            "skipped": self.skipped,
+            "predicted_latency_ms": round(self.predicted_latency_ms, 1),
+            "predicted_cost_ms": round(self.predicted_cost_ms, 1),
+            "expected_score": round(self.expected_score, 4),
+            "within_budget": self.within_budget,
+            "latency_budget_ms": self.latency_budget_ms,
+            "cost_budget_ms": self.cost_budget_ms,
+            "model_latency_ms": {k: round(v, 1) for k, v in self.model_latency_ms.items()},
+        }
+
+
+class EnsemblePlanner:
+    """Choose the ensemble model subset that fits a latency or cost budget.
+
+    Predicted latency is the maximum of the chosen models' latency
+    percentile (they run concurrently); predicted cost is the sum of their
+    median latencies, i.e. compute milliseconds spent on the request. Among
+    subsets within both budgets the one with the highest summed weight wins,
+    ties going to the faster, then cheaper, subset. If no subset fits, the
+    single fastest model is used and the plan is marked ``within_budget=False``.
+    """
+
+    def __init__(
+        self,
+        model_weights: Optional[Dict[str, float]] = None,
+        latency_percentile: Optional[float] = None,
+        prior_latency_ms: float = PRIOR_LATENCY_MS
+    ):
+        """Initialize ensemble planner.
+
+        Args:
+            model_weights: Weights per model (defaults to DEFAULT_MODEL_WEIGHTS)
+            latency_percentile: Latency percentile used for the latency
+                budget (defaults to ENSEMBLE_LATENCY_PERCENTILE)
+            prior_latency_ms: Latency assumed for models without samples
+        """
+        self.model_weights = model_weights or DEFAULT_MODEL_WEIGHTS
+        self.latency_percentile = latency_percentile or DEFAULT_LATENCY_PERCENTILE
+        self.prior_latency_ms = prior_latency_ms
+        self.inference_logger = get_inference_logger()
+
+    def _latency_ms(self, model_name: str, percentile: float) -> float:
+        """Live latency percentile of a model, or the prior without samples."""
+        seconds = self.inference_logger.get_latency_percentile(model_name, percentile)
+        return self.prior_latency_ms if seconds is None else seconds * 1000
+
+    def plan(
+        self,
+        model_names: Iterable[str],
+        latency_budget_ms: Optional[float] = None,
+        cost_budget_ms: Optional[float] = None
+    ) -> EnsemblePlan:
+        """Pick the model subset with the best expected accuracy under budget.
+
+        Args:
+            model_names: Models available for the ensemble
+            latency_budget_ms: Maximum predicted request latency
+            cost_budget_ms: Maximum predicted compute milliseconds
+
+        Returns:
+            EnsemblePlan with the chosen models and predictions
+        """
+        names = list(model_names)
+        if not names:
+            return EnsemblePlan([], 0.0, 0.0, 0.0, True, latency_budget_ms, cost_budget_ms)
+
+        latency = {name: self._latency_ms(name, self.latency_percentile) for name in names}
+        cost = {name: self._latency_ms(name, 50) for name in names}
+        weight = {name: model_weight(self.model_weights, name) for name in names}
+
+        def predict(subset: Tuple[str, ...]) -> Tuple[float, float, float]:
+            return (
+                max(latency[name] for name in subset),
+                sum(cost[name] for name in subset),
+                sum(weight[name] for name in subset),
+            )
+
+        best: Optional[Tuple[str, ...]] = None
+        best_key: Optional[Tuple[float, float, float]] = None
+        # Ensembles have a handful of models, so every subset is scored
+        for size in range(1, len(names) + 1):
+            for subset in combinations(names, size):
+                subset_latency, subset_cost, score = predict(subset)
+                if latency_budget_ms is not None and subset_latency > latency_budget_ms:
+                    continue
+                if cost_budget_ms is not None and subset_cost > cost_budget_ms:
+                    continue
+                key = (score, -subset_latency, -subset_cost)
+                if best_key is None or key > best_key:
+                    best, best_key = subset, key
+
+        within_budget = best is not None
+        if best is None:
+            best = (min(names, key=lambda name: (latency[name], -weight[name])),)
+            logger.warning(
+                f"No ensemble fits latency budget {latency_budget_ms} ms / "
+                f"cost budget {cost_budget_ms} ms, using fastest model {best[0]}"
+            )
+
+        subset_latency, subset_cost, score = predict(best)
+        return EnsemblePlan(
+            models=list(best),
+            predicted_latency_ms=subset_latency,
+            predicted_cost_ms=subset_cost,
+            expected_score=score,
+            within_budget=within_budget,
+            latency_budget_ms=latency_budget_ms,
+            cost_budget_ms=cost_budget_ms,
+            skipped=[name for name in names if name not in best],
+            model_latency_ms=latency,
+        )
@@ -7,27 +7,216 @@ Strategies:
 - StaggeredEnsembleStrategy: Sequential with early exit
 - ParallelEnsembleStrategy: All models in parallel with voting
 - WeightedEnsembleStrategy: Weighted scoring with re-ranking and calibration
+
+Parallel and weighted ensembles accept a latency and/or cost budget; an
+EnsemblePlanner then runs only the model subset expected to fit it. With
+an embedding client they fetch every query embedding in one Modal round
+trip (MultiReIDModel) instead of one per model.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 import asyncio
+import os
+import statistics
+import time
 from PIL import Image
-import io
 import numpy as np
 
+from backend.infrastructure.modal.model_registry import get_model_registry
+from backend.infrastructure.modal.clients.multi_embedding_client import (
+    MultiEmbeddingClient,
+    get_multi_embedding_client,
+    multi_embedding_name,
+)
+from backend.utils.image_artifact import ImageArtifact, encode_image
 from backend.utils.logging import get_logger
-from backend.database.vector_search import find_matching_tigers
+from backend.database.embedding_cache import get_embedding_cache, sha256_hex
+from backend.database.verification_features import (
+    build_gallery_selection,
+    extract_verification_features,
+    gallery_rank_key,
+    get_gallery_feature_store,
+)
+from backend.database.vector_search import (
+    find_matching_tigers,
+    get_model_embedding_dim,
+    hydrate_matches,
+)
 from backend.models.interfaces.base_reid_model import BaseReIDModel
 from backend.services.confidence_calibrator import ConfidenceCalibrator, DEFAULT_MODEL_WEIGHTS
+from backend.services.model_inference_logger import get_inference_logger
+from backend.services.modal_client import record_fallback
 from backend.services.reranking_service import RerankingService
-from backend.infrastructure.modal.model_registry import ModelRegistry
+from backend.services.tiger.ensemble_planner import (
+    DEFAULT_COST_BUDGET_MS,
+    DEFAULT_LATENCY_BUDGET_MS,
+    EnsemblePlan,
+    EnsemblePlanner,
+)
 
 logger = get_logger(__name__)
 
-# Initialize model registry for dimension validation
-_model_registry = ModelRegistry()
+# Speculative staggered execution (see StaggeredEnsembleStrategy)
+DEFAULT_SPECULATIVE = os.getenv("STAGGERED_SPECULATIVE", "false").lower() == "true"
+# Fixed hedge delay in seconds; unset hedges at each stage's p50 latency
+_delay = os.getenv("STAGGERED_SPECULATIVE_DELAY")
+DEFAULT_SPECULATIVE_DELAY: Optional[float] = float(_delay) if _delay else None
+# Hedge delay used until a stage has enough latency samples for a p50
+FALLBACK_SPECULATIVE_DELAY = 1.0
+
+# Matches each model contributes to weighted fusion and re-ranking
+DEFAULT_CANDIDATE_POOL = int(os.getenv("ENSEMBLE_CANDIDATE_POOL", "10"))
+
+# Fetch all query embeddings in one MultiReIDModel call (needs the class deployed)
+DEFAULT_COMBINED_EMBEDDINGS = os.getenv("ENSEMBLE_COMBINED_EMBEDDINGS", "false").lower() == "true"
+
+# MatchAnything comparisons in flight at once across verified candidates
+DEFAULT_VERIFICATION_CONCURRENCY = int(os.getenv("VERIFICATION_CONCURRENCY", "8"))
+
+_STAGE_LATENCY_WINDOW = 50
+_STAGE_LATENCY_MIN_SAMPLES = 5
+_stage_latencies: Dict[str, Deque[float]] = {}
+
+
+def record_stage_latency(model_name: str, seconds: float) -> None:
+    """Record a completed stage's latency for p50-based hedging."""
+    _stage_latencies.setdefault(model_name, deque(maxlen=_STAGE_LATENCY_WINDOW)).append(seconds)
+
+
+def stage_latency_p50(model_name: str) -> Optional[float]:
+    """Median of a model's recent stage latencies, None until enough samples."""
+    samples = _stage_latencies.get(model_name)
+    if not samples or len(samples) < _STAGE_LATENCY_MIN_SAMPLES:
+        return None
+    return statistics.median(samples)
+
+
+def _plan_models(
+    planner: EnsemblePlanner,
+    models: Dict[str, BaseReIDModel],
+    latency_budget_ms: Optional[float],
+    cost_budget_ms: Optional[float]
+) -> Tuple[Dict[str, BaseReIDModel], Optional[EnsemblePlan]]:
+    """Restrict an ensemble to the planner's choice when a budget is set."""
+    if latency_budget_ms is None and cost_budget_ms is None:
+        return models, None
+    plan = planner.plan(models, latency_budget_ms, cost_budget_ms)
+    logger.info(
+        f"Ensemble plan: {plan.models} (predicted {plan.predicted_latency_ms:.0f} ms, "
+        f"skipped {plan.skipped})"
+    )
+    return {name: models[name] for name in plan.models}, plan
+
+
+async def embed_query(model: BaseReIDModel, artifact: ImageArtifact) -> np.ndarray:
+    """Embed a query crop, letting the model reuse the shared artifact."""
+    if hasattr(model, 'generate_embedding_from_artifact'):
+        embedding = await model.generate_embedding_from_artifact(artifact)
+    elif hasattr(model, 'generate_embedding_from_bytes'):
+        embedding = await model.generate_embedding_from_bytes(artifact.data)
+    else:
+        embedding = await model.generate_embedding(artifact.image)
+
+    # Ensure embedding is numpy array
+    if isinstance(embedding, list):
+        embedding = np.array(embedding)
+    return embedding
+
+
+async def embed_queries_combined(
+    client: MultiEmbeddingClient,
+    model_names: List[str],
+    artifact: ImageArtifact
+) -> Dict[str, np.ndarray]:
+    """Embed a query crop with several models in one Modal round trip.
+
+    Returns unit-length embeddings keyed by ensemble model name, as the
+    per-model wrappers produce them. Embeddings in the persistent embedding
+    cache are not requested again. Models the combined call did not serve
+    are left out for the caller to embed one by one.
+    """
+    registry = get_model_registry()
+    served = {name: multi_embedding_name(name) for name in model_names}
+    # Models on the local CPU backend are not sent to Modal
+    served = {
+        name: remote for name, remote in served.items()
+        if remote is not None and registry.get_backend(remote) == "modal"
+    }
+    if not served:
+        return {}
+
+    embeddings = {}
+    cache = get_embedding_cache()
+    keys = {}
+    if cache is not None:
+        image_sha256 = sha256_hex(encode_image(artifact))
+        keys = {
+            name: (image_sha256, remote, registry.get_embedding_version(remote))
+            for name, remote in served.items()
+        }
+        cached = cache.get_many(keys.values())
+        for name, key in keys.items():
+            if key in cached:
+                embeddings[name] = _unit_length(cached[key])
+        served = {name: remote for name, remote in served.items() if name not in embeddings}
+        if not served:
+            return embeddings
+
+    started = time.perf_counter()
+    response = await client.generate_all_embeddings(artifact, models=list(served.values()))
+    elapsed = time.perf_counter() - started
+    if not response.get("success"):
+        logger.warning(f"Combined embedding call failed, embedding per model: {response.get('error')}")
+        return embeddings
+    if response.get("mock"):
+        for remote in served.values():
+            record_fallback(remote)
+
+    inference_logger = get_inference_logger()
+    computed = {}
+    for name, remote in served.items():
+        result = response["embeddings"].get(remote) or {}
+        if not result.get("success") or result.get("embedding") is None:
+            continue
+        embedding = np.asarray(result["embedding"])
+        embeddings[name] = _unit_length(embedding)
+        if name in keys:
+            computed[keys[name]] = embedding
+        # Every served model waited on the same round trip
+        inference_logger.record_latency(name, elapsed)
+    if computed and not response.get("mock"):
+        cache.put_many(computed)
+    return embeddings
+
+
+def _unit_length(embedding: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(embedding)
+    return embedding / norm if norm > 0 else embedding
+
+
+def _hydrate_model_results(db_session: Any, model_results: List[Dict[str, Any]]) -> None:
+    """Attach tiger metadata to every model's matches with one lookup.
+
+    Per-model searches run with ``hydrate=False``; candidates shared across
+    models are hydrated once here, after all searches have finished.
+    """
+    successful = [r for r in model_results if r.get("success") and r.get("matches")]
+    if not successful:
+        return
+
+    hydrated = {
+        m["image_id"]: m
+        for m in hydrate_matches(db_session, [m for r in successful for m in r["matches"]])
+    }
+    # Keep each model's own similarity when models share a candidate image
+    for result in successful:
+        result["matches"] = [
+            {**hydrated[m["image_id"]], **m} for m in result["matches"] if m["image_id"] in hydrated
+        ]
+        result["tiger_name"] = result["matches"][0]["tiger_name"] if result["matches"] else None
 
 
 class EnsembleStrategy(ABC):
@@ -36,7 +225,7 @@ class EnsembleStrategy(ABC):
     @abstractmethod
     async def identify(
         self,
-        tiger_crop: bytes,
+        tiger_crop: Union[bytes, ImageArtifact],
         models: Dict[str, BaseReIDModel],
         db_session: Any,
         similarity_threshold: float,
@@ -45,7 +234,7 @@ class EnsembleStrategy(ABC):
         """Run identification using the ensemble strategy.
 
         Args:
-            tiger_crop: Cropped tiger image as bytes
+            tiger_crop: Cropped tiger image as bytes or a shared ImageArtifact
             models: Dictionary of model_name -> model instance
             db_session: Database session for vector search
             similarity_threshold: Minimum similarity for a match
@@ -66,6 +255,12 @@ class StaggeredEnsembleStrategy(EnsembleStrategy):
     1. RAPID: >0.90 accept, <0.60 reject, else continue
     2. Wildlife-Tools: >0.85 accept, <0.65 reject, else continue
     3. CVWC2019: >0.80 accept, else continue
+
+    In speculative mode the next stage is started while the current one is
+    still running, once a hedge delay has passed (a fixed delay, or the
+    current stage's recent p50 latency). Decisions are still taken in stage
+    order, and a speculative stage is cancelled as soon as an earlier stage
+    accepts or rejects. At most one speculative stage is in flight.
     """
 
     # Confidence thresholds for each stage
@@ -75,16 +270,101 @@ class StaggeredEnsembleStrategy(EnsembleStrategy):
         {"model": "cvwc2019", "accept": 0.80, "reject": None},
     ]
 
+    def __init__(
+        self,
+        speculative: Optional[bool] = None,
+        speculative_delay: Optional[float] = None
+    ):
+        """Initialize staggered ensemble strategy.
+
+        Args:
+            speculative: Start the next stage before the current one
+                finishes (defaults to STAGGERED_SPECULATIVE)
+            speculative_delay: Seconds after a stage starts before the next
+                stage is launched. None uses the stage model's p50 latency
+                (defaults to STAGGERED_SPECULATIVE_DELAY)
+        """
+        self.speculative = DEFAULT_SPECULATIVE if speculative is None else speculative
+        self.speculative_delay = (
+            DEFAULT_SPECULATIVE_DELAY if speculative_delay is None else speculative_delay
+        )
+
+    def _hedge_delay(self, model_name: str) -> float:
+        """Seconds to wait on a stage before launching the next one."""
+        if self.speculative_delay is not None:
+            return self.speculative_delay
+        p50 = stage_latency_p50(model_name)
+        return p50 if p50 is not None else FALLBACK_SPECULATIVE_DELAY
+
+    async def _run_stage(
+        self,
+        stage: Dict[str, Any],
+        model: BaseReIDModel,
+        artifact: ImageArtifact,
+        db_session: Any,
+        similarity_threshold: float
+    ) -> Dict[str, Any]:
+        """Embed and search with one stage's model and classify the outcome.
+
+        Returns:
+            Dictionary with status ("accepted", "rejected", "inconclusive",
+            "no_match", "skipped" or "failed"), matches and confidence
+        """
+        model_name = stage["model"]
+        try:
+            # Generate embedding
+            embedding = await embed_query(model, artifact)
+
+            # Validate embedding dimensions
+            expected_dim = get_model_embedding_dim(model_name)
+            if expected_dim is not None and embedding.shape[0] != expected_dim:
+                logger.warning(
+                    f"Embedding dimension mismatch for {model_name}: "
+                    f"expected {expected_dim}, got {embedding.shape[0]}"
+                )
+                return {"status": "skipped", "matches": [], "confidence": None}
+
+            # Search for matches
+            matches = find_matching_tigers(
+                db_session,
+                query_embedding=embedding,
+                limit=5,
+                similarity_threshold=similarity_threshold,
+                model_name=model_name
+            )
+        except Exception as e:
+            logger.warning(f"{model_name} model failed: {e}, continuing to next stage")
+            return {"status": "failed", "matches": [], "confidence": None, "error": str(e)}
+
+        if not matches:
+            return {"status": "no_match", "matches": [], "confidence": None}
+
+        confidence = matches[0]["similarity"]
+        if stage["accept"] and confidence > stage["accept"]:
+            status = "accepted"
+        elif stage["reject"] and confidence < stage["reject"]:
+            status = "rejected"
+        else:
+            status = "inconclusive"
+        return {"status": status, "matches": matches, "confidence": confidence}
+
     async def identify(
         self,
-        tiger_crop: bytes,
+        tiger_crop: Union[bytes, ImageArtifact],
         models: Dict[str, BaseReIDModel],
         db_session: Any,
         similarity_threshold: float,
         user_id: UUID
     ) -> Dict[str, Any]:
-        """Run staggered identification with early exit."""
-        image_obj = Image.open(io.BytesIO(tiger_crop))
+        """Run staggered identification with early exit.
+
+        The result includes ``stage_timings``: one entry per launched stage
+        with its start offset and duration in milliseconds, its status
+        (including "cancelled" for abandoned speculative stages) and
+        whether it was launched speculatively.
+        """
+        artifact = ImageArtifact.coerce(tiger_crop)
+        started = time.perf_counter()
 
         result = {
             "identified": False,
@@ -95,84 +375,117 @@ class StaggeredEnsembleStrategy(EnsembleStrategy):
             "matches": []
         }
 
-        for stage in self.STAGE_CONFIG:
-            model_name = stage["model"]
-
-            if model_name not in models:
-                continue
+        stages = [stage for stage in self.STAGE_CONFIG if stage["model"] in models]
+        launched: Dict[int, Tuple[asyncio.Task, Dict[str, Any]]] = {}
+        # perf_counter() at each stage's launch and completion
+        clocks: Dict[int, List[Optional[float]]] = {}
+        decided = False
 
+        async def run_timed(index: int) -> Dict[str, Any]:
+            stage = stages[index]
             try:
-                model = models[model_name]
-
-                # Generate embedding
-                if hasattr(model, 'generate_embedding_from_bytes'):
-                    embedding = await model.generate_embedding_from_bytes(tiger_crop)
-                else:
-                    embedding = await model.generate_embedding(image_obj)
-
-                # Ensure embedding is numpy array
-                if isinstance(embedding, list):
-                    embedding = np.array(embedding)
-
-                # Validate embedding dimensions
-                expected_dim = _model_registry.get_embedding_dim(model_name)
-                if expected_dim is not None and embedding.shape[0] != expected_dim:
-                    logger.warning(
-                        f"Embedding dimension mismatch for {model_name}: "
-                        f"expected {expected_dim}, got {embedding.shape[0]}"
-                    )
-                    continue  # Skip this model and try next stage
-
-                # Search for matches
-                matches = find_matching_tigers(
-                    db_session,
-                    query_embedding=embedding,
-                    limit=5,
-                    similarity_threshold=similarity_threshold
+                return await self._run_stage(
+                    stage, models[stage["model"]], artifact, db_session, similarity_threshold
                 )
+            finally:
+                # Stamped when the stage finishes, not when the loop reaches it
+                clocks[index][1] = time.perf_counter()
+
+        def launch(index: int, speculative: bool) -> None:
+            launched_at = time.perf_counter()
+            timing = {
+                "model": stages[index]["model"],
+                "speculative": speculative,
+                "start_ms": round((launched_at - started) * 1000, 1),
+                "duration_ms": None,
+                "status": "running",
+                "confidence": None,
+            }
+            clocks[index] = [launched_at, None]
+            launched[index] = (asyncio.create_task(run_timed(index)), timing)
 
-                result["model_path"].append(model_name)
-
-                if matches:
-                    confidence = matches[0]["similarity"]
-
-                    # Check accept threshold
-                    if stage["accept"] and confidence > stage["accept"]:
-                        result.update({
-                            "identified": True,
-                            "tiger_id": matches[0]["tiger_id"],
-                            "tiger_name": matches[0]["tiger_name"],
-                            "confidence": confidence,
-                            "matches": matches
-                        })
+        try:
+            for index, stage in enumerate(stages):
+                model_name = stage["model"]
+                if index not in launched:
+                    launch(index, speculative=False)
+                task, timing = launched[index]
+
+                # Hedge: launch the next stage if this one runs past the delay
+                if self.speculative and index + 1 < len(stages) and index + 1 not in launched:
+                    elapsed = time.perf_counter() - started - timing["start_ms"] / 1000
+                    done, _ = await asyncio.wait({task}, timeout=max(self._hedge_delay(model_name) - elapsed, 0))
+                    if not done:
                         logger.info(
-                            f"Staggered ensemble: accepted at {model_name} "
-                            f"with confidence {confidence:.3f}"
+                            f"Staggered ensemble: {model_name} still running, "
+                            f"starting {stages[index + 1]['model']} speculatively"
                         )
-                        return result
+                        launch(index + 1, speculative=True)
+
+                outcome = await task
+                duration = clocks[index][1] - clocks[index][0]
+                timing.update({
+                    "duration_ms": round(duration * 1000, 1),
+                    "status": outcome["status"],
+                    "confidence": outcome["confidence"],
+                })
+                if outcome["status"] in ("skipped", "failed"):
+                    continue
 
-                    # Check reject threshold
-                    if stage["reject"] and confidence < stage["reject"]:
-                        result["message"] = "Tiger not found in database - new individual"
-                        result["requires_verification"] = True
-                        logger.info(
-                            f"Staggered ensemble: rejected at {model_name} "
-                            f"with confidence {confidence:.3f}"
-                        )
-                        return result
+                record_stage_latency(model_name, duration)
+                result["model_path"].append(model_name)
+                confidence = outcome["confidence"]
+
+                if outcome["status"] == "accepted":
+                    matches = outcome["matches"]
+                    result.update({
+                        "identified": True,
+                        "tiger_id": matches[0]["tiger_id"],
+                        "tiger_name": matches[0]["tiger_name"],
+                        "confidence": confidence,
+                        "matches": matches
+                    })
+                    logger.info(
+                        f"Staggered ensemble: accepted at {model_name} "
+                        f"with confidence {confidence:.3f}"
+                    )
+                    decided = True
+                    break
 
+                if outcome["status"] == "rejected":
+                    result["message"] = "Tiger not found in database - new individual"
+                    result["requires_verification"] = True
+                    logger.info(
+                        f"Staggered ensemble: rejected at {model_name} "
+                        f"with confidence {confidence:.3f}"
+                    )
+                    decided = True
+                    break
+
+                if outcome["status"] == "inconclusive":
                     # Continue to next stage
                     logger.info(
                         f"Staggered ensemble: {model_name} inconclusive "
                         f"(confidence {confidence:.3f}), continuing"
                     )
-
-            except Exception as e:
-                logger.warning(f"{model_name} model failed: {e}, continuing to next stage")
-
-        # No match found after all stages
-        result["message"] = "Tiger not found in database - new individual"
-        result["requires_verification"] = True
+        finally:
+            # Cancel speculative stages made redundant by an earlier decision
+            pending = [(task, timing) for task, timing in launched.values() if not task.done()]
+            for task, timing in pending:
+                task.cancel()
+                timing["status"] = "cancelled"
+                timing["duration_ms"] = round((time.perf_counter() - started) * 1000 - timing["start_ms"], 1)
+            if pending:
+                await asyncio.gather(*(task for task, _ in pending), return_exceptions=True)
+
+        result["speculative"] = self.speculative
+        result["stage_timings"] = [launched[index][1] for index in sorted(launched)]
+        result["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        if not decided:
+            # No match found after all stages
+            result["message"] = "Tiger not found in database - new individual"
+            result["requires_verification"] = True
         return result
 
 
@@ -180,33 +493,70 @@ class ParallelEnsembleStrategy(EnsembleStrategy):
     """Parallel ensemble with consensus decision.
 
     Runs all models simultaneously and uses voting to determine the result.
+    With a latency or cost budget, only the planned model subset runs.
     """
 
+    def __init__(
+        self,
+        latency_budget_ms: Optional[float] = None,
+        cost_budget_ms: Optional[float] = None,
+        planner: Optional[EnsemblePlanner] = None,
+        embedding_client: Optional[MultiEmbeddingClient] = None
+    ):
+        """Initialize parallel ensemble strategy.
+
+        Args:
+            latency_budget_ms: Predicted latency budget for model selection
+                (defaults to ENSEMBLE_LATENCY_BUDGET_MS)
+            cost_budget_ms: Predicted compute budget for model selection
+                (defaults to ENSEMBLE_COST_BUDGET_MS)
+            planner: Planner choosing models under the budget
+            embedding_client: Client fetching all query embeddings in one
+                round trip (the shared client when ENSEMBLE_COMBINED_EMBEDDINGS
+                is set, otherwise models are called one by one)
+        """
+        self.latency_budget_ms = (
+            DEFAULT_LATENCY_BUDGET_MS if latency_budget_ms is None else latency_budget_ms
+        )
+        self.cost_budget_ms = DEFAULT_COST_BUDGET_MS if cost_budget_ms is None else cost_budget_ms
+        self.planner = planner or EnsemblePlanner()
+        self.embedding_client = embedding_client or (
+            get_multi_embedding_client() if DEFAULT_COMBINED_EMBEDDINGS else None
+        )
+
     async def identify(
         self,
-        tiger_crop: bytes,
+        tiger_crop: Union[bytes, ImageArtifact],
         models: Dict[str, BaseReIDModel],
         db_session: Any,
         similarity_threshold: float,
         user_id: UUID
     ) -> Dict[str, Any]:
-        """Run all models in parallel and use consensus decision."""
-        image_obj = Image.open(io.BytesIO(tiger_crop))
+        """Run all models in parallel and use consensus decision.
+
+        When a budget is set the result includes ``ensemble_plan`` with the
+        models run and the predicted latency.
+        """
+        artifact = ImageArtifact.coerce(tiger_crop)
+        models, plan = _plan_models(self.planner, models, self.latency_budget_ms, self.cost_budget_ms)
+        inference_logger = get_inference_logger()
+        prefetched = (
+            await embed_queries_combined(self.embedding_client, list(models), artifact)
+            if self.embedding_client is not None else {}
+        )
 
         async def run_model(model_name: str, model: BaseReIDModel) -> Dict[str, Any]:
             """Run a single model and return results."""
             try:
-                if hasattr(model, 'generate_embedding_from_bytes'):
-                    embedding = await model.generate_embedding_from_bytes(tiger_crop)
-                else:
-                    embedding = await model.generate_embedding(image_obj)
-
-                # Ensure embedding is numpy array
-                if isinstance(embedding, list):
-                    embedding = np.array(embedding)
+                embedding = prefetched.get(model_name)
+                if embedding is None:
+                    # Generate embedding, feeding the planner's latency window
+                    embed_started = time.perf_counter()
+                    embedding = await embed_query(model, artifact)
+                    inference_logger.record_latency(model_name, time.perf_counter() - embed_started)
 
                 # Validate embedding dimensions
-                expected_dim = _model_registry.get_embedding_dim(model_name)
+                expected_dim = get_model_embedding_dim(model_name)
                 if expected_dim is not None and embedding.shape[0] != expected_dim:
                     logger.warning(
                         f"Embedding dimension mismatch for {model_name}: "
@@ -222,7 +572,9 @@ class ParallelEnsembleStrategy(EnsembleStrategy):
                     db_session,
                     query_embedding=embedding,
                     limit=5,
-                    similarity_threshold=similarity_threshold
+                    similarity_threshold=similarity_threshold,
+                    model_name=model_name,
+                    hydrate=False
                 )
 
                 return {
@@ -230,7 +582,7 @@ class ParallelEnsembleStrategy(EnsembleStrategy):
                     "matches": matches,
                     "best_similarity": matches[0]["similarity"] if matches else 0.0,
                     "tiger_id": matches[0]["tiger_id"] if matches else None,
-                    "tiger_name": matches[0]["tiger_name"] if matches else None,
+                    "tiger_name": None,
                     "success": True
                 }
             except Exception as e:
@@ -247,8 +599,12 @@ class ParallelEnsembleStrategy(EnsembleStrategy):
             for model_name, model in models.items()
         ]
         model_results = await asyncio.gather(*tasks)
+        _hydrate_model_results(db_session, model_results)
 
-        return self._consensus_decision(model_results)
+        result = self._consensus_decision(model_results)
+        if plan is not None:
+            result["ensemble_plan"] = plan.to_dict()
+        return result
 
     def _consensus_decision(
         self,
@@ -360,7 +716,12 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
         use_calibration: bool = True,
         reranking_k1: int = 20,
         reranking_k2: int = 6,
-        reranking_lambda: float = 0.3
+        reranking_lambda: float = 0.3,
+        latency_budget_ms: Optional[float] = None,
+        cost_budget_ms: Optional[float] = None,
+        planner: Optional[EnsemblePlanner] = None,
+        candidate_pool_size: Optional[int] = None,
+        embedding_client: Optional[MultiEmbeddingClient] = None
     ):
         """Initialize weighted ensemble strategy.
 
@@ -371,10 +732,30 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
             reranking_k1: K1 parameter for re-ranking
             reranking_k2: K2 parameter for re-ranking
             reranking_lambda: Lambda parameter for re-ranking
+            latency_budget_ms: Predicted latency budget for model selection
+                (defaults to ENSEMBLE_LATENCY_BUDGET_MS)
+            cost_budget_ms: Predicted compute budget for model selection
+                (defaults to ENSEMBLE_COST_BUDGET_MS)
+            planner: Planner choosing models under the budget (defaults to
+                one using this strategy's model weights)
+            candidate_pool_size: Matches fetched per model for fusion and
+                re-ranking (defaults to ENSEMBLE_CANDIDATE_POOL)
+            embedding_client: Client fetching all query embeddings in one
+                round trip (the shared client when ENSEMBLE_COMBINED_EMBEDDINGS
+                is set, otherwise models are called one by one)
         """
         self.model_weights = model_weights or DEFAULT_MODEL_WEIGHTS.copy()
         self.use_reranking = use_reranking
         self.use_calibration = use_calibration
+        self.latency_budget_ms = (
+            DEFAULT_LATENCY_BUDGET_MS if latency_budget_ms is None else latency_budget_ms
+        )
+        self.cost_budget_ms = DEFAULT_COST_BUDGET_MS if cost_budget_ms is None else cost_budget_ms
+        self.planner = planner or EnsemblePlanner(model_weights=self.model_weights)
+        self.candidate_pool_size = candidate_pool_size or DEFAULT_CANDIDATE_POOL
+        self.embedding_client = embedding_client or (
+            get_multi_embedding_client() if DEFAULT_COMBINED_EMBEDDINGS else None
+        )
 
         # Initialize calibrator and re-ranking service
         self.calibrator = ConfidenceCalibrator(weights=self.model_weights)
@@ -386,7 +767,7 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
 
     async def identify(
         self,
-        tiger_crop: bytes,
+        tiger_crop: Union[bytes, ImageArtifact],
         models: Dict[str, BaseReIDModel],
         db_session: Any,
         similarity_threshold: float,
@@ -395,7 +776,7 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
         """Run weighted ensemble identification with optional re-ranking.
 
         Args:
-            tiger_crop: Cropped tiger image as bytes
+            tiger_crop: Cropped tiger image as bytes or a shared ImageArtifact
             models: Dictionary of model_name -> model instance
             db_session: Database session for vector search
             similarity_threshold: Minimum similarity for a match
@@ -408,24 +789,28 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
             - confidence: Weighted confidence score
             - model_results: Per-model results
             - ensemble_matches: Combined and ranked matches
+            - ensemble_plan: Models run and predicted latency (with a budget)
         """
-        image_obj = Image.open(io.BytesIO(tiger_crop))
+        artifact = ImageArtifact.coerce(tiger_crop)
+        models, plan = _plan_models(self.planner, models, self.latency_budget_ms, self.cost_budget_ms)
+        inference_logger = get_inference_logger()
+        prefetched = (
+            await embed_queries_combined(self.embedding_client, list(models), artifact)
+            if self.embedding_client is not None else {}
+        )
 
         async def run_model(model_name: str, model: BaseReIDModel) -> Dict[str, Any]:
             """Run a single model and return results with embedding."""
             try:
-                # Generate embedding
-                if hasattr(model, 'generate_embedding_from_bytes'):
-                    embedding = await model.generate_embedding_from_bytes(tiger_crop)
-                else:
-                    embedding = await model.generate_embedding(image_obj)
-
-                # Ensure embedding is numpy array
-                if isinstance(embedding, list):
-                    embedding = np.array(embedding)
+                embedding = prefetched.get(model_name)
+                if embedding is None:
+                    # Generate embedding, feeding the planner's latency window
+                    embed_started = time.perf_counter()
+                    embedding = await embed_query(model, artifact)
+                    inference_logger.record_latency(model_name, time.perf_counter() - embed_started)
 
                 # Validate embedding dimensions
-                expected_dim = _model_registry.get_embedding_dim(model_name)
+                expected_dim = get_model_embedding_dim(model_name)
                 if expected_dim is not None and embedding.shape[0] != expected_dim:
                     logger.warning(
                         f"Embedding dimension mismatch for {model_name}: "
@@ -441,8 +826,10 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
                 matches = find_matching_tigers(
                     db_session,
                     query_embedding=embedding,
-                    limit=10,  # Get more matches for re-ranking
-                    similarity_threshold=similarity_threshold * 0.8  # Lower threshold for re-ranking pool
+                    limit=self.candidate_pool_size,  # Get more matches for re-ranking
+                    similarity_threshold=similarity_threshold * 0.8,  # Lower threshold for re-ranking pool
+                    model_name=model_name,
+                    hydrate=False
                 )
 
                 return {
@@ -451,7 +838,7 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
                     "matches": matches,
                     "best_similarity": matches[0]["similarity"] if matches else 0.0,
                     "tiger_id": matches[0]["tiger_id"] if matches else None,
-                    "tiger_name": matches[0]["tiger_name"] if matches else None,
+                    "tiger_name": None,
                     "success": True
                 }
             except Exception as e:
@@ -468,12 +855,46 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
             for model_name, model in models.items()
         ]
         model_results = await asyncio.gather(*tasks)
+        if self.reranking_service is not None:
+            await asyncio.to_thread(self._rerank_model_results, model_results)
+        _hydrate_model_results(db_session, model_results)
 
         # Process results with weighted ensemble
-        return self._weighted_ensemble_decision(
+        result = self._weighted_ensemble_decision(
             model_results,
             similarity_threshold
         )
+        if plan is not None:
+            result["ensemble_plan"] = plan.to_dict()
+        return result
+
+    def _rerank_model_results(self, model_results: List[Dict[str, Any]]) -> None:
+        """Reorder each model's candidate pool with k-reciprocal re-ranking.
+
+        Re-ranking runs against the model's cached gallery k-NN graph, so
+        only query-to-gallery distances are computed per identification.
+        Models without a loaded graph keep their vector search order.
+
+        Args:
+            model_results: Results from each model (updated in place)
+        """
+        for result in model_results:
+            if not result.get("success") or not result.get("matches"):
+                continue
+            try:
+                reranked = self.reranking_service.rerank_gallery_matches(
+                    result["model"], result["embedding"], result["matches"]
+                )
+            except Exception as e:
+                logger.warning(f"Re-ranking failed for {result['model']}, keeping search order: {e}")
+                continue
+            if reranked is None:
+                continue
+
+            result["matches"] = reranked
+            result["best_similarity"] = reranked[0]["similarity"]
+            result["tiger_id"] = reranked[0]["tiger_id"]
+            result["reranked"] = True
 
     def _weighted_ensemble_decision(
         self,
@@ -503,62 +924,53 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
                 "models": {r["model"]: r for r in model_results}
             }
 
-        # Collect all unique tiger IDs and their scores from each model
-        tiger_scores: Dict[str, Dict[str, Any]] = {}
-
+        # Fuse on a models x candidates matrix holding each model's best
+        # (calibrated) similarity per tiger; 0 means the model did not find it
+        candidate_index: Dict[str, int] = {}
+        tiger_names: List[Optional[str]] = []
+        model_names = [r["model"] for r in successful_results]
+        rows = []
         for result in successful_results:
-            model_name = result["model"]
-            weight = self.model_weights.get(model_name, 0.1)
-
-            for match in result.get("matches", []):
-                tiger_id = match.get("tiger_id")
-                if not tiger_id:
-                    continue
-
-                similarity = match.get("similarity", 0)
-
-                # Apply calibration if enabled
-                if self.use_calibration:
-                    similarity = self.calibrator.calibrate(similarity, model_name)
-
-                if tiger_id not in tiger_scores:
-                    tiger_scores[tiger_id] = {
-                        "tiger_id": tiger_id,
-                        "tiger_name": match.get("tiger_name"),
-                        "model_scores": {},
-                        "weighted_sum": 0.0,
-                        "total_weight": 0.0
-                    }
-
-                # Store the best score from this model for this tiger
-                current_score = tiger_scores[tiger_id]["model_scores"].get(model_name, 0)
-                if similarity > current_score:
-                    # Update weighted sum
-                    old_contribution = current_score * weight
-                    new_contribution = similarity * weight
-
-                    tiger_scores[tiger_id]["weighted_sum"] += (new_contribution - old_contribution)
-                    if model_name not in tiger_scores[tiger_id]["model_scores"]:
-                        tiger_scores[tiger_id]["total_weight"] += weight
-
-                    tiger_scores[tiger_id]["model_scores"][model_name] = similarity
-
-        # Calculate final weighted scores
-        for tiger_id, data in tiger_scores.items():
-            if data["total_weight"] > 0:
-                data["weighted_score"] = data["weighted_sum"] / data["total_weight"]
-            else:
-                data["weighted_score"] = 0.0
+            matches = [m for m in result["matches"] if m.get("tiger_id")]
+            for match in matches:
+                if match["tiger_id"] not in candidate_index:
+                    candidate_index[match["tiger_id"]] = len(tiger_names)
+                    tiger_names.append(match.get("tiger_name"))
+            columns = np.fromiter(
+                (candidate_index[m["tiger_id"]] for m in matches), dtype=np.intp, count=len(matches)
+            )
+            similarities = np.fromiter(
+                (m.get("similarity", 0) for m in matches), dtype=np.float64, count=len(matches)
+            )
+            if self.use_calibration:
+                similarities = self.calibrator.calibrate_batch(similarities, result["model"])
+            rows.append((columns, similarities))
+
+        scores = np.zeros((len(model_names), len(tiger_names)))
+        for row, (columns, similarities) in enumerate(rows):
+            np.maximum.at(scores[row], columns, similarities)
+
+        found = scores > 0
+        weights = np.array([self.model_weights.get(name, 0.1) for name in model_names])
+        total_weight = weights @ found
+        weighted_scores = np.divide(
+            weights @ scores, total_weight, out=np.zeros(len(tiger_names)), where=total_weight > 0
+        )
+        model_counts = found.sum(axis=0)
+        tiger_ids = list(candidate_index)
 
-            # Count how many models found this tiger
-            data["model_count"] = len(data["model_scores"])
+        def candidate(column: int) -> Dict[str, Any]:
+            return {
+                "tiger_id": tiger_ids[column],
+                "tiger_name": tiger_names[column],
+                "weighted_score": float(weighted_scores[column]),
+                "model_count": int(model_counts[column]),
+            }
 
-        # Sort by weighted score
-        ranked_tigers = sorted(
-            tiger_scores.values(),
-            key=lambda x: x["weighted_score"],
-            reverse=True
-        )
+        # Sort by weighted score (stable, so ties keep first-seen order)
+        ranked_tigers = [
+            candidate(column) for column in np.argsort(-weighted_scores, kind="stable")[:5]
+        ]
 
         if not ranked_tigers:
             return {
@@ -569,6 +981,11 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
             }
 
         best_match = ranked_tigers[0]
+        best_column = candidate_index[best_match["tiger_id"]]
+        best_match["model_scores"] = {
+            name: float(scores[row, best_column])
+            for row, name in enumerate(model_names) if found[row, best_column]
+        }
 
         # Determine confidence level
         if best_match["weighted_score"] >= 0.90 and best_match["model_count"] >= 2:
@@ -596,7 +1013,7 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
             "model_scores": best_match["model_scores"],
             "ensemble_method": "weighted",
             "calibration_applied": self.use_calibration,
-            "reranking_applied": self.use_reranking,
+            "reranking_applied": any(r.get("reranked") for r in model_results),
             "top_candidates": [
                 {
                     "tiger_id": t["tiger_id"],
@@ -604,7 +1021,7 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
                     "weighted_score": t["weighted_score"],
                     "model_count": t["model_count"]
                 }
-                for t in ranked_tigers[:5]
+                for t in ranked_tigers
             ],
             "models": {r["model"]: {
                 "success": r.get("success"),
@@ -629,7 +1046,9 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
 
     The verification stage:
     1. Gets top-K candidates from weighted ensemble
-    2. Runs MatchAnything pairwise comparison on each candidate (in parallel)
+    2. Runs MatchAnything pairwise comparison on each candidate (in parallel,
+       at most ``verification_concurrency`` comparisons at once), matching
+       the query's features against precomputed gallery features
     3. Combines ReID scores with geometric matching scores using adaptive weights
     4. Re-ranks based on combined scores with meaningful verification status
     """
@@ -660,7 +1079,13 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
         use_adaptive_weights: bool = True,
         reranking_k1: int = 20,
         reranking_k2: int = 6,
-        reranking_lambda: float = 0.3
+        reranking_lambda: float = 0.3,
+        verification_concurrency: Optional[int] = None,
+        latency_budget_ms: Optional[float] = None,
+        cost_budget_ms: Optional[float] = None,
+        planner: Optional[EnsemblePlanner] = None,
+        candidate_pool_size: Optional[int] = None,
+        embedding_client: Optional[MultiEmbeddingClient] = None
     ):
         """Initialize verified ensemble strategy.
 
@@ -676,6 +1101,14 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
             reranking_k1: K1 parameter for re-ranking
             reranking_k2: K2 parameter for re-ranking
             reranking_lambda: Lambda parameter for re-ranking
+            verification_concurrency: Maximum MatchAnything comparisons in
+                flight (defaults to VERIFICATION_CONCURRENCY)
+            latency_budget_ms: Predicted ReID latency budget for model selection
+            cost_budget_ms: Predicted ReID compute budget for model selection
+            planner: Planner choosing ReID models under the budget
+            candidate_pool_size: Matches fetched per ReID model for fusion
+            embedding_client: Client fetching all ReID query embeddings in
+                one round trip
         """
         super().__init__(
             model_weights=model_weights,
@@ -683,18 +1116,24 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
             use_calibration=use_calibration,
             reranking_k1=reranking_k1,
             reranking_k2=reranking_k2,
-            reranking_lambda=reranking_lambda
+            reranking_lambda=reranking_lambda,
+            latency_budget_ms=latency_budget_ms,
+            cost_budget_ms=cost_budget_ms,
+            planner=planner,
+            candidate_pool_size=candidate_pool_size,
+            embedding_client=embedding_client
         )
         self.use_verification = use_verification
         self.verification_top_k = verification_top_k
         self.reid_weight = reid_weight
         self.match_weight = match_weight
         self.use_adaptive_weights = use_adaptive_weights
+        self.verification_concurrency = verification_concurrency or DEFAULT_VERIFICATION_CONCURRENCY
         self._matchanything_model = None
 
     async def identify(
         self,
-        tiger_crop: bytes,
+        tiger_crop: Union[bytes, ImageArtifact],
         models: Dict[str, BaseReIDModel],
         db_session: Any,
         similarity_threshold: float,
@@ -704,7 +1143,7 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
         """Run verified ensemble identification.
 
         Args:
-            tiger_crop: Cropped tiger image as bytes
+            tiger_crop: Cropped tiger image as bytes or a shared ImageArtifact
             models: Dictionary of model_name -> model instance
             db_session: Database session for vector search
             similarity_threshold: Minimum similarity for a match
@@ -714,18 +1153,18 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
         Returns:
             Dictionary with identification results including verification scores
         """
+        # Decode once for both the ReID models and verification
+        query_image = ImageArtifact.coerce(tiger_crop)
+
         # First run the weighted ensemble
         result = await super().identify(
-            tiger_crop, models, db_session, similarity_threshold, user_id
+            query_image, models, db_session, similarity_threshold, user_id
         )
 
         # If verification is disabled or no candidates, return as-is
         if not self.use_verification or not result.get("top_candidates"):
             return result
 
-        # Get query image
-        query_image = Image.open(io.BytesIO(tiger_crop))
-
         # Verify top candidates
         try:
             verified_candidates = await self._verify_candidates(
@@ -760,7 +1199,7 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
 
     async def _verify_candidates(
         self,
-        query_image: Image.Image,
+        query_image: Union[Image.Image, ImageArtifact],
         candidates: List[Dict[str, Any]],
         gallery_images: Optional[Dict[str, Image.Image]],
         db_session: Any,
@@ -768,6 +1207,10 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
     ) -> List[Dict[str, Any]]:
         """Verify candidates using MatchAnything in parallel.
 
+        The query's verification features are extracted once and matched
+        against the gallery features of every candidate, with at most
+        ``verification_concurrency`` comparisons in flight.
+
         Args:
             query_image: Query tiger image
             candidates: List of candidate dictionaries
@@ -791,20 +1234,36 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
         # Calculate adaptive weights if enabled
         reid_weight, match_weight = self._calculate_adaptive_weights(candidates)
 
+        # Matcher input for the query, shared by every comparison
+        query_features = await asyncio.to_thread(extract_verification_features, query_image)
+        semaphore = asyncio.Semaphore(self.verification_concurrency)
+
+        async def match(gallery_features: bytes) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._matchanything_model.match_pair(query_features, gallery_features)
+
+        # Gallery features of every candidate without a pre-loaded image, in one lookup
+        to_load = [
+            c.get("tiger_id") for c in candidates
+            if not (gallery_images and c.get("tiger_id") in gallery_images)
+        ]
+        gallery_features = await self._load_gallery_features(to_load, db_session, query_side_view)
+
         async def verify_single(candidate: Dict[str, Any]) -> Dict[str, Any]:
             """Verify a single candidate against multiple gallery images."""
             tiger_id = candidate.get("tiger_id")
             reid_score = candidate.get("weighted_score", 0)
 
-            # Get gallery images for this tiger
+            # Get gallery features for this tiger
             gallery_imgs = []
             if gallery_images and tiger_id in gallery_images:
-                gallery_imgs = [(gallery_images[tiger_id], None)]
-            else:
-                # Load multiple gallery images from database
-                gallery_imgs = await self._load_gallery_images(
-                    tiger_id, db_session, query_side_view
+                features = await asyncio.to_thread(
+                    extract_verification_features, gallery_images[tiger_id]
                 )
+                gallery_imgs = [(features, None)]
+            else:
+                # Precomputed features of the tiger's best gallery images
+                gallery_imgs = gallery_features.get(tiger_id, [])
 
             if not gallery_imgs:
                 logger.warning(f"No gallery image for tiger {tiger_id}, skipping verification")
@@ -821,17 +1280,17 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
             best_match_result = None
             best_num_matches = 0
 
-            for gallery_img, tiger_image_record in gallery_imgs:
-                try:
-                    match_result = await self._matchanything_model.match_pair(
-                        query_image, gallery_img
-                    )
-                    if match_result["num_matches"] > best_num_matches:
-                        best_num_matches = match_result["num_matches"]
-                        best_match_result = match_result
-                except Exception as e:
-                    logger.warning(f"MatchAnything failed for gallery image: {e}")
+            match_results = await asyncio.gather(
+                *(match(features) for features, _ in gallery_imgs),
+                return_exceptions=True
+            )
+            for match_result in match_results:
+                if isinstance(match_result, Exception):
+                    logger.warning(f"MatchAnything failed for gallery image: {match_result}")
                     continue
+                if match_result["num_matches"] > best_num_matches:
+                    best_num_matches = match_result["num_matches"]
+                    best_match_result = match_result
 
             if best_match_result is None:
                 return {
@@ -1025,6 +1484,119 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
     # Timeout for loading a single image (seconds)
     IMAGE_LOAD_TIMEOUT = 10
 
+    def _select_gallery_records(
+        self,
+        tiger_id: str,
+        db_session: Any,
+        query_side_view: Optional[str] = None
+    ) -> List[Any]:
+        """TigerImage records with files, best verification candidates first.
+
+        Args:
+            tiger_id: Tiger identifier
+            db_session: Database session
+            query_side_view: Side view of query for preferential selection
+
+        Returns:
+            TigerImage records ordered by side view match and quality
+        """
+        from backend.database.models import TigerImage
+
+        # Query images ordered by quality metrics
+        query = db_session.query(TigerImage).filter(
+            TigerImage.tiger_id == tiger_id,
+            TigerImage.image_path.isnot(None)
+        ).order_by(
+            TigerImage.is_reference.desc().nullslast(),
+            TigerImage.verified.desc().nullslast(),
+            TigerImage.quality_score.desc().nullslast()
+        )
+
+        tiger_images = query.all()
+
+        # Select best images considering side view
+        if tiger_images and query_side_view and query_side_view != "unknown":
+            # Sort to prioritize matching side views
+            tiger_images = sorted(
+                tiger_images,
+                key=lambda img: gallery_rank_key(img, query_side_view),
+                reverse=True
+            )
+        return tiger_images
+
+    async def _load_gallery_features(
+        self,
+        tiger_ids: List[str],
+        db_session: Any,
+        query_side_view: Optional[str] = None,
+        max_images: Optional[int] = None
+    ) -> Dict[str, List[tuple]]:
+        """Verification features of several tigers' best gallery images.
+
+        Images come from the store's per-tiger, per-side preselection and
+        their features from the store, both maintained at ingest, so the
+        whole candidate list costs two store lookups. Tigers without a
+        preselection (images predating the store) are seeded from the
+        database once; images without stored features are read from disk
+        once and stored.
+        Without a store (in-memory databases) the gallery images are loaded
+        and their features extracted per query.
+
+        Args:
+            tiger_ids: Tiger identifiers
+            db_session: Database session
+            query_side_view: Side view of query for preferential selection
+            max_images: Maximum number of images per tiger
+
+        Returns:
+            Dictionary of tiger_id -> list of (features bytes, image_id) tuples
+        """
+        max_images = max_images or self.MAX_GALLERY_IMAGES
+        store = get_gallery_feature_store()
+        if store is None:
+            result = {}
+            for tiger_id in tiger_ids:
+                images = await self._load_gallery_images(tiger_id, db_session, query_side_view, max_images)
+                result[tiger_id] = [
+                    (await asyncio.to_thread(extract_verification_features, img), str(record.image_id))
+                    for img, record in images
+                ]
+            return result
+
+        try:
+            selected = {}
+            if max_images <= store.selection_size:
+                selected = store.select_gallery(tiger_ids, query_side_view, max_images)
+                missing = [t for t in tiger_ids if t not in selected]
+                if missing and build_gallery_selection(db_session, missing):
+                    selected.update(store.select_gallery(missing, query_side_view, max_images))
+
+            # More images than are preselected, or a seed that lost a race
+            for tiger_id in [t for t in tiger_ids if t not in selected]:
+                records = self._select_gallery_records(tiger_id, db_session, query_side_view)
+                selected[tiger_id] = [(str(r.image_id), r.image_path) for r in records[:max_images]]
+
+            refs = [ref for tiger_id in tiger_ids for ref in selected.get(tiger_id, [])]
+            features = await asyncio.wait_for(
+                asyncio.to_thread(store.get_or_compute, refs),
+                timeout=self.IMAGE_LOAD_TIMEOUT * max(len(refs), 1)
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout loading verification features for tigers {tiger_ids}")
+            return {}
+        except Exception as e:
+            logger.warning(f"Failed to load verification features for tigers {tiger_ids}: {e}")
+            return {}
+
+        return {
+            tiger_id: [
+                (features[image_id], image_id)
+                for image_id, _ in selected.get(tiger_id, [])
+                if image_id in features
+            ]
+            for tiger_id in tiger_ids
+        }
+
     async def _load_gallery_images(
         self,
         tiger_id: str,
@@ -1044,40 +1616,14 @@ class VerifiedEnsembleStrategy(WeightedEnsembleStrategy):
             List of (PIL.Image, TigerImage) tuples
         """
         from pathlib import Path
-        from backend.database.models import TigerImage
 
         max_images = max_images or self.MAX_GALLERY_IMAGES
 
         try:
-            # Query images ordered by quality metrics
-            query = db_session.query(TigerImage).filter(
-                TigerImage.tiger_id == tiger_id,
-                TigerImage.image_path.isnot(None)
-            ).order_by(
-                TigerImage.is_reference.desc().nullslast(),
-                TigerImage.verified.desc().nullslast(),
-                TigerImage.quality_score.desc().nullslast()
-            )
-
-            tiger_images = query.all()
+            tiger_images = self._select_gallery_records(tiger_id, db_session, query_side_view)
             if not tiger_images:
                 return []
 
-            # Select best images considering side view
-            if query_side_view and query_side_view != "unknown":
-                # Sort to prioritize matching side views
-                tiger_images = sorted(
-                    tiger_images,
-                    key=lambda img: (
-                        2 if (img.side_view and img.side_view.value == query_side_view) else
-                        (1 if (img.side_view and img.side_view.value == "both") else 0),
-                        img.is_reference or False,
-                        img.verified or False,
-                        img.quality_score or 0
-                    ),
-                    reverse=True
-                )
-
             # Load images from filesystem with timeout protection
             result = []
             loop = asyncio.get_event_loop()
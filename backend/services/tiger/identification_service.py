@@ -8,11 +8,15 @@ from uuid import UUID
 import asyncio
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
-from PIL import Image
-import io
 
+from backend.utils.image_artifact import ImageArtifact
 from backend.utils.logging import get_logger
 from backend.config.settings import get_settings
+from backend.database.identification_cache import (
+    get_active_model_versions,
+    get_identification_cache,
+    make_cache_key,
+)
 from backend.database.vector_search import find_matching_tigers
 from backend.models.detection import TigerDetectionModel
 from backend.models.interfaces.base_reid_model import BaseReIDModel
@@ -23,12 +27,34 @@ from backend.services.tiger.ensemble_strategy import (
     ParallelEnsembleStrategy,
     WeightedEnsembleStrategy,
     VerifiedEnsembleStrategy,
+    embed_query,
 )
 from backend.services.model_inference_logger import get_inference_logger
 from backend.services.model_cache_service import get_cache_service
+from backend.services.modal_client import track_fallbacks
 
 logger = get_logger(__name__)
 
+NO_DETECTION_MESSAGE = "No tiger detected in image"
+
+
+def _is_cacheable(result: Dict[str, Any], fallbacks: List[str]) -> bool:
+    """Whether an identification result may be served to later uploads.
+
+    Results that depend on a transient condition (no detection, a failed
+    model run, or a mock or fallback response while Modal was down) are
+    not cached, so a re-submission is identified again.
+    """
+    if fallbacks or result.get("message") == NO_DETECTION_MESSAGE:
+        return False
+    if any(stage.get("status") == "failed" for stage in result.get("stage_timings") or []):
+        return False
+    return all(
+        model_result.get("success", True)
+        for model_result in (result.get("models") or {}).values()
+        if isinstance(model_result, dict)
+    )
+
 
 class TigerIdentificationService:
     """Service for identifying tigers from images."""
@@ -96,19 +122,32 @@ class TigerIdentificationService:
         user_id: UUID,
         similarity_threshold: float = 0.8,
         model_name: Optional[str] = None,
-        use_all_models: bool = False
+        use_all_models: bool = False,
+        latency_budget_ms: Optional[float] = None,
+        cost_budget_ms: Optional[float] = None
     ) -> Dict[str, Any]:
         """Identify a tiger from an uploaded image.
 
+        Results are cached by image content, ensemble mode, request
+        parameters, active model versions and gallery generation, so a
+        repeat upload skips detection, embedding and search entirely.
+        Results without a detection, with a failed model run or with a
+        mock or fallback response are not cached.
+
         Args:
             image: Uploaded image file
             user_id: User ID
             similarity_threshold: Similarity threshold for matching
             model_name: Name of model to use (None for default)
             use_all_models: If True, run all available models
+            latency_budget_ms: Predicted latency budget; parallel, weighted
+                and verified ensembles run only the models expected to fit
+            cost_budget_ms: Predicted compute budget for the same selection
 
         Returns:
-            Dictionary with identification results
+            Dictionary with identification results (``cached`` is True
+            when served from the cache; budgeted ensembles include
+            ``ensemble_plan``)
         """
         logger.info(
             "Identifying tiger from image",
@@ -116,33 +155,74 @@ class TigerIdentificationService:
             model=model_name
         )
 
-        # Read image
-        image_bytes = await image.read()
+        # Read image; every stage shares this decode-once artifact
+        artifact = ImageArtifact.from_bytes(await image.read())
 
+        cache = get_identification_cache()
+        if cache is None:
+            return await self._identify_artifact(
+                artifact, user_id, similarity_threshold, model_name, use_all_models,
+                latency_budget_ms, cost_budget_ms
+            )
+
+        generation = cache.generation()
+        cache_key = make_cache_key(
+            artifact.sha256,
+            generation,
+            get_active_model_versions(self.db),
+            ensemble_mode=self._ensemble_mode,
+            similarity_threshold=similarity_threshold,
+            model_name=model_name,
+            use_all_models=use_all_models,
+            latency_budget_ms=latency_budget_ms,
+            cost_budget_ms=cost_budget_ms,
+            models=self.get_available_models(),
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("Identification served from cache", filename=image.filename)
+            cached["cached"] = True
+            return cached
+
+        with track_fallbacks() as fallbacks:
+            result = await self._identify_artifact(
+                artifact, user_id, similarity_threshold, model_name, use_all_models,
+                latency_budget_ms, cost_budget_ms
+            )
+        if _is_cacheable(result, fallbacks):
+            cache.put(cache_key, generation, result)
+        else:
+            logger.info("Identification result not cached", fallbacks=fallbacks)
+        return result
+
+    async def _identify_artifact(
+        self,
+        artifact: ImageArtifact,
+        user_id: UUID,
+        similarity_threshold: float,
+        model_name: Optional[str],
+        use_all_models: bool,
+        latency_budget_ms: Optional[float] = None,
+        cost_budget_ms: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Run detection and the selected identification strategy."""
         # Detect tiger in image
-        detection_result = await self.detection_model.detect(image_bytes)
+        detection_result = await self.detection_model.detect(artifact)
 
         if not detection_result.get("detections"):
             return {
                 "identified": False,
-                "message": "No tiger detected in image",
+                "message": NO_DETECTION_MESSAGE,
                 "confidence": 0.0,
                 "model": model_name or "default"
             }
 
-        # Extract tiger crop
-        tiger_crop = detection_result["detections"][0].get("crop")
-
-        # Convert crop to bytes if it's a PIL Image
-        # Use run_in_executor to avoid blocking the event loop
-        if hasattr(tiger_crop, 'save'):
-            def _save_image_to_bytes(img):
-                buffer = io.BytesIO()
-                img.save(buffer, format='JPEG')
-                return buffer.getvalue()
+        # Reuse the crop artifact (already decoded) for every model
+        detection = detection_result["detections"][0]
+        tiger_crop = detection.get("artifact") or ImageArtifact.coerce(detection.get("crop"))
 
-            loop = asyncio.get_event_loop()
-            tiger_crop = await loop.run_in_executor(None, _save_image_to_bytes, tiger_crop)
+        # Encode the crop once off the event loop; model calls share it
+        await asyncio.to_thread(tiger_crop.encode)
 
         # Choose identification strategy
         if self._ensemble_mode == 'staggered':
@@ -156,7 +236,9 @@ class TigerIdentificationService:
             # Use weighted ensemble with calibration and re-ranking
             strategy = WeightedEnsembleStrategy(
                 use_reranking=True,
-                use_calibration=True
+                use_calibration=True,
+                latency_budget_ms=latency_budget_ms,
+                cost_budget_ms=cost_budget_ms
             )
             models = self._get_all_model_instances()
             return await strategy.identify(
@@ -169,7 +251,9 @@ class TigerIdentificationService:
                 use_reranking=True,
                 use_calibration=True,
                 use_verification=True,
-                use_adaptive_weights=True
+                use_adaptive_weights=True,
+                latency_budget_ms=latency_budget_ms,
+                cost_budget_ms=cost_budget_ms
             )
             models = self._get_all_model_instances()
             return await strategy.identify(
@@ -177,7 +261,10 @@ class TigerIdentificationService:
             )
 
         elif self._ensemble_mode == 'parallel' or use_all_models:
-            strategy = ParallelEnsembleStrategy()
+            strategy = ParallelEnsembleStrategy(
+                latency_budget_ms=latency_budget_ms,
+                cost_budget_ms=cost_budget_ms
+            )
             models = self._get_all_model_instances()
             return await strategy.identify(
                 tiger_crop, models, self.db, similarity_threshold, user_id
@@ -191,14 +278,14 @@ class TigerIdentificationService:
 
     async def _identify_single_model(
         self,
-        tiger_crop: bytes,
+        tiger_crop: ImageArtifact,
         model_name: Optional[str],
         similarity_threshold: float
     ) -> Dict[str, Any]:
         """Identify using a single model.
 
         Args:
-            tiger_crop: Cropped tiger image bytes
+            tiger_crop: Cropped tiger image artifact
             model_name: Model to use
             similarity_threshold: Minimum similarity for match
 
@@ -208,18 +295,15 @@ class TigerIdentificationService:
         reid_model = self._get_model(model_name)
 
         # Generate embedding
-        if hasattr(reid_model, 'generate_embedding_from_bytes'):
-            embedding = await reid_model.generate_embedding_from_bytes(tiger_crop)
-        else:
-            image_obj = Image.open(io.BytesIO(tiger_crop))
-            embedding = await reid_model.generate_embedding(image_obj)
+        embedding = await embed_query(reid_model, tiger_crop)
 
         # Search for matching tigers
         matches = find_matching_tigers(
             self.db,
             query_embedding=embedding,
             limit=5,
-            similarity_threshold=similarity_threshold
+            similarity_threshold=similarity_threshold,
+            model_name=model_name
         )
 
         result = {
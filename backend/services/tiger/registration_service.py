@@ -3,16 +3,17 @@
 Handles registering new tigers with images and embeddings.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from uuid import UUID, uuid4
 from pathlib import Path
+import numpy as np
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
 
 from backend.utils.logging import get_logger
 from backend.config.settings import get_settings
 from backend.database.models import Tiger, TigerImage
-from backend.database.vector_search import store_embedding
+from backend.database.vector_search import store_embedding, store_embeddings_bulk
 from backend.models.detection import TigerDetectionModel
 from backend.models.interfaces.base_reid_model import BaseReIDModel
 from backend.repositories.tiger_repository import TigerRepository
@@ -99,8 +100,9 @@ class TigerRegistrationService:
         self.db.add(tiger)
         self.db.flush()  # Get ID without committing
 
-        # Process images
+        # Process images, collecting embeddings for one bulk write
         image_paths = []
+        pending_embeddings: List[Tuple[str, Any]] = []
         for idx, image_file in enumerate(images):
             try:
                 processed_path = await self._process_registration_image(
@@ -108,7 +110,8 @@ class TigerRegistrationService:
                     image_file=image_file,
                     index=idx,
                     model_name=model_name,
-                    user_id=user_id
+                    user_id=user_id,
+                    pending_embeddings=pending_embeddings
                 )
                 if processed_path:
                     image_paths.append(processed_path)
@@ -119,6 +122,17 @@ class TigerRegistrationService:
                 )
                 continue
 
+        # Store all embeddings, then commit them with the tiger and images
+        if pending_embeddings:
+            store_embeddings_bulk(
+                self.db,
+                model_name,
+                [image_id for image_id, _ in pending_embeddings],
+                np.stack([np.asarray(e, dtype=np.float32).reshape(-1) for _, e in pending_embeddings]),
+                tiger_ids=[str(tiger.tiger_id)] * len(pending_embeddings),
+                commit=False
+            )
+
         # Commit all changes
         self.db.commit()
         self.db.refresh(tiger)
@@ -142,7 +156,8 @@ class TigerRegistrationService:
         image_file: UploadFile,
         index: int,
         model_name: Optional[str],
-        user_id: UUID
+        user_id: UUID,
+        pending_embeddings: Optional[List[Tuple[str, Any]]] = None
     ) -> Optional[str]:
         """Process a single image for tiger registration.
 
@@ -152,6 +167,8 @@ class TigerRegistrationService:
             index: Image index
             model_name: Model for embedding
             user_id: User ID
+            pending_embeddings: When given, (image_id, embedding) is appended
+                here for the caller to store in bulk instead of stored now
 
         Returns:
             Image path if successful, None otherwise
@@ -218,12 +235,14 @@ class TigerRegistrationService:
         self.db.flush()
 
         # Store embedding in vector database
-        if embedding is not None:
+        if embedding is not None and pending_embeddings is not None:
+            pending_embeddings.append((str(tiger_image.image_id), embedding))
+        elif embedding is not None:
             store_embedding(
                 self.db,
-                tiger_id=str(tiger.tiger_id),
                 image_id=str(tiger_image.image_id),
-                embedding=embedding
+                embedding=embedding,
+                model_name=model_name
             )
 
         logger.info(
@@ -7,7 +7,11 @@ from fastapi import UploadFile
 import numpy as np
 
 from backend.database import Tiger, TigerImage, get_db_session
-from backend.database.vector_search import find_matching_tigers, store_embedding
+from backend.database.vector_search import (
+    find_matching_tigers,
+    find_matching_tigers_batch,
+    store_embedding,
+)
 from backend.models.reid import TigerReIDModel
 from backend.models.detection import TigerDetectionModel
 from backend.utils.logging import get_logger
@@ -116,47 +120,58 @@ class TigerService:
         else:
             # Use specified or default model
             reid_model = self._get_model(model_name)
-            
-            # Generate embedding
-            if hasattr(reid_model, 'generate_embedding_from_bytes'):
-                embedding = await reid_model.generate_embedding_from_bytes(tiger_crop)
-            else:
-                from PIL import Image
-                import io
-                image_obj = Image.open(io.BytesIO(tiger_crop))
-                embedding = await reid_model.generate_embedding(image_obj)
+            embedding = await self._generate_embedding(reid_model, tiger_crop)
             
             # Search for matching tigers
             matches = find_matching_tigers(
                 self.db,
                 query_embedding=embedding,
                 limit=5,
-                similarity_threshold=similarity_threshold
+                similarity_threshold=similarity_threshold,
+                model_name=model_name
             )
             
-            result = {
-                "model": model_name or "tiger_reid",
-                "identified": False,
-                "confidence": 0.0
-            }
-            
-            if matches:
-                best_match = matches[0]
-                result.update({
-                    "identified": True,
-                    "tiger_id": best_match["tiger_id"],
-                    "tiger_name": best_match["tiger_name"],
-                    "similarity": best_match["similarity"],
-                    "confidence": best_match["similarity"],
-                    "matches": matches
-                })
-            else:
-                result.update({
-                    "message": "Tiger not found in database - new individual",
-                    "requires_verification": True
-                })
-            
-            return result
+            return self._build_identification_result(model_name, matches)
+    
+    async def _generate_embedding(self, reid_model, tiger_crop: bytes) -> np.ndarray:
+        """Generate an embedding for a tiger crop with the given model"""
+        if hasattr(reid_model, 'generate_embedding_from_bytes'):
+            return await reid_model.generate_embedding_from_bytes(tiger_crop)
+        
+        from PIL import Image
+        import io
+        image_obj = Image.open(io.BytesIO(tiger_crop))
+        return await reid_model.generate_embedding(image_obj)
+    
+    def _build_identification_result(
+        self,
+        model_name: Optional[str],
+        matches: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build a single-model identification result from ranked matches"""
+        result = {
+            "model": model_name or "tiger_reid",
+            "identified": False,
+            "confidence": 0.0
+        }
+        
+        if matches:
+            best_match = matches[0]
+            result.update({
+                "identified": True,
+                "tiger_id": best_match["tiger_id"],
+                "tiger_name": best_match["tiger_name"],
+                "similarity": best_match["similarity"],
+                "confidence": best_match["similarity"],
+                "matches": matches
+            })
+        else:
+            result.update({
+                "message": "Tiger not found in database - new individual",
+                "requires_verification": True
+            })
+        
+        return result
     
     async def _identify_with_all_models(
         self,
@@ -192,7 +207,8 @@ class TigerService:
                     self.db,
                     query_embedding=embedding,
                     limit=5,
-                    similarity_threshold=similarity_threshold
+                    similarity_threshold=similarity_threshold,
+                    model_name=model_name
                 )
                 
                 results["models"][model_name] = {
@@ -258,7 +274,8 @@ class TigerService:
                     self.db,
                     query_embedding=embedding,
                     limit=5,
-                    similarity_threshold=similarity_threshold
+                    similarity_threshold=similarity_threshold,
+                    model_name='rapid'
                 )
                 
                 result["model_path"].append("rapid")
@@ -297,7 +314,8 @@ class TigerService:
                     self.db,
                     query_embedding=embedding,
                     limit=5,
-                    similarity_threshold=similarity_threshold
+                    similarity_threshold=similarity_threshold,
+                    model_name='wildlife_tools'
                 )
                 
                 result["model_path"].append("wildlife_tools")
@@ -336,7 +354,8 @@ class TigerService:
                     self.db,
                     query_embedding=embedding,
                     limit=5,
-                    similarity_threshold=similarity_threshold
+                    similarity_threshold=similarity_threshold,
+                    model_name='cvwc2019'
                 )
                 
                 result["model_path"].append("cvwc2019")
@@ -391,7 +410,8 @@ class TigerService:
                     self.db,
                     query_embedding=embedding,
                     limit=5,
-                    similarity_threshold=similarity_threshold
+                    similarity_threshold=similarity_threshold,
+                    model_name=model_name
                 )
                 
                 return {
@@ -518,13 +538,51 @@ class TigerService:
         
         results = []
         
+        # Ensemble modes search per model per image; keep the per-image path
+        if getattr(self, '_ensemble_mode', None):
+            for image in images:
+                try:
+                    result = await self.identify_tiger_from_image(
+                        image, user_id, similarity_threshold, model_name
+                    )
+                    result["image_filename"] = image.filename
+                    results.append(result)
+                except Exception as e:
+                    logger.error(f"Error processing image {image.filename}: {e}")
+                    results.append({
+                        "image_filename": image.filename,
+                        "identified": False,
+                        "error": str(e)
+                    })
+            
+            return results
+        
+        # Single-model path: detect and embed every image, then search the
+        # whole batch with one vector query and one metadata query
+        reid_model = self._get_model(model_name)
+        pending = []
+        
         for image in images:
             try:
-                result = await self.identify_tiger_from_image(
-                    image, user_id, similarity_threshold, model_name
-                )
-                result["image_filename"] = image.filename
+                image_bytes = await image.read()
+                detection_result = await self.detection_model.detect(image_bytes)
+                
+                if not detection_result.get("detections"):
+                    results.append({
+                        "image_filename": image.filename,
+                        "identified": False,
+                        "message": "No tiger detected in image",
+                        "confidence": 0.0,
+                        "model": model_name or "default"
+                    })
+                    continue
+                
+                tiger_crop = detection_result["detections"][0].get("crop")
+                embedding = await self._generate_embedding(reid_model, tiger_crop)
+                
+                result = {"image_filename": image.filename}
                 results.append(result)
+                pending.append((result, np.asarray(embedding, dtype=np.float32).reshape(-1)))
             except Exception as e:
                 logger.error(f"Error processing image {image.filename}: {e}")
                 results.append({
@@ -533,6 +591,22 @@ class TigerService:
                     "error": str(e)
                 })
         
+        if pending:
+            try:
+                batch_matches = find_matching_tigers_batch(
+                    self.db,
+                    np.stack([embedding for _, embedding in pending]),
+                    model_name=model_name,
+                    limit=5,
+                    similarity_threshold=similarity_threshold
+                )
+                for (result, _), matches in zip(pending, batch_matches):
+                    result.update(self._build_identification_result(model_name, matches))
+            except Exception as e:
+                logger.error(f"Batch vector search failed: {e}")
+                for result, _ in pending:
+                    result.update({"identified": False, "error": str(e)})
+        
         return results
     
     async def store_tiger_image(
@@ -541,7 +615,8 @@ class TigerService:
         image_path: str,
         embedding: np.ndarray,
         side_view: str = "unknown",
-        user_id: Optional[UUID] = None
+        user_id: Optional[UUID] = None,
+        model_name: Optional[str] = None
     ) -> Dict[str, Any]:
         """Store a tiger image with embedding"""
         session = next(get_db_session())
@@ -558,7 +633,7 @@ class TigerService:
             session.refresh(image)
             
             # Store embedding
-            store_embedding(session, str(image.image_id), embedding)
+            store_embedding(session, str(image.image_id), embedding, model_name=model_name)
             
             return {
                 "image_id": str(image.image_id),
@@ -722,9 +797,9 @@ class TigerService:
                 if embedding is not None:
                     store_embedding(
                         self.db,
-                        tiger_id=str(tiger.tiger_id),
                         image_id=str(tiger_image.image_id),
-                        embedding=embedding
+                        embedding=embedding,
+                        model_name=model_name
                     )
                 
                 logger.info(f"Processed image {idx+1}/{len(images)} for tiger {tiger.tiger_id}")
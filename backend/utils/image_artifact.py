@@ -0,0 +1,258 @@
+"""Decode-once image container shared across the identification pipeline
+
+An upload used to be decoded and encoded again at every stage: detection
+opened the bytes to crop, the identification service re-encoded the crop,
+every ensemble strategy opened it again and every Modal call saved its own
+JPEG. ``ImageArtifact`` carries the original bytes and decodes, hashes,
+reads EXIF and encodes lazily, once, caching each result:
+
+    artifact = ImageArtifact.from_bytes(upload_bytes)
+    detection = await detector.detect(artifact)          # decodes once
+    crop = detection["detections"][0]["artifact"]        # crop of the same pixels
+    jpeg = crop.encode("JPEG")                            # shared by every model call
+
+Encodings are cached per (format, max_size, quality). Encoding an artifact
+to its own source format at full size returns the original bytes.
+"""
+
+import hashlib
+import io
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+from PIL.ExifTags import GPSTAGS, TAGS
+
+# Default encoding matches PIL's own JPEG default used by the Modal clients
+DEFAULT_FORMAT = "JPEG"
+
+# EXIF IFD holding GPS tags
+_GPS_IFD = 0x8825
+
+
+class ImageArtifact:
+    """An image with lazily computed, cached decodings and encodings."""
+
+    def __init__(
+        self,
+        data: Optional[bytes] = None,
+        image: Optional[Image.Image] = None,
+        parent: Optional["ImageArtifact"] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None
+    ):
+        """
+        Create an artifact from encoded bytes and/or a decoded image.
+
+        Prefer ``from_bytes``, ``from_image`` or ``crop``.
+
+        Args:
+            data: Original encoded bytes
+            image: Decoded image
+            parent: Artifact this one was cropped from (EXIF is inherited)
+            bbox: Crop box within the parent
+        """
+        if data is None and image is None:
+            raise ValueError("ImageArtifact needs bytes or an image")
+        self._data = data
+        self._image = image.convert("RGB") if image is not None and image.mode != "RGB" else image
+        self.parent = parent
+        self.bbox = bbox
+        self._source_format: Optional[str] = None
+        self._array: Optional[np.ndarray] = None
+        self._sha256: Optional[str] = None
+        self._exif: Optional[Dict[str, Any]] = None
+        self._encodings: Dict[Tuple[str, Optional[int], Optional[int]], bytes] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ImageArtifact":
+        """Wrap encoded image bytes (decoded on first use)."""
+        return cls(data=data)
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "ImageArtifact":
+        """Wrap a decoded image (encoded on first use)."""
+        return cls(image=image)
+
+    @classmethod
+    def coerce(cls, value: Union["ImageArtifact", bytes, Image.Image]) -> "ImageArtifact":
+        """Return ``value`` as an artifact, wrapping bytes or a PIL image."""
+        if isinstance(value, ImageArtifact):
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            return cls.from_bytes(bytes(value))
+        if isinstance(value, Image.Image):
+            return cls.from_image(value)
+        raise TypeError(f"Cannot build an ImageArtifact from {type(value).__name__}")
+
+    # ------------------------------------------------------------------
+    # Decoded views
+    # ------------------------------------------------------------------
+
+    def _decode(self) -> None:
+        """Decode the original bytes and read EXIF from the raw file."""
+        raw = Image.open(io.BytesIO(self._data))
+        self._source_format = raw.format
+        if self._exif is None:
+            self._exif = _read_exif(raw)
+        raw.load()
+        self._image = raw.convert("RGB") if raw.mode != "RGB" else raw
+
+    @property
+    def image(self) -> Image.Image:
+        """Decoded RGB image (shared; copy before mutating)."""
+        if self._image is None:
+            with self._lock:
+                if self._image is None:
+                    self._decode()
+        return self._image
+
+    @property
+    def array(self) -> np.ndarray:
+        """Decoded pixels as a read-only HxWx3 uint8 array."""
+        if self._array is None:
+            with self._lock:
+                if self._array is None:
+                    array = np.asarray(self.image)
+                    array.flags.writeable = False
+                    self._array = array
+        return self._array
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """(width, height) of the decoded image."""
+        return self.image.size
+
+    @property
+    def data(self) -> bytes:
+        """Original bytes, or the default encoding for artifacts built from pixels."""
+        if self._data is not None:
+            return self._data
+        return self.encode()
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of ``data``."""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    @property
+    def exif(self) -> Dict[str, Any]:
+        """EXIF tags by name (GPS tags nested under "GPSInfo"); crops inherit the parent's."""
+        if self._exif is None:
+            with self._lock:
+                if self._exif is None:
+                    if self.parent is not None:
+                        self._exif = self.parent.exif
+                    elif self._data is not None:
+                        self._exif = _read_exif(Image.open(io.BytesIO(self._data)))
+                    else:
+                        self._exif = {}
+        return self._exif
+
+    # ------------------------------------------------------------------
+    # Derived artifacts and encodings
+    # ------------------------------------------------------------------
+
+    def crop(self, box: Tuple[float, float, float, float]) -> "ImageArtifact":
+        """
+        Crop the decoded pixels without re-decoding.
+
+        Args:
+            box: (x1, y1, x2, y2) in pixels
+
+        Returns:
+            Artifact for the crop, linked to this one
+        """
+        return ImageArtifact(image=self.image.crop(box), parent=self, bbox=tuple(box))
+
+    def encode(
+        self,
+        format: str = DEFAULT_FORMAT,
+        max_size: Optional[int] = None,
+        quality: Optional[int] = None
+    ) -> bytes:
+        """
+        Encoded bytes for a target format and size, cached per target.
+
+        Args:
+            format: PIL format name (e.g. "JPEG", "PNG")
+            max_size: Longest side in pixels (aspect ratio kept; never upscales)
+            quality: Encoder quality (PIL default when omitted)
+
+        Returns:
+            Encoded image bytes
+        """
+        format = format.upper()
+        key = (format, max_size, quality)
+        cached = self._encodings.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            cached = self._encodings.get(key)
+            if cached is not None:
+                return cached
+
+            image = self.image
+            resized = max_size is not None and max(image.size) > max_size
+            if self._data is not None and not resized and quality is None and self._source_format == format:
+                # The source already is this encoding
+                encoded = self._data
+            else:
+                if resized:
+                    image = image.copy()
+                    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                options = {"quality": quality} if quality is not None else {}
+                image.save(buffer, format=format, **options)
+                encoded = buffer.getvalue()
+            self._encodings[key] = encoded
+            return encoded
+
+    def __repr__(self) -> str:
+        decoded = f"{self._image.size[0]}x{self._image.size[1]}" if self._image is not None else "undecoded"
+        return f"ImageArtifact({decoded}, encodings={len(self._encodings)})"
+
+
+def _read_exif(image: Image.Image) -> Dict[str, Any]:
+    """Named EXIF tags of an undecoded PIL image."""
+    try:
+        raw = image.getexif()
+    except Exception:
+        return {}
+    exif = {TAGS.get(tag, tag): value for tag, value in raw.items()}
+    try:
+        gps = raw.get_ifd(_GPS_IFD)
+    except Exception:
+        gps = {}
+    if gps:
+        exif["GPSInfo"] = {GPSTAGS.get(tag, tag): value for tag, value in gps.items()}
+    return exif
+
+
+def encode_image(image: Union[ImageArtifact, Image.Image], format: str = DEFAULT_FORMAT) -> bytes:
+    """
+    Encode an image for a model call, reusing an artifact's cached bytes.
+
+    Args:
+        image: Artifact or PIL image
+        format: PIL format name
+
+    Returns:
+        Encoded image bytes
+    """
+    if isinstance(image, ImageArtifact):
+        return image.encode(format)
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def to_pil(image: Union[ImageArtifact, Image.Image, bytes]) -> Image.Image:
+    """Decoded PIL image for an artifact, bytes or image."""
+    if isinstance(image, Image.Image):
+        return image
+    return ImageArtifact.coerce(image).image
@@ -62,7 +62,7 @@ async def main():
     from backend.database import get_db_session
     from backend.database.models import TigerImage, Tiger
     from backend.database.vector_search import (
-        store_embedding, get_embedding_counts_by_table, MODEL_TO_TABLE
+        store_embeddings_bulk, get_embedding_counts_by_table, MODEL_TO_TABLE
     )
     from backend.services.tiger_service import TigerService
     from pathlib import Path
@@ -139,6 +139,7 @@ async def main():
 
         batch_stored = 0
         batch_time = time.time()
+        pending = {model_name: ([], [], []) for model_name in models}
 
         for img_data in batch:
             try:
@@ -157,21 +158,29 @@ async def main():
             tasks = [run_model(mn) for mn in models.keys()]
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
-            # Store embeddings
-            with get_db_session() as db:
-                for result in results:
-                    if isinstance(result, Exception):
-                        total_errors += 1
-                        continue
-                    model_name, embedding = result
-                    if embedding is not None and isinstance(embedding, np.ndarray):
-                        if store_embedding(db, img_data["image_id"], embedding, model_name=model_name):
-                            batch_stored += 1
-                            total_stored += 1
-                        else:
-                            total_errors += 1
-                    else:
-                        total_skipped += 1
+            # Queue embeddings for one bulk write per model
+            for result in results:
+                if isinstance(result, Exception):
+                    total_errors += 1
+                    continue
+                model_name, embedding = result
+                if embedding is not None and isinstance(embedding, np.ndarray):
+                    image_ids, embeddings, tiger_ids = pending[model_name]
+                    image_ids.append(img_data["image_id"])
+                    embeddings.append(embedding.reshape(-1))
+                    tiger_ids.append(img_data["tiger_id"])
+                else:
+                    total_skipped += 1
+
+        # Store the batch with one transaction per model
+        with get_db_session() as db:
+            for model_name, (image_ids, embeddings, tiger_ids) in pending.items():
+                if not image_ids:
+                    continue
+                stored = store_embeddings_bulk(db, model_name, image_ids, np.stack(embeddings), tiger_ids)
+                batch_stored += stored
+                total_stored += stored
+                total_errors += len(image_ids) - stored
 
         elapsed = time.time() - batch_time
         total_elapsed = time.time() - start_time
@@ -0,0 +1,100 @@
+"""Check quantized gallery-index recall against exact search on ATRW references.
+
+Loads the ATRW reference gallery (TigerImage.is_reference) for each model
+from its per-model vec table, then compares the quantized first-stage scan
+plus float32 re-scoring against exact float32 top-k. Each reference image is
+used as a query against the full gallery.
+
+Usage:
+    python scripts/check_quantization_recall.py
+    python scripts/check_quantization_recall.py --models wildlife_tools --k 5
+    python scripts/check_quantization_recall.py --quantization float16 --rescore-factor 2
+    python scripts/check_quantization_recall.py --min-recall 0.99
+"""
+
+import argparse
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import numpy as np
+from sqlalchemy import text
+
+
+def load_reference_gallery(db, table: str) -> np.ndarray:
+    """Load float32 embeddings for ATRW reference images from a vec table."""
+    rows = db.execute(text(f"""
+        SELECT ve.embedding
+        FROM {table} ve
+        JOIN tiger_images ti ON ve.image_id = ti.image_id
+        WHERE ti.is_reference = 1
+    """)).fetchall()
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack([np.frombuffer(row.embedding, dtype=np.float32) for row in rows])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized vs exact recall on the ATRW reference gallery")
+    parser.add_argument("--models", nargs="+", default=None, help="Models to check (default: all ReID models)")
+    parser.add_argument("--quantization", nargs="+", default=["int8", "float16"],
+                        choices=["int8", "float16"], help="Quantization modes to check")
+    parser.add_argument("--k", type=int, default=10, help="Top-k compared per query")
+    parser.add_argument("--rescore-factor", type=int, default=None, help="Candidates per result re-scored")
+    parser.add_argument("--max-queries", type=int, default=1000, help="Sample at most N queries")
+    parser.add_argument("--min-recall", type=float, default=0.99, help="Fail if recall@k drops below this")
+    args = parser.parse_args()
+
+    from backend.database import get_db_session
+    from backend.database.gallery_index import measure_quantization_recall
+    from backend.database.vector_search import get_model_registry, get_vec_table_name
+
+    models = args.models or get_model_registry().list_reid_models()
+    rng = np.random.default_rng(0)
+    failed = []
+
+    print("=" * 70)
+    print("QUANTIZATION RECALL CHECK - ATRW reference gallery")
+    print("=" * 70)
+
+    with get_db_session() as db:
+        for model_name in models:
+            gallery = load_reference_gallery(db, get_vec_table_name(model_name))
+            if len(gallery) == 0:
+                print(f"\n{model_name}: no reference embeddings, skipping")
+                continue
+
+            queries = gallery
+            if len(queries) > args.max_queries:
+                queries = gallery[rng.choice(len(gallery), args.max_queries, replace=False)]
+
+            print(f"\n{model_name}: {len(gallery)} gallery images, {len(queries)} queries")
+            for mode in args.quantization:
+                stats = measure_quantization_recall(
+                    gallery, queries, k=args.k,
+                    quantization=mode, rescore_factor=args.rescore_factor
+                )
+                ok = stats["recall_at_k"] >= args.min_recall
+                if not ok:
+                    failed.append((model_name, mode))
+                print(
+                    f"  {mode:8s} recall@{args.k}: {stats['recall_at_k']:.4f} "
+                    f"{'OK' if ok else 'BELOW THRESHOLD'} | "
+                    f"scan {stats['quantized_scan_bytes'] / 1e6:.1f}MB "
+                    f"(exact {stats['exact_scan_bytes'] / 1e6:.1f}MB) | "
+                    f"{stats['quantized_ms_per_query']:.2f}ms/query "
+                    f"(exact {stats['exact_ms_per_query']:.2f}ms)"
+                )
+
+    print("\n" + "=" * 70)
+    if failed:
+        print(f"RECALL CHECK FAILED: {failed}")
+        sys.exit(1)
+    print("RECALL CHECK PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Export ReID and detection models to ONNX for the local CPU backend.
+
+Builds each model as its Modal class does, loads the weights from
+data/models/ and writes data/models/onnx/<model>.onnx (plus
+<model>.int8.onnx with --int8). Select the local backend per model with
+MODEL_BACKEND_<MODEL_NAME>=local, or MODEL_BACKEND=local for all of them.
+
+Usage:
+    python scripts/export_onnx_models.py
+    python scripts/export_onnx_models.py --models cvwc2019_reid megadetector
+    python scripts/export_onnx_models.py --int8 --output-dir /opt/tiger-id/onnx
+"""
+
+import argparse
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+
+def main():
+    from backend.infrastructure.local.specs import LOCAL_MODEL_SPECS
+
+    parser = argparse.ArgumentParser(description="Export models to ONNX for local CPU inference")
+    parser.add_argument("--models", nargs="+", default=list(LOCAL_MODEL_SPECS),
+                        choices=list(LOCAL_MODEL_SPECS), help="Models to export (default: all)")
+    parser.add_argument("--output-dir", default=None, help="Output directory (default: LOCAL_MODEL_DIR)")
+    parser.add_argument("--int8", action="store_true", help="Also write dynamically quantized INT8 graphs")
+    parser.add_argument("--opset", type=int, default=None, help="ONNX opset version")
+    args = parser.parse_args()
+
+    from backend.infrastructure.local.onnx_export import DEFAULT_OPSET, export_onnx_model
+
+    failed = []
+    for model_name in args.models:
+        print(f"Exporting {model_name}...")
+        try:
+            path = export_onnx_model(
+                model_name,
+                model_dir=args.output_dir,
+                int8=args.int8,
+                opset=args.opset or DEFAULT_OPSET
+            )
+            print(f"  -> {path}")
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            failed.append(model_name)
+
+    if failed:
+        print(f"\nFailed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
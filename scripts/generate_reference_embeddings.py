@@ -127,7 +127,7 @@ class EmbeddingGenerator:
                 print(f"  ❌ Unknown model: {model_name}")
                 return None
 
-            if result.get("success") and result.get("embedding"):
+            if result.get("success") and result.get("embedding") is not None:
                 embedding = np.array(result["embedding"])
                 return embedding
             else:
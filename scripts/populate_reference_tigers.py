@@ -32,6 +32,7 @@ from backend.services.modal_client import get_modal_client
 from PIL import Image
 import io
 import json
+import numpy as np
 
 async def populate_reference_data(limit: int = 20, skip_existing: bool = True):
     """
@@ -143,11 +144,13 @@ async def populate_reference_data(limit: int = 20, skip_existing: bool = True):
                     failed += 1
                     continue
                 
-                embedding_list = embedding_result.get('embedding')
-                if not embedding_list:
+                embedding = embedding_result.get('embedding')
+                if embedding is None:
                     print(f"  ERROR: No embedding in result")
                     failed += 1
                     continue
+                # The client returns an ndarray; the legacy column stores JSON
+                embedding_list = np.asarray(embedding, dtype=np.float32).tolist()
                 
                 print(f"  Generated embedding: {len(embedding_list)} dimensions")
                 
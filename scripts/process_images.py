@@ -5,6 +5,7 @@ import sys
 from pathlib import Path
 from typing import List
 import asyncio
+import numpy as np
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -13,7 +14,7 @@ sys.path.insert(0, str(project_root))
 from backend.database import get_db_session, TigerImage
 from backend.models.tiger_detection import TigerDetectionModel
 from backend.models.tiger_reid import TigerReIDModel
-from backend.database.vector_search import store_embedding
+from backend.database.vector_search import store_embeddings_bulk
 from backend.services.tiger_service import TigerService
 
 
@@ -88,6 +89,8 @@ async def save_to_database(results: List[dict], investigation_id: str = None):
     
     with get_db_session() as session:
         tiger_service = TigerService(session)
+        image_ids = []
+        embeddings = []
         
         for result in results:
             # Check if tiger exists, or create new
@@ -116,17 +119,17 @@ async def save_to_database(results: List[dict], investigation_id: str = None):
                 }
             )
             session.add(tiger_image)
+            session.flush()  # Assign image_id
             
-            # Store embedding
-            store_embedding(
-                session,
-                tiger_id=tiger_id,
-                image_id=tiger_image.image_id,
-                embedding=result["embedding"]
-            )
+            # Queue embedding for one bulk write
+            image_ids.append(str(tiger_image.image_id))
+            embeddings.append(np.asarray(result["embedding"], dtype=np.float32).reshape(-1))
             
             print(f"✅ Saved image for tiger {tiger_id}")
         
+        # Store all embeddings and commit them with the image records
+        if image_ids:
+            store_embeddings_bulk(session, None, image_ids, np.stack(embeddings), commit=False)
         session.commit()
         print(f"Saved {len(results)} images to database")
 
@@ -0,0 +1,58 @@
+"""Re-embed every tiger image into one model's vector table.
+
+Streams tiger_images in image_id order, embeds batches through the model
+client and bulk-writes them. Progress is checkpointed to a BackgroundJob,
+so an interrupted run picks up after the last committed batch.
+
+Usage:
+    python scripts/sync_embeddings.py --model wildlife_tools
+    python scripts/sync_embeddings.py --model cvwc2019_reid --batch-size 64
+    python scripts/sync_embeddings.py --job-id <job_id>
+    python scripts/sync_embeddings.py --model wildlife_tools --restart
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Resumable embedding re-index")
+    parser.add_argument("--model", default="wildlife_tools", help="Model whose table to rebuild")
+    parser.add_argument("--batch-size", type=int, default=32, help="Images per batch/transaction")
+    parser.add_argument("--job-id", default=None, help="Resume this sync job")
+    parser.add_argument("--restart", action="store_true", help="Start over instead of resuming")
+    args = parser.parse_args()
+
+    from backend.database import get_db_session
+    from backend.database.vector_search import get_embedding_count, sync_embeddings
+
+    print("=" * 70)
+    print(f"EMBEDDING SYNC - {args.model}")
+    print("=" * 70)
+
+    with get_db_session() as db:
+        result = await sync_embeddings(
+            db,
+            model_name=args.model,
+            batch_size=args.batch_size,
+            job_id=args.job_id,
+            resume=not args.restart
+        )
+        print(json.dumps(result, indent=2))
+        print(f"\n  Vec table rows: {get_embedding_count(db, args.model)}")
+
+    print("\n" + "=" * 70)
+    print(f"SYNC {result['status'].upper()} ({result['images_per_sec']:.1f} images/sec)")
+    print("=" * 70)
+    sys.exit(0 if result["status"] == "completed" else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
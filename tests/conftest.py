@@ -14,6 +14,47 @@ from unittest.mock import Mock
 # Import models and connection utilities
 from backend.database.models import Base
 from backend.database import SessionLocal, engine
+from backend.database import embedding_cache, identification_cache, verification_features
+from backend.database.match_metadata_cache import get_match_metadata_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_match_metadata_cache():
+    """Search metadata is cached per process; tests reuse ids across databases"""
+    get_match_metadata_cache().clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_identification_cache(monkeypatch):
+    """Keep identification results in memory instead of next to the database"""
+    cache = identification_cache.IdentificationCache(":memory:")
+    monkeypatch.setattr(identification_cache, "_cache", cache)
+    monkeypatch.setattr(identification_cache, "_cache_loaded", True)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_embedding_cache(monkeypatch):
+    """Keep cached embeddings in memory instead of next to the database"""
+    cache = embedding_cache.EmbeddingCache(":memory:")
+    monkeypatch.setattr(embedding_cache, "_cache", cache)
+    monkeypatch.setattr(embedding_cache, "_cache_loaded", True)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_verification_features(monkeypatch):
+    """Keep gallery verification features in memory instead of next to the database"""
+    store = verification_features.GalleryFeatureStore(":memory:")
+    monkeypatch.setattr(verification_features, "_store", store)
+    monkeypatch.setattr(verification_features, "_store_loaded", True)
+    yield store
+    # Let ingest-time extraction finish before the store closes
+    verification_features._get_executor().submit(lambda: None).result()
+    store.close()
 
 
 @pytest.fixture(scope="function")
@@ -0,0 +1,131 @@
+"""Tests for the decode-once image artifact"""
+
+import hashlib
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.utils import image_artifact
+from backend.utils.image_artifact import ImageArtifact, encode_image
+
+
+def _jpeg_with_exif() -> bytes:
+    image = Image.new("RGB", (64, 48), (200, 120, 40))
+    exif = Image.Exif()
+    exif[0x010F] = "TrailCam"  # Make
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def open_calls(monkeypatch):
+    calls = []
+    real_open = image_artifact.Image.open
+
+    def counting_open(*args, **kwargs):
+        calls.append(args)
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr(image_artifact.Image, "open", counting_open)
+    return calls
+
+
+class TestImageArtifact:
+    """Tests for ImageArtifact decoding, crops and cached encodings"""
+
+    def test_decodes_once(self, open_calls):
+        """Image, array, size and EXIF share one decode"""
+        data = _jpeg_with_exif()
+        artifact = ImageArtifact.from_bytes(data)
+
+        assert artifact.size == (64, 48)
+        assert artifact.array.shape == (48, 64, 3)
+        assert not artifact.array.flags.writeable
+        assert artifact.exif["Make"] == "TrailCam"
+        assert artifact.image.mode == "RGB"
+        assert len(open_calls) == 1
+        assert artifact.sha256 == hashlib.sha256(data).hexdigest()
+
+    def test_source_encoding_reused(self):
+        """Full-size encodes in the source format return the original bytes"""
+        data = _jpeg_with_exif()
+        artifact = ImageArtifact.from_bytes(data)
+
+        assert artifact.encode("JPEG") is data
+        png = artifact.encode("PNG")
+        assert png is artifact.encode("png")
+        assert Image.open(io.BytesIO(png)).format == "PNG"
+
+    def test_resized_encodings_cached(self):
+        """Each target size is encoded once and never upscaled"""
+        artifact = ImageArtifact.from_image(Image.new("RGB", (400, 200)))
+
+        small = artifact.encode("JPEG", max_size=100)
+        assert artifact.encode("JPEG", max_size=100) is small
+        assert Image.open(io.BytesIO(small)).size == (100, 50)
+        assert Image.open(io.BytesIO(artifact.encode("JPEG", max_size=1000))).size == (400, 200)
+        assert artifact.size == (400, 200)
+
+    def test_crop_shares_pixels_and_exif(self, open_calls):
+        """Crops come from the decoded parent and inherit its EXIF"""
+        parent = ImageArtifact.from_bytes(_jpeg_with_exif())
+        crop = parent.crop((10, 5, 30, 25))
+
+        assert crop.size == (20, 20)
+        assert crop.parent is parent
+        assert crop.exif["Make"] == "TrailCam"
+        assert np.array_equal(crop.array, parent.array[5:25, 10:30])
+        assert crop.data == crop.encode("JPEG")
+        assert len(open_calls) == 1
+
+    def test_coerce_and_encode_image(self):
+        """Bytes, images and artifacts are accepted interchangeably"""
+        image = Image.new("RGB", (8, 8))
+        artifact = ImageArtifact.coerce(image)
+        assert ImageArtifact.coerce(artifact) is artifact
+        assert encode_image(artifact) is artifact.encode()
+        assert Image.open(io.BytesIO(encode_image(image))).size == (8, 8)
+        with pytest.raises(TypeError):
+            ImageArtifact.coerce("not an image")
+
+    @pytest.mark.asyncio
+    async def test_detection_to_embedding_reuses_artifact(self, open_calls):
+        """Detection crops are embedded from the same artifact without re-decoding"""
+        from backend.models.detection import TigerDetectionModel
+        from backend.models.wildlife_tools import WildlifeToolsReIDModel
+        from backend.services.tiger.ensemble_strategy import embed_query
+
+        received = []
+
+        class FakeModalClient:
+            async def megadetector_detect(self, image, confidence_threshold=0.5):
+                received.append(image)
+                return {"success": True, "detections": [{"bbox": [4, 4, 36, 28], "confidence": 0.9}]}
+
+            async def wildlife_tools_embedding(self, image):
+                received.append(image)
+                encode_image(image)
+                return {"success": True, "embedding": [1.0] * 1536}
+
+        detector = TigerDetectionModel.__new__(TigerDetectionModel)
+        detector.modal_client = FakeModalClient()
+        detector._confidence_threshold = 0.5
+        model = WildlifeToolsReIDModel.__new__(WildlifeToolsReIDModel)
+        model.modal_client = detector.modal_client
+
+        source = ImageArtifact.from_bytes(_jpeg_with_exif())
+        result = await detector.detect(source)
+        crop = result["detections"][0]["artifact"]
+        jpeg = crop.encode()
+
+        embedding = await embed_query(model, crop)
+        await embed_query(model, crop)
+
+        assert received[0] is source
+        assert received[1] is crop and received[2] is crop
+        assert crop.encode() is jpeg
+        assert embedding.shape == (1536,)
+        assert len(open_calls) == 1
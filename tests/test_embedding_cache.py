@@ -0,0 +1,112 @@
+"""Tests for the persistent embedding cache"""
+
+import numpy as np
+import pytest
+
+from backend.database.embedding_cache import EmbeddingCache, sha256_hex
+from backend.infrastructure.modal.model_registry import ModelRegistry
+
+
+def _key(data: bytes, model_name: str = "wildlife_tools", version: str = "1/modal"):
+    return (sha256_hex(data), model_name, version)
+
+
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache storage, eviction and metrics"""
+
+    def test_round_trip_and_metrics(self):
+        cache = EmbeddingCache(":memory:")
+        embedding = np.arange(4, dtype=np.float64)
+
+        assert cache.get(*_key(b"crop")) is None
+        cache.put(*_key(b"crop"), embedding)
+        found = cache.get(*_key(b"crop"))
+
+        assert found.dtype == np.float32
+        np.testing.assert_array_equal(found, embedding)
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+        assert stats["size_bytes"] == 16
+
+    def test_key_includes_model_and_version(self):
+        cache = EmbeddingCache(":memory:")
+        cache.put(*_key(b"crop"), np.ones(4))
+
+        assert cache.get(*_key(b"crop", model_name="transreid")) is None
+        assert cache.get(*_key(b"crop", version="2/modal")) is None
+        assert cache.get(*_key(b"other")) is None
+
+    def test_bulk_get_and_put(self):
+        cache = EmbeddingCache(":memory:")
+        stored = {_key(bytes([i])): np.full(4, i) for i in range(5)}
+
+        assert cache.put_many(stored) == 5
+        found = cache.get_many(list(stored) + [_key(b"missing")])
+
+        assert set(found) == set(stored)
+        np.testing.assert_array_equal(found[_key(bytes([3]))], np.full(4, 3))
+        assert cache.misses == 1
+
+    def test_evicts_least_recently_used_by_size(self):
+        # Room for two 4-float embeddings
+        cache = EmbeddingCache(":memory:", max_bytes=32)
+        cache.put(*_key(b"a"), np.ones(4))
+        cache.put(*_key(b"b"), np.ones(4))
+        cache.get(*_key(b"a"))
+        cache.put(*_key(b"c"), np.ones(4))
+
+        assert cache.get(*_key(b"b")) is None
+        assert cache.get(*_key(b"a")) is not None
+        assert cache.get(*_key(b"c")) is not None
+        assert cache.size_bytes() == 32
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_survives_reopen(self, tmp_path):
+        path = tmp_path / "embedding_cache.db"
+        cache = EmbeddingCache(path)
+        cache.put(*_key(b"crop"), np.ones(4))
+        cache.close()
+
+        reopened = EmbeddingCache(path)
+        assert reopened.get(*_key(b"crop")) is not None
+        reopened.close()
+
+
+class TestEmbeddingVersion:
+    """Tests for the model version embeddings are cached under"""
+
+    def test_version_includes_backend(self):
+        registry = ModelRegistry()
+        assert registry.get_embedding_version("transreid") == "1/modal"
+        registry.set_backend("transreid", "local")
+        assert registry.get_embedding_version("transreid").startswith("1/local")
+
+    def test_weights_version_override(self, monkeypatch):
+        monkeypatch.setenv("MODEL_VERSION_TRANSREID", "2024-06")
+        assert ModelRegistry().get_embedding_version("transreid") == "2024-06/modal"
+
+
+class TestModalClientCaching:
+    """Tests for ModalClient skipping Modal for known crops"""
+
+    @pytest.mark.asyncio
+    async def test_second_request_served_from_cache(self, isolated_embedding_cache):
+        from backend.services.modal_client import ModalClient
+
+        client = ModalClient(use_mock=False, batching=False)
+        calls = []
+
+        async def fake_call(func, image_bytes, **kwargs):
+            calls.append(image_bytes)
+            return {"success": True, "embedding": [1.0, 2.0, 3.0]}
+
+        client._call_with_retry = fake_call
+        client._get_modal_function = lambda model_name: type("Model", (), {"generate_embedding": None})
+
+        first = await client.transreid_generate_embedding(b"crop")
+        second = await client.transreid_generate_embedding(b"crop")
+
+        assert len(calls) == 1
+        assert second["cached"] is True
+        np.testing.assert_array_equal(second["embedding"], first["embedding"])
+        assert isolated_embedding_cache.get_stats()["hits"] == 1
@@ -0,0 +1,274 @@
+"""Tests for the in-memory gallery matrix index"""
+
+import numpy as np
+import pytest
+
+from backend.database.gallery_index import GalleryIndex
+
+
+def _random_gallery(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+class TestGalleryIndex:
+    """Tests for GalleryIndex add/remove/search/persistence"""
+
+    def test_search_matches_brute_force(self):
+        """Top-k from argpartition matches a full sort"""
+        gallery = _random_gallery(500, 64)
+        index = GalleryIndex("tiger_reid", 64)
+        index.add_many([f"img{i}" for i in range(500)], gallery, [f"t{i % 50}" for i in range(500)])
+
+        query = gallery[42] + 0.01
+        results = index.search(query, k=10)
+
+        normed = gallery / np.linalg.norm(gallery, axis=1, keepdims=True)
+        expected = np.argsort(-(normed @ (query / np.linalg.norm(query))))[:10]
+        assert [r[0] for r in results] == [f"img{i}" for i in expected]
+        assert results[0][0] == "img42"
+        assert results[0][2] == pytest.approx(1.0, abs=1e-3)
+
+    def test_search_batch_matches_single_queries(self):
+        """One GEMM over q queries gives the same rankings as q searches"""
+        gallery = _random_gallery(300, 32, seed=4)
+        index = GalleryIndex("tiger_reid", 32)
+        index.add_many([f"img{i}" for i in range(300)], gallery, [f"t{i % 30}" for i in range(300)])
+
+        queries = gallery[[3, 77, 150]] + 0.05
+        batch = index.search_batch(queries, k=7, exclude_tiger_id="t3")
+        assert len(batch) == 3
+        for query, hits in zip(queries, batch):
+            single = index.search(query, k=7, exclude_tiger_id="t3")
+            assert [h[:2] for h in hits] == [h[:2] for h in single]
+            assert [h[2] for h in hits] == pytest.approx([h[2] for h in single], abs=1e-5)
+
+    def test_exclude_tiger_and_threshold(self):
+        """Excluded tiger never appears and threshold trims results"""
+        gallery = _random_gallery(100, 32, seed=1)
+        index = GalleryIndex("tiger_reid", 32)
+        index.add_many([f"img{i}" for i in range(100)], gallery, ["a" if i < 50 else "b" for i in range(100)])
+
+        results = index.search(gallery[0], k=20, exclude_tiger_id="a")
+        assert results and all(tiger_id == "b" for _, tiger_id, _ in results)
+
+        results = index.search(gallery[0], k=20, similarity_threshold=0.99)
+        assert [r[0] for r in results] == ["img0"]
+
+    def test_eligible_ids_prefilter(self):
+        """A selective candidate set still fills k results from eligible rows only"""
+        gallery = _random_gallery(200, 32, seed=9)
+        index = GalleryIndex("tiger_reid", 32)
+        index.add_many([f"img{i}" for i in range(200)], gallery, [f"t{i % 20}" for i in range(200)])
+
+        eligible = {f"img{i}" for i in range(0, 200, 25)} | {"missing"}
+        results = index.search(gallery[3], k=5, eligible_ids=eligible, exclude_tiger_id="t0")
+        assert len(results) == 5
+        assert {r[0] for r in results} <= eligible
+        assert all(tiger_id != "t0" for _, tiger_id, _ in results)
+
+        assert index.search(gallery[3], k=5, eligible_ids=set()) == []
+
+    def test_replace_and_remove(self):
+        """Re-adding replaces in place; remove swaps the last row in"""
+        gallery = _random_gallery(3, 16, seed=2)
+        index = GalleryIndex("tiger_reid", 16)
+        index.add_many(["a", "b", "c"], gallery)
+        assert len(index) == 3
+
+        index.add("a", gallery[2])
+        assert len(index) == 3
+
+        assert index.remove("a")
+        assert not index.remove("a")
+        assert len(index) == 2
+        assert "a" not in index
+        assert {r[0] for r in index.search(gallery[1], k=5)} == {"b", "c"}
+
+    def test_save_and_load_memory_mapped(self, tmp_path):
+        """Snapshots round-trip and stay usable after further mutation"""
+        gallery = _random_gallery(20, 16, seed=3)
+        index = GalleryIndex("tiger_reid", 16, directory=tmp_path)
+        index.add_many([f"img{i}" for i in range(20)], gallery, ["t"] * 20)
+        assert index.save()
+
+        loaded = GalleryIndex("tiger_reid", 16, directory=tmp_path)
+        assert loaded.load()
+        assert isinstance(loaded._matrix, np.memmap)
+        assert len(loaded) == 20
+        assert loaded.search(gallery[5], k=1)[0][0] == "img5"
+
+        loaded.remove("img5")
+        loaded.add("new", gallery[5], "t2")
+        assert loaded.search(gallery[5], k=1)[0][:2] == ("new", "t2")
+
+    def test_dimension_mismatch(self):
+        """Queries and rows must match the index dimension"""
+        index = GalleryIndex("tiger_reid", 8)
+        with pytest.raises(ValueError):
+            index.add("x", np.ones(4))
+        index.add("x", np.ones(8))
+        with pytest.raises(ValueError):
+            index.search(np.ones(4), k=1)
+
+
+class TestQuantizedGalleryIndex:
+    """Tests for int8/float16 first-stage scan with float32 re-scoring"""
+
+    @pytest.mark.parametrize("quantization", ["int8", "float16"])
+    def test_quantized_recall_and_exact_scores(self, quantization):
+        """Re-scored results match exact search on a clustered gallery"""
+        rng = np.random.default_rng(5)
+        centers = rng.standard_normal((40, 128)).astype(np.float32)
+        gallery = centers[np.repeat(np.arange(40), 10)] + 0.5 * rng.standard_normal((400, 128)).astype(np.float32)
+        ids = [f"img{i}" for i in range(400)]
+
+        exact = GalleryIndex("tiger_reid", 128)
+        exact.add_many(ids, gallery)
+        quantized = GalleryIndex("tiger_reid", 128, quantization=quantization)
+        quantized.add_many(ids, gallery)
+        assert quantized.scan_bytes() < exact.scan_bytes()
+
+        queries = gallery[::20] + 0.1
+        for exact_hits, quantized_hits in zip(
+            exact.search_batch(queries, k=10), quantized.search_batch(queries, k=10)
+        ):
+            assert [h[0] for h in quantized_hits] == [h[0] for h in exact_hits]
+            assert [h[2] for h in quantized_hits] == pytest.approx([h[2] for h in exact_hits], abs=1e-5)
+
+    def test_measure_recall(self):
+        """Recall helper reports recall@k and scan sizes"""
+        from backend.database.gallery_index import measure_quantization_recall
+
+        gallery = _random_gallery(300, 64, seed=6)
+        stats = measure_quantization_recall(gallery, gallery[:30], k=5, quantization="int8")
+        assert stats["recall_at_k"] >= 0.95
+        assert stats["quantized_scan_bytes"] < stats["exact_scan_bytes"]
+
+    def test_quantized_snapshot_round_trip(self, tmp_path):
+        """Exact rows come from the snapshot after reload and from memory after adds"""
+        gallery = _random_gallery(50, 32, seed=7)
+        index = GalleryIndex("tiger_reid", 32, directory=tmp_path, quantization="int8")
+        index.add_many([f"img{i}" for i in range(50)], gallery)
+        assert index.save()
+
+        loaded = GalleryIndex("tiger_reid", 32, directory=tmp_path, quantization="int8")
+        assert loaded.load()
+        assert loaded._matrix.dtype == np.int8
+        assert loaded.search(gallery[9], k=1)[0][0] == "img9"
+        assert loaded.search(gallery[9], k=1)[0][2] == pytest.approx(1.0, abs=1e-5)
+
+        loaded.add("img9", gallery[10])
+        loaded.remove("img10")
+        assert loaded.search(gallery[10], k=1)[0][0] == "img9"
+        assert loaded.save()
+        assert loaded.search(gallery[10], k=1)[0][0] == "img9"
+
+    def test_unknown_quantization(self):
+        """Invalid modes are rejected"""
+        with pytest.raises(ValueError):
+            GalleryIndex("tiger_reid", 8, quantization="int4")
+
+
+class TestSnapshotReconciliation:
+    """Tests for checking snapshots against the vec tables at startup"""
+
+    MODEL = "transreid"
+    TABLE = "vec_embeddings_transreid"
+    DIM = 768
+
+    @pytest.fixture
+    def session(self, monkeypatch):
+        """Session with a plain stand-in for the model's vec0 table"""
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+
+        from backend.database import gallery_index
+        from backend.database.models import Base
+
+        monkeypatch.setattr(gallery_index, "_indexes", {})
+        monkeypatch.setattr(gallery_index, "_index_dir", None)
+
+        engine = create_engine(
+            "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE {self.TABLE} (
+                    image_id TEXT PRIMARY KEY, embedding BLOB,
+                    tiger_id TEXT, side_view TEXT, is_reference INTEGER, verified INTEGER
+                )
+            """))
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+        engine.dispose()
+
+    def _write_rows(self, session, gallery):
+        """Rewrite the table the way another process would (no in-process index update)"""
+        from sqlalchemy import text
+
+        from backend.database.gallery_index import bump_table_generation
+
+        session.execute(text(f"DELETE FROM {self.TABLE}"))
+        for i, vector in enumerate(gallery):
+            session.execute(
+                text(f"INSERT INTO {self.TABLE}(image_id, embedding) VALUES (:id, :embedding)"),
+                {"id": f"img{i}", "embedding": vector.tobytes()}
+            )
+        bump_table_generation(session, self.TABLE)
+        session.commit()
+
+    def _restart(self, monkeypatch, session, tmp_path):
+        from backend.database import gallery_index
+
+        monkeypatch.setattr(gallery_index, "_indexes", {})
+        gallery_index.load_gallery_indexes(session, tmp_path)
+        return gallery_index.get_gallery_index(self.MODEL)
+
+    def test_same_count_rewrite_is_rebuilt(self, monkeypatch, session, tmp_path):
+        """A re-embed that keeps the row count does not load the old vectors"""
+        old = _random_gallery(4, self.DIM, seed=1)
+        self._write_rows(session, old)
+        index = self._restart(monkeypatch, session, tmp_path)
+        assert index.search(old[2], k=1)[0][0] == "img2"
+
+        new = old[::-1].copy()
+        self._write_rows(session, new)
+        index = self._restart(monkeypatch, session, tmp_path)
+
+        assert len(index) == 4
+        assert index.search(new[2], k=1)[0][0] == "img2"
+        assert index.search(old[2], k=1)[0][0] == "img1"
+
+    def test_in_process_writes_keep_snapshot_current(self, monkeypatch, session, tmp_path):
+        """Writes applied to the loaded index are saved with the new generation"""
+        from backend.database import gallery_index
+        from backend.database.vector_search import store_embeddings_bulk
+
+        gallery = _random_gallery(3, self.DIM, seed=2)
+        self._write_rows(session, gallery[:2])
+        self._restart(monkeypatch, session, tmp_path)
+        assert store_embeddings_bulk(session, self.MODEL, ["img2"], gallery[2:]) == 1
+        gallery_index.save_gallery_indexes()
+
+        rebuilds = []
+        monkeypatch.setattr(
+            GalleryIndex, "rebuild_from_table",
+            lambda self, session, table: rebuilds.append(table)
+        )
+        index = self._restart(monkeypatch, session, tmp_path)
+
+        assert rebuilds == []
+        assert len(index) == 3
+
+    def test_unreadable_table_leaves_index_unloaded(self, monkeypatch, session, tmp_path):
+        """Models whose table cannot be read are not served from an empty index"""
+        from backend.database import gallery_index
+
+        self._restart(monkeypatch, session, tmp_path)
+
+        assert gallery_index.get_loaded_gallery_index(self.MODEL) is not None
+        assert gallery_index.get_loaded_gallery_index("tiger_reid") is None
@@ -0,0 +1,205 @@
+"""Tests for the HNSW approximate gallery index"""
+
+import numpy as np
+import pytest
+
+from backend.database import hnsw_index
+from backend.database.hnsw_index import HNSWIndex, HNSWLIB_AVAILABLE
+
+BACKENDS = ["numpy"] + (["hnswlib"] if HNSWLIB_AVAILABLE else [])
+
+
+def _clustered_gallery(n, dim, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    gallery = centers[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dim))
+    return gallery.astype(np.float32)
+
+
+def _build(backend, gallery, **kwargs):
+    index = HNSWIndex("tiger_reid", gallery.shape[1], backend=backend, **kwargs)
+    index.build_from(
+        [f"img{i}" for i in range(len(gallery))],
+        gallery,
+        [f"t{i % 25}" for i in range(len(gallery))]
+    )
+    return index
+
+
+def _recall(index, gallery, queries, k, ef_search=None):
+    normed = gallery / np.linalg.norm(gallery, axis=1, keepdims=True)
+    hits = 0
+    for query in queries:
+        q = query / np.linalg.norm(query)
+        exact = {f"img{i}" for i in np.argsort(-(normed @ q))[:k]}
+        found = {image_id for image_id, _, _ in index.search(query, k, ef_search=ef_search)}
+        hits += len(exact & found)
+    return hits / (len(queries) * k)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestHNSWIndex:
+    """Tests for HNSWIndex search/add/remove/persistence"""
+
+    def test_recall_against_exact_search(self, backend):
+        """Graph search finds nearly all exact top-k neighbours"""
+        gallery = _clustered_gallery(800, 32)
+        index = _build(backend, gallery)
+
+        rng = np.random.default_rng(1)
+        queries = gallery[rng.choice(800, 50, replace=False)] + 0.1 * rng.standard_normal((50, 32))
+        assert _recall(index, gallery, queries, k=10) >= 0.95
+
+    def test_ef_search_trades_recall(self, backend):
+        """A wider beam never loses recall"""
+        gallery = _clustered_gallery(800, 32, seed=2)
+        index = _build(backend, gallery, M=4, ef_construction=16)
+
+        rng = np.random.default_rng(3)
+        queries = rng.standard_normal((50, 32)).astype(np.float32)
+        narrow = _recall(index, gallery, queries, k=10, ef_search=10)
+        wide = _recall(index, gallery, queries, k=10, ef_search=200)
+        assert wide >= narrow
+        assert wide >= 0.95
+
+    def test_exclude_tiger_and_threshold(self, backend):
+        """Excluded tiger never appears and threshold trims results"""
+        gallery = _clustered_gallery(200, 16, seed=4)
+        index = _build(backend, gallery)
+
+        results = index.search(gallery[0], k=20, exclude_tiger_id="t0")
+        assert len(results) == 20
+        assert all(tiger_id != "t0" for _, tiger_id, _ in results)
+
+        results = index.search(gallery[0], k=20, similarity_threshold=0.999)
+        assert [r[0] for r in results] == ["img0"]
+        assert results[0][2] == pytest.approx(1.0, abs=1e-4)
+
+    @pytest.mark.parametrize("exact_scan_max", [0, 2048])
+    def test_eligible_ids_prefilter(self, backend, exact_scan_max, monkeypatch):
+        """Selective candidate sets fill k results via graph search or exact scan"""
+        monkeypatch.setattr(hnsw_index, "_EXACT_SCAN_MAX_ELIGIBLE", exact_scan_max)
+        gallery = _clustered_gallery(400, 16, seed=10)
+        index = _build(backend, gallery)
+
+        eligible = {f"img{i}" for i in range(0, 400, 20)}
+        query = gallery[5]
+        results = index.search(query, k=5, eligible_ids=eligible, exclude_tiger_id="t0")
+        assert len(results) == 5
+        assert {r[0] for r in results} <= eligible
+        assert all(tiger_id != "t0" for _, tiger_id, _ in results)
+
+        normed = gallery / np.linalg.norm(gallery, axis=1, keepdims=True)
+        candidates = [i for i in range(0, 400, 20) if i % 25 != 0]
+        expected = sorted(candidates, key=lambda i: -(normed[i] @ query))[:5]
+        assert [r[0] for r in results] == [f"img{i}" for i in expected]
+
+    def test_add_replace_and_remove(self, backend):
+        """Incremental updates are visible to the next search"""
+        gallery = _clustered_gallery(100, 16, seed=5)
+        index = _build(backend, gallery)
+
+        assert index.remove("img7")
+        assert not index.remove("img7")
+        assert "img7" not in index
+        assert "img7" not in [r[0] for r in index.search(gallery[7], k=5)]
+
+        replacement = -gallery[3]
+        index.add("img3", replacement, "t3")
+        assert len(index) == 99
+        assert index.search(replacement, k=1)[0][0] == "img3"
+        assert index.search(gallery[3], k=1)[0][0] != "img3"
+
+        new = np.random.default_rng(6).standard_normal(16).astype(np.float32)
+        index.add("new", new, "t9")
+        assert index.search(new, k=1)[0][:2] == ("new", "t9")
+
+    def test_save_and_load_round_trip(self, backend, tmp_path):
+        """A saved graph reloads with the same results and tombstones"""
+        gallery = _clustered_gallery(300, 16, seed=7)
+        index = _build(backend, gallery, directory=tmp_path)
+        index.remove("img11")
+        assert index.save()
+
+        loaded = HNSWIndex("tiger_reid", 16, directory=tmp_path, backend=backend)
+        assert loaded.load()
+        assert len(loaded) == 299
+        assert "img11" not in loaded
+
+        query = gallery[42]
+        assert loaded.search(query, k=5) == index.search(query, k=5)
+        assert loaded.search(query, k=5, exclude_tiger_id="t17") == \
+            index.search(query, k=5, exclude_tiger_id="t17")
+
+    def test_save_compacts_deleted_nodes(self, backend, tmp_path):
+        """Heavily deleted graphs are rebuilt without tombstones on save"""
+        gallery = _clustered_gallery(100, 16, seed=8)
+        index = _build(backend, gallery, directory=tmp_path)
+        for i in range(50):
+            index.remove(f"img{i}")
+        assert index.deleted_count == 50
+
+        index.save()
+        assert index.deleted_count == 0
+        assert len(index) == 50
+        assert index.search(gallery[60], k=1)[0][0] == "img60"
+
+    def test_dimension_mismatch_rejected(self, backend):
+        """Wrong-dimension vectors are rejected"""
+        index = HNSWIndex("tiger_reid", 16, backend=backend)
+        with pytest.raises(ValueError):
+            index.add("x", np.ones(8, dtype=np.float32))
+        with pytest.raises(ValueError):
+            index.search(np.ones(8, dtype=np.float32), k=1)
+
+
+def test_empty_index_returns_no_results():
+    """Searching an empty graph is a no-op"""
+    index = HNSWIndex("tiger_reid", 16, backend="numpy")
+    assert index.search(np.ones(16, dtype=np.float32), k=5) == []
+
+
+def test_stale_graph_rebuilds_in_background(monkeypatch, tmp_path):
+    """Startup does not wait for a rebuild; the graph goes live once built"""
+    import threading
+
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+
+    from backend.database.gallery_index import bump_table_generation
+    from backend.database.models import Base
+
+    monkeypatch.setattr(hnsw_index, "_indexes", {})
+    monkeypatch.setattr(hnsw_index, "_rebuilds", {})
+    engine = create_engine(f"sqlite:///{tmp_path / 'tiger_id.db'}")
+    Base.metadata.create_all(bind=engine)
+    gallery = _clustered_gallery(5, 768)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE vec_embeddings_transreid (image_id TEXT PRIMARY KEY, embedding BLOB)"))
+        for i, vector in enumerate(gallery):
+            conn.execute(
+                text("INSERT INTO vec_embeddings_transreid VALUES (:id, :embedding)"),
+                {"id": f"img{i}", "embedding": vector.tobytes()}
+            )
+        bump_table_generation(conn, "vec_embeddings_transreid")
+
+    release = threading.Event()
+    rebuild = HNSWIndex.rebuild_from_table
+
+    def slow_rebuild(self, session, table, batch_size=5000):
+        assert release.wait(5)
+        return rebuild(self, session, table, batch_size)
+
+    monkeypatch.setattr(HNSWIndex, "rebuild_from_table", slow_rebuild)
+    with sessionmaker(bind=engine)() as session:
+        counts = hnsw_index.load_hnsw_indexes(session, tmp_path / "index")
+
+    assert counts["transreid"] == 0
+    assert hnsw_index.get_loaded_hnsw_index("transreid") is None
+
+    release.set()
+    hnsw_index._rebuilds["transreid"].join(5)
+    index = hnsw_index.get_loaded_hnsw_index("transreid")
+    assert index is not None and len(index) == 5
+    assert index.search(gallery[3], k=1)[0][0] == "img3"
+    engine.dispose()
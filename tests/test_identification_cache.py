@@ -0,0 +1,203 @@
+"""Tests for the persistent identification result cache"""
+
+import io
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database.identification_cache import IdentificationCache, make_cache_key
+from backend.database.models import Base, Tiger, TigerImage
+from backend.database.vector_search import store_embeddings_bulk
+
+
+@pytest.fixture
+def session():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Plain stand-in when sqlite-vec is not installed
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS vec_embeddings_wildlife_tools (
+                image_id TEXT PRIMARY KEY, embedding BLOB,
+                tiger_id TEXT, side_view TEXT, is_reference INTEGER, verified INTEGER
+            )
+        """))
+
+    session = sessionmaker(bind=engine)()
+    session.add(Tiger(tiger_id="t1", name="Raja"))
+    session.add(TigerImage(image_id="i1", tiger_id="t1", image_path="a.jpg"))
+    session.commit()
+    yield session
+    session.close()
+
+
+class FakeDetector:
+    """Detector that finds nothing and counts its calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def detect(self, image_bytes):
+        self.calls += 1
+        return {"detections": []}
+
+
+class FakeIdentify:
+    """Stands in for detection, embedding and search, counting its calls"""
+
+    def __init__(self, result, fallback=None):
+        self.result = result
+        self.fallback = fallback
+        self.calls = 0
+
+    async def __call__(self, *args, **kwargs):
+        from backend.services.modal_client import record_fallback
+
+        self.calls += 1
+        if self.fallback:
+            record_fallback(self.fallback)
+        return dict(self.result)
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="evidence.jpg")
+
+
+class TestIdentificationCache:
+    """Tests for IdentificationCache storage, generations and invalidation"""
+
+    def test_round_trip_and_numpy_values(self, tmp_path):
+        """Results survive reopening the file with numpy values converted"""
+        path = tmp_path / "cache.db"
+        cache = IdentificationCache(path)
+        key = make_cache_key("abc", 0, {"wildlife_tools": "1.0:m1"}, ensemble_mode="weighted")
+        assert cache.get(key) is None
+        assert cache.put(key, 0, {"confidence": np.float32(0.5), "matches": [{"similarity": np.float64(0.25)}]})
+        cache.close()
+
+        reopened = IdentificationCache(path)
+        assert reopened.get(key) == {"confidence": 0.5, "matches": [{"similarity": 0.25}]}
+        assert reopened.get_stats()["hits"] == 1
+
+    def test_key_depends_on_versions_and_parameters(self):
+        """Model versions, generation and request parameters change the key"""
+        base = make_cache_key("abc", 0, {"wildlife_tools": "1.0:m1"}, ensemble_mode=None)
+        assert base == make_cache_key("abc", 0, {"wildlife_tools": "1.0:m1"}, ensemble_mode=None)
+        assert base != make_cache_key("abc", 0, {"wildlife_tools": "1.1:m2"}, ensemble_mode=None)
+        assert base != make_cache_key("abc", 1, {"wildlife_tools": "1.0:m1"}, ensemble_mode=None)
+        assert base != make_cache_key("abc", 0, {"wildlife_tools": "1.0:m1"}, ensemble_mode="staggered")
+
+    def test_bump_purges_and_rejects_stale_results(self):
+        """A generation bump drops entries and results computed before it"""
+        cache = IdentificationCache(":memory:")
+        cache.put("k1", 0, {"identified": True})
+        assert cache.bump_generation() == 1
+        assert cache.get("k1") is None
+        assert cache.put("k2", 0, {"identified": False}) is False
+        assert cache.put("k2", 1, {"identified": False}) is True
+        assert len(cache) == 1
+
+    def test_least_recently_used_evicted(self, monkeypatch):
+        """Entries beyond max_entries are evicted by last use"""
+        from backend.database import identification_cache
+
+        clock = [1000.0]
+        monkeypatch.setattr(identification_cache.time, "time", lambda: clock[0])
+        cache = IdentificationCache(":memory:", max_entries=2)
+        for key in ("a", "b"):
+            clock[0] += 1
+            cache.put(key, 0, {"key": key})
+        clock[0] += 1
+        cache.get("a")
+        clock[0] += 1
+        cache.put("c", 0, {"key": "c"})
+        assert cache.get("b") is None
+        assert cache.get("a") == {"key": "a"}
+        assert len(cache) == 2
+
+    def test_gallery_changes_bump_on_commit(self, session, isolated_identification_cache):
+        """Tiger edits and embedding writes invalidate after commit, not on rollback"""
+        cache = isolated_identification_cache
+        start = cache.generation()
+
+        session.get(Tiger, "t1").name = "Raja II"
+        session.flush()
+        session.rollback()
+        assert cache.generation() == start
+
+        session.get(Tiger, "t1").name = "Raja II"
+        session.commit()
+        assert cache.generation() == start + 1
+
+        embeddings = np.ones((1, 1536), dtype=np.float32)
+        assert store_embeddings_bulk(session, "wildlife_tools", ["i1"], embeddings) == 1
+        assert cache.generation() == start + 2
+
+    @pytest.mark.asyncio
+    async def test_service_short_circuits_repeat_upload(self, session, isolated_identification_cache):
+        """The same photo is identified once until the gallery changes"""
+        from backend.services.tiger.identification_service import TigerIdentificationService
+
+        service = TigerIdentificationService(db=session, detection_model=FakeDetector())
+        identify = FakeIdentify({"identified": False, "message": "Tiger not found in database"})
+        service._identify_artifact = identify
+        photo = b"same evidence photo"
+
+        first = await service.identify_from_image(_upload(photo), uuid4())
+        second = await service.identify_from_image(_upload(photo), uuid4())
+        assert identify.calls == 1
+        assert "cached" not in first
+        assert second["cached"] is True
+        assert second["message"] == first["message"]
+
+        await service.identify_from_image(_upload(b"another photo"), uuid4())
+        assert identify.calls == 2
+
+        session.add(TigerImage(image_id="i2", tiger_id="t1", image_path="b.jpg"))
+        session.commit()
+        await service.identify_from_image(_upload(photo), uuid4())
+        assert identify.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_no_detection_not_cached(self, session, isolated_identification_cache):
+        """A photo without a detected tiger is detected again on re-upload"""
+        from backend.services.tiger.identification_service import TigerIdentificationService
+
+        detector = FakeDetector()
+        service = TigerIdentificationService(db=session, detection_model=detector)
+
+        await service.identify_from_image(_upload(b"empty frame"), uuid4())
+        await service.identify_from_image(_upload(b"empty frame"), uuid4())
+        assert detector.calls == 2
+        assert len(isolated_identification_cache) == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("result, fallback", [
+        ({"identified": False, "models": {"wildlife_tools": {"success": False}}}, None),
+        ({"identified": False, "stage_timings": [{"model": "wildlife_tools", "status": "failed"}]}, None),
+        ({"identified": True, "models": {"wildlife_tools": {"success": True}}}, "wildlife_tools"),
+    ])
+    async def test_degraded_results_not_cached(
+        self, session, isolated_identification_cache, result, fallback
+    ):
+        """Failed model runs and mock or fallback responses are not cached"""
+        from backend.services.tiger.identification_service import TigerIdentificationService
+
+        service = TigerIdentificationService(db=session, detection_model=FakeDetector())
+        identify = FakeIdentify(result, fallback=fallback)
+        service._identify_artifact = identify
+
+        await service.identify_from_image(_upload(b"photo"), uuid4())
+        second = await service.identify_from_image(_upload(b"photo"), uuid4())
+        assert identify.calls == 2
+        assert "cached" not in second
+        assert len(isolated_identification_cache) == 0
@@ -0,0 +1,109 @@
+"""Tests for the binary embedding wire format."""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from backend.infrastructure.modal.embedding_codec import (
+    decode_embedding,
+    decode_embedding_result,
+    encode_embedding,
+)
+
+
+class TestEmbeddingCodec:
+    """Tests for encoding and decoding embeddings."""
+
+    def test_float32_round_trip_is_exact(self):
+        """float32 bytes decode to the same vector."""
+        embedding = np.random.rand(2048).astype(np.float32)
+        payload = encode_embedding(embedding, "float32")
+
+        assert payload["dtype"] == "<f4"
+        assert payload["shape"] == [2048]
+        assert len(payload["data"]) == 2048 * 4
+        np.testing.assert_array_equal(decode_embedding(payload), embedding)
+
+    def test_float16_round_trip_is_close(self):
+        """float16 halves the payload and decodes back to float32."""
+        embedding = np.random.rand(768).astype(np.float32)
+        decoded = decode_embedding(encode_embedding(embedding, "float16"))
+
+        assert decoded.dtype == np.float32
+        np.testing.assert_allclose(decoded, embedding, atol=1e-3)
+
+    def test_list_format_still_decodes(self):
+        """The original list of floats is accepted as-is."""
+        embedding = np.random.rand(16)
+        payload = encode_embedding(embedding, "list")
+
+        assert isinstance(payload, list)
+        np.testing.assert_allclose(decode_embedding(payload), embedding, rtol=1e-6)
+
+    def test_binary_payload_is_smaller(self):
+        """Pickled binary payloads are a fraction of the list format."""
+        embedding = np.random.rand(2048)
+        as_list = len(pickle.dumps(encode_embedding(embedding, "list")))
+        as_bytes = len(pickle.dumps(encode_embedding(embedding, "float32")))
+
+        assert as_bytes * 2 < as_list
+
+    def test_unknown_encoding_rejected(self):
+        with pytest.raises(ValueError):
+            encode_embedding(np.zeros(4), "int8")
+
+    def test_decode_result_is_writable(self):
+        """Decoded embeddings can be normalized in place."""
+        result = decode_embedding_result(
+            {"success": True, "embedding": encode_embedding(np.ones(4), "float32")}
+        )
+        result["embedding"] /= 2
+        assert result["embedding"].tolist() == [0.5] * 4
+        assert decode_embedding_result({"success": False, "error": "x"}) == {
+            "success": False, "error": "x"
+        }
+
+
+class TestClientEncoding:
+    """Tests for clients requesting and decoding binary embeddings."""
+
+    @pytest.mark.asyncio
+    async def test_client_requests_and_decodes_binary(self, sample_rgb_image):
+        """The configured encoding is sent to Modal and decoded to float32."""
+        from backend.infrastructure.modal.clients.wildlife_tools_client import WildlifeToolsClient
+
+        client = WildlifeToolsClient(use_mock=False, batching=False, encoding="float16")
+        seen = {}
+
+        async def fake_call(method_name, payload, **kwargs):
+            seen.update(kwargs)
+            return {
+                "success": True,
+                "embedding": encode_embedding(np.full(1536, 0.25), kwargs["encoding"]),
+            }
+
+        client._call_with_retry = fake_call
+        result = await client.generate_embedding(sample_rgb_image)
+
+        assert seen == {"encoding": "float16"}
+        assert result["embedding"].dtype == np.float32
+        assert result["embedding"].shape == (1536,)
+
+    @pytest.mark.asyncio
+    async def test_list_encoding_sends_no_argument(self, sample_rgb_image):
+        """Legacy deployments without the encoding parameter keep working."""
+        from backend.infrastructure.modal.clients.wildlife_tools_client import WildlifeToolsClient
+
+        client = WildlifeToolsClient(use_mock=False, batching=False, encoding="list")
+        seen = []
+
+        async def fake_call(method_name, payload, **kwargs):
+            seen.append(kwargs)
+            return {"success": True, "embedding": [0.5, 0.5]}
+
+        client._call_with_retry = fake_call
+        result = await client.generate_embedding(sample_rgb_image)
+
+        assert seen == [{}]
+        assert result["embedding"].tolist() == [0.5, 0.5]
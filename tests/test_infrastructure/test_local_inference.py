@@ -0,0 +1,233 @@
+"""Tests for the local ONNX Runtime inference backend."""
+
+import ast
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.infrastructure.local.onnx_client import (
+    LocalInferenceClient,
+    decode_yolo_output,
+    letterbox,
+    non_max_suppression,
+    preprocess,
+)
+from backend.infrastructure.local.specs import LOCAL_MODEL_SPECS, onnx_model_path
+from backend.infrastructure.modal.model_registry import ModelRegistry
+
+
+class FakeSession:
+    """Stands in for an onnxruntime InferenceSession."""
+
+    def __init__(self, output):
+        self.output = output
+        self.inputs = []
+
+    def get_inputs(self):
+        class Input:
+            name = "input"
+        return [Input()]
+
+    def run(self, output_names, feeds):
+        self.inputs.append(feeds["input"])
+        return [self.output]
+
+
+class TestBackendSelection:
+    """Tests for choosing a model's backend through ModelRegistry."""
+
+    def test_models_default_to_modal(self):
+        registry = ModelRegistry()
+        assert registry.get_backend("cvwc2019_reid") == "modal"
+        assert registry.list_local_models() == []
+
+    def test_set_backend(self):
+        registry = ModelRegistry()
+        registry.set_backend("cvwc2019_reid", "LOCAL")
+        assert registry.get_backend("cvwc2019_reid") == "local"
+        assert registry.list_local_models() == ["cvwc2019_reid"]
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            ModelRegistry().set_backend("tiger_reid", "tpu")
+
+    def test_per_model_env_override(self, monkeypatch):
+        monkeypatch.setenv("MODEL_BACKEND_RAPID_REID", "local")
+        registry = ModelRegistry()
+        assert registry.get_backend("rapid_reid") == "local"
+        assert registry.get_backend("tiger_reid") == "modal"
+
+
+def _modal_center_crop_image():
+    """modal_app._center_crop_image, compiled on its own (modal is not installed here)."""
+    source = (Path(__file__).parents[2] / "backend" / "modal_app.py").read_text()
+    function = next(
+        node for node in ast.parse(source).body
+        if isinstance(node, ast.FunctionDef) and node.name == "_center_crop_image"
+    )
+    namespace = {"np": np}
+    exec(compile(ast.Module([function], type_ignores=[]), "modal_app.py", "exec"), namespace)
+    return namespace["_center_crop_image"]
+
+
+class TestPreprocessing:
+    """Tests for matching the Modal input pipelines."""
+
+    def test_stretch_resize_and_imagenet_normalization(self):
+        image = Image.new("RGB", (300, 500), color=(255, 255, 255))
+        inputs = preprocess(image, LOCAL_MODEL_SPECS["rapid_reid"])
+
+        assert inputs.shape == (1, 3, 256, 128)
+        assert inputs.dtype == np.float32
+        assert inputs[0, 0, 0, 0] == pytest.approx((1 - 0.485) / 0.229, rel=1e-5)
+
+    def test_center_crop_keeps_square(self):
+        image = Image.new("RGB", (600, 300), color=(255, 0, 0))
+        inputs = preprocess(image, LOCAL_MODEL_SPECS["megadescriptor_b"])
+
+        assert inputs.shape == (1, 3, 224, 224)
+        assert inputs.max() == pytest.approx(255.0)
+
+    @pytest.mark.parametrize("model_name", ["wildlife_tools", "megadescriptor_b"])
+    def test_megadescriptor_inputs_match_modal_app(self, model_name):
+        """Local inputs equal the pixels modal_app.py passes to DeepFeatures."""
+        rng = np.random.default_rng(0)
+        image = Image.fromarray(rng.integers(0, 256, (300, 500, 3), dtype=np.uint8))
+        size = LOCAL_MODEL_SPECS[model_name].input_size[0]
+
+        modal_pixels = _modal_center_crop_image()(image, size)
+        inputs = preprocess(image, LOCAL_MODEL_SPECS[model_name])
+
+        np.testing.assert_allclose(inputs[0].transpose(1, 2, 0), modal_pixels, atol=1e-3)
+
+    def test_letterbox_pads_to_input_size(self):
+        padded, scale, pad = letterbox(Image.new("RGB", (1280, 640)), (640, 640))
+
+        assert padded.size == (640, 640)
+        assert scale == pytest.approx(0.5)
+        assert pad == (0.0, 160.0)
+
+
+class TestDetectionDecoding:
+    """Tests for turning raw YOLOv5 output into detections."""
+
+    def test_nms_drops_overlapping_boxes(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+        scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+        assert non_max_suppression(boxes, scores, 0.45) == [0, 2]
+
+    def test_boxes_mapped_back_to_original_image(self):
+        # cx, cy, w, h, objectness, animal, person, vehicle (letterboxed pixels)
+        output = np.array([
+            [320, 320, 100, 100, 0.9, 0.9, 0.1, 0.0],
+            [100, 100, 20, 20, 0.2, 0.9, 0.0, 0.0],
+        ], dtype=np.float32)
+
+        detections = decode_yolo_output(
+            output, confidence_threshold=0.5, scale=0.5, pad=(0.0, 160.0), image_size=(1280, 640)
+        )
+
+        assert len(detections) == 1
+        assert detections[0]["category"] == "animal"
+        assert detections[0]["bbox"] == pytest.approx([540, 220, 740, 420])
+        assert detections[0]["confidence"] == pytest.approx(0.81)
+
+
+class TestLocalInferenceClient:
+    """Tests for running embeddings and detection on CPU."""
+
+    def test_embedding_is_l2_normalized(self, sample_rgb_image):
+        client = LocalInferenceClient(model_dir="/nonexistent")
+        session = FakeSession(np.array([[3.0, 4.0]], dtype=np.float32))
+        client._sessions["rapid_reid"] = session
+
+        result = client.embed("rapid_reid", sample_rgb_image)
+
+        assert result["success"] is True
+        assert result["backend"] == "local"
+        assert result["embedding"].dtype == np.float32
+        np.testing.assert_allclose(result["embedding"], [0.6, 0.8])
+        assert session.inputs[0].shape == (1, 3, 256, 128)
+
+    def test_missing_graph_reports_failure(self, sample_rgb_image):
+        client = LocalInferenceClient(model_dir="/nonexistent")
+
+        result = client.embed("tiger_reid", sample_rgb_image)
+
+        assert result["success"] is False
+        assert result["embedding"] is None
+        assert client.get_stats()["failures"] == 1
+
+    def test_prefers_exported_int8_graph(self, tmp_path):
+        onnx_model_path("tiger_reid", str(tmp_path), int8=True).touch()
+
+        assert LocalInferenceClient(str(tmp_path), int8=True).model_path("tiger_reid").name == \
+            "tiger_reid.int8.onnx"
+        assert LocalInferenceClient(str(tmp_path), int8=False).model_path("tiger_reid").name == \
+            "tiger_reid.onnx"
+
+    @pytest.mark.asyncio
+    async def test_detect(self, sample_rgb_image):
+        client = LocalInferenceClient(model_dir="/nonexistent")
+        output = np.array([[[320, 320, 64, 64, 0.9, 0.9, 0.0, 0.0]]], dtype=np.float32)
+        client._sessions["megadetector"] = FakeSession(output)
+
+        result = await client.detect(sample_rgb_image, confidence_threshold=0.5)
+
+        assert result["success"] is True
+        assert result["num_detections"] == 1
+        assert result["detections"][0]["category"] == "animal"
+
+
+class TestModalClientRouting:
+    """Tests for ModalClient sending requests to the local backend."""
+
+    @pytest.fixture
+    def local_setup(self, monkeypatch):
+        import backend.services.modal_client as modal_client_module
+
+        registry = ModelRegistry()
+        local_client = LocalInferenceClient(model_dir="/nonexistent")
+        local_client._sessions["cvwc2019_reid"] = FakeSession(np.ones((1, 4), dtype=np.float32))
+        monkeypatch.setattr(modal_client_module, "get_model_registry", lambda: registry)
+        monkeypatch.setattr(modal_client_module, "get_local_inference_client", lambda: local_client)
+        return registry, local_client
+
+    @pytest.mark.asyncio
+    async def test_local_backend_skips_modal(self, local_setup, sample_rgb_image):
+        from backend.services.modal_client import ModalClient
+
+        registry, _ = local_setup
+        registry.set_backend("cvwc2019_reid", "local")
+        client = ModalClient(use_mock=False)
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("Modal should not be called")
+
+        client._call_with_retry = fail
+        result = await client.cvwc2019_reid_embedding(sample_rgb_image)
+
+        assert result["backend"] == "local"
+        assert result["embedding"].shape == (4,)
+
+    @pytest.mark.asyncio
+    async def test_modal_failure_falls_back_to_exported_graph(
+        self, local_setup, sample_rgb_image, monkeypatch
+    ):
+        from backend.services.modal_client import ModalClient, ModalUnavailableError
+
+        _, local_client = local_setup
+        monkeypatch.setattr(local_client, "is_available", lambda model_name: True)
+        client = ModalClient(use_mock=False, batching=False)
+
+        async def unavailable(*args, **kwargs):
+            raise ModalUnavailableError("down")
+
+        client._call_with_retry = unavailable
+        client._get_modal_function = lambda model_name: type("Model", (), {"generate_embedding": None})
+        result = await client.cvwc2019_reid_embedding(sample_rgb_image)
+
+        assert result["backend"] == "local"
+        assert "mock" not in result
@@ -0,0 +1,133 @@
+"""Tests for micro-batching of Modal embedding requests."""
+
+import asyncio
+import threading
+
+import pytest
+from PIL import Image
+
+from backend.infrastructure.modal.base_client import ModalClientError
+from backend.infrastructure.modal.micro_batcher import MicroBatcher
+
+
+class TestMicroBatcher:
+    """Tests for coalescing concurrent submissions."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_submissions_share_one_batch(self):
+        """Requests arriving together are sent in one call and demultiplexed."""
+        calls = []
+
+        async def batch_fn(items):
+            calls.append(list(items))
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=5)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+        assert results == [0, 10, 20, 30, 40]
+        assert calls == [[0, 1, 2, 3, 4]]
+        assert batcher.get_stats()["avg_batch_size"] == 5
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self):
+        """Reaching max_batch_size dispatches immediately and splits the rest."""
+        calls = []
+
+        async def batch_fn(items):
+            calls.append(list(items))
+            return items
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait_ms=10_000)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(6))), timeout=1
+        )
+
+        assert results == list(range(6))
+        assert calls == [[0, 1, 2], [3, 4, 5]]
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self):
+        """A failed batch call raises in each waiting request."""
+        async def batch_fn(items):
+            raise ModalClientError("boom")
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=1)
+        results = await asyncio.gather(
+            *(batcher.submit(i) for i in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ModalClientError) for r in results)
+
+    def test_callers_on_separate_loops_are_resolved_on_their_own_loop(self):
+        """Submissions from another thread's event loop are not stranded."""
+        batch_loops = []
+
+        async def batch_fn(items):
+            batch_loops.append(asyncio.get_running_loop())
+            await asyncio.sleep(0.01)
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=20)
+        results = {}
+
+        def run(name, item):
+            async def submit():
+                return await asyncio.wait_for(batcher.submit(item), timeout=2)
+            results[name] = asyncio.run(submit())
+
+        threads = [threading.Thread(target=run, args=(name, i)) for i, name in enumerate("ab")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == {"a": 0, "b": 10}
+        assert len(set(batch_loops)) == 2
+
+
+class TestBatchedEmbeddingClient:
+    """Tests for micro-batched embedding clients."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_embeddings_use_batch_method(self, sample_rgb_image):
+        """Concurrent requests go through generate_embedding_batch once."""
+        from backend.infrastructure.modal.clients.wildlife_tools_client import WildlifeToolsClient
+
+        client = WildlifeToolsClient(use_mock=False, batching=True, max_wait_ms=5)
+        calls = []
+
+        async def fake_call(method_name, payload, **kwargs):
+            calls.append(method_name)
+            if method_name == "generate_embedding":
+                return {"success": True, "embedding": [0.0]}
+            return [{"success": True, "embedding": [float(i)]} for i in range(len(payload))]
+
+        client._call_with_retry = fake_call
+
+        # Distinct images (identical ones would share a single-flight call)
+        images = [Image.new("RGB", (8, 8), color=(60 * i, 0, 0)) for i in range(4)]
+        results = await asyncio.gather(*(client.generate_embedding(image) for image in images))
+        assert calls == ["generate_embedding_batch"]
+        assert [r["embedding"].tolist() for r in results] == [[0.0], [1.0], [2.0], [3.0]]
+
+        # A lone request keeps using the single-image method
+        await client.generate_embedding(sample_rgb_image)
+        assert calls[-1] == "generate_embedding"
+        assert client.get_stats()["batching"]["batches"] == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_batch_response_falls_back(self, sample_rgb_image):
+        """A malformed batch response is a client error, so callers fall back to mock."""
+        from backend.infrastructure.modal.clients.wildlife_tools_client import WildlifeToolsClient
+
+        client = WildlifeToolsClient(use_mock=False, batching=True, max_wait_ms=5)
+
+        async def fake_call(method_name, payload, **kwargs):
+            return {"success": True}
+
+        client._call_with_retry = fake_call
+
+        images = [Image.new("RGB", (8, 8), color=(60 * i, 0, 0)) for i in range(2)]
+        results = await asyncio.gather(*(client.generate_embedding(image) for image in images))
+        assert all(r["mock"] for r in results)
@@ -631,7 +631,8 @@ class TestCrossClientConsistency:
             assert result["success"] is True
             assert "embedding" in result
             assert len(result["embedding"]) == expected_dim
-            assert isinstance(result["embedding"], list)
+            assert isinstance(result["embedding"], np.ndarray)
+            assert result["embedding"].dtype == np.float32
 
     def test_all_clients_use_same_app_name(self):
         """Test that all clients use the same Modal app name."""
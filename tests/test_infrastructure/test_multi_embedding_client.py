@@ -0,0 +1,70 @@
+"""Tests for the multi-model embedding client."""
+
+import numpy as np
+import pytest
+
+from backend.infrastructure.modal.base_client import ModalClientError
+from backend.infrastructure.modal.clients.multi_embedding_client import (
+    MultiEmbeddingClient,
+    multi_embedding_name,
+)
+from backend.infrastructure.modal.embedding_codec import encode_embedding
+
+
+class TestMultiEmbeddingClient:
+    """Tests for fetching several embeddings in one request."""
+
+    def test_ensemble_names_map_to_served_models(self):
+        assert multi_embedding_name("rapid") == "rapid_reid"
+        assert multi_embedding_name("cvwc2019") == "cvwc2019_reid"
+        assert multi_embedding_name("wildlife_tools") == "wildlife_tools"
+        assert multi_embedding_name("matchanything") is None
+
+    @pytest.mark.asyncio
+    async def test_one_call_returns_every_embedding(self, sample_rgb_image):
+        """All requested models travel in a single call and are decoded."""
+        client = MultiEmbeddingClient(use_mock=False, encoding="float32")
+        calls = []
+
+        async def fake_call(method_name, image_bytes, models, **kwargs):
+            calls.append((method_name, models, kwargs))
+            return {
+                "embeddings": {
+                    name: {"embedding": encode_embedding(np.ones(4), "float32"), "success": True}
+                    for name in models
+                },
+                "success": True,
+            }
+
+        client._call_with_retry = fake_call
+        result = await client.generate_all_embeddings(
+            sample_rgb_image, models=["transreid", "rapid_reid"]
+        )
+
+        assert calls == [
+            ("generate_all_embeddings", ["transreid", "rapid_reid"], {"encoding": "float32"})
+        ]
+        assert set(result["embeddings"]) == {"transreid", "rapid_reid"}
+        assert result["embeddings"]["rapid_reid"]["embedding"].dtype == np.float32
+
+    @pytest.mark.asyncio
+    async def test_failure_is_reported_not_mocked(self, sample_rgb_image):
+        """A failed call returns success False so callers embed per model."""
+        client = MultiEmbeddingClient(use_mock=False)
+
+        async def fake_call(*args, **kwargs):
+            raise ModalClientError("down")
+
+        client._call_with_retry = fake_call
+        result = await client.generate_all_embeddings(sample_rgb_image)
+
+        assert result["success"] is False
+        assert result["embeddings"] == {}
+
+    @pytest.mark.asyncio
+    async def test_mock_mode(self, sample_rgb_image):
+        client = MultiEmbeddingClient(use_mock=True)
+        result = await client.generate_all_embeddings(sample_rgb_image, models=["transreid"])
+
+        assert result["mock"] is True
+        assert len(result["embeddings"]["transreid"]["embedding"]) == 768
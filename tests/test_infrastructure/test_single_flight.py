@@ -0,0 +1,208 @@
+"""Tests for coalescing identical in-flight Modal calls."""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.infrastructure.modal.base_client import BaseModalClient, ModalClientError
+from backend.infrastructure.modal.single_flight import SingleFlight, content_key
+
+
+class ConcreteClient(BaseModalClient):
+    @property
+    def app_name(self) -> str:
+        return "test-app"
+
+    @property
+    def class_name(self) -> str:
+        return "TestModel"
+
+
+class TestContentKey:
+    """Tests for keying calls by their arguments."""
+
+    def test_same_arguments_same_key(self):
+        assert content_key(b"img", 0.5, models=["a"]) == content_key(b"img", 0.5, models=["a"])
+        assert content_key(np.ones(3)) == content_key(np.ones(3))
+
+    def test_different_arguments_different_key(self):
+        assert content_key(b"img", 0.5) != content_key(b"img", 0.6)
+        assert content_key(b"img") != content_key(b"img2")
+        assert content_key("1") != content_key(1)
+
+    def test_objects_without_byte_form_are_not_keyed(self):
+        assert content_key(Image.new("RGB", (2, 2))) is None
+
+
+class TestSingleFlight:
+    """Tests for sharing one call between concurrent callers."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"embedding": [1.0]}
+
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("key", fn) for _ in range(4)))
+
+        assert calls == 1
+        assert all(result == {"embedding": [1.0]} for result in results)
+        # Callers may mutate their result without affecting the others
+        assert len({id(result) for result in results}) == 4
+        stats = flight.get_stats()
+        assert (stats["executed"], stats["deduplicated"], stats["in_flight"]) == (1, 3, 0)
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_run_again(self):
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        flight = SingleFlight()
+        assert await flight.do("key", fn) == 1
+        assert await flight.do("key", fn) == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_caller(self):
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ModalClientError("down")
+
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do("key", fn), flight.do("key", fn), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ModalClientError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        async def fn():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("key", fn))
+        second = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+
+    def test_calls_on_other_thread_loop_join(self):
+        calls = 0
+        started = threading.Event()
+        release = threading.Event()
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            started.set()
+            while not release.is_set():
+                await asyncio.sleep(0.005)
+            return {"embedding": [1.0]}
+
+        flight = SingleFlight()
+        results = {}
+
+        def run(name):
+            results[name] = asyncio.run(asyncio.wait_for(flight.do("key", fn), timeout=5))
+
+        owner = threading.Thread(target=run, args=("owner",))
+        owner.start()
+        assert started.wait(5)
+        joiner = threading.Thread(target=run, args=("joiner",))
+        joiner.start()
+        while flight.get_stats()["deduplicated"] == 0:
+            time.sleep(0.005)
+        release.set()
+        owner.join(5)
+        joiner.join(5)
+
+        assert calls == 1
+        assert results["owner"] == results["joiner"] == {"embedding": [1.0]}
+        assert flight.get_stats()["in_flight"] == 0
+
+
+class TestClientCoalescing:
+    """Tests for single-flight in BaseModalClient._call_with_retry."""
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_deduplicated(self):
+        client = ConcreteClient(use_mock=False)
+        sent = []
+
+        async def remote(*args, **kwargs):
+            sent.append(args)
+            await asyncio.sleep(0.01)
+            return {"success": True}
+
+        class Method:
+            class remote:
+                aio = staticmethod(remote)
+
+        client._modal_function = type("Model", (), {"detect": Method})()
+        await asyncio.gather(
+            client._call_with_retry("detect", b"img", 0.5),
+            client._call_with_retry("detect", b"img", 0.5),
+            client._call_with_retry("detect", b"other", 0.5),
+        )
+
+        assert len(sent) == 2
+        assert client.get_stats()["requests_deduplicated"] == 1
+        assert client.get_stats()["requests_sent"] == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        client = ConcreteClient(use_mock=False, single_flight=False)
+        sent = []
+
+        async def remote(*args, **kwargs):
+            sent.append(args)
+            await asyncio.sleep(0.01)
+            return {"success": True}
+
+        class Method:
+            class remote:
+                aio = staticmethod(remote)
+
+        client._modal_function = type("Model", (), {"detect": Method})()
+        await asyncio.gather(*(client._call_with_retry("detect", b"img") for _ in range(2)))
+
+        assert len(sent) == 2
+        assert client.get_stats()["requests_deduplicated"] == 0
+
+    @pytest.mark.asyncio
+    async def test_modal_client_shares_embedding_call(self):
+        from backend.services.modal_client import ModalClient
+
+        client = ModalClient(use_mock=False, batching=False)
+        calls = []
+
+        async def fake_call(func, image_bytes, **kwargs):
+            calls.append(image_bytes)
+            await asyncio.sleep(0.01)
+            return {"success": True, "embedding": [1.0, 2.0]}
+
+        client._call_with_retry = fake_call
+        client._get_modal_function = lambda model_name: type("Model", (), {"generate_embedding": None})
+
+        results = await asyncio.gather(
+            *(client.transreid_generate_embedding(b"crop") for _ in range(3))
+        )
+
+        assert len(calls) == 1
+        assert all(result["success"] for result in results)
+        assert client.get_stats()["single_flight"]["deduplicated"] == 2
@@ -0,0 +1,84 @@
+"""Tests for the persisted gallery k-NN graph"""
+
+import numpy as np
+import pytest
+
+from backend.database.knn_graph import GalleryKNNGraph
+
+
+def neighbour_lists(graph):
+    with graph.read() as view:
+        return {
+            view.image_ids[row]: (
+                [view.image_ids[j] for j in view.neighbours[row] if j >= 0],
+                float(view.row_max[row])
+            )
+            for row in range(len(view.image_ids))
+        }
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(1).standard_normal((80, 16)).astype(np.float32)
+
+
+class TestGalleryKNNGraph:
+    """Incremental updates must match a graph built from scratch"""
+
+    def test_build_lists_self_first(self, vectors):
+        graph = GalleryKNNGraph("m", 16, k=6)
+        graph.build_from([f"i{n}" for n in range(80)], vectors)
+
+        normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        dist = np.maximum(2 - 2 * normed @ normed.T, 0)
+        lists = neighbour_lists(graph)
+        for n in range(80):
+            listed, row_max = lists[f"i{n}"]
+            assert listed[0] == f"i{n}"
+            assert listed == [f"i{j}" for j in np.argsort(dist[n], kind="stable")[:6]]
+            assert row_max == pytest.approx(dist[n].max(), abs=1e-5)
+
+    def test_incremental_updates_match_rebuild(self, vectors):
+        ids = [f"i{n}" for n in range(80)]
+        graph = GalleryKNNGraph("m", 16, k=6)
+        graph.add_many(ids[:3], vectors[:3])  # fewer images than k
+        graph.add_many(ids[3:40], vectors[3:40])
+        for n in range(40, 80):
+            graph.add(ids[n], vectors[n])
+        for image_id in ("i0", "i79", "i41"):
+            assert graph.remove(image_id)
+        assert not graph.remove("i0")
+        graph.add("i41", vectors[5] + 0.01)  # re-added with a new embedding
+
+        expected = {ids[n]: vectors[n] for n in range(80) if ids[n] not in ("i0", "i79", "i41")}
+        expected["i41"] = vectors[5] + 0.01
+        rebuilt = GalleryKNNGraph("m", 16, k=6)
+        rebuilt.build_from(list(expected), np.stack(list(expected.values())))
+
+        lists, rebuilt_lists = neighbour_lists(graph), neighbour_lists(rebuilt)
+        assert lists.keys() == rebuilt_lists.keys()
+        for image_id, (listed, row_max) in rebuilt_lists.items():
+            assert lists[image_id][0] == listed
+            assert lists[image_id][1] == pytest.approx(row_max, abs=1e-5)
+
+    def test_versions_change_on_mutation(self, vectors):
+        graph = GalleryKNNGraph("m", 16, k=4)
+        first = graph.version
+        graph.add("a", vectors[0])
+        second = graph.version
+        graph.remove("a")
+        assert len({first, second, graph.version}) == 3
+
+    def test_save_and_load(self, vectors, tmp_path):
+        graph = GalleryKNNGraph("m", 16, k=5, directory=tmp_path)
+        graph.build_from([f"i{n}" for n in range(30)], vectors[:30], tiger_ids=["t1"] * 30)
+        assert graph.save()
+
+        loaded = GalleryKNNGraph("m", 16, k=5, directory=tmp_path)
+        assert loaded.load()
+        assert neighbour_lists(loaded) == neighbour_lists(graph)
+        with loaded.read() as view:
+            assert view.tiger_ids[0] == "t1"
+
+        # A snapshot built with another k is ignored
+        assert not GalleryKNNGraph("m", 16, k=8, directory=tmp_path).load()
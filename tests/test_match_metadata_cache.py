@@ -0,0 +1,150 @@
+"""Tests for the vector search match metadata cache"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import match_metadata_cache
+from backend.database.match_metadata_cache import MatchMetadataCache
+from backend.database.models import Base, Facility, Tiger, TigerImage
+from backend.database.vector_search import hydrate_matches
+
+
+@pytest.fixture
+def session():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    session.add(Facility(facility_id="f1", exhibitor_name="Big Cat Ranch"))
+    session.add(Tiger(tiger_id="t1", name="Raja", alias="R", origin_facility_id="f1"))
+    session.add(Tiger(tiger_id="t2", name="Mira"))
+    session.add(TigerImage(image_id="i1", tiger_id="t1", image_path="a.jpg", side_view="left"))
+    session.add(TigerImage(image_id="i2", tiger_id="t1", image_path="b.jpg", side_view="right"))
+    session.add(TigerImage(image_id="i3", tiger_id="t2", image_path="c.jpg"))
+    session.commit()
+
+    yield session
+
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = MatchMetadataCache(max_entries=100, ttl_seconds=300)
+    monkeypatch.setattr(match_metadata_cache, "_cache", cache)
+    return cache
+
+
+class TestMatchMetadataCache:
+    """Tests for MatchMetadataCache loading, hits and invalidation"""
+
+    def test_loads_misses_and_serves_hits(self, session, cache):
+        """First lookup joins, repeat lookups hit the cache"""
+        metadata = cache.get_many(session, ["i1", "i3", "missing"])
+        assert set(metadata) == {"i1", "i3"}
+        assert metadata["i1"]["tiger_name"] == "Raja"
+        assert metadata["i1"]["facility_name"] == "Big Cat Ranch"
+        assert metadata["i3"]["facility_id"] is None
+
+        cache.get_many(session, ["i1", "i3"])
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 3
+        assert stats["entries"] == 2
+
+    def test_tiger_update_invalidates_its_images(self, session, cache):
+        """Renaming a tiger drops its images and nobody else's"""
+        cache.get_many(session, ["i1", "i2", "i3"])
+
+        session.get(Tiger, "t1").name = "Raja II"
+        session.commit()
+
+        assert len(cache) == 1
+        assert cache.get_many(session, ["i1"])["i1"]["tiger_name"] == "Raja II"
+
+    def test_facility_update_invalidates_its_tigers(self, session, cache):
+        """Renaming a facility drops images of tigers from that facility"""
+        cache.get_many(session, ["i1", "i2", "i3"])
+
+        session.get(Facility, "f1").exhibitor_name = "Sanctuary"
+        session.commit()
+
+        assert len(cache) == 1
+        assert cache.get_many(session, ["i2"])["i2"]["facility_name"] == "Sanctuary"
+
+    def test_image_delete_invalidates_entry(self, session, cache):
+        """Deleted images disappear from lookups"""
+        cache.get_many(session, ["i3"])
+
+        session.delete(session.get(TigerImage, "i3"))
+        session.commit()
+
+        assert cache.get_many(session, ["i3"]) == {}
+
+    def test_invalidation_during_load_skips_store(self, session, cache, monkeypatch):
+        """Rows loaded before a concurrent invalidation are not cached"""
+        load = match_metadata_cache._load_metadata
+
+        def racing_load(session, image_ids):
+            rows = load(session, image_ids)
+            cache.invalidate("tiger", "t1")
+            return rows
+
+        monkeypatch.setattr(match_metadata_cache, "_load_metadata", racing_load)
+        assert "i1" in cache.get_many(session, ["i1"])
+        assert len(cache) == 0
+
+    def test_lru_eviction_and_ttl(self, session, monkeypatch):
+        """Oldest entries are evicted and expired entries reloaded"""
+        cache = MatchMetadataCache(max_entries=2, ttl_seconds=10)
+        cache.get_many(session, ["i1", "i2"])
+        cache.get_many(session, ["i1"])
+        cache.get_many(session, ["i3"])
+        assert len(cache) == 2
+        assert cache.get_stats()["hits"] == 1
+
+        clock = [1000.0]
+        monkeypatch.setattr(match_metadata_cache.time, "monotonic", lambda: clock[0])
+        cache.clear()
+        cache.get_many(session, ["i1"])
+        clock[0] += 11
+        cache.get_many(session, ["i1"])
+        assert cache.get_stats()["misses"] == 5
+
+    def test_hydrate_matches(self, session, cache):
+        """Un-hydrated matches gain metadata; vanished images are dropped"""
+        matches = [
+            {"image_id": "i2", "tiger_id": "t1", "similarity": 0.9},
+            {"image_id": "gone", "tiger_id": "t9", "similarity": 0.8},
+            {"image_id": "i3", "tiger_id": "t2", "similarity": 0.7},
+        ]
+        hydrated = hydrate_matches(session, matches)
+        assert [m["image_id"] for m in hydrated] == ["i2", "i3"]
+        assert hydrated[0]["similarity"] == 0.9
+        assert hydrated[0]["tiger_name"] == "Raja"
+        assert hydrated[1]["image_path"] == "c.jpg"
+
+    def test_ensemble_hydration_keeps_each_models_similarity(self, session, cache):
+        """Models returning the same image keep their own similarity after hydration"""
+        from backend.services.tiger.ensemble_strategy import _hydrate_model_results
+
+        model_results = [
+            {"model": "wildlife_tools", "success": True,
+             "matches": [{"image_id": "i1", "tiger_id": "t1", "similarity": 0.91}]},
+            {"model": "transreid", "success": True,
+             "matches": [{"image_id": "i1", "tiger_id": "t1", "similarity": 0.42},
+                         {"image_id": "i3", "tiger_id": "t2", "similarity": 0.40}]},
+        ]
+        _hydrate_model_results(session, model_results)
+
+        assert model_results[0]["matches"][0]["similarity"] == 0.91
+        assert [m["similarity"] for m in model_results[1]["matches"]] == [0.42, 0.40]
+        assert model_results[0]["tiger_name"] == "Raja"
+        assert model_results[1]["matches"][1]["tiger_name"] == "Mira"
@@ -0,0 +1,87 @@
+"""Tests for per-tiger prototype embeddings"""
+
+import numpy as np
+import pytest
+
+from backend.database.prototype_index import PrototypeIndex
+
+
+def _tiger_gallery(tigers, images_per_tiger, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((tigers, dim)).astype(np.float32)
+    members = {
+        f"t{t}": centers[t] + 0.5 * rng.standard_normal((images_per_tiger, dim)).astype(np.float32)
+        for t in range(tigers)
+    }
+    return centers, members
+
+
+class TestPrototypeIndex:
+    """Tests for PrototypeIndex fusion/ranking/maintenance"""
+
+    def test_prototype_is_normalized_mean(self):
+        """A prototype is the re-normalized mean of normalized members"""
+        index = PrototypeIndex("tiger_reid", 8)
+        members = np.random.default_rng(1).standard_normal((5, 8)).astype(np.float32)
+        index.set_members("t1", members)
+
+        normed = members / np.linalg.norm(members, axis=1, keepdims=True)
+        expected = normed.mean(axis=0)
+        expected /= np.linalg.norm(expected)
+        assert index.member_count("t1") == 5
+        assert index.rank(expected, 1)[0] == [("t1", pytest.approx(1.0, abs=1e-5))]
+
+    def test_rank_finds_owning_tiger(self):
+        """Queries near a tiger's images rank that tiger first"""
+        centers, members = _tiger_gallery(30, 8, 32)
+        index = PrototypeIndex("tiger_reid", 32)
+        for tiger_id, embeddings in members.items():
+            index.set_members(tiger_id, embeddings)
+
+        ranked = index.rank(centers, top_n=3)
+        assert [hits[0][0] for hits in ranked] == [f"t{t}" for t in range(30)]
+        assert all(len(hits) == 3 for hits in ranked)
+        scores = [score for _, score in ranked[0]]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_exclude_tiger(self):
+        """The excluded tiger is never ranked"""
+        centers, members = _tiger_gallery(5, 4, 16, seed=2)
+        index = PrototypeIndex("tiger_reid", 16)
+        for tiger_id, embeddings in members.items():
+            index.set_members(tiger_id, embeddings)
+
+        hits = index.rank(centers[0], top_n=5, exclude_tiger_id="t0")[0]
+        assert len(hits) == 4
+        assert "t0" not in [tiger_id for tiger_id, _ in hits]
+
+    def test_update_and_drop(self):
+        """Replacing members moves a prototype; empty members drop the tiger"""
+        centers, members = _tiger_gallery(4, 4, 16, seed=3)
+        index = PrototypeIndex("tiger_reid", 16)
+        for tiger_id, embeddings in members.items():
+            index.set_members(tiger_id, embeddings)
+
+        index.set_members("t0", members["t3"])
+        assert index.rank(centers[3], top_n=2)[0][0][1] == pytest.approx(
+            index.rank(centers[3], top_n=2)[0][1][1], abs=1e-5
+        )
+
+        index.set_members("t1", np.zeros((0, 16), dtype=np.float32))
+        assert "t1" not in index
+        assert len(index) == 3
+        assert {t for t, _ in index.rank(centers[2], top_n=10)[0]} == {"t0", "t2", "t3"}
+
+    def test_mark_stale(self):
+        """Stale tigers are tracked until recomputed"""
+        index = PrototypeIndex("tiger_reid", 4)
+        index.mark_stale(["t1", None, "t2"])
+        assert index.stale_count == 2
+
+        index.set_members("t1", np.ones((1, 4), dtype=np.float32))
+        assert index.stale_count == 1
+
+    def test_empty_index(self):
+        """Ranking an empty index returns no tigers"""
+        index = PrototypeIndex("tiger_reid", 4)
+        assert index.rank(np.ones((2, 4), dtype=np.float32), top_n=3) == [[], []]
@@ -0,0 +1,104 @@
+"""Tests for fetching ensemble query embeddings in one round trip"""
+
+import io
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.services.tiger import ensemble_strategy
+from backend.services.tiger.ensemble_strategy import ParallelEnsembleStrategy
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_embedding_from_bytes(self, crop):
+        self.calls += 1
+        return np.ones(8, dtype=np.float32)
+
+
+class FakeMultiClient:
+    def __init__(self, success=True):
+        self.calls = []
+        self.success = success
+
+    async def generate_all_embeddings(self, image, models=None):
+        self.calls.append(list(models))
+        if not self.success:
+            return {"embeddings": {}, "error": "down", "success": False}
+        return {
+            "embeddings": {
+                name: {"embedding": np.full(8, 3.0, dtype=np.float32), "success": True}
+                for name in models
+                if name != "transreid"
+            },
+            "success": True,
+        }
+
+
+def _fake_search(session, query_embedding, limit, similarity_threshold, model_name, hydrate=True):
+    return [{"tiger_id": "t1", "image_id": f"i-{model_name}", "similarity": 0.9}]
+
+
+@pytest.fixture
+def crop(monkeypatch):
+    monkeypatch.setattr(ensemble_strategy, "find_matching_tigers", _fake_search)
+    monkeypatch.setattr(ensemble_strategy, "get_model_embedding_dim", lambda name: 8)
+    monkeypatch.setattr(ensemble_strategy, "_hydrate_model_results", lambda session, results: None)
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_one_call_serves_all_models(crop):
+    """Served models skip their own round trip; the rest are called one by one"""
+    client = FakeMultiClient()
+    models = {name: FakeModel() for name in ("rapid", "cvwc2019", "transreid", "custom")}
+
+    result = await ParallelEnsembleStrategy(embedding_client=client).identify(
+        crop, models, None, 0.5, uuid4()
+    )
+
+    assert client.calls == [["rapid_reid", "cvwc2019_reid", "transreid"]]
+    assert models["rapid"].calls == 0 and models["cvwc2019"].calls == 0
+    # transreid failed in the combined response, custom is not served by it
+    assert models["transreid"].calls == 1 and models["custom"].calls == 1
+    assert set(result["models"]) == set(models)
+
+
+@pytest.mark.asyncio
+async def test_combined_embeddings_are_normalized(crop):
+    """Prefetched embeddings are unit length, like the per-model wrappers"""
+    embeddings = await ensemble_strategy.embed_queries_combined(
+        FakeMultiClient(), ["wildlife_tools"], ensemble_strategy.ImageArtifact.coerce(crop)
+    )
+    assert np.linalg.norm(embeddings["wildlife_tools"]) == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_failed_call_falls_back_per_model(crop):
+    models = {name: FakeModel() for name in ("rapid", "wildlife_tools")}
+
+    await ParallelEnsembleStrategy(embedding_client=FakeMultiClient(success=False)).identify(
+        crop, models, None, 0.5, uuid4()
+    )
+
+    assert all(model.calls == 1 for model in models.values())
+
+
+@pytest.mark.asyncio
+async def test_cached_embeddings_are_not_requested_again(crop):
+    """A crop embedded by the combined call is served from the embedding cache next time"""
+    client = FakeMultiClient()
+    artifact = ensemble_strategy.ImageArtifact.from_bytes(crop)
+
+    first = await ensemble_strategy.embed_queries_combined(client, ["rapid", "cvwc2019"], artifact)
+    second = await ensemble_strategy.embed_queries_combined(client, ["rapid", "cvwc2019"], artifact)
+
+    assert client.calls == [["rapid_reid", "cvwc2019_reid"]]
+    assert set(second) == {"rapid", "cvwc2019"}
+    np.testing.assert_allclose(second["rapid"], first["rapid"])
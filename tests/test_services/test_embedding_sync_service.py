@@ -0,0 +1,161 @@
+"""Tests for the resumable embedding sync job"""
+
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database.models import Base, BackgroundJob, Tiger, TigerImage
+from backend.services.embedding_sync_service import EmbeddingSyncService
+from backend.services.modal_client import record_fallback
+
+
+class FakeModel:
+    """Deterministic 1536-dim embedder that can fail on a chosen call"""
+
+    def __init__(self, fail_on_call=None, error_on_call=None, mock_on_call=None):
+        self.calls = 0
+        self.batch_sizes = []
+        self.fail_on_call = fail_on_call
+        self.error_on_call = error_on_call
+        self.mock_on_call = mock_on_call
+
+    async def batch_generate_embeddings(self, images):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise KeyboardInterrupt  # simulated crash, not a per-batch error
+        if self.calls == self.error_on_call:
+            raise RuntimeError("Modal embedding generation failed")
+        if self.calls == self.mock_on_call:
+            record_fallback("wildlife_tools")
+        self.batch_sizes.append(len(images))
+        return [np.full(1536, image.getpixel((0, 0))[0] + 1, dtype=np.float32) for image in images]
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Plain stand-in when sqlite-vec is not installed
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS vec_embeddings_wildlife_tools (
+                image_id TEXT PRIMARY KEY, embedding BLOB,
+                tiger_id TEXT, side_view TEXT, is_reference INTEGER, verified INTEGER
+            )
+        """))
+
+    session = sessionmaker(bind=engine)()
+    session.add(Tiger(tiger_id="t1", name="T1"))
+    for i in range(7):
+        Image.new("RGB", (4, 4), (i, 0, 0)).save(tmp_path / f"{i}.png")
+        session.add(TigerImage(image_id=f"img{i}", tiger_id="t1", image_path=f"{i}.png"))
+    session.add(TigerImage(image_id="img9", tiger_id="t1", image_path="missing.png"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _stored_ids(session):
+    return [
+        row.image_id for row in session.execute(
+            text("SELECT image_id FROM vec_embeddings_wildlife_tools ORDER BY image_id")
+        )
+    ]
+
+
+class TestEmbeddingSyncService:
+    """Tests for EmbeddingSyncService batching, checkpointing and resume"""
+
+    @pytest.mark.asyncio
+    async def test_full_sync(self, session, tmp_path):
+        """Every loadable image is embedded in batches and the job completes"""
+        model = FakeModel()
+        service = EmbeddingSyncService(session, model=model, image_root=tmp_path)
+
+        result = await service.run("wildlife_tools", batch_size=3)
+
+        assert result["status"] == "completed"
+        assert result["processed"] == 8
+        assert result["stored"] == 7
+        assert result["skipped"] == 1
+        assert result["images_per_sec"] > 0
+        assert model.batch_sizes == [3, 3, 1]
+        assert _stored_ids(session) == [f"img{i}" for i in range(7)]
+
+        job = session.get(BackgroundJob, result["job_id"])
+        assert job.status == "completed"
+        assert json.loads(job.result)["last_image_id"] == "img9"
+
+    @pytest.mark.asyncio
+    async def test_resume_after_crash(self, session, tmp_path):
+        """A crashed run resumes after its last committed batch"""
+        crashing = FakeModel(fail_on_call=2)
+        with pytest.raises(KeyboardInterrupt):
+            await EmbeddingSyncService(session, model=crashing, image_root=tmp_path).run(
+                "wildlife_tools", batch_size=3
+            )
+        session.rollback()
+        assert _stored_ids(session) == ["img0", "img1", "img2"]
+
+        model = FakeModel()
+        result = await EmbeddingSyncService(session, model=model, image_root=tmp_path).run(
+            "wildlife_tools", batch_size=3
+        )
+        assert result["status"] == "completed"
+        assert result["processed"] == 8
+        assert model.batch_sizes == [3, 1]
+        assert session.get(BackgroundJob, result["job_id"]).retry_count == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failure", [{"error_on_call": 2}, {"mock_on_call": 2}])
+    async def test_failed_batch_is_retried_on_resume(self, session, tmp_path, failure):
+        """A batch that fails to embed fails the job at its checkpoint"""
+        failing = FakeModel(**failure)
+        result = await EmbeddingSyncService(session, model=failing, image_root=tmp_path).run(
+            "wildlife_tools", batch_size=3
+        )
+        assert result["status"] == "failed"
+        assert result["last_image_id"] == "img2"
+        assert _stored_ids(session) == ["img0", "img1", "img2"]
+
+        model = FakeModel()
+        result = await EmbeddingSyncService(session, model=model, image_root=tmp_path).run(
+            "wildlife_tools", batch_size=3
+        )
+        assert result["status"] == "completed"
+        assert result["failed"] == 0
+        assert model.batch_sizes == [3, 1]
+        assert _stored_ids(session) == [f"img{i}" for i in range(7)]
+
+    @pytest.mark.asyncio
+    async def test_restart_and_prune_orphans(self, session, tmp_path):
+        """resume=False starts over and rows for deleted images are pruned"""
+        session.execute(text("""
+            INSERT INTO vec_embeddings_wildlife_tools(image_id, embedding, tiger_id, side_view, is_reference, verified)
+            VALUES ('gone', x'00', 't1', '', 0, 0)
+        """))
+        session.commit()
+
+        service = EmbeddingSyncService(session, model=FakeModel(), image_root=tmp_path)
+        first = await service.run("wildlife_tools", batch_size=4)
+        second = await service.run("wildlife_tools", batch_size=4, resume=False)
+
+        assert first["pruned"] == 1
+        assert second["job_id"] != first["job_id"]
+        assert second["processed"] == 8
+        assert "gone" not in _stored_ids(session)
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_id(self, session):
+        """Resuming a job that does not exist is an error"""
+        with pytest.raises(ValueError):
+            await EmbeddingSyncService(session, model=FakeModel()).run(job_id="nope")
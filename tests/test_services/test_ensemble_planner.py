@@ -0,0 +1,137 @@
+"""Tests for latency/cost-budgeted ensemble planning"""
+
+import asyncio
+import io
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.services import model_inference_logger
+from backend.services.model_inference_logger import ModelInferenceLogger
+from backend.services.tiger import ensemble_strategy
+from backend.services.tiger.ensemble_planner import EnsemblePlanner
+from backend.services.tiger.ensemble_strategy import ParallelEnsembleStrategy
+
+# Recent p95 latency per model, in seconds
+LATENCIES = {"wildlife_tools": 1.2, "cvwc2019": 0.7, "transreid": 0.5, "rapid": 0.1}
+
+
+@pytest.fixture
+def inference_logger(monkeypatch):
+    """Fresh inference logger with a steady latency history per model"""
+    inference_logger = ModelInferenceLogger()
+    for name, seconds in LATENCIES.items():
+        for _ in range(10):
+            inference_logger.record_latency(name, seconds)
+    monkeypatch.setattr(model_inference_logger, "_inference_logger", inference_logger)
+    return inference_logger
+
+
+class TestEnsemblePlanner:
+    """Tests for choosing model subsets under a budget"""
+
+    def test_over_budget_model_replanned_after_samples_expire(self, inference_logger, monkeypatch):
+        """Slow samples (e.g. cold starts) do not keep a model planned out for good"""
+        now = [1000.0]
+        inference_logger._clock = lambda: now[0]
+        monkeypatch.setattr(model_inference_logger, "LATENCY_MAX_AGE_SECONDS", 60.0)
+        inference_logger.reset_statistics()
+        for name, seconds in LATENCIES.items():
+            for _ in range(10):
+                inference_logger.record_latency(name, seconds)
+
+        planner = EnsemblePlanner()
+        assert "wildlife_tools" in planner.plan(LATENCIES, latency_budget_ms=800).skipped
+
+        # Only the models that kept running have fresh samples
+        now[0] += 61
+        for name in ("cvwc2019", "transreid", "rapid"):
+            for _ in range(5):
+                inference_logger.record_latency(name, LATENCIES[name])
+
+        assert planner.plan(LATENCIES, latency_budget_ms=800).models == list(LATENCIES)
+
+    def test_latency_budget_drops_slow_models(self, inference_logger):
+        """Models slower than the budget are skipped, the rest all run"""
+        plan = EnsemblePlanner().plan(LATENCIES, latency_budget_ms=800)
+        assert plan.models == ["cvwc2019", "transreid", "rapid"]
+        assert plan.skipped == ["wildlife_tools"]
+        assert plan.predicted_latency_ms == pytest.approx(700)
+        assert plan.within_budget
+
+    def test_cost_budget_keeps_highest_weight_subset(self, inference_logger):
+        """Under a compute budget the most accurate affordable mix wins"""
+        plan = EnsemblePlanner().plan(LATENCIES, cost_budget_ms=1300)
+        # cvwc2019 (0.30) + transreid (0.20) beats wildlife_tools (0.40) alone
+        assert plan.models == ["cvwc2019", "transreid", "rapid"]
+        assert plan.predicted_cost_ms == pytest.approx(1300)
+        assert plan.expected_score == pytest.approx(0.55)
+
+    def test_unmeasured_models_use_prior(self, inference_logger):
+        """Models without enough samples are assumed to take the prior latency"""
+        plan = EnsemblePlanner(prior_latency_ms=2000).plan(
+            ["rapid", "megadescriptor_b"], latency_budget_ms=800
+        )
+        assert plan.models == ["rapid"]
+        assert plan.model_latency_ms["megadescriptor_b"] == 2000
+
+    def test_fresh_planner_measures_every_model(self, monkeypatch):
+        """Without latency history, models are tried and measured, not starved"""
+        inference_logger = ModelInferenceLogger()
+        monkeypatch.setattr(model_inference_logger, "_inference_logger", inference_logger)
+        planner = EnsemblePlanner()
+
+        plans = []
+        for _ in range(10):
+            plan = planner.plan(LATENCIES, latency_budget_ms=800)
+            plans.append(plan.models)
+            for name in plan.models:
+                inference_logger.record_latency(name, LATENCIES[name])
+
+        assert len(plans[0]) == len(LATENCIES)
+        assert plans[-1] == ["cvwc2019", "transreid", "rapid"]
+
+    def test_impossible_budget_falls_back_to_fastest(self, inference_logger):
+        """No subset fits: the fastest model still runs, flagged over budget"""
+        plan = EnsemblePlanner().plan(LATENCIES, latency_budget_ms=50)
+        assert plan.models == ["rapid"]
+        assert not plan.within_budget
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_embedding_from_bytes(self, crop):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return np.ones(8, dtype=np.float32)
+
+
+def _fake_search(session, query_embedding, limit, similarity_threshold, model_name, hydrate=True):
+    return [{"tiger_id": "t1", "image_id": f"i-{model_name}", "similarity": 0.9}]
+
+
+@pytest.mark.asyncio
+async def test_parallel_strategy_runs_planned_models(inference_logger, monkeypatch):
+    """A budgeted parallel ensemble skips planned-out models and reports the plan"""
+    monkeypatch.setattr(ensemble_strategy, "find_matching_tigers", _fake_search)
+    monkeypatch.setattr(ensemble_strategy, "get_model_embedding_dim", lambda name: 8)
+    monkeypatch.setattr(ensemble_strategy, "_hydrate_model_results", lambda session, results: None)
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(buffer, format="PNG")
+    models = {name: FakeModel() for name in LATENCIES}
+
+    result = await ParallelEnsembleStrategy(latency_budget_ms=800).identify(
+        buffer.getvalue(), models, None, 0.5, uuid4()
+    )
+
+    assert models["wildlife_tools"].calls == 0
+    assert all(models[name].calls == 1 for name in ("cvwc2019", "transreid", "rapid"))
+    assert result["ensemble_plan"]["skipped"] == ["wildlife_tools"]
+    assert result["ensemble_plan"]["predicted_latency_ms"] == 700
+    assert set(result["models"]) == {"cvwc2019", "transreid", "rapid"}
+    # Run latencies feed back into the planner's window
+    assert len(inference_logger._latencies["rapid"]) == 11
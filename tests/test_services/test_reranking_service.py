@@ -0,0 +1,162 @@
+"""Tests for sparse k-reciprocal re-ranking"""
+
+import numpy as np
+import pytest
+
+from backend.database import knn_graph
+from backend.database.knn_graph import GalleryKNNGraph
+from backend.services import reranking_service
+from backend.services.reranking_service import (
+    RerankingService,
+    k_reciprocal_rerank,
+    k_reciprocal_rerank_graph,
+    rerank_matches,
+)
+
+
+def dense_reference_rerank(query_features, gallery_features, k1=20, k2=6, lambda_value=0.3):
+    """The original dense (N+Q)x(N+Q) implementation, kept as the oracle"""
+    query_num = query_features.shape[0]
+    all_features = np.vstack([query_features, gallery_features])
+    all_num = all_features.shape[0]
+
+    sq = np.sum(all_features ** 2, axis=1, keepdims=True)
+    original_dist = np.maximum(sq + sq.T - 2 * np.dot(all_features, all_features.T), 0)
+    original_dist = (original_dist / np.max(original_dist, axis=0, keepdims=True)).T
+    V = np.zeros((all_num, all_num), dtype=np.float32)
+    initial_rank = np.argsort(original_dist, axis=1).astype(np.int32)
+
+    for i in range(all_num):
+        forward = initial_rank[i, :k1 + 1]
+        backward = initial_rank[forward, :k1 + 1]
+        k_reciprocal_index = forward[np.where(backward == i)[0]]
+        expansion = k_reciprocal_index.copy()
+        for candidate in k_reciprocal_index:
+            half = int(np.around(k1 / 2)) + 1
+            c_forward = initial_rank[candidate, :half]
+            c_backward = initial_rank[c_forward, :half]
+            c_reciprocal = c_forward[np.where(c_backward == candidate)[0]]
+            if len(np.intersect1d(c_reciprocal, k_reciprocal_index)) > 2 / 3 * len(c_reciprocal):
+                expansion = np.append(expansion, c_reciprocal)
+        expansion = np.unique(expansion)
+        weight = np.exp(-original_dist[i, expansion])
+        V[i, expansion] = weight / np.sum(weight)
+
+    if k2 != 1:
+        V = np.stack([np.mean(V[initial_rank[i, :k2], :], axis=0) for i in range(all_num)])
+
+    jaccard_dist = np.zeros((query_num, all_num), dtype=np.float32)
+    for i in range(query_num):
+        temp_min = np.minimum(V[i:i + 1, :], V).sum(axis=1)
+        jaccard_dist[i] = 1 - temp_min / (2 - temp_min + 1e-10)
+
+    final_dist = jaccard_dist * (1 - lambda_value) + original_dist[:query_num] * lambda_value
+    return final_dist[:, query_num:]
+
+
+def clustered_features(seed, gallery_num, query_num, dim=32, clusters=10):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    gallery = centers[rng.integers(0, clusters, gallery_num)] + 0.3 * rng.normal(size=(gallery_num, dim))
+    queries = centers[rng.integers(0, clusters, query_num)] + 0.3 * rng.normal(size=(query_num, dim))
+    return queries.astype(np.float32), gallery.astype(np.float32)
+
+
+class TestKReciprocalRerank:
+    """Sparse re-ranking must reproduce the dense reference"""
+
+    @pytest.mark.parametrize("gallery_num,query_num,k1,k2", [
+        (200, 5, 20, 6),
+        (120, 3, 20, 1),
+        (150, 12, 10, 3),
+        (8, 2, 20, 6),  # gallery smaller than k1
+    ])
+    def test_matches_dense_reference(self, gallery_num, query_num, k1, k2):
+        queries, gallery = clustered_features(gallery_num, gallery_num, query_num)
+
+        expected = dense_reference_rerank(queries, gallery, k1=k1, k2=k2)
+        result = k_reciprocal_rerank(queries, gallery, k1=k1, k2=k2)
+
+        assert result.shape == (query_num, gallery_num)
+        np.testing.assert_allclose(result, expected, atol=1e-5)
+        assert (np.argsort(result, axis=1) == np.argsort(expected, axis=1)).all()
+
+    def test_small_blocks_match_dense_reference(self, monkeypatch):
+        """Block sizes bound memory without changing the result"""
+        monkeypatch.setattr(reranking_service, "_BLOCK_ELEMENTS", 600)
+        queries, gallery = clustered_features(7, 250, 9)
+
+        np.testing.assert_allclose(
+            k_reciprocal_rerank(queries, gallery),
+            dense_reference_rerank(queries, gallery),
+            atol=1e-5
+        )
+
+    def test_rerank_matches_orders_by_similarity(self):
+        queries, gallery = clustered_features(3, 60, 1)
+        ids = [f"tiger_{i}" for i in range(60)]
+
+        results = rerank_matches(queries[0], gallery, ids)
+
+        expected = np.exp(-dense_reference_rerank(queries, gallery)[0])
+        assert [tiger_id for tiger_id, _ in results] == [ids[i] for i in np.argsort(-expected)]
+        assert rerank_matches(queries[0], np.empty((0, 32)), []) == []
+
+
+class TestGraphRerank:
+    """Re-ranking against a cached gallery k-NN graph"""
+
+    @staticmethod
+    def normalized(features):
+        return features / np.linalg.norm(features, axis=1, keepdims=True)
+
+    @pytest.mark.parametrize("gallery_num,k2", [(12, 6), (200, 6), (200, 1)])
+    def test_matches_full_rerank_per_query(self, gallery_num, k2):
+        queries, gallery = clustered_features(gallery_num, gallery_num, 4)
+        queries, gallery = self.normalized(queries), self.normalized(gallery)
+        graph = GalleryKNNGraph("wildlife_tools", 32, k=21)
+        graph.build_from([f"img{i}" for i in range(gallery_num)], gallery)
+
+        image_ids, result = k_reciprocal_rerank_graph(queries, graph, k2=k2)
+
+        assert image_ids == [f"img{i}" for i in range(gallery_num)]
+        for query, distances in zip(queries, result):
+            np.testing.assert_allclose(
+                distances, k_reciprocal_rerank(query[None], gallery, k2=k2)[0], atol=1e-5
+            )
+
+    def test_graph_updates_invalidate_cached_encoding(self):
+        queries, gallery = clustered_features(5, 150, 1)
+        queries, gallery = self.normalized(queries), self.normalized(gallery)
+        graph = GalleryKNNGraph("wildlife_tools", 32, k=21)
+        graph.build_from([f"img{i}" for i in range(100)], gallery[:100])
+        k_reciprocal_rerank_graph(queries, graph)
+
+        graph.add_many([f"img{i}" for i in range(100, 150)], gallery[100:])
+        _, result = k_reciprocal_rerank_graph(queries, graph)
+
+        np.testing.assert_allclose(result[0], k_reciprocal_rerank(queries, gallery)[0], atol=1e-5)
+
+    def test_rerank_gallery_matches(self, monkeypatch):
+        queries, gallery = clustered_features(9, 80, 1)
+        graph = GalleryKNNGraph("wildlife_tools", 32, k=21)
+        graph.build_from([f"img{i}" for i in range(80)], gallery)
+        graph.loaded = True
+        monkeypatch.setattr(knn_graph, "_graphs", {"wildlife_tools": graph})
+
+        matches = [
+            {"image_id": f"img{i}", "tiger_id": f"t{i}", "similarity": 0.9 - i / 100}
+            for i in range(5)
+        ] + [{"image_id": "not_indexed", "tiger_id": "t9", "similarity": 0.95}]
+        service = RerankingService()
+
+        reranked = service.rerank_gallery_matches("wildlife_tools", queries[0], matches)
+
+        _, distances = k_reciprocal_rerank_graph(queries, graph)
+        expected = sorted(range(5), key=lambda i: distances[0][i])
+        assert [m["image_id"] for m in reranked] == [f"img{i}" for i in expected] + ["not_indexed"]
+        assert [m["similarity"] for m in reranked] == sorted((m["similarity"] for m in matches), reverse=True)
+        assert reranked[-1]["original_similarity"] == 0.95
+        assert reranked[-1]["rerank_distance"] is None
+
+        assert service.rerank_gallery_matches("transreid", queries[0], matches) is None
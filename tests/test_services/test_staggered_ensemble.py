@@ -0,0 +1,157 @@
+"""Tests for the staggered ensemble strategy and its speculative mode"""
+
+import asyncio
+import io
+import time
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.services.tiger import ensemble_strategy
+from backend.services.tiger.ensemble_strategy import StaggeredEnsembleStrategy
+
+
+class FakeModel:
+    """Async embedder whose embedding encodes the top-match confidence"""
+
+    def __init__(self, confidence, delay):
+        self.confidence = confidence
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = False
+
+    async def generate_embedding_from_bytes(self, crop):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return np.full(8, self.confidence, dtype=np.float32)
+
+
+def _fake_search(session, query_embedding, limit, similarity_threshold, model_name):
+    return [{"tiger_id": f"t-{model_name}", "tiger_name": model_name, "similarity": float(query_embedding[0])}]
+
+
+@pytest.fixture
+def crop():
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def fake_search(monkeypatch):
+    monkeypatch.setattr(ensemble_strategy, "find_matching_tigers", _fake_search)
+    monkeypatch.setattr(ensemble_strategy, "get_model_embedding_dim", lambda name: 8)
+    monkeypatch.setattr(ensemble_strategy, "_stage_latencies", {})
+
+
+async def _identify(strategy, crop, models):
+    return await strategy.identify(crop, models, None, 0.5, uuid4())
+
+
+class TestStaggeredEnsembleStrategy:
+    """Tests for sequential and hedged staggered identification"""
+
+    @pytest.mark.asyncio
+    async def test_sequential_early_accept(self, crop):
+        """The default mode stops at the first accepting stage"""
+        models = {
+            "rapid": FakeModel(0.95, 0.01),
+            "wildlife_tools": FakeModel(0.70, 0.01),
+        }
+        result = await _identify(StaggeredEnsembleStrategy(speculative=False), crop, models)
+
+        assert result["identified"] is True
+        assert result["tiger_id"] == "t-rapid"
+        assert result["model_path"] == ["rapid"]
+        assert models["wildlife_tools"].calls == 0
+        assert [t["status"] for t in result["stage_timings"]] == ["accepted"]
+        assert result["stage_timings"][0]["speculative"] is False
+
+    @pytest.mark.asyncio
+    async def test_speculative_stage_overlaps_slow_stage(self, crop):
+        """An inconclusive slow stage is overlapped by the next stage"""
+        models = {
+            "rapid": FakeModel(0.70, 0.3),
+            "wildlife_tools": FakeModel(0.90, 0.3),
+        }
+        strategy = StaggeredEnsembleStrategy(speculative=True, speculative_delay=0.05)
+
+        started = time.perf_counter()
+        result = await _identify(strategy, crop, models)
+        elapsed = time.perf_counter() - started
+
+        assert result["identified"] is True
+        assert result["tiger_id"] == "t-wildlife_tools"
+        assert result["model_path"] == ["rapid", "wildlife_tools"]
+        assert elapsed < 0.5
+        rapid, wildlife = result["stage_timings"]
+        assert wildlife["speculative"] is True
+        assert wildlife["start_ms"] < rapid["duration_ms"]
+
+    @pytest.mark.asyncio
+    async def test_stage_finishing_early_records_its_own_runtime(self, crop):
+        """A speculative stage done before the stage ahead of it is not charged the wait"""
+        models = {
+            "rapid": FakeModel(0.70, 0.4),
+            "wildlife_tools": FakeModel(0.75, 0.05),
+        }
+        strategy = StaggeredEnsembleStrategy(speculative=True, speculative_delay=0.05)
+        result = await _identify(strategy, crop, models)
+
+        rapid, wildlife = result["stage_timings"]
+        assert wildlife["speculative"] is True
+        assert wildlife["start_ms"] + wildlife["duration_ms"] < rapid["duration_ms"]
+        assert wildlife["duration_ms"] < 200
+        recorded = ensemble_strategy._stage_latencies["wildlife_tools"]
+        assert list(recorded) == [pytest.approx(wildlife["duration_ms"] / 1000, abs=1e-3)]
+
+    @pytest.mark.asyncio
+    async def test_speculative_stage_cancelled_on_decision(self, crop):
+        """An earlier accept cancels the in-flight speculative stage"""
+        models = {
+            "rapid": FakeModel(0.95, 0.2),
+            "wildlife_tools": FakeModel(0.90, 1.0),
+            "cvwc2019": FakeModel(0.90, 0.01),
+        }
+        strategy = StaggeredEnsembleStrategy(speculative=True, speculative_delay=0.05)
+        result = await _identify(strategy, crop, models)
+
+        assert result["tiger_id"] == "t-rapid"
+        assert result["model_path"] == ["rapid"]
+        assert models["wildlife_tools"].cancelled is True
+        assert models["cvwc2019"].calls == 0
+        assert [(t["model"], t["status"]) for t in result["stage_timings"]] == [
+            ("rapid", "accepted"),
+            ("wildlife_tools", "cancelled"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_reject_and_fast_stage_not_hedged(self, crop):
+        """A stage that decides before the hedge delay never starts the next one"""
+        models = {
+            "rapid": FakeModel(0.30, 0.01),
+            "wildlife_tools": FakeModel(0.90, 0.01),
+        }
+        strategy = StaggeredEnsembleStrategy(speculative=True, speculative_delay=0.5)
+        result = await _identify(strategy, crop, models)
+
+        assert result["identified"] is False
+        assert result["requires_verification"] is True
+        assert models["wildlife_tools"].calls == 0
+        assert len(result["stage_timings"]) == 1
+
+    def test_hedge_delay_uses_p50(self):
+        """Without a fixed delay the stage's median latency is used"""
+        strategy = StaggeredEnsembleStrategy(speculative=True)
+        assert strategy._hedge_delay("rapid") == ensemble_strategy.FALLBACK_SPECULATIVE_DELAY
+
+        for seconds in (0.1, 0.2, 0.3, 0.4, 5.0):
+            ensemble_strategy.record_stage_latency("rapid", seconds)
+        assert strategy._hedge_delay("rapid") == pytest.approx(0.3)
+        assert StaggeredEnsembleStrategy(speculative=True, speculative_delay=0.05)._hedge_delay("rapid") == 0.05
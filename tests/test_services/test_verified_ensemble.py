@@ -0,0 +1,71 @@
+"""Tests for MatchAnything verification in the verified ensemble strategy"""
+
+import asyncio
+
+import pytest
+from PIL import Image
+
+from backend.database import verification_features
+from backend.database.models import Tiger, TigerImage
+from backend.services.tiger.ensemble_strategy import VerifiedEnsembleStrategy
+
+
+class FakeMatcher:
+    """Matcher that records its inputs and peak concurrency"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.pairs = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def match_pair(self, img1, img2):
+        self.pairs.append((img1, img2))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return {"num_matches": 120, "mean_score": 0.8, "success": True}
+
+
+@pytest.fixture
+def gallery(db_session, tmp_path):
+    """Three tigers with three gallery images each"""
+    for t in range(3):
+        db_session.add(Tiger(tiger_id=f"t{t}", name=f"Tiger {t}"))
+        for i in range(3):
+            path = tmp_path / f"t{t}_{i}.jpg"
+            Image.new("RGB", (1600, 1200), (40 * t, 20 * i, 90)).save(path, format="JPEG")
+            db_session.add(TigerImage(image_id=f"t{t}-{i}", tiger_id=f"t{t}", image_path=str(path)))
+    db_session.commit()
+    verification_features._get_executor().submit(lambda: None).result()
+    return db_session
+
+
+@pytest.mark.asyncio
+async def test_matches_query_features_against_stored_gallery_features(gallery, monkeypatch):
+    """Verification reads preselected images' features and never opens gallery files"""
+    strategy = VerifiedEnsembleStrategy(verification_concurrency=2)
+    strategy._matchanything_model = FakeMatcher()
+
+    async def no_disk(*args, **kwargs):
+        raise AssertionError("gallery images should not be loaded")
+
+    def no_ranking_query(*args, **kwargs):
+        raise AssertionError("gallery images should come from the preselection")
+
+    monkeypatch.setattr(strategy, "_load_gallery_images", no_disk)
+    monkeypatch.setattr(strategy, "_select_gallery_records", no_ranking_query)
+
+    candidates = [{"tiger_id": f"t{t}", "weighted_score": 0.8 - 0.1 * t} for t in range(3)]
+    verified = await strategy._verify_candidates(
+        Image.new("RGB", (300, 200), (1, 2, 3)), candidates, None, gallery
+    )
+
+    matcher = strategy._matchanything_model
+    assert len(matcher.pairs) == 9
+    assert matcher.peak == 2
+    # One query encoding shared by every comparison
+    assert len({id(query) for query, _ in matcher.pairs}) == 1
+    assert all(v["gallery_images_tested"] == 3 for v in verified)
+    assert verified[0]["tiger_id"] == "t0"
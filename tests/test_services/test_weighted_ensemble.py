@@ -0,0 +1,93 @@
+"""Tests for weighted ensemble score fusion"""
+
+import random
+
+import pytest
+
+from backend.services.tiger.ensemble_strategy import WeightedEnsembleStrategy
+
+
+def _reference_scores(strategy, model_results):
+    """Per-tiger weighted scores computed one match at a time"""
+    tiger_scores = {}
+    for result in model_results:
+        for match in result["matches"]:
+            similarity = strategy.calibrator.calibrate(match["similarity"], result["model"])
+            scores = tiger_scores.setdefault(match["tiger_id"], {})
+            if similarity > scores.get(result["model"], 0):
+                scores[result["model"]] = similarity
+    fused = {}
+    for tiger_id, scores in tiger_scores.items():
+        total = sum(strategy.model_weights.get(m, 0.1) for m in scores)
+        fused[tiger_id] = (
+            sum(s * strategy.model_weights.get(m, 0.1) for m, s in scores.items()) / total
+            if total else 0.0,
+            len(scores),
+        )
+    return fused
+
+
+def _model_results(pool_size, tigers=80, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "model": model,
+            "success": True,
+            "matches": [
+                {
+                    "tiger_id": f"t{rng.randrange(tigers)}",
+                    "tiger_name": None,
+                    "similarity": rng.uniform(0.3, 1.0),
+                }
+                for _ in range(pool_size)
+            ],
+        }
+        for model in ("wildlife_tools", "cvwc2019_reid", "transreid", "unknown_model")
+    ]
+
+
+class TestWeightedFusion:
+    """Tests for the models x candidates fusion matrix"""
+
+    @pytest.mark.parametrize("pool_size", [10, 300])
+    def test_matches_per_match_fusion(self, pool_size):
+        """Matrix fusion keeps each model's best score per tiger and its weight"""
+        strategy = WeightedEnsembleStrategy(use_reranking=False)
+        model_results = _model_results(pool_size)
+        expected = _reference_scores(strategy, model_results)
+
+        result = strategy._weighted_ensemble_decision(model_results, 0.5)
+
+        best = max(expected.values(), key=lambda scored: scored[0])
+        assert result["confidence"] == pytest.approx(best[0])
+        assert len(result["top_candidates"]) == 5
+        for candidate in result["top_candidates"]:
+            score, count = expected[candidate["tiger_id"]]
+            assert candidate["weighted_score"] == pytest.approx(score)
+            assert candidate["model_count"] == count
+        scores = [c["weighted_score"] for c in result["top_candidates"]]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_best_match_reports_its_model_scores(self):
+        """Only models that found the winning tiger appear in its model scores"""
+        strategy = WeightedEnsembleStrategy(use_reranking=False, use_calibration=False)
+        model_results = [
+            {"model": "wildlife_tools", "success": True, "matches": [
+                {"tiger_id": "a", "tiger_name": "A", "similarity": 0.95},
+                {"tiger_id": "a", "tiger_name": "A", "similarity": 0.5},
+            ]},
+            {"model": "transreid", "success": True, "matches": [
+                {"tiger_id": "b", "tiger_name": "B", "similarity": 0.7},
+                {"tiger_id": "a", "tiger_name": "A", "similarity": 0.85},
+            ]},
+            {"model": "cvwc2019_reid", "success": False, "error": "timeout"},
+        ]
+
+        result = strategy._weighted_ensemble_decision(model_results, 0.5)
+
+        assert result["tiger_id"] == "a"
+        assert result["tiger_name"] == "A"
+        assert result["model_scores"] == {"wildlife_tools": 0.95, "transreid": 0.85}
+        assert result["confidence"] == pytest.approx((0.95 * 0.4 + 0.85 * 0.2) / 0.6)
+        assert result["confidence_level"] == "high"
+        assert [c["tiger_id"] for c in result["top_candidates"]] == ["a", "b"]
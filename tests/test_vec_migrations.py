@@ -0,0 +1,88 @@
+"""Tests for the per-model vector table migrations"""
+
+import importlib
+import sqlite3
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from backend.database import _create_engine
+from backend.database.models import Base, Tiger, TigerImage
+from backend.database.vector_search import LEGACY_VEC_TABLE, create_vec_tables
+
+sqlite_vec = pytest.importorskip("sqlite_vec")
+
+
+def _vec0_available() -> bool:
+    try:
+        conn = sqlite3.connect(":memory:")
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.close()
+        return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _vec0_available(), reason="sqlite-vec cannot be loaded")
+
+migration_008 = importlib.import_module("backend.database.migrations.008_per_model_vec_tables")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database with the schema init_db creates and legacy 2048-dim rows"""
+    path = tmp_path / "tiger_id.db"
+    engine = _create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        create_vec_tables(conn)
+        conn.execute(text(f"""
+            CREATE VIRTUAL TABLE {LEGACY_VEC_TABLE} USING vec0(
+                image_id TEXT PRIMARY KEY,
+                embedding FLOAT[2048]
+            )
+        """))
+        for image_id in ("img0", "img1"):
+            conn.execute(
+                text(f"INSERT INTO {LEGACY_VEC_TABLE}(image_id, embedding) VALUES (:id, :embedding)"),
+                {"id": image_id, "embedding": np.ones(2048, dtype=np.float32).tobytes()}
+            )
+        conn.execute(Tiger.__table__.insert().values(tiger_id="t1", name="T1"))
+        conn.execute(TigerImage.__table__.insert().values(
+            image_id="img0", tiger_id="t1", image_path="a.jpg", side_view="left",
+            is_reference=True, verified=False
+        ))
+    engine.dispose()
+    return path
+
+
+class TestMigration008:
+    """Tests for moving legacy rows into the per-model tables"""
+
+    def test_moves_rows_into_tables_with_metadata(self, db_path):
+        """Rows keep their tiger_images metadata; unknown images get defaults"""
+        assert migration_008.migrate(db_path)
+
+        conn = migration_008._connect(db_path)
+        try:
+            rows = conn.execute("""
+                SELECT image_id, tiger_id, side_view, is_reference, verified
+                FROM vec_embeddings_tiger_reid ORDER BY image_id
+            """).fetchall()
+            legacy = conn.execute(f"SELECT COUNT(*) FROM {LEGACY_VEC_TABLE}").fetchone()[0]
+        finally:
+            conn.close()
+
+        assert rows == [("img0", "t1", "left", 1, 0), ("img1", "", "", 0, 0)]
+        assert legacy == 0
+
+    def test_rerun_is_idempotent(self, db_path):
+        assert migration_008.migrate(db_path)
+        assert migration_008.migrate(db_path, drop_legacy=True)
+
+        result = migration_008.verify(db_path)
+        assert result["all_tables_present"]
+        assert result["legacy_rows_remaining"] == 0
+        assert result["tables"]["vec_embeddings_tiger_reid"]["rows"] == 2
@@ -9,10 +9,18 @@ from sqlalchemy.pool import StaticPool
 from backend.database.models import Base, TigerImage, Tiger, Facility
 from backend.database.vector_search import (
     find_matching_tigers,
+    find_matching_tigers_batch,
     store_embedding,
+    store_embeddings_bulk,
     delete_embedding,
     sync_embeddings,
-    get_embedding_count
+    get_embedding_count,
+    create_vec_tables,
+    get_vec_table_name,
+    resolve_model_name,
+    SearchFilters,
+    _eligible_image_ids,
+    _filter_conditions,
 )
 
 
@@ -32,15 +40,10 @@ class TestVectorSearch:
         # Create tables
         Base.metadata.create_all(bind=test_engine)
 
-        # Create vec_embeddings virtual table
+        # Create per-model vec_embeddings_* virtual tables
         with test_engine.connect() as conn:
             try:
-                conn.execute(text("""
-                    CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings USING vec0(
-                        image_id TEXT PRIMARY KEY,
-                        embedding FLOAT[2048]
-                    )
-                """))
+                create_vec_tables(conn)
                 conn.commit()
             except Exception:
                 # sqlite-vec might not be available in test environment
@@ -87,6 +90,27 @@ class TestVectorSearch:
         finally:
             session.close()
     
+    def test_batch_embedding_validation(self):
+        """Test query matrix validation in find_matching_tigers_batch"""
+        from backend.database import SessionLocal
+        session = SessionLocal()
+
+        try:
+            with pytest.raises(ValueError, match="must be numpy array"):
+                find_matching_tigers_batch(session, [[1.0, 2.0]])
+
+            with pytest.raises(ValueError, match="2-dimensional"):
+                find_matching_tigers_batch(session, np.ones(2048))
+
+            with pytest.raises(ValueError, match="all-zero rows"):
+                find_matching_tigers_batch(
+                    session, np.vstack([np.ones(2048), np.zeros(2048)])
+                )
+
+            assert find_matching_tigers_batch(session, np.empty((0, 1536))) == []
+        finally:
+            session.close()
+
     def test_find_matching_tigers_basic(self, test_db_with_vectors):
         """Test find_matching_tigers with empty database"""
         TestSessionLocal = sessionmaker(
@@ -173,6 +197,212 @@ class TestVectorSearch:
             assert not (0 <= threshold <= 1)
 
 
+class TestModelTableRouting:
+    """Tests for per-model vector table selection"""
+
+    def test_table_name_per_model(self):
+        """Each ReID model gets its own table, aliases share the canonical one"""
+        assert get_vec_table_name("tiger_reid") == "vec_embeddings_tiger_reid"
+        assert get_vec_table_name("wildlife_tools") == "vec_embeddings_wildlife_tools"
+        assert get_vec_table_name("cvwc2019") == get_vec_table_name("cvwc2019_reid")
+        assert get_vec_table_name("rapid") == get_vec_table_name("rapid_reid")
+
+    def test_resolve_model_from_dimension(self):
+        """Legacy callers without model_name are routed by embedding dimension"""
+        assert resolve_model_name(embedding_dim=2048) == "tiger_reid"
+        assert resolve_model_name(embedding_dim=1536) == "wildlife_tools"
+        assert resolve_model_name(embedding_dim=1024) == "megadescriptor_b"
+        assert resolve_model_name(embedding_dim=768) == "transreid"
+
+    def test_unknown_model_rejected(self):
+        """Unknown and non-ReID models have no vector table"""
+        with pytest.raises(ValueError):
+            resolve_model_name("not_a_model")
+        with pytest.raises(ValueError):
+            resolve_model_name("megadetector")
+
+    def test_dimension_mismatch_rejected(self):
+        """Query embeddings must match the model's native dimension"""
+        from backend.database import SessionLocal
+        session = SessionLocal()
+
+        try:
+            with pytest.raises(ValueError, match="dimension"):
+                find_matching_tigers(
+                    session,
+                    np.random.rand(2048).astype(np.float32),
+                    model_name="wildlife_tools"
+                )
+        finally:
+            session.close()
+
+
+class TestSearchFilters:
+    """Tests for filters applied inside the KNN"""
+
+    def test_filter_conditions_target_metadata_columns(self):
+        """Filters become vec0 metadata conditions with bound values"""
+        params = {}
+        conditions = _filter_conditions(
+            SearchFilters("tiger-1", "left", True, False), params, "vec_embeddings_tiger_reid"
+        )
+        assert conditions == [
+            "vec_embeddings_tiger_reid.tiger_id != :exclude_tiger_id",
+            "vec_embeddings_tiger_reid.side_view IN (:side_view, 'both', 'unknown')",
+            "vec_embeddings_tiger_reid.is_reference = :is_reference",
+            "vec_embeddings_tiger_reid.verified = :verified",
+        ]
+        assert params == {
+            "exclude_tiger_id": "tiger-1", "side_view": "left", "is_reference": 1, "verified": 0
+        }
+        assert _filter_conditions(SearchFilters(), {}, "ti") == []
+
+    def test_candidate_tigers_condition(self):
+        """Two-stage search restricts the KNN to the candidate tigers"""
+        params = {}
+        conditions = _filter_conditions(SearchFilters(tiger_ids=("a", "b")), params, "ti")
+        assert conditions == ["ti.tiger_id IN (:tiger_id_0, :tiger_id_1)"]
+        assert params == {"tiger_id_0": "a", "tiger_id_1": "b"}
+        assert SearchFilters(tiger_ids=()).has_attribute_filters
+
+    def test_eligible_image_ids(self):
+        """In-memory indexes get the pre-filtered candidate set"""
+        engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        try:
+            session.add(Tiger(tiger_id="t1", name="T1"))
+            for i, (side_view, is_reference) in enumerate(
+                [("left", True), ("right", True), ("both", False), ("unknown", True)]
+            ):
+                session.add(TigerImage(
+                    image_id=f"img{i}", tiger_id="t1", image_path="x",
+                    side_view=side_view, is_reference=is_reference
+                ))
+            session.commit()
+
+            assert _eligible_image_ids(session, SearchFilters(exclude_tiger_id="t1")) is None
+            assert _eligible_image_ids(session, SearchFilters(side_view="left")) == {"img0", "img2", "img3"}
+            assert _eligible_image_ids(
+                session, SearchFilters(side_view="left", is_reference=True)
+            ) == {"img0", "img3"}
+        finally:
+            session.close()
+
+
+class TestBulkStore:
+    """Tests for single-transaction bulk embedding writes"""
+
+    @pytest.fixture
+    def session(self, monkeypatch):
+        from backend.database import gallery_index, knn_graph
+        from backend.database.gallery_index import GalleryIndex
+        from backend.database.knn_graph import GalleryKNNGraph
+
+        engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            # Plain stand-in when sqlite-vec is not installed
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS vec_embeddings_wildlife_tools (
+                    image_id TEXT PRIMARY KEY, embedding BLOB,
+                    tiger_id TEXT, side_view TEXT, is_reference INTEGER, verified INTEGER
+                )
+            """))
+
+        index = GalleryIndex("wildlife_tools", 1536)
+        index.loaded = True
+        monkeypatch.setattr(gallery_index, "_indexes", {"wildlife_tools": index})
+
+        graph = GalleryKNNGraph("wildlife_tools", 1536, k=3)
+        graph.loaded = True
+        monkeypatch.setattr(knn_graph, "_graphs", {"wildlife_tools": graph})
+
+        session = sessionmaker(bind=engine)()
+        session.add(Tiger(tiger_id="t1", name="T1"))
+        for i in range(5):
+            session.add(TigerImage(image_id=f"img{i}", tiger_id="t1", image_path="x", side_view="left"))
+        session.commit()
+        yield session
+        session.close()
+
+    def test_bulk_write_and_index_update(self, session):
+        """Rows, metadata and the in-memory index are written together"""
+        from backend.database.gallery_index import get_gallery_index
+
+        embeddings = np.random.default_rng(0).standard_normal((6, 1536)).astype(np.float32)
+        ids = ["img0", "img1", "img2", "img3", "img4", "img0"]
+        assert store_embeddings_bulk(session, "wildlife_tools", ids, embeddings) == 5
+
+        rows = session.execute(text(
+            "SELECT image_id, tiger_id, side_view FROM vec_embeddings_wildlife_tools ORDER BY image_id"
+        )).fetchall()
+        assert [tuple(r) for r in rows] == [(f"img{i}", "t1", "left") for i in range(5)]
+
+        index = get_gallery_index("wildlife_tools")
+        assert len(index) == 5
+        # A repeated id keeps its last embedding
+        assert index.search(embeddings[5], k=1)[0][0] == "img0"
+
+    def test_store_and_delete_update_knn_graph(self, session):
+        """The re-ranking k-NN graph follows committed writes and deletes"""
+        from backend.database.knn_graph import get_knn_graph
+
+        embeddings = np.random.default_rng(2).standard_normal((5, 1536)).astype(np.float32)
+        store_embeddings_bulk(session, "wildlife_tools", [f"img{i}" for i in range(5)], embeddings)
+
+        graph = get_knn_graph("wildlife_tools")
+        assert len(graph) == 5
+        with graph.read() as view:
+            assert [view.image_ids[row[0]] for row in view.neighbours] == view.image_ids
+
+        assert delete_embedding(session, "img2", "wildlife_tools")
+        assert len(graph) == 4
+        assert "img2" not in graph
+
+    def test_uncommitted_writes_reach_index_on_commit(self, session):
+        """commit=False defers index updates to the caller's commit or rollback"""
+        from backend.database.gallery_index import get_gallery_index
+
+        embeddings = np.random.default_rng(1).standard_normal((2, 1536)).astype(np.float32)
+        index = get_gallery_index("wildlife_tools")
+
+        assert store_embeddings_bulk(session, None, ["img0", "img1"], embeddings, commit=False) == 2
+        assert len(index) == 0
+        session.rollback()
+        assert len(index) == 0
+
+        store_embeddings_bulk(session, None, ["img0", "img1"], embeddings, commit=False)
+        session.commit()
+        assert len(index) == 2
+
+    def test_uncommitted_failure_is_left_to_the_caller(self, session):
+        """A failed commit=False write raises instead of rolling back the caller's records"""
+        session.add(Tiger(tiger_id="t2", name="T2"))
+        session.flush()
+
+        with pytest.raises(ValueError):
+            store_embeddings_bulk(session, "wildlife_tools", ["img0"], np.ones((1, 768)), commit=False)
+
+        assert session.get(Tiger, "t2") is not None
+        session.commit()
+        assert session.get(Tiger, "t2") is not None
+
+    def test_dimension_mismatch_stores_nothing(self, session):
+        """Embeddings that do not fit the model are rejected"""
+        embeddings = np.ones((2, 768), dtype=np.float32)
+        assert store_embeddings_bulk(session, "wildlife_tools", ["img0", "img1"], embeddings) == 0
+        assert store_embeddings_bulk(session, "wildlife_tools", ["img0"], np.ones((2, 1536))) == 0
+
+
 class TestVectorSearchIntegration:
     """Integration tests for vector search (requires PostgreSQL + pgvector)"""
     
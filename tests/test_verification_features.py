@@ -0,0 +1,186 @@
+"""Tests for the gallery verification feature store"""
+
+import io
+import os
+
+import pytest
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import verification_features
+from backend.database.models import Base, Tiger, TigerImage
+from backend.database.verification_features import (
+    MATCHER_INPUT_SIZE,
+    GalleryFeatureStore,
+    backfill_gallery_features,
+    build_gallery_selection,
+    extract_verification_features,
+)
+
+
+def _write_image(path, color=(200, 120, 40), size=(1200, 900)):
+    Image.new("RGB", size, color).save(path, format="JPEG")
+    return str(path)
+
+
+def _wait_for_ingest():
+    verification_features._get_executor().submit(lambda: None).result()
+
+
+@pytest.fixture
+def session():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Tiger(tiger_id="t1", name="Raja"))
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestVerificationFeatures:
+    """Tests for feature extraction, freshness checks and ingest hooks"""
+
+    def test_features_are_matcher_sized_grayscale(self):
+        """Features are the lossless grayscale input the matcher resizes to"""
+        features = extract_verification_features(Image.new("RGB", (1200, 900), (10, 20, 30)))
+        decoded = Image.open(io.BytesIO(features))
+        assert decoded.format == "PNG"
+        assert decoded.mode == "L"
+        assert decoded.size == MATCHER_INPUT_SIZE
+
+    def test_computed_once_then_served_from_store(self, tmp_path, monkeypatch):
+        """A second lookup reads the store, not the gallery file"""
+        path = _write_image(tmp_path / "a.jpg")
+        store = GalleryFeatureStore(tmp_path / "features.db")
+        first = store.get_or_compute([("i1", path)])
+
+        opens = []
+        monkeypatch.setattr(verification_features.Image, "open", lambda *a, **k: opens.append(a))
+        assert store.get_or_compute([("i1", path)]) == first
+        assert opens == []
+        assert store.get_stats()["computed"] == 1
+        assert store.get_stats()["hits"] == 1
+
+    def test_changed_or_missing_file_is_not_served(self, tmp_path):
+        """Rewriting the source file invalidates its features"""
+        path = _write_image(tmp_path / "a.jpg")
+        store = GalleryFeatureStore(":memory:")
+        original = store.get_or_compute([("i1", path)])["i1"]
+
+        _write_image(path, color=(0, 0, 0), size=(800, 600))
+        os.utime(path, ns=(1, 1))
+        assert store.get_many([("i1", path)]) == {}
+        assert store.get_or_compute([("i1", path)])["i1"] != original
+
+        os.remove(path)
+        assert store.get_or_compute([("i1", path)]) == {}
+
+    def test_ingest_computes_and_delete_drops(self, session, tmp_path, isolated_verification_features):
+        """Committed gallery images get features; deleted ones lose them"""
+        store = isolated_verification_features
+        path = _write_image(tmp_path / "a.jpg")
+        session.add(TigerImage(image_id="i1", tiger_id="t1", image_path=path))
+        session.commit()
+        _wait_for_ingest()
+        assert set(store.get_many([("i1", path)])) == {"i1"}
+
+        session.delete(session.get(TigerImage, "i1"))
+        session.commit()
+        assert len(store) == 0
+
+    def test_rollback_discards_pending_ingest(self, session, tmp_path, isolated_verification_features):
+        """Images from a rolled-back transaction are never extracted"""
+        path = _write_image(tmp_path / "a.jpg")
+        session.add(TigerImage(image_id="i1", tiger_id="t1", image_path=path))
+        session.flush()
+        session.rollback()
+        _wait_for_ingest()
+        assert len(isolated_verification_features) == 0
+
+    def test_backfill_fills_only_missing(self, session, tmp_path, isolated_verification_features):
+        """Backfill computes features for images ingested without them"""
+        store = isolated_verification_features
+        paths = [_write_image(tmp_path / f"{i}.jpg") for i in range(3)]
+        for i, path in enumerate(paths):
+            session.add(TigerImage(image_id=f"i{i}", tiger_id="t1", image_path=path))
+        session.commit()
+        _wait_for_ingest()
+        # Images ingested before the store existed
+        store.delete(["i0", "i2"])
+
+        assert backfill_gallery_features(session) == 2
+        assert backfill_gallery_features(session) == 0
+        assert len(store) == 3
+
+
+class TestGallerySelection:
+    """Tests for the per-tiger, per-side gallery preselection"""
+
+    @pytest.fixture
+    def tiger_images(self, session, tmp_path):
+        images = [
+            TigerImage(image_id="left-low", tiger_id="t1", image_path=str(tmp_path / "1.jpg"),
+                       side_view="left", quality_score=0.2),
+            TigerImage(image_id="right-high", tiger_id="t1", image_path=str(tmp_path / "2.jpg"),
+                       side_view="right", quality_score=0.9),
+            TigerImage(image_id="both-mid", tiger_id="t1", image_path=str(tmp_path / "3.jpg"),
+                       side_view="both", quality_score=0.5),
+            TigerImage(image_id="unknown-verified", tiger_id="t1", image_path=str(tmp_path / "4.jpg"),
+                       verified=True, quality_score=0.1),
+        ]
+        session.add_all(images)
+        session.commit()
+        _wait_for_ingest()
+        return images
+
+    def test_ingest_builds_best_images_per_side(self, tiger_images, isolated_verification_features):
+        """Committed images are ranked per query side in the background"""
+        store = isolated_verification_features
+
+        def ids(side):
+            return [image_id for image_id, _ in store.select_gallery(["t1"], side)["t1"]]
+
+        assert ids("left") == ["left-low", "both-mid", "unknown-verified"]
+        assert ids("right") == ["right-high", "both-mid", "unknown-verified"]
+        assert ids(None) == ["unknown-verified", "right-high", "both-mid"]
+        assert len(store.select_gallery(["t1"], "left", limit=1)["t1"]) == 1
+
+    def test_verifying_an_image_rebuilds_its_tiger(self, session, tiger_images, isolated_verification_features):
+        """Flipping verified re-ranks the tiger's selection after commit"""
+        store = isolated_verification_features
+        session.get(TigerImage, "left-low").verified = True
+        session.commit()
+        _wait_for_ingest()
+        assert store.select_gallery(["t1"], None)["t1"][0][0] == "left-low"
+
+    def test_seed_racing_a_commit_is_not_stored(self, session, tmp_path, isolated_verification_features):
+        """A seed that read the database before a commit keeps the newer selection"""
+        store = isolated_verification_features
+        store.clear()
+        version = store.selection_versions(["t1"])["t1"]
+        session.add(TigerImage(image_id="new", tiger_id="t1", image_path=str(tmp_path / "5.jpg")))
+        session.commit()
+
+        assert not store.seed_gallery("t1", [], version)
+        assert "t1" not in store.select_gallery(["t1"])
+        assert build_gallery_selection(session, ["t1"]) == 1
+        assert [image_id for image_id, _ in store.select_gallery(["t1"])["t1"]] == ["new"]
+
+    def test_images_predating_the_store_are_seeded(self, session, tiger_images, isolated_verification_features):
+        """A tiger is only ranked once all of its images are known"""
+        store = isolated_verification_features
+        store.clear()
+        session.get(TigerImage, "left-low").quality_score = 1.0
+        session.commit()
+        # Only one of the tiger's images reached the store through the hooks
+        assert "t1" not in store.select_gallery(["t1"])
+
+        assert build_gallery_selection(session) == 1
+        assert len(store.select_gallery(["t1"])["t1"]) == 3